@@ -0,0 +1,528 @@
+"""
+Performance benchmarks of backtesting and hyperopt.
+
+Backtests the sample strategy on synthetic candles - generated on the fly for a number of pairs
+and candles - and records throughput and peak memory of each case to a json file.
+Results are compared against a stored baseline, failing if any case regressed.
+
+Run from the root of the repository:
+
+    python -m benchmarks.backtest_benchmark
+    python -m benchmarks.backtest_benchmark --pairs 20 --candles 20000 --cases spot hyperopt
+    python -m benchmarks.backtest_benchmark --save-baseline
+
+Timings depend on the machine - the baseline should be recreated (`--save-baseline`) on the
+machine results are compared on, from the commit to compare against.
+"""
+
+import argparse
+import logging
+import math
+import multiprocessing
+import platform
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from datetime import UTC, datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import rapidjson
+from pandas import DataFrame
+
+from freqtrade.configuration import Configuration
+from freqtrade.data.converter import trim_dataframes
+from freqtrade.data.history import get_datahandler, get_timerange
+from freqtrade.enums import CandleType, RunMode
+from freqtrade.exchange import Exchange, timeframe_to_minutes, timeframe_to_resample_freq
+from freqtrade.misc import file_dump_json
+from freqtrade.optimize.backtest_profiler import BacktestProfiler
+from freqtrade.optimize.backtesting import Backtesting
+from freqtrade.optimize.optimize_reports import generate_backtest_stats
+from freqtrade.resolvers import ExchangeResolver
+
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DIR = Path(__file__).parent
+BASELINE_FILE = BENCHMARK_DIR / "baseline.json"
+RESULTS_DIR = BENCHMARK_DIR / "results"
+TEMPLATES_DIR = BENCHMARK_DIR.parent / "freqtrade" / "templates"
+
+STRATEGY = "SampleStrategy"
+HYPEROPT_LOSS = "SharpeHyperOptLoss"
+TIMEFRAME = "5m"
+DETAIL_TIMEFRAME = "1m"
+START_DATE = datetime(2024, 1, 1, tzinfo=UTC)
+SEED = 42
+
+PAIR_COUNT = 10
+CANDLE_COUNT = 10_000
+EPOCH_COUNT = 20
+REPEAT_COUNT = 3
+# Relative change of a metric which counts as regression
+TOLERANCE = 0.1
+
+# Case name -> configuration overrides. "can_short" is set on the strategy.
+CASES: dict[str, dict[str, Any]] = {
+    "spot": {},
+    "spot_detail": {"timeframe_detail": DETAIL_TIMEFRAME},
+    "spot_stacking": {"position_stacking": True},
+    "futures_short": {"trading_mode": "futures", "margin_mode": "isolated", "can_short": True},
+    "futures_short_detail": {
+        "trading_mode": "futures",
+        "margin_mode": "isolated",
+        "can_short": True,
+        "timeframe_detail": DETAIL_TIMEFRAME,
+    },
+    "hyperopt": {"hyperopt": True},
+}
+# Metrics compared against the baseline - and whether higher values are better
+COMPARED_METRICS = {
+    "candles_per_second": True,
+    "epochs_per_minute": True,
+    "peak_memory_mb": False,
+}
+# Leverage tier of all synthetic futures pairs
+LEVERAGE_TIER = {
+    "minNotional": 0.0,
+    "maxNotional": 1e9,
+    "maintenanceMarginRate": 0.01,
+    "maxLeverage": 20.0,
+    "maintAmt": 0.0,
+}
+
+
+def pair_names(count: int, futures: bool) -> list[str]:
+    return [f"B{index:03d}/USDT{':USDT' if futures else ''}" for index in range(count)]
+
+
+def synthetic_candles(index: int, count: int) -> DataFrame:
+    """
+    Random walk of DETAIL_TIMEFRAME candles of one pair - identical for the same index and count.
+    Volatility changes slowly, so RSI based signals fire in bursts, like on real data.
+    """
+    rng = np.random.default_rng([SEED, index])
+    volatility = 0.0015 * np.exp(np.cumsum(rng.normal(0, 0.01, count)).clip(-1.5, 1.5))
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 1, count) * volatility))
+    open_ = np.concatenate(([100.0], close[:-1]))
+    wicks = np.abs(rng.normal(0, 1, (2, count))) * volatility
+    return DataFrame(
+        {
+            "date": pd.date_range(START_DATE, periods=count, freq="1min"),
+            "open": open_,
+            "high": np.maximum(open_, close) * (1 + wicks[0]),
+            "low": np.minimum(open_, close) * (1 - wicks[1]),
+            "close": close,
+            "volume": rng.uniform(100, 1000, count),
+        }
+    )
+
+
+def resample(candles: DataFrame, timeframe: str) -> DataFrame:
+    return (
+        candles.resample(timeframe_to_resample_freq(timeframe), on="date")
+        .agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+        .reset_index()
+    )
+
+
+def write_data(
+    config: dict[str, Any], exchange: Exchange, pairs: list[str], candle_count: int
+) -> None:
+    """
+    Store the synthetic candles of all pairs to the data directory - including detail candles,
+    mark candles and funding rates where needed.
+    """
+    handler = get_datahandler(config["datadir"], config["dataformat_ohlcv"])
+    candle_type = CandleType.from_string(config["candle_type_def"])
+    futures = candle_type == CandleType.FUTURES
+    detail = config.get("timeframe_detail")
+    for index, pair in enumerate(pairs):
+        candles = synthetic_candles(index, candle_count * timeframe_to_minutes(TIMEFRAME))
+        handler.ohlcv_store(pair, TIMEFRAME, resample(candles, TIMEFRAME), candle_type)
+        if detail:
+            handler.ohlcv_store(pair, detail, resample(candles, detail), candle_type)
+        if futures:
+            mark_timeframe = exchange.get_option("mark_ohlcv_timeframe")
+            mark_type = CandleType.from_string(exchange.get_option("mark_ohlcv_price"))
+            handler.ohlcv_store(pair, mark_timeframe, resample(candles, mark_timeframe), mark_type)
+            funding_timeframe = exchange.get_option("funding_fee_timeframe")
+            rates = resample(candles, funding_timeframe)
+            rates.loc[:, ["open", "high", "low", "close"]] = 0.0001
+            rates["volume"] = 0.0
+            handler.ohlcv_store(pair, funding_timeframe, rates, CandleType.FUNDING_RATE)
+
+
+def synthetic_market(pair: str, futures: bool) -> dict[str, Any]:
+    base, quote = pair.split(":")[0].split("/")
+    return {
+        "id": pair.replace("/", "").split(":")[0],
+        "symbol": pair,
+        "base": base,
+        "quote": quote,
+        "settle": quote if futures else None,
+        "baseId": base,
+        "quoteId": quote,
+        "settleId": quote if futures else None,
+        "type": "swap" if futures else "spot",
+        "spot": not futures,
+        "margin": False,
+        "swap": futures,
+        "future": False,
+        "option": False,
+        "contract": futures,
+        "linear": True if futures else None,
+        "inverse": False if futures else None,
+        "contractSize": 1.0 if futures else None,
+        "active": True,
+        "precision": {"amount": 0.001, "price": 0.0001},
+        "limits": {
+            "amount": {"min": 0.001, "max": 1e6},
+            "price": {"min": 0.0001, "max": 1e6},
+            "cost": {"min": 5.0, "max": None},
+            "leverage": {"min": 1.0, "max": 20.0},
+        },
+        "info": {},
+    }
+
+
+def offline_exchange(config: dict[str, Any], pairs: list[str]) -> Exchange:
+    """
+    Exchange with synthetic markets (and leverage tiers), which doesn't connect to the exchange.
+    """
+    exchange = ExchangeResolver.load_exchange(config, validate=False, load_leverage_tiers=False)
+    futures = config.get("trading_mode") == "futures"
+    exchange._markets = {pair: synthetic_market(pair, futures) for pair in pairs}
+    if futures:
+        exchange._leverage_tiers = {pair: [dict(LEVERAGE_TIER)] for pair in pairs}  # type: ignore
+    return exchange
+
+
+def benchmark_config(
+    workdir: Path, options: dict[str, Any], pairs: list[str], epochs: int
+) -> dict[str, Any]:
+    config_file = workdir / "config.json"
+    file_dump_json(
+        config_file,
+        {
+            "max_open_trades": -1,
+            "stake_currency": "USDT",
+            "stake_amount": 100,
+            "dry_run_wallet": 1_000_000,
+            "tradable_balance_ratio": 0.99,
+            "timeframe": TIMEFRAME,
+            "dry_run": True,
+            "trading_mode": options.get("trading_mode", "spot"),
+            "margin_mode": options.get("margin_mode", ""),
+            "fee": 0.001,
+            "exchange": {"name": "binance", "pair_whitelist": pairs, "pair_blacklist": []},
+            "pairlists": [{"method": "StaticPairList"}],
+            "entry_pricing": {"price_side": "same"},
+            "exit_pricing": {"price_side": "same"},
+            "dataformat_ohlcv": "feather",
+        },
+        log=False,
+    )
+    args = {
+        "config": [str(config_file)],
+        "strategy": STRATEGY,
+        "strategy_path": str(TEMPLATES_DIR),
+        "user_data_dir": str(workdir / "user_data"),
+        "datadir": str(workdir / "data"),
+        "timeframe_detail": options.get("timeframe_detail"),
+        "position_stacking": options.get("position_stacking", False),
+    }
+    runmode = RunMode.BACKTEST
+    if options.get("hyperopt"):
+        runmode = RunMode.HYPEROPT
+        args.update(
+            {
+                "epochs": epochs,
+                "spaces": ["buy", "sell"],
+                "hyperopt_loss": HYPEROPT_LOSS,
+                "hyperopt_random_state": SEED,
+                "hyperopt_min_trades": 1,
+            }
+        )
+    (workdir / "user_data").mkdir()
+    config = Configuration(args, runmode).get_config()
+    config["export"] = "none"
+    return config
+
+
+def run_backtest_case(
+    config: dict[str, Any], exchange: Exchange, options: dict[str, Any], repeat: int
+) -> dict[str, Any]:
+    """
+    Backtest all pairs repeat times - times are the fastest of all repeats.
+    """
+    seconds: dict[str, float] = {}
+    start = perf_counter()
+    backtesting = Backtesting(config, exchange)
+    seconds["startup"] = perf_counter() - start
+
+    start = perf_counter()
+    data, timerange = backtesting.load_bt_data()
+    seconds["dataload"] = perf_counter() - start
+
+    strategy = backtesting.strategylist[0]
+    strategy.can_short = options.get("can_short", False)
+    backtesting._set_strategy(strategy)
+    start = perf_counter()
+    preprocessed = strategy.advise_all_indicators(data)
+    seconds["analyze"] = perf_counter() - start
+    min_date, max_date = get_timerange(
+        trim_dataframes(preprocessed, timerange, backtesting.required_startup)
+    )
+
+    for _ in range(repeat):
+        processed = {pair: df.copy() for pair, df in preprocessed.items()}
+        backtesting.progress.profiler = profiler = BacktestProfiler()
+        start = perf_counter()
+        results = backtesting.backtest(processed, min_date, max_date)
+        backtest_time = perf_counter() - start
+        backtesting.progress.profiler = None
+        profiler.stop_phase()
+        if backtest_time < seconds.get("backtest", math.inf):
+            seconds["backtest"] = backtest_time
+            seconds["convert"] = profiler.phases.get("convert", 0.0)
+            seconds["backtest_loop"] = profiler.phases.get("backtest", 0.0)
+            candles = profiler.candles
+
+    results.update({"run_id": "", "backtest_start_time": 0, "backtest_end_time": 0})
+    start = perf_counter()
+    generate_backtest_stats(preprocessed, {STRATEGY: results}, min_date, max_date)
+    seconds["report"] = perf_counter() - start
+    return {
+        "candles": candles,
+        "trades": len(results["results"]),
+        "seconds": {name: round(value, 4) for name, value in seconds.items()},
+        "candles_per_second": round(candles / seconds["backtest"], 1),
+    }
+
+
+def run_hyperopt_case(config: dict[str, Any], exchange: Exchange, epochs: int) -> dict[str, Any]:
+    """
+    Run epochs hyperopt epochs in this process - as with `--job-workers 1`.
+    """
+    from freqtrade.optimize.hyperopt.hyperopt_optimizer import HyperOptimizer
+
+    hyperopt_dir = config["user_data_dir"] / "hyperopt_results"
+    hyperopt_dir.mkdir(parents=True, exist_ok=True)
+    seconds: dict[str, float] = {}
+    start = perf_counter()
+    # The optimizer creates its own Backtesting instance - which uses the offline exchange.
+    with patch.object(ExchangeResolver, "load_exchange", return_value=exchange):
+        optimizer = HyperOptimizer(config, hyperopt_dir / "hyperopt_tickerdata.pkl")
+    seconds["startup"] = perf_counter() - start
+
+    start = perf_counter()
+    optimizer.prepare_hyperopt()
+    seconds["prepare"] = perf_counter() - start
+
+    study = optimizer.get_optimizer(SEED)
+    candles = 0
+    start = perf_counter()
+    for _ in range(epochs):
+        trial = study.ask(optimizer.o_dimensions)
+        optimizer.backtesting.progress.profiler = profiler = BacktestProfiler()
+        result = optimizer.generate_optimizer(trial.params)
+        study.tell(trial, result["loss"])
+        candles += profiler.candles
+    seconds["optimize"] = perf_counter() - start
+    return {
+        "candles": candles,
+        "epochs": epochs,
+        "seconds": {name: round(value, 4) for name, value in seconds.items()},
+        "epochs_per_minute": round(epochs / seconds["optimize"] * 60, 2),
+    }
+
+
+def peak_memory_mb() -> float | None:
+    """
+    Peak resident memory of this process, if available on this platform.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_case(
+    name: str, pair_count: int, candle_count: int, epochs: int, repeat: int
+) -> dict[str, Any]:
+    """
+    Run one benchmark case in this process, with its own synthetic data.
+    """
+    options = CASES[name]
+    pairs = pair_names(pair_count, options.get("trading_mode") == "futures")
+    with TemporaryDirectory(prefix="ft-benchmark-") as tmp_dir:
+        config = benchmark_config(Path(tmp_dir), options, pairs, epochs)
+        exchange = offline_exchange(config, pairs)
+        write_data(config, exchange, pairs, candle_count)
+        try:
+            if options.get("hyperopt"):
+                result = run_hyperopt_case(config, exchange, epochs)
+            else:
+                result = run_backtest_case(config, exchange, options, repeat)
+        finally:
+            Backtesting.cleanup()
+    result["peak_memory_mb"] = peak_memory_mb()
+    return result
+
+
+def _run_case_in_process(
+    name: str, pair_count: int, candle_count: int, epochs: int, repeat: int, verbose: bool
+) -> dict[str, Any]:
+    if not verbose:
+        # Freqtrade sets up logging on its own while loading the configuration
+        logging.disable(logging.INFO)
+    return run_case(name, pair_count, candle_count, epochs, repeat)
+
+
+def run_benchmarks(
+    cases: list[str], pair_count: int, candle_count: int, epochs: int, repeat: int, verbose: bool
+) -> dict[str, Any]:
+    """
+    Run the cases one after the other - each in a fresh process, so peak memory is per case.
+    """
+    results: dict[str, Any] = {}
+    context = multiprocessing.get_context("spawn")
+    for name in cases:
+        logger.info(f"Running benchmark case {name} ...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[name] = executor.submit(
+                _run_case_in_process, name, pair_count, candle_count, epochs, repeat, verbose
+            ).result()
+        logger.info(f"{name}: {results[name]}")
+    return {
+        "parameters": {
+            "pairs": pair_count,
+            "candles": candle_count,
+            "epochs": epochs,
+            "repeat": repeat,
+        },
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "date": datetime.now(UTC).isoformat(timespec="seconds"),
+        "results": results,
+    }
+
+
+def compare_results(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float = TOLERANCE
+) -> list[str]:
+    """
+    Compare benchmark results against a baseline.
+    :return: list of regressions - empty if there are none
+    """
+    if results["parameters"] != baseline["parameters"]:
+        logger.warning(
+            f"Benchmark parameters {results['parameters']} differ from the baseline "
+            f"{baseline['parameters']} - not comparing."
+        )
+        return []
+    if results.get("machine") != baseline.get("machine"):
+        logger.warning(
+            f"Benchmarks ran on {results.get('machine')}, the baseline on "
+            f"{baseline.get('machine')} - timings are not comparable, not comparing."
+        )
+        return []
+    regressions = []
+    for case, metrics in results["results"].items():
+        base_metrics = baseline["results"].get(case)
+        if base_metrics is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            value = metrics.get(metric)
+            base = base_metrics.get(metric)
+            if not value or not base:
+                continue
+            change = value / base - 1
+            logger.info(f"{case} {metric}: {value} (baseline {base}, {change:+.1%})")
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append(f"{case} {metric}: {value} (baseline {base}, {change:+.1%})")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Backtesting and hyperopt benchmarks.")
+    parser.add_argument(
+        "--cases", nargs="+", choices=list(CASES), default=list(CASES), help="Cases to run."
+    )
+    parser.add_argument("--pairs", type=int, default=PAIR_COUNT, help="Number of pairs.")
+    parser.add_argument(
+        "--candles", type=int, default=CANDLE_COUNT, help=f"Number of {TIMEFRAME} candles per pair."
+    )
+    parser.add_argument("--epochs", type=int, default=EPOCH_COUNT, help="Hyperopt epochs.")
+    parser.add_argument(
+        "--repeat", type=int, default=REPEAT_COUNT, help="Backtests per case - fastest counts."
+    )
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results).")
+    parser.add_argument(
+        "--baseline", type=Path, default=BASELINE_FILE, help="Baseline to compare against."
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store the results as new baseline."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=TOLERANCE,
+        help="Relative change of a metric which counts as regression (default: %(default)s).",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show freqtrade logs.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    results = run_benchmarks(
+        args.cases, args.pairs, args.candles, args.epochs, args.repeat, args.verbose
+    )
+    output = args.output or (
+        RESULTS_DIR / f"benchmark-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    file_dump_json(output, results, log=False)
+    logger.info(f"Stored benchmark results to {output}.")
+
+    if args.save_baseline:
+        baseline = deepcopy(results)
+        if args.baseline.is_file():
+            # Keep the cases which weren't run
+            with args.baseline.open() as f:
+                previous = rapidjson.load(f)
+            if previous["parameters"] == results["parameters"]:
+                baseline["results"] = {**previous["results"], **results["results"]}
+        # Pretty-printed, so changes of the baseline can be reviewed
+        with args.baseline.open("w") as f:
+            rapidjson.dump(baseline, f, indent=2)
+            f.write("\n")
+        logger.info(f"Stored benchmark baseline to {args.baseline}.")
+        return 0
+
+    if not args.baseline.is_file():
+        logger.warning(f"No baseline found at {args.baseline}.")
+        return 0
+    with args.baseline.open() as f:
+        baseline = rapidjson.load(f)
+    if regressions := compare_results(results, baseline, args.tolerance):
+        logger.error("Performance regressions:\n" + "\n".join(regressions))
+        return 1
+    logger.info("No performance regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
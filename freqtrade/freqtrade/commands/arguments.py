@@ -59,8 +59,14 @@ ARGS_BACKTEST = [
     "exportdirectory",
     "backtest_breakdown",
     "backtest_cache",
+    "backtest_loop",
+    "backtest_jobs",
+    "backtest_shards",
+    "backtest_pair_cache",
     "freqai_backtest_live_models",
     "backtest_notes",
+    "profile",
+    "profile_stacks",
 ]
 
 ARGS_HYPEROPT = [
@@ -70,6 +76,7 @@ ARGS_HYPEROPT = [
     "enable_protections",
     "dry_run_wallet",
     "timeframe_detail",
+    "backtest_loop",
     "epochs",
     "spaces",
     "print_all",
@@ -82,6 +89,8 @@ ARGS_HYPEROPT = [
     "hyperopt_ignore_missing_space",
     "analyze_per_epoch",
     "early_stop",
+    "profile",
+    "profile_stacks",
 ]
 
 ARGS_EDGE = [*ARGS_COMMON_OPTIMIZE]
@@ -274,6 +274,57 @@ AVAILABLE_CLI_OPTIONS = {
         default=constants.BACKTEST_CACHE_DEFAULT,
         choices=constants.BACKTEST_CACHE_AGE,
     ),
+    "backtest_loop": Arg(
+        "--backtest-loop",
+        help="Backtest loop mode. `sparse` only visits candles with entry signals or open "
+        "trades, `vectorized` also skips candles where open trades can't exit. Both give "
+        "identical results (default: `%(default)s`).",
+        default=constants.BACKTEST_LOOP_DEFAULT,
+        choices=constants.BACKTEST_LOOP_MODES,
+    ),
+    "backtest_jobs": Arg(
+        "--backtest-jobs",
+        help="The number of strategies from `--strategy-list` to backtest in parallel "
+        "(worker processes). "
+        "If -1, all CPUs are used, for -2, all CPUs but one are used, etc. "
+        "(default: %(default)d).",
+        type=int,
+        metavar="JOBS",
+        default=1,
+    ),
+    "backtest_shards": Arg(
+        "--backtest-shards",
+        help="Split the pairs into this many shards, backtested in parallel (worker processes). "
+        "Only used when pairs can't affect each other's trades - unlimited `max_open_trades`, "
+        "a fixed stake amount and no global protections. "
+        "If -1, all CPUs are used, for -2, all CPUs but one are used, etc. "
+        "(default: %(default)d).",
+        type=int,
+        metavar="SHARDS",
+        default=1,
+    ),
+    "backtest_pair_cache": Arg(
+        "--backtest-pair-cache",
+        help="Cache backtest results per pair, and only backtest pairs whose data or signals "
+        "changed since - from the first changed candle where possible. "
+        "Only used when pairs can't affect each other's trades.",
+        action="store_true",
+        default=False,
+    ),
+    "profile": Arg(
+        "--profile",
+        help="Profile the run - time spent per phase and per strategy callback. "
+        "The report is stored next to the results.",
+        action="store_true",
+        default=False,
+    ),
+    "profile_stacks": Arg(
+        "--profile-stacks",
+        help="With `--profile`, also sample the stack of the main process, and store it "
+        "as collapsed stacks for flamegraph tools.",
+        action="store_true",
+        default=False,
+    ),
     # Hyperopt
     "hyperopt_path": Arg(
         "--hyperopt-path",
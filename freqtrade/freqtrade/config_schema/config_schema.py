@@ -6,6 +6,7 @@ from freqtrade.constants import (
     AVAILABLE_PAIRLISTS,
     BACKTEST_BREAKDOWNS,
     BACKTEST_CACHE_AGE,
+    BACKTEST_LOOP_MODES,
     DRY_RUN_WALLET,
     EXPORT_OPTIONS,
     HYPEROPT_LOSS_BUILTIN,
@@ -236,6 +237,52 @@ CONF_SCHEMA = {
             "type": "string",
             "enum": BACKTEST_CACHE_AGE,
         },
+        "backtest_loop": {
+            "description": (
+                "Backtest loop mode. `sparse` only visits candles with entry signals "
+                "or open trades, `vectorized` also skips candles where open trades can't exit."
+            ),
+            "type": "string",
+            "enum": BACKTEST_LOOP_MODES,
+            "default": "dense",
+        },
+        "backtest_jobs": {
+            "description": (
+                "Number of strategies from `strategy_list` to backtest in parallel processes. "
+                "-1 for all CPUs."
+            ),
+            "type": "integer",
+            "default": 1,
+        },
+        "backtest_shards": {
+            "description": (
+                "Number of shards of the pairs to backtest in parallel processes, "
+                "if pairs can't affect each other's trades. -1 for all CPUs."
+            ),
+            "type": "integer",
+            "default": 1,
+        },
+        "backtest_pair_cache": {
+            "description": (
+                "Cache backtest results per pair, and only backtest changed pairs, "
+                "if pairs can't affect each other's trades."
+            ),
+            "type": "boolean",
+            "default": False,
+        },
+        "profile": {
+            "description": (
+                "Profile backtesting and hyperopt runs - time spent per phase and "
+                "per strategy callback."
+            ),
+            "type": "boolean",
+            "default": False,
+        },
+        "profile_stacks": {
+            "description": "Also sample the stack of the main process while profiling.",
+            "type": "boolean",
+            "default": False,
+        },
         # Hyperopt
         "hyperopt_path": {
             "description": "Specify additional lookup path for Hyperopt Loss functions.",
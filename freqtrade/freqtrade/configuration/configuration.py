@@ -334,9 +334,15 @@ class Configuration:
             ("export", "Parameter --export detected: {} ..."),
             ("backtest_breakdown", "Parameter --breakdown detected ..."),
             ("backtest_cache", "Parameter --cache={} detected ..."),
+            ("backtest_loop", "Parameter --backtest-loop={} detected ..."),
+            ("backtest_jobs", "Parameter --backtest-jobs={} detected ..."),
+            ("backtest_shards", "Parameter --backtest-shards={} detected ..."),
+            ("backtest_pair_cache", "Parameter --backtest-pair-cache detected ..."),
             ("disableparamexport", "Parameter --disableparamexport detected: {} ..."),
             ("freqai_backtest_live_models", "Parameter --freqai-backtest-live-models detected ..."),
             ("backtest_notes", "Parameter --notes detected: {} ..."),
+            ("profile", "Parameter --profile detected ..."),
+            ("profile_stacks", "Parameter --profile-stacks detected ..."),
         ]
         self._args_to_config_loop(config, configurations)
 
@@ -4,6 +4,7 @@ Helpers when analyzing backtest data
 
 import logging
 import zipfile
+from collections.abc import Iterator, Mapping
 from copy import copy
 from datetime import UTC, datetime
 from io import BytesIO, StringIO
@@ -457,6 +458,47 @@ def load_file_from_zip(zip_path: Path, filename: str) -> bytes:
         raise ValueError(f"Bad zip file: {zip_path}.") from None
 
 
+class AnalysisChunks(Mapping[str, pd.DataFrame]):
+    """
+    Analysis candles of one strategy by pair, stored as chunks in the backtest result zip.
+    Each pair's candles are loaded when accessed.
+    """
+
+    def __init__(self, zip_path: Path, chunks: dict[str, str]) -> None:
+        self._zip_path = zip_path
+        self._chunks = chunks
+
+    def __getitem__(self, pair: str) -> pd.DataFrame:
+        import joblib
+
+        member = f"{self._zip_path.stem}_analysis/{self._chunks[pair]}"
+        data = BytesIO(load_file_from_zip(self._zip_path, member))
+        if member.endswith(".pkl"):
+            return joblib.load(data)
+        return pd.read_parquet(data)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._chunks)
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+
+def _load_analysis_index(zip_path: Path) -> dict[str, Any] | None:
+    """
+    Index of the analysis chunks in a backtest result zip, or None if it has none
+    """
+    index_name = f"{zip_path.stem}_analysis.json"
+    try:
+        with zipfile.ZipFile(zip_path) as zipf:
+            if index_name not in zipf.namelist():
+                return None
+    except (FileNotFoundError, zipfile.BadZipFile):
+        # Reported when loading the analysis data
+        return None
+    return json_load(StringIO(load_file_from_zip(zip_path, index_name).decode("utf-8")))
+
+
 def load_backtest_analysis_data(
     file_or_directory: Path,
     name: Literal["signals", "rejected", "exited"],
@@ -475,7 +517,15 @@ def load_backtest_analysis_data(
 
     zip_path = _normalize_filename(file_or_directory, filename)
 
-    if zip_path.suffix == ".zip":
+    if zip_path.suffix == ".zip" and (index := _load_analysis_index(zip_path)) is not None:
+        # Chunks written while backtesting - loaded per pair when accessed
+        logger.info(f"Loading {name} candles from zip: {str(zip_path)}")
+        return {
+            strategy: AnalysisChunks(zip_path, chunks)
+            for strategy, chunks in index.get(name, {}).items()
+        }
+
+    elif zip_path.suffix == ".zip":
         # Load from zip file
         analysis_name = f"{zip_path.stem}_{name}.pkl"
         data = load_file_from_zip(zip_path, analysis_name)
@@ -7,6 +7,7 @@ Common Interface for bot and strategy to access data.
 
 import logging
 from collections import deque
+from collections.abc import Callable
 from datetime import UTC, datetime
 from typing import Any
 
@@ -50,6 +51,7 @@ class DataProvider:
         self.__rpc = rpc
         self.__cached_pairs: dict[PairWithTimeframe, tuple[DataFrame, datetime]] = {}
         self.__slice_index: dict[str, int] = {}
+        self.__slice_index_source: Callable[[str], int | None] | None = None
         self.__slice_date: datetime | None = None
 
         self.__cached_pairs_backtesting: dict[PairWithTimeframe, DataFrame] = {}
@@ -77,6 +79,15 @@ class DataProvider:
         """
         self.__slice_index[pair] = limit_index
 
+    def _set_dataframe_max_index_source(self, source: Callable[[str], int | None] | None):
+        """
+        Compute the max index of analyzed dataframes on demand, instead of using the ones set
+        via _set_dataframe_max_index().
+        Only relevant in backtesting, when not every pair is visited on every candle.
+        :param source: callable returning the dataframe index for a pair, or None to reset.
+        """
+        self.__slice_index_source = source
+
     def _set_dataframe_max_date(self, limit_date: datetime):
         """
         Limit informative dataframe to max specified index.
@@ -410,7 +421,11 @@ class DataProvider:
                 df, date = self.__cached_pairs[pair_key]
             else:
                 df, date = self.__cached_pairs[pair_key]
-                if (max_index := self.__slice_index.get(pair)) is not None:
+                if self.__slice_index_source is not None:
+                    max_index = self.__slice_index_source(pair)
+                else:
+                    max_index = self.__slice_index.get(pair)
+                if max_index is not None:
                     df = df.iloc[max(0, max_index - MAX_DATAFRAME_CANDLES) : max_index]
                 else:
                     return (DataFrame(), datetime.fromtimestamp(0, tz=UTC))
@@ -449,6 +464,7 @@ class DataProvider:
         # otherwise they're reloaded each time during hyperopt due to with analyze_per_epoch
         # self.__cached_pairs_backtesting = {}
         self.__slice_index = {}
+        self.__slice_index_source = None
 
     # Exchange functions
 
@@ -2,6 +2,7 @@
 from freqtrade.ft_types.backtest_result_type import (
     BacktestContentType,
     BacktestContentTypeIcomplete,
+    BacktestCountersType,
     BacktestHistoryEntryType,
     BacktestMetadataType,
     BacktestResultType,
@@ -41,6 +41,15 @@ class BacktestHistoryEntryType(BacktestMetadataType):
     timeframe_detail: str | None
 
 
+class BacktestCountersType(TypedDict):
+    rejected_signals: int
+    timedout_entry_orders: int
+    timedout_exit_orders: int
+    canceled_trade_entries: int
+    canceled_entry_orders: int
+    replaced_entry_orders: int
+
+
 class BacktestContentTypeIcomplete(TypedDict, total=False):
     results: DataFrame
     config: Config
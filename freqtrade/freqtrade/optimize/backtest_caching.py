@@ -5,6 +5,25 @@ from pathlib import Path
 import rapidjson
 
 
+# Options that have no impact on results of individual backtest.
+NOT_IMPORTANT_KEYS = ("strategy_list", "original_config", "telegram", "api_server")
+# Options that have no impact on the trades of a pair, with its own data and signals.
+NOT_IMPORTANT_PAIR_KEYS = (
+    *NOT_IMPORTANT_KEYS,
+    "timerange",
+    "pairs",
+    "export",
+    "exportfilename",
+    "exportdirectory",
+    "backtest_cache",
+    "backtest_pair_cache",
+    "backtest_jobs",
+    "backtest_shards",
+    "backtest_loop",
+    "backtest_notes",
+)
+
+
 def get_strategy_run_id(strategy) -> str:
     """
     Generate unique identification hash for a backtest run. Identical config and strategy file will
@@ -12,24 +31,44 @@ def get_strategy_run_id(strategy) -> str:
     :param strategy: strategy object.
     :return: hex string id.
     """
-    digest = hashlib.sha1()  # noqa: S324
+    return _strategy_digest(strategy, deepcopy(strategy.config), NOT_IMPORTANT_KEYS)
+
+
+def get_strategy_pair_context_id(strategy) -> str:
+    """
+    Generate identification hash for the context of the backtest of a single pair.
+    Like get_strategy_run_id(), but independent of the timerange and the pairlist.
+    :param strategy: strategy object.
+    :return: hex string id.
+    """
     config = deepcopy(strategy.config)
+    for k in ("pair_whitelist", "pair_blacklist"):
+        config.get("exchange", {}).pop(k, None)
+    # Sorted, as the order of keys may differ between runs
+    return _strategy_digest(strategy, config, NOT_IMPORTANT_PAIR_KEYS, sort_keys=True)
+
 
-    # Options that have no impact on results of individual backtest.
-    not_important_keys = ("strategy_list", "original_config", "telegram", "api_server")
+def _strategy_digest(
+    strategy, config: dict, not_important_keys: tuple[str, ...], sort_keys: bool = False
+) -> str:
+    digest = hashlib.sha1()  # noqa: S324
     for k in not_important_keys:
-        if k in config:
-            del config[k]
+        config.pop(k, None)
 
     # Explicitly allow NaN values (e.g. max_open_trades).
     # as it does not matter for getting the hash.
     digest.update(
-        rapidjson.dumps(config, default=str, number_mode=rapidjson.NM_NAN).encode("utf-8")
+        rapidjson.dumps(
+            config, default=str, number_mode=rapidjson.NM_NAN, sort_keys=sort_keys
+        ).encode("utf-8")
     )
     # Include _ft_params_from_file - so changing parameter files cause cache eviction
     digest.update(
         rapidjson.dumps(
-            strategy._ft_params_from_file, default=str, number_mode=rapidjson.NM_NAN
+            strategy._ft_params_from_file,
+            default=str,
+            number_mode=rapidjson.NM_NAN,
+            sort_keys=sort_keys,
         ).encode("utf-8")
     )
     with Path(strategy.__file__).open("rb") as fp:
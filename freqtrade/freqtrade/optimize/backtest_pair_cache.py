@@ -0,0 +1,258 @@
+"""
+Per-pair cache of backtest results, for pairs which don't affect each other's trades
+"""
+
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+from joblib import dump, load
+from pandas import DataFrame
+from pandas.util import hash_pandas_object
+
+from freqtrade.enums import ExitType, TradingMode
+from freqtrade.misc import pair_to_filename
+from freqtrade.optimize.backtest_caching import get_strategy_pair_context_id
+from freqtrade.optimize.backtest_parallel import (
+    implemented_callback,
+    merge_pair_results,
+    shard_blocker,
+    sum_result_counters,
+    unbounded_wallets,
+    wallet_limited,
+)
+
+
+if TYPE_CHECKING:
+    from freqtrade.ft_types import BacktestContentTypeIcomplete
+    from freqtrade.optimize.backtesting import Backtesting
+
+
+logger = logging.getLogger(__name__)
+
+PAIR_CACHE_DIR = ".pair_cache"
+# Rows per fingerprint chunk - the granularity at which changed data or signals are detected.
+CHUNK_ROWS = 500
+# Columns of the backtest loop rows (backtesting.HEADERS) - all a pair's trades depend on.
+FINGERPRINT_COLUMNS = [
+    "date",
+    "open",
+    "high",
+    "low",
+    "close",
+    "enter_long",
+    "exit_long",
+    "enter_short",
+    "exit_short",
+    "enter_tag",
+    "exit_tag",
+]
+
+
+def pair_cache_blocker(backtesting: "Backtesting", pair_count: int) -> str | None:
+    """
+    Reason why results can't be cached per pair, or None if they can.
+    Pairs are backtested one at a time - the same couplings as for shards apply, including
+    callbacks which look at other pairs.
+    """
+    if blocker := shard_blocker(backtesting, pair_count):
+        return blocker
+    if backtesting.trading_mode != TradingMode.SPOT:
+        return "only spot markets are supported"
+    if backtesting.config.get("timeframe_detail"):
+        return "a detail timeframe is used"
+    return None
+
+
+def _resumable(backtesting: "Backtesting", entry: dict[str, Any]) -> bool:
+    """
+    Whether the backtest of a pair can continue from a candle without open trades,
+    with the cached trades closed before.
+    Protections and locks look back on earlier trades, unfilled orders may remain open without
+    a trade, and callbacks may keep state from earlier candles - these require a backtest
+    of the pair from the start.
+    """
+    return (
+        not backtesting.enable_protections
+        and not entry["locks"]
+        and not any(entry["counters"].values())
+        and implemented_callback(backtesting) is None
+    )
+
+
+def fingerprint(rows: DataFrame) -> list[str]:
+    """
+    Digests of consecutive chunks of the backtest loop rows of a pair.
+    """
+    if rows.empty:
+        return []
+    hashes = hash_pandas_object(rows[FINGERPRINT_COLUMNS], index=False).to_numpy()
+    return [
+        hashlib.sha1(hashes[start : start + CHUNK_ROWS].tobytes()).hexdigest()  # noqa: S324
+        for start in range(0, len(hashes), CHUNK_ROWS)
+    ]
+
+
+def _valid_rows(entry: dict[str, Any], chunks: list[str], rows: int, end_date: datetime) -> int:
+    """
+    Number of leading rows the cached result of the pair is valid for.
+    """
+    common = 0
+    for cached, current in zip(entry["chunks"], chunks, strict=False):
+        if cached != current:
+            break
+        common += 1
+    valid = min(common * CHUNK_ROWS, entry["rows"], rows)
+    if entry["end_date"] != end_date:
+        # No entries on the last candle of a backtest
+        valid = min(valid, entry["rows"] - 1, rows - 1)
+    return max(valid, 0)
+
+
+def _resume_date(trades: DataFrame, date: datetime) -> datetime:
+    """
+    Latest candle up to date without an open trade. The trades closed before it remain valid.
+    """
+    unfinished = trades["exit_reason"] == ExitType.FORCE_EXIT.value
+    while True:
+        affected = trades.loc[(trades["close_date"] >= date) | unfinished, "open_date"]
+        if affected.empty or affected.min() >= date:
+            return date
+        date = affected.min()
+
+
+def _load_entry(path: Path) -> dict[str, Any] | None:
+    if not path.is_file():
+        return None
+    try:
+        with path.open("rb") as f:
+            return load(f)
+    except Exception as e:
+        logger.warning(f"Ignoring pair result cache file {path}: {e}")
+        return None
+
+
+def _backtest_pair(
+    backtesting: "Backtesting",
+    pair: str,
+    pair_data: DataFrame,
+    start_date: datetime,
+    end_date: datetime,
+    skipped: int,
+) -> tuple["BacktestContentTypeIcomplete", list]:
+    """
+    Backtest a single pair, skipping the first loop rows.
+    Rows are processed on the candle of their date - start_date is one candle before
+    the first row.
+    """
+    required_startup = backtesting.required_startup
+    rejected_dict = backtesting.rejected_dict
+    # Indexes of the dataprovider's dataframe remain the same
+    backtesting.required_startup += skipped
+    backtesting.rejected_dict = {}
+    try:
+        results = backtesting.backtest({pair: pair_data}, start_date, end_date)
+        return results, backtesting.take_rejected(pair)
+    finally:
+        backtesting.required_startup = required_startup
+        backtesting.rejected_dict = rejected_dict
+
+
+def backtest_pair_cached(
+    backtesting: "Backtesting",
+    processed: dict[str, DataFrame],
+    start_date: datetime,
+    end_date: datetime,
+) -> "BacktestContentTypeIcomplete | None":
+    """
+    Backtest pair by pair, reusing the cached results of pairs with the same loop rows.
+    Where only later rows changed (e.g. an extended timerange), the pair's backtest continues
+    from the last candle without an open trade before the change.
+    Results are merged as backtesting.backtest() would return them.
+    :return: merged results, or None if the pairs are not independent and need to be
+        backtested together.
+    """
+    if blocker := pair_cache_blocker(backtesting, len(processed)):
+        logger.info(f"Pair result cache is not used as {blocker}. Backtesting all pairs together.")
+        return None
+    cache_dir = (
+        backtesting.config["user_data_dir"]
+        / "backtest_results"
+        / PAIR_CACHE_DIR
+        / get_strategy_pair_context_id(backtesting.strategy)
+    )
+
+    entries: dict[str, dict[str, Any]] = {}
+    reused: set[str] = set()
+    resumed = 0
+    with unbounded_wallets(backtesting):
+        for pair, pair_data in processed.items():
+            _, rows = backtesting.analyze_pair_rows(pair, pair_data)
+            chunks = fingerprint(rows)
+            entry = _load_entry(cache_dir / f"{pair_to_filename(pair)}.pkl")
+            valid = 0 if entry is None else _valid_rows(entry, chunks, len(rows), end_date)
+            if (
+                entry is not None
+                and valid == len(rows) == entry["rows"]
+                and entry["end_date"] == end_date
+            ):
+                entries[pair] = entry
+                reused.add(pair)
+                continue
+
+            kept_trades: list[DataFrame] = []
+            kept_rejected: list = []
+            start, skipped = start_date, 0
+            if entry is not None and valid > 0 and _resumable(backtesting, entry):
+                resume = _resume_date(entry["trades"], rows["date"].iat[valid])
+                skipped = int(rows["date"].searchsorted(resume))
+                if skipped > 0:
+                    trades = entry["trades"]
+                    kept_trades = [trades[trades["close_date"] < resume]]
+                    kept_rejected = [r for r in entry["rejected"] if r[0] < resume]
+                    start = resume - backtesting.timeframe_td
+                    resumed += 1
+            pair_results, rejected = _backtest_pair(
+                backtesting, pair, pair_data, start, end_date, skipped
+            )
+            frames = [frame for frame in (*kept_trades, pair_results["results"]) if not frame.empty]
+            entries[pair] = {
+                "end_date": end_date,
+                "rows": len(rows),
+                "chunks": chunks,
+                "trades": (
+                    pd.concat(frames, ignore_index=True) if frames else pair_results["results"]
+                ),
+                "locks": pair_results["locks"],
+                "rejected": kept_rejected + rejected,
+                "counters": sum_result_counters([pair_results]),
+            }
+
+    results = merge_pair_results(
+        backtesting,
+        [
+            {"results": entry["trades"], "locks": entry["locks"], **entry["counters"]}
+            for entry in entries.values()
+        ],
+    )
+    if wallet_limited(backtesting.config, results["results"]):
+        logger.info(
+            "Pair result cache is not used as the wallet limits entries. "
+            "Backtesting all pairs together."
+        )
+        return None
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for pair, entry in entries.items():
+        if entry["rejected"]:
+            backtesting.rejected_dict.setdefault(pair, []).extend(entry["rejected"])
+        if pair not in reused:
+            dump(entry, cache_dir / f"{pair_to_filename(pair)}.pkl")
+    logger.info(
+        f"Pair result cache: reused {len(reused)} pairs, resumed {resumed}, "
+        f"backtested {len(entries) - len(reused) - resumed} from the start."
+    )
+    return results
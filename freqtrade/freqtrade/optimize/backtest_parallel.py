@@ -0,0 +1,532 @@
+"""
+Parallel backtesting - of the strategies of a --strategy-list, or of shards of the pair whitelist
+"""
+
+import logging
+import sys
+import time
+from collections.abc import Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from multiprocessing import Manager, parent_process
+from pathlib import Path
+from queue import Queue
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, cpu_count, delayed, dump, load
+from joblib.externals import cloudpickle
+from pandas import DataFrame
+
+from freqtrade.configuration import TimeRange
+from freqtrade.constants import UNLIMITED_STAKE_AMOUNT, Config
+from freqtrade.enums import BacktestState, MarginMode, TradingMode
+from freqtrade.optimize.backtest_profiler import profile_worker
+from freqtrade.optimize.backtest_vectorized import _overridden
+from freqtrade.plugins.protectionmanager import ProtectionManager
+from freqtrade.strategy.interface import IStrategy
+from freqtrade.wallets import Wallets
+
+
+if TYPE_CHECKING:
+    from freqtrade.ft_types import BacktestContentTypeIcomplete, BacktestCountersType
+    from freqtrade.optimize.backtesting import Backtesting
+
+
+logger = logging.getLogger(__name__)
+
+# Exchange attributes which can't be sent to other processes - not needed for backtesting.
+EXCHANGE_CONNECTION_ATTRS = (
+    "_api",
+    "_api_async",
+    "_ws_async",
+    "_exchange_ws",
+    "loop",
+    "_loop_lock",
+    "_cache_lock",
+)
+
+
+def _process_count(jobs: int) -> int:
+    if jobs < 0:
+        # Same convention as joblib / hyperopt: -1 for all CPUs, -2 for all but one, ...
+        jobs = cpu_count() + 1 + jobs
+    return max(1, jobs)
+
+
+def strategy_jobs(config: Config, strategy_count: int) -> int:
+    """
+    Number of processes to backtest strategy_count strategies with.
+    """
+    jobs = config.get("backtest_jobs", 1)
+    if strategy_count < 2 or jobs == 1:
+        return 1
+    if config.get("freqai", {}).get("enabled", False):
+        logger.warning("Parallel backtesting is not supported with FreqAI. Running sequentially.")
+        return 1
+    return min(_process_count(jobs), strategy_count)
+
+
+def _register_strategy_modules(bases: tuple[type, ...]) -> None:
+    """
+    Pickle the modules of strategy base classes by value, as workers can't import them.
+    """
+    for base in bases:
+        if base.__name__ != "IStrategy":
+            if mod := sys.modules.get(base.__module__):
+                cloudpickle.register_pickle_by_value(mod)
+            _register_strategy_modules(base.__bases__)
+
+
+@contextmanager
+def _detached_exchange(backtesting: "Backtesting") -> Iterator[None]:
+    """
+    Temporarily remove the exchange's connection objects, so the backtesting instance
+    can be pickled.
+    """
+    exchange = backtesting.exchange
+    saved = {attr: getattr(exchange, attr, None) for attr in EXCHANGE_CONNECTION_ATTRS}
+    for attr in EXCHANGE_CONNECTION_ATTRS:
+        setattr(exchange, attr, None)
+    try:
+        yield
+    finally:
+        for attr, value in saved.items():
+            setattr(exchange, attr, value)
+
+
+@contextmanager
+def _worker_logging(log_queue: Queue, log_level: int) -> Iterator[None]:
+    """
+    Send the log records of a worker process to the main process.
+    Jobs which run in the main process (a single job) log directly.
+    """
+    if parent_process() is None:
+        yield
+        return
+    handler = QueueHandler(log_queue)
+    root = logging.getLogger()
+    root.setLevel(log_level)
+    root.addHandler(handler)
+    try:
+        yield
+    finally:
+        root.removeHandler(handler)
+
+
+class _ForwardingHandler(logging.Handler):
+    """
+    Hands log records of worker processes to the logger they were logged with.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
+
+
+@contextmanager
+def _forwarded_logs(log_queue: Queue) -> Iterator[None]:
+    """
+    Log the records of worker processes as they arrive, while the workers run.
+    Records still queued when the workers are done are logged before returning.
+    """
+    listener = QueueListener(log_queue, _ForwardingHandler())
+    listener.start()
+    try:
+        yield
+    finally:
+        listener.stop()
+
+
+def _backtest_in_worker(
+    payload: bytes,
+    strategy_name: str,
+    data_file: Path,
+    timerange: TimeRange,
+    log_queue: Queue,
+    log_level: int,
+) -> dict[str, Any]:
+    """
+    Backtest one strategy in a worker process
+    """
+    with _worker_logging(log_queue, log_level):
+        backtesting: Backtesting = cloudpickle.loads(payload)
+        with data_file.open("rb") as f:
+            # Shared between workers - read-only memory mapped
+            data: dict[str, DataFrame] = load(f, mmap_mode="r")
+        strategy = next(
+            s for s in backtesting.strategylist if s.get_strategy_name() == strategy_name
+        )
+        start = time.perf_counter()
+        with profile_worker(backtesting.progress) as profile:
+            min_date, max_date = backtesting.backtest_one_strategy(strategy, data, timerange)
+        writer = backtesting.analysis_writer
+        return {
+            "strategy": strategy_name,
+            "min_date": min_date,
+            "max_date": max_date,
+            "results": backtesting.all_bt_content[strategy_name],
+            # Written to the export directory already, if streamed
+            "analysis_results": (
+                writer.strategy_index(strategy_name)
+                if writer is not None
+                else {
+                    key: values[strategy_name]
+                    for key, values in backtesting.analysis_results.items()
+                    if strategy_name in values
+                }
+            ),
+            "duration": time.perf_counter() - start,
+            "profile": profile,
+        }
+
+
+def backtest_strategies_parallel(
+    backtesting: "Backtesting",
+    strategies: list[IStrategy],
+    data: dict[str, DataFrame],
+    timerange: TimeRange,
+    jobs: int,
+) -> tuple[datetime, datetime]:
+    """
+    Backtest strategies in worker processes, one strategy per worker at a time.
+    The data is loaded once, and memory-mapped by the workers.
+    Results are merged into the backtesting instance as if the strategies had run one by one.
+    :return: min_date, max_date of the last strategy
+    """
+    for strategy in strategies:
+        _register_strategy_modules(strategy.__class__.__bases__)
+    with _detached_exchange(backtesting):
+        payload = cloudpickle.dumps(backtesting)
+
+    logger.info(f"Backtesting {len(strategies)} strategies using {jobs} processes.")
+    backtesting.progress.init_step(BacktestState.BACKTEST, len(strategies))
+    start = time.perf_counter()
+    log_level = logging.INFO if backtesting.config.get("verbosity", 0) < 1 else logging.DEBUG
+    with TemporaryDirectory() as tmp_dir, Manager() as manager:
+        data_file = Path(tmp_dir) / "backtest_data.pkl"
+        dump(data, data_file)
+        log_queue = manager.Queue()
+        with _forwarded_logs(log_queue):
+            outcomes = Parallel(n_jobs=jobs)(
+                delayed(_backtest_in_worker)(
+                    payload,
+                    strategy.get_strategy_name(),
+                    data_file,
+                    timerange,
+                    log_queue,
+                    log_level,
+                )
+                for strategy in strategies
+            )
+
+    total = 0.0
+    for outcome in outcomes:
+        name = outcome["strategy"]
+        backtesting.all_bt_content[name] = outcome["results"]
+        if backtesting.analysis_writer is not None:
+            backtesting.analysis_writer.add_index(name, outcome["analysis_results"])
+        else:
+            backtesting.add_analysis_results(name, outcome["analysis_results"])
+        total += outcome["duration"]
+        if backtesting.progress.profiler is not None:
+            backtesting.progress.profiler.merge(outcome["profile"])
+        logger.info(f"Strategy {name} backtested in {outcome['duration']:.2f}s.")
+    logger.info(
+        f"Backtested {len(strategies)} strategies in {time.perf_counter() - start:.2f}s "
+        f"({total:.2f}s of strategy time)."
+    )
+    return outcomes[-1]["min_date"], outcomes[-1]["max_date"]
+
+
+# Start balance of the wallets of shard workers, so the wallet never limits entries there.
+UNBOUNDED_BALANCE = 1e15
+
+
+def shard_count(config: Config, pair_count: int) -> int:
+    """
+    Number of shards (processes) to split pair_count pairs into.
+    """
+    shards = config.get("backtest_shards", 1)
+    if pair_count < 2 or shards == 1:
+        return 1
+    return min(_process_count(shards), pair_count)
+
+
+# Strategy callbacks of the backtest loop. They may look at other pairs - their dataframes
+# (dp.get_analyzed_dataframe()) or trades (Trade.get_trades_proxy()) - which a shard doesn't have.
+LOOP_CALLBACKS = (
+    "bot_loop_start",
+    "confirm_trade_entry",
+    "confirm_trade_exit",
+    "custom_entry_price",
+    "custom_exit_price",
+    "custom_exit",
+    "custom_stake_amount",
+    "custom_stoploss",
+    "custom_roi",
+    "check_entry_timeout",
+    "check_exit_timeout",
+    "adjust_entry_price",
+    "adjust_exit_price",
+    "adjust_order_price",
+    "order_filled",
+)
+
+
+def implemented_callback(backtesting: "Backtesting") -> str | None:
+    """
+    Name of a backtest loop callback the strategy implements, or None.
+    """
+    callbacks: tuple[str, ...] = LOOP_CALLBACKS
+    if backtesting.trading_mode != TradingMode.SPOT:
+        callbacks += ("leverage",)
+    return next((name for name in callbacks if _overridden(backtesting.strategy, name)), None)
+
+
+def shard_blocker(backtesting: "Backtesting", pair_count: int) -> str | None:
+    """
+    Reason why the pairs can't be backtested independently of each other, or None if they can.
+    Pairs interact through open trade slots, global protections, the wallet and callbacks.
+    Whether the wallet limited any entry is only known once the shards are done -
+    see wallet_limited().
+    """
+    config = backtesting.config
+    strategy = backtesting.strategy
+    if backtesting.dynamic_pairlist:
+        return "dynamic pairlists are used"
+    if config.get("freqai", {}).get("enabled", False):
+        return "FreqAI is used"
+    if config.get("margin_mode") == MarginMode.CROSS:
+        return "cross margin is used"
+    max_open_trades = strategy.max_open_trades
+    if 0 < max_open_trades < float("inf") and (
+        config.get("position_stacking", False) or max_open_trades < pair_count
+    ):
+        return "max_open_trades can be reached"
+    if config["stake_amount"] == UNLIMITED_STAKE_AMOUNT:
+        return "the stake amount is unlimited"
+    if strategy.position_adjustment_enable:
+        return "position adjustment is enabled"
+    if callback := implemented_callback(backtesting):
+        return f"{callback} is implemented"
+    if (
+        backtesting.enable_protections
+        and ProtectionManager(config, strategy.protections).has_global_stop
+    ):
+        return "protections can lock all pairs"
+    return None
+
+
+def pair_shards(data: dict[str, DataFrame], shards: int) -> list[list[str]]:
+    """
+    Split the pairs into shards of about the same number of candles.
+    Pairs keep their order within a shard.
+    """
+    groups: list[set[str]] = [set() for _ in range(min(shards, len(data)))]
+    sizes = [0] * len(groups)
+    for pair in sorted(data, key=lambda p: len(data[p]), reverse=True):
+        smallest = sizes.index(min(sizes))
+        groups[smallest].add(pair)
+        sizes[smallest] += len(data[pair])
+    return [[pair for pair in data if pair in group] for group in groups]
+
+
+def _start_balance(config: Config) -> float:
+    start_cap = config["dry_run_wallet"]
+    if isinstance(start_cap, dict):
+        return start_cap.get(config["stake_currency"], 0)
+    return start_cap
+
+
+@contextmanager
+def unbounded_wallets(backtesting: "Backtesting") -> Iterator[None]:
+    """
+    Temporarily replace the wallets with ones which never limit entries.
+    """
+    wallets = backtesting.wallets
+    config = {key: value for key, value in backtesting.config.items() if key != "available_capital"}
+    if isinstance(start_cap := config["dry_run_wallet"], dict):
+        config["dry_run_wallet"] = {**start_cap, config["stake_currency"]: UNBOUNDED_BALANCE}
+    else:
+        config["dry_run_wallet"] = UNBOUNDED_BALANCE
+    config["tradable_balance_ratio"] = 1.0
+    backtesting.wallets = Wallets(config, backtesting.exchange, is_backtest=True)
+    backtesting.strategy.wallets = backtesting.wallets
+    try:
+        yield
+    finally:
+        backtesting.wallets = wallets
+        backtesting.strategy.wallets = wallets
+
+
+def wallet_limited(config: Config, trades: DataFrame) -> bool:
+    """
+    Whether a shared wallet would have limited the stake of any of the trades.
+    Replays the wallet as Wallets.get_available_stake_amount() sees it at each entry.
+    Conservative for trades in the same candle: other entries count as open already,
+    exits as not closed yet.
+    """
+    if trades.empty:
+        return False
+    opens = trades["open_timestamp"].to_numpy()
+    closes = trades["close_timestamp"].to_numpy()
+    stakes = trades["stake_amount"].to_numpy(dtype=np.float64)
+    profits = trades["profit_abs"].to_numpy(dtype=np.float64)
+
+    by_close = np.argsort(closes, kind="stable")
+    by_open = np.argsort(opens, kind="stable")
+    closed_profit = np.concatenate(([0.0], np.cumsum(profits[by_close])))
+    closed_stake = np.concatenate(([0.0], np.cumsum(stakes[by_close])))
+    opened_stake = np.concatenate(([0.0], np.cumsum(stakes[by_open])))
+    closed = np.searchsorted(closes[by_close], opens, side="left")
+    opened = np.searchsorted(opens[by_open], opens, side="right")
+
+    profit = closed_profit[closed]
+    in_trades = opened_stake[opened] - closed_stake[closed] - stakes
+    free = _start_balance(config) + profit - in_trades
+    if "available_capital" in config:
+        total = config["available_capital"] + profit
+    else:
+        total = (in_trades + free) * config["tradable_balance_ratio"]
+    available = np.minimum(total - in_trades, free)
+    required = np.maximum(stakes, config["stake_amount"])
+    return bool((available < required * (1 + 1e-9)).any())
+
+
+def _backtest_shard_in_worker(
+    payload_file: Path,
+    data_file: Path,
+    pairs: list[str],
+    start_date: datetime,
+    end_date: datetime,
+    log_queue: Queue,
+    log_level: int,
+) -> dict[str, Any]:
+    """
+    Backtest a shard of the pairs in a worker process
+    """
+    with _worker_logging(log_queue, log_level):
+        with payload_file.open("rb") as f:
+            backtesting: Backtesting = cloudpickle.load(f)
+        with data_file.open("rb") as f:
+            data: dict[str, DataFrame] = load(f, mmap_mode="r")
+        # Copied from the read-only memory map, as signals are added to the dataframes
+        processed = {pair: data[pair].copy() for pair in pairs}
+        del data
+        backtesting.disable_database_use()
+        backtesting.rejected_dict = {}
+        start = time.perf_counter()
+        with unbounded_wallets(backtesting), profile_worker(backtesting.progress) as profile:
+            results = backtesting.backtest(processed, start_date, end_date)
+        results.pop("config")
+        return {
+            "results": results,
+            "rejected": backtesting.rejected_dict,
+            "duration": time.perf_counter() - start,
+            "profile": profile,
+        }
+
+
+def sum_result_counters(pair_results: Sequence[Mapping[str, Any]]) -> "BacktestCountersType":
+    """
+    Counters of backtest() results, which add up over independent groups of pairs.
+    """
+    return {
+        "rejected_signals": sum(result["rejected_signals"] for result in pair_results),
+        "timedout_entry_orders": sum(result["timedout_entry_orders"] for result in pair_results),
+        "timedout_exit_orders": sum(result["timedout_exit_orders"] for result in pair_results),
+        "canceled_trade_entries": sum(result["canceled_trade_entries"] for result in pair_results),
+        "canceled_entry_orders": sum(result["canceled_entry_orders"] for result in pair_results),
+        "replaced_entry_orders": sum(result["replaced_entry_orders"] for result in pair_results),
+    }
+
+
+def merge_pair_results(
+    backtesting: "Backtesting", pair_results: list[dict[str, Any]]
+) -> "BacktestContentTypeIcomplete":
+    """
+    Combine the backtest() results of independent groups of pairs, in an order which doesn't
+    depend on the grouping.
+    """
+    frames = [result["results"] for result in pair_results if not result["results"].empty]
+    trades = pd.concat(frames, ignore_index=True) if frames else pair_results[0]["results"]
+    trades = trades.sort_values(
+        ["close_date", "open_date", "pair"], kind="stable", ignore_index=True
+    )
+    locks = [lock for result in pair_results for lock in result["locks"]]
+    merged: BacktestContentTypeIcomplete = {
+        "results": trades,
+        "config": backtesting.strategy.config,
+        "locks": sorted(locks, key=lambda lock: (lock.lock_time, lock.pair)),
+        "final_balance": _start_balance(backtesting.config) + trades["profit_abs"].sum(),
+        **sum_result_counters(pair_results),
+    }
+    return merged
+
+
+def backtest_sharded(
+    backtesting: "Backtesting",
+    processed: dict[str, DataFrame],
+    start_date: datetime,
+    end_date: datetime,
+    shards: int,
+) -> "BacktestContentTypeIcomplete | None":
+    """
+    Backtest the pairs in shards - each in a worker process - and merge the results,
+    as backtesting.backtest() would return them.
+    Only valid if the pairs don't interact - see shard_blocker().
+    :return: merged results, or None if the pairs are not independent and need to be
+        backtested in one process.
+    """
+    if blocker := shard_blocker(backtesting, len(processed)):
+        logger.info(
+            f"Pair-sharded backtesting is not possible as {blocker}. "
+            "Backtesting all pairs in one process."
+        )
+        return None
+    groups = pair_shards(processed, shards)
+    _register_strategy_modules(backtesting.strategy.__class__.__bases__)
+    # Reset by backtest() anyway - no need to send it to the workers
+    backtesting.dataprovider.clear_cache()
+
+    logger.info(f"Backtesting {len(processed)} pairs in {len(groups)} shards.")
+    backtesting.progress.init_step(BacktestState.BACKTEST, len(groups))
+    start = time.perf_counter()
+    log_level = logging.INFO if backtesting.config.get("verbosity", 0) < 1 else logging.DEBUG
+    with TemporaryDirectory() as tmp_dir, Manager() as manager:
+        payload_file = Path(tmp_dir) / "backtesting.pkl"
+        with _detached_exchange(backtesting), payload_file.open("wb") as f:
+            cloudpickle.dump(backtesting, f)
+        data_file = Path(tmp_dir) / "backtest_data.pkl"
+        dump(processed, data_file)
+        log_queue = manager.Queue()
+        with _forwarded_logs(log_queue):
+            outcomes = Parallel(n_jobs=len(groups))(
+                delayed(_backtest_shard_in_worker)(
+                    payload_file, data_file, pairs, start_date, end_date, log_queue, log_level
+                )
+                for pairs in groups
+            )
+
+    if backtesting.progress.profiler is not None:
+        for outcome in outcomes:
+            backtesting.progress.profiler.merge(outcome["profile"])
+    results = merge_pair_results(backtesting, [outcome["results"] for outcome in outcomes])
+    if wallet_limited(backtesting.config, results["results"]):
+        logger.info(
+            "Pair-sharded backtesting is not possible as the wallet limits entries. "
+            "Backtesting all pairs in one process."
+        )
+        return None
+    for outcome in outcomes:
+        for pair, rejected in outcome["rejected"].items():
+            backtesting.rejected_dict.setdefault(pair, []).extend(rejected)
+    durations = ", ".join(f"{outcome['duration']:.2f}s" for outcome in outcomes)
+    logger.info(
+        f"Backtested {len(groups)} shards in {time.perf_counter() - start:.2f}s "
+        f"(shard times: {durations})."
+    )
+    return results
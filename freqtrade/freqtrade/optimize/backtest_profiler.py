@@ -0,0 +1,253 @@
+"""
+Profiling of backtesting and hyperopt runs (--profile)
+"""
+
+import logging
+import sys
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from types import FrameType
+from typing import TYPE_CHECKING, Any
+
+from freqtrade.misc import file_dump_json
+from freqtrade.strategy.strategy_wrapper import set_call_recorder
+
+
+if TYPE_CHECKING:
+    from freqtrade.optimize.bt_progress import BTProgress
+
+
+logger = logging.getLogger(__name__)
+
+# Interval between two samples of the stack, in seconds
+SAMPLE_INTERVAL = 0.005
+
+
+class BacktestProfiler:
+    """
+    Collects where the time of a backtest goes - the time spent in each backtest phase, and
+    the number of calls of and time spent in each strategy callback.
+    Phases are switched by BTProgress.init_step(). Callbacks are timed by
+    strategy_safe_wrapper() while recording.
+    Work done in worker processes (parallel backtests, hyperopt epochs) is profiled there,
+    and merged into the profiler of the main process - see profile_worker().
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+        # name -> [calls, seconds]
+        self.calls: dict[str, list] = {}
+        self.candles = 0
+        self.epochs = 0
+        # Summed over all worker processes
+        self.worker_phases: dict[str, float] = {}
+        self.worker_tasks = 0
+        self._phase: str | None = None
+        self._phase_start = 0.0
+        self._start = perf_counter()
+
+    def start_phase(self, name: str) -> None:
+        self.stop_phase()
+        self._phase = name
+        self._phase_start = perf_counter()
+
+    def stop_phase(self) -> None:
+        if self._phase is not None:
+            self.phases[self._phase] = (
+                self.phases.get(self._phase, 0.0) + perf_counter() - self._phase_start
+            )
+            self._phase = None
+
+    def record_call(self, name: str, seconds: float) -> None:
+        if (entry := self.calls.get(name)) is None:
+            self.calls[name] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    @contextmanager
+    def recording(self) -> Iterator[None]:
+        """
+        Time the calls of user-provided methods while in this context
+        """
+        previous = set_call_recorder(self.record_call)
+        try:
+            yield
+        finally:
+            self.stop_phase()
+            set_call_recorder(previous)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Collected data, to be merged into the profiler of the main process
+        """
+        self.stop_phase()
+        return {
+            "phases": self.phases,
+            "calls": self.calls,
+            "candles": self.candles,
+        }
+
+    def merge(self, snapshot: dict[str, Any]) -> None:
+        """
+        Add the data collected by a worker - see snapshot()
+        """
+        if not snapshot:
+            return
+        for name, seconds in snapshot["phases"].items():
+            self.worker_phases[name] = self.worker_phases.get(name, 0.0) + seconds
+        for name, (calls, seconds) in snapshot["calls"].items():
+            entry = self.calls.setdefault(name, [0, 0.0])
+            entry[0] += calls
+            entry[1] += seconds
+        self.candles += snapshot["candles"]
+        self.worker_tasks += 1
+
+    def report(self) -> dict[str, Any]:
+        """
+        Profile of the run, as json-serializable dict
+        """
+        self.stop_phase()
+        backtest_time = self.phases.get("backtest", 0.0) + self.worker_phases.get("backtest", 0.0)
+        report: dict[str, Any] = {
+            "duration": round(perf_counter() - self._start, 6),
+            "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "callbacks": {
+                name: {
+                    "calls": calls,
+                    "seconds": round(seconds, 6),
+                    "mean_us": round(seconds / calls * 1e6, 3),
+                }
+                for name, (calls, seconds) in sorted(
+                    self.calls.items(), key=lambda item: item[1][1], reverse=True
+                )
+            },
+            "candles": self.candles,
+            "candles_per_second": round(self.candles / backtest_time, 1) if backtest_time else 0,
+        }
+        if self.worker_tasks:
+            report["workers"] = {
+                "tasks": self.worker_tasks,
+                "phases": {name: round(seconds, 6) for name, seconds in self.worker_phases.items()},
+            }
+        if self.epochs:
+            optimize_time = self.phases.get("optimize", 0.0)
+            report["epochs"] = self.epochs
+            report["epochs_per_minute"] = (
+                round(self.epochs / optimize_time * 60, 2) if optimize_time else 0
+            )
+        return report
+
+    @contextmanager
+    def session(self, directory: Path, stacks: bool = False) -> Iterator[None]:
+        """
+        Profile a backtest or hyperopt run, and store the report in directory once done.
+        :param directory: directory to store the report in
+        :param stacks: also sample the stack of the main thread, for flamegraphs
+        """
+        sampler = StackSampler() if stacks else None
+        if sampler is not None:
+            sampler.start()
+        try:
+            with self.recording():
+                yield
+        finally:
+            if sampler is not None:
+                sampler.stop()
+            self.store(directory, sampler)
+
+    def store(self, directory: Path, sampler: "StackSampler | None" = None) -> Path:
+        """
+        Store the report - and the sampled stacks - in directory
+        :return: filename of the report
+        """
+        report = self.report()
+        directory.mkdir(parents=True, exist_ok=True)
+        dt_appendix = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        filename = directory / f"profile-{dt_appendix}.json"
+        logger.info(f"Storing profile report to {filename}.")
+        file_dump_json(filename, report, log=False)
+        if sampler is not None:
+            stacks_file = filename.with_suffix(".collapsed")
+            logger.info(f"Storing sampled stacks to {stacks_file}.")
+            sampler.write(stacks_file)
+
+        for name, seconds in report["phases"].items():
+            logger.info(f"Profile: {name} took {seconds:.2f}s.")
+        for name, entry in list(report["callbacks"].items())[:10]:
+            logger.info(
+                f"Profile: {name} called {entry['calls']} times, took {entry['seconds']:.2f}s."
+            )
+        return filename
+
+
+@contextmanager
+def profile_worker(progress: "BTProgress") -> Iterator[dict[str, Any]]:
+    """
+    Profile the work done in a worker process - or for one hyperopt epoch - with a profiler
+    of its own, if profiling.
+    The yielded dict is filled once done, and is to be merged into the profiler of the
+    main process with BacktestProfiler.merge().
+    """
+    profile: dict[str, Any] = {}
+    profiler = progress.profiler
+    if profiler is None:
+        yield profile
+        return
+    progress.profiler = worker = BacktestProfiler()
+    try:
+        with worker.recording():
+            yield profile
+    finally:
+        progress.profiler = profiler
+    profile.update(worker.snapshot())
+
+
+class StackSampler:
+    """
+    Samples the stack of the thread it was created in at a fixed interval,
+    from a background thread.
+    Stacks are written in the collapsed format read by flamegraph tools -
+    one line per stack, with frames separated by ';' followed by the number of samples.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ft_stack_sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+
+    @staticmethod
+    def _collapse(frame: FrameType | None) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(
+                f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def write(self, filename: Path) -> None:
+        with filename.open("w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
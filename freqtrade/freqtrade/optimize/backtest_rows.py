@@ -0,0 +1,190 @@
+"""
+Row store for the backtest loop
+"""
+
+import logging
+from datetime import UTC
+from itertools import repeat
+
+import numpy as np
+from pandas import DataFrame, DatetimeIndex, Timestamp, factorize
+
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ["open", "high", "low", "close"]
+SIGNAL_COLUMNS = ["enter_long", "exit_long", "enter_short", "exit_short"]
+
+# Rows read in order are built in blocks, as building them one by one is slower.
+# Blocks start small, and double while reads continue in order.
+MIN_BLOCK_SIZE = 16
+MAX_BLOCK_SIZE = 1024
+
+
+def _dates_ns(df: DataFrame) -> np.ndarray:
+    return df["date"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+def _timestamps(dates: np.ndarray) -> list[Timestamp]:
+    if len(dates) < 64:
+        # Building an index only pays off for longer slices
+        return [Timestamp(date, tz=UTC) for date in dates.tolist()]
+    return DatetimeIndex(dates.view("datetime64[ns]")).tz_localize(UTC).tolist()
+
+
+class TagTable:
+    """
+    Interned entry / exit tags, shared by all pairs of a backtest.
+    Tags are stored as indexes into this table, with 0 meaning no tag.
+    """
+
+    def __init__(self) -> None:
+        self.tags: list = [None]
+        self._index: dict = {None: 0}
+
+    def codes(self, values: np.ndarray) -> np.ndarray:
+        """
+        Tag indexes for a tag column
+        """
+        codes = np.zeros(len(values), dtype=np.int32)
+        present = np.flatnonzero(values != None)  # noqa: E711
+        if len(present):
+            inverse, uniques = factorize(values[present])
+            table = np.array([self._add(tag) for tag in uniques.tolist()], dtype=np.int32)
+            codes[present] = table[inverse]
+        return codes
+
+    def _add(self, tag) -> int:
+        index = self._index.get(tag)
+        if index is None:
+            index = self._index[tag] = len(self.tags)
+            self.tags.append(tag)
+        return index
+
+
+class PairRows:
+    """
+    Backtest rows of one pair, stored as contiguous NumPy arrays - int64 dates (ns since epoch),
+    float64 prices, int8 signals and interned tags.
+    Behaves like the list of row tuples (in HEADERS order) it replaces. Rows are built on demand,
+    a block at a time when read in order, and only the latest block is kept.
+    """
+
+    __slots__ = (
+        "_block",
+        "_block_start",
+        "_last",
+        "_tags",
+        "dates",
+        "enter_tags",
+        "exit_tags",
+        "prices",
+        "signals",
+    )
+
+    def __init__(self, df: DataFrame, tags: TagTable) -> None:
+        """
+        :param df: analyzed and shifted dataframe of the pair
+        :param tags: tag table of the backtest
+        """
+        self.dates = _dates_ns(df)
+        self.prices = df[PRICE_COLUMNS].to_numpy(dtype=np.float64)
+        self.signals = df[SIGNAL_COLUMNS].to_numpy(dtype=np.int8)
+        self.enter_tags = tags.codes(df["enter_tag"].to_numpy(dtype=object))
+        self.exit_tags = tags.codes(df["exit_tag"].to_numpy(dtype=object))
+        self._tags = tags.tags
+        self._block_start = -1
+        self._block: list[tuple] = []
+        self._last = -2
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, index: int) -> tuple:
+        length = len(self.dates)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("row index out of range")
+        offset = index - self._block_start
+        if 0 <= offset < len(self._block):
+            row = self._block[offset]
+        elif index == self._last + 1:
+            # Sequential reads - build the next rows at once.
+            size = MIN_BLOCK_SIZE
+            if offset == len(self._block):
+                size = min(MAX_BLOCK_SIZE, max(size, 2 * len(self._block)))
+            self._block_start = index
+            self._block = self._rows(index, min(index + size, length))
+            row = self._block[0]
+        else:
+            row = self._rows(index, index + 1)[0]
+        self._last = index
+        return row
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.dates.nbytes
+            + self.prices.nbytes
+            + self.signals.nbytes
+            + self.enter_tags.nbytes
+            + self.exit_tags.nbytes
+        )
+
+    def _rows(self, start: int, end: int) -> list[tuple]:
+        tags = self._tags.__getitem__
+        return list(
+            zip(
+                _timestamps(self.dates[start:end]),
+                *self.prices[start:end].T.tolist(),
+                *self.signals[start:end].T.tolist(),
+                map(tags, self.enter_tags[start:end].tolist()),
+                map(tags, self.exit_tags[start:end].tolist()),
+                strict=False,
+            )
+        )
+
+
+class DetailRows:
+    """
+    Detail (smaller timeframe) candles of one pair, as NumPy arrays, pre-split by main candle.
+    """
+
+    __slots__ = ("_ends", "_starts", "dates", "prices")
+
+    def __init__(self, df: DataFrame, main_rows: PairRows, timeframe_secs: int) -> None:
+        """
+        :param df: detail candles of the pair
+        :param main_rows: main candles of the pair
+        :param timeframe_secs: main timeframe, in seconds
+        """
+        self.dates = _dates_ns(df)
+        self.prices = df[PRICE_COLUMNS].to_numpy(dtype=np.float64)
+        # Detail candles of main row i are [_starts[i], _ends[i])
+        self._starts = np.searchsorted(self.dates, main_rows.dates)
+        self._ends = np.searchsorted(
+            self.dates, main_rows.dates + np.int64(timeframe_secs * 1_000_000_000)
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + self.prices.nbytes + self._starts.nbytes + self._ends.nbytes
+
+    def rows(self, index: int, row: tuple) -> list[tuple] | None:
+        """
+        Detail candles of the main candle at index, with the main candle's signals and tags.
+        """
+        start = int(self._starts[index])
+        end = int(self._ends[index])
+        if start == end:
+            return None
+        return list(
+            zip(
+                _timestamps(self.dates[start:end]),
+                *self.prices[start:end].T.tolist(),
+                # Signals and tags of the main candle
+                *(repeat(value) for value in row[len(PRICE_COLUMNS) + 1 :]),
+                strict=False,
+            )
+        )
@@ -0,0 +1,146 @@
+"""
+Signal schedule for the sparse backtest loop
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+from pandas import DataFrame
+
+
+logger = logging.getLogger(__name__)
+
+
+class SignalSchedule:
+    """
+    Precomputed schedule of the backtest loop, used to skip (candle, pair) combinations
+    where nothing can happen: no entry signal, and no open trade.
+
+    The dense loop consumes one row per pair and candle, once the row's date is reached.
+    The candle at which each row is consumed is computed upfront with NumPy, so the sparse
+    loop can look up the row of any pair at any candle, and knows which pairs have an entry
+    signal at each candle.
+    """
+
+    def __init__(self, start_date: datetime, timeframe_secs: int) -> None:
+        self._first_candle = np.datetime64(start_date.replace(tzinfo=None), "ns").astype(
+            np.int64
+        ) + np.int64(timeframe_secs * 1_000_000_000)
+        self._timeframe = np.int64(timeframe_secs * 1_000_000_000)
+        # Candle index at which each row of a pair is consumed (strictly increasing)
+        self._consumed: dict[str, list[int]] = {}
+        self._signals: dict[int, list[str]] = defaultdict(list)
+        self._pair_order: dict[str, int] = {}
+        # Position of the loop, for lazy dataframe slicing
+        self.candle = -1
+        self.is_first = True
+        self.current_pair: str | None = None
+        self.open_pairs: list[str] = []
+
+    def add_pair(self, pair: str, df: DataFrame, can_short: bool) -> None:
+        """
+        Add a pair's analyzed, shifted dataframe (as converted to rows for the backtest)
+        """
+        self._pair_order[pair] = len(self._pair_order)
+        if df.empty:
+            self._consumed[pair] = []
+            return
+        dates = df["date"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        positions = np.arange(len(dates), dtype=np.int64)
+        # first candle at which the row's date is reached
+        due = np.maximum(-((self._first_candle - dates) // self._timeframe), 0)
+        # one row per candle at most - rows fall behind if they are due earlier
+        candles = positions + np.maximum.accumulate(due - positions)
+        self._consumed[pair] = candles.tolist()
+
+        # Same conditions as Backtesting.check_for_trade_entry()
+        enter_long = df["enter_long"].to_numpy() == 1
+        exit_long = df["exit_long"].to_numpy() == 1
+        if can_short:
+            enter_short = df["enter_short"].to_numpy() == 1
+            exit_short = df["exit_short"].to_numpy() == 1
+            entries = (enter_long & ~(exit_long | enter_short)) | (
+                enter_short & ~(exit_short | enter_long)
+            )
+        else:
+            entries = enter_long & ~exit_long
+        for candle in candles[entries].tolist():
+            self._signals[candle].append(pair)
+
+    def start_candle(self, candle: int, open_pairs: list[str]) -> None:
+        """
+        Move the loop position to a new candle, before any pair is processed
+        """
+        self.candle = candle
+        self.is_first = True
+        self.current_pair = None
+        self.open_pairs = open_pairs
+
+    def visit(self, pair: str, is_first: bool) -> None:
+        """
+        Move the loop position to a pair (on the main or a detail candle)
+        """
+        self.is_first = is_first
+        self.current_pair = pair
+
+    def first_visit_order(self) -> list[str]:
+        """
+        Pairs with data, in the order the dense loop first processes them
+        """
+        pairs = [pair for pair, consumed in self._consumed.items() if consumed]
+        return sorted(pairs, key=lambda pair: (self._consumed[pair][0], self._pair_order[pair]))
+
+    @property
+    def signal_count(self) -> int:
+        return sum(len(pairs) for pairs in self._signals.values())
+
+    def signal_pairs(self, candle: int) -> list[str]:
+        """
+        Pairs with an entry signal at this candle, in pair order
+        """
+        return self._signals.get(candle, [])
+
+    def row_index(self, pair: str, candle: int) -> int | None:
+        """
+        Index of the row of the pair consumed at this candle, or None if there is none
+        """
+        consumed = self._consumed.get(pair)
+        if consumed is None:
+            return None
+        index = bisect_left(consumed, candle)
+        if index < len(consumed) and consumed[index] == candle:
+            return index
+        return None
+
+    def rows_consumed(self, pair: str) -> int | None:
+        """
+        Number of rows of the pair the dense loop would have consumed at the current position
+        of the loop - used as dataframe slice index for callbacks.
+        Pairs which come later in the dense loop's order in this candle are still at the
+        previous candle.
+        """
+        consumed = self._consumed.get(pair)
+        if consumed is None:
+            return None
+        candle = self.candle
+        if self.is_first and pair != self.current_pair and not self._visited(pair):
+            candle -= 1
+        count = bisect_right(consumed, candle)
+        return count if count else None
+
+    def _visited(self, pair: str) -> bool:
+        """
+        Whether the dense loop would already have processed the pair in the current candle
+        """
+        current = self.current_pair
+        if current is None:
+            return False
+        open_pairs = self.open_pairs
+        if pair in open_pairs:
+            return current not in open_pairs or open_pairs.index(pair) < open_pairs.index(current)
+        if current in open_pairs:
+            return False
+        return self._pair_order.get(pair, -1) < self._pair_order.get(current, -1)
@@ -0,0 +1,232 @@
+"""
+Vectorized fast path of the backtest loop, for strategies without per-candle callbacks
+"""
+
+import logging
+from datetime import UTC, datetime
+
+import numpy as np
+from pandas import Timestamp
+
+from freqtrade.constants import Config
+from freqtrade.enums import TradingMode
+from freqtrade.exchange.exchange_utils import SIGNIFICANT_DIGITS, TICK_SIZE
+from freqtrade.optimize.backtest_rows import PairRows
+from freqtrade.optimize.backtest_schedule import SignalSchedule
+from freqtrade.persistence import LocalTrade
+from freqtrade.strategy.interface import IStrategy
+
+
+logger = logging.getLogger(__name__)
+
+# Column positions in PairRows.prices / PairRows.signals
+_HIGH = 1
+_LOW = 2
+_EXIT_LONG = 1
+
+# Rows scanned at once when looking for the next possible exit - doubles while none is found.
+SCAN_SIZE = 64
+# calc_profit_ratio() rounds to 8 decimals
+PROFIT_TOLERANCE = 1e-8
+
+
+def _overridden(strategy: IStrategy, name: str) -> bool:
+    method = getattr(strategy, name)
+    return getattr(method, "__func__", method) is not getattr(IStrategy, name)
+
+
+def vectorized_blocker(strategy: IStrategy, config: Config) -> str | None:
+    """
+    Reason why the vectorized loop can't be used with this strategy and configuration,
+    or None if it can.
+    The vectorized loop skips candles of open trades, so nothing may be called for every candle
+    of a trade - only on entry and exit.
+    """
+    if config.get("trading_mode", TradingMode.SPOT) != TradingMode.SPOT:
+        return "only spot markets are supported"
+    if config.get("position_stacking", False):
+        return "position stacking is enabled"
+    if config.get("timeframe_detail"):
+        return "a detail timeframe is used"
+    if strategy.position_adjustment_enable:
+        return "position adjustment is enabled"
+    if strategy.use_custom_stoploss:
+        return "custom_stoploss is used"
+    if strategy.use_custom_roi:
+        return "custom_roi is used"
+    if strategy.use_exit_signal and _overridden(strategy, "custom_exit"):
+        return "custom_exit is implemented"
+    return None
+
+
+class _TradeState:
+    __slots__ = ("due", "last", "trade")
+
+    def __init__(self, trade: LocalTrade, last: int) -> None:
+        self.trade = trade
+        # Last row the trade was processed on
+        self.last = last
+        # Next row the trade may exit on - None until computed
+        self.due: int | None = None
+
+
+class OpenTradeScanner:
+    """
+    Skips the candles of open trades where they can't exit.
+
+    For an open trade, the next candle where it may exit - exit signal, ROI or (trailing) stoploss
+    reached - is found with array operations over the pair's rows. Candles before it are not
+    processed, and their effect on the trade (min / max rates, trailing stoploss) is applied at
+    once before the next candle that is.
+    Entries, exits, stake and wallet handling remain with the backtest loop.
+    Only valid for strategies without per-candle callbacks - see vectorized_blocker().
+    """
+
+    def __init__(self, strategy: IStrategy, schedule: SignalSchedule, data: dict) -> None:
+        self._strategy = strategy
+        self._schedule = schedule
+        self._data = data
+        roi = sorted(strategy.minimal_roi.items())
+        self._roi_minutes = np.array([minutes for minutes, _ in roi], dtype=np.int64)
+        self._roi_values = np.array([value for _, value in roi], dtype=np.float64)
+        self._use_exit_signal = strategy.use_exit_signal
+
+        stoploss = abs(strategy.stoploss)
+        self._trailing_distance: float | None = None
+        # The catch-up of skipped candles assumes that a higher high never lowers the stoploss
+        self._every_candle = False
+        if strategy.trailing_stop:
+            self._trailing_distance = stoploss
+            if strategy.trailing_stop_positive is not None:
+                positive = abs(strategy.trailing_stop_positive)
+                self._trailing_distance = min(stoploss, positive)
+                self._every_candle = positive > stoploss
+        self._states: dict[str, _TradeState] = {}
+
+    def visit(self, trade: LocalTrade, required: bool) -> bool:
+        """
+        Whether the trade's pair must be processed in the current candle of the schedule.
+        If so, the trade is brought up to date with the candles skipped since it was last
+        processed.
+        :param required: the pair is processed anyway (it has an entry signal)
+        """
+        pair = trade.pair
+        index = self._schedule.row_index(pair, self._schedule.candle)
+        if index is None:
+            return False
+        rows = self._data[pair]
+        state = self._state(trade, rows)
+        if required or trade.has_open_orders or self._every_candle:
+            state.due = index
+        elif state.due is None:
+            state.due = self._next_exit(rows, trade, state.last + 1)
+        if index < state.due:
+            return False
+        self._catch_up(rows, trade, state.last + 1, index)
+        state.last = index
+        state.due = None
+        return True
+
+    def catch_up_open_trades(self) -> None:
+        """
+        Bring open trades up to date with the candles skipped until the end of the backtest.
+        """
+        for trade in LocalTrade.bt_trades_open:
+            rows = self._data[trade.pair]
+            state = self._state(trade, rows)
+            end = self._schedule.rows_consumed(trade.pair) or 0
+            self._catch_up(rows, trade, state.last + 1, end)
+            state.last = end - 1
+
+    def _state(self, trade: LocalTrade, rows: PairRows) -> _TradeState:
+        state = self._states.get(trade.pair)
+        if state is None or state.trade is not trade:
+            # Opened since the last candle, and processed on its entry candle.
+            entry = int(np.searchsorted(rows.dates, Timestamp(trade.open_date_utc).value))
+            state = self._states[trade.pair] = _TradeState(trade, entry)
+        return state
+
+    def _catch_up(self, rows: PairRows, trade: LocalTrade, start: int, end: int) -> None:
+        """
+        Apply the effect of rows [start, end) to the trade, which did not exit on any of them.
+        As stoploss and trailing stoploss only move up with the high, the highest high of all
+        skipped rows yields the same stoploss as processing them one by one.
+        No low is passed on - the stoploss was below the low of every skipped row.
+        """
+        if start >= end:
+            return
+        high = float(rows.prices[start:end, _HIGH].max())
+        low = float(rows.prices[start:end, _LOW].min())
+        trade.adjust_min_max_rates(high, low)
+        if self._trailing_distance is not None:
+            current_time = datetime.fromtimestamp(int(rows.dates[end - 1]) / 1e9, tz=UTC)
+            self._strategy.ft_stoploss_adjust(
+                high,
+                trade,  # type: ignore
+                current_time,
+                trade.calc_profit_ratio(high),
+                0,
+                high=high,
+            )
+
+    def _next_exit(self, rows: PairRows, trade: LocalTrade, start: int) -> int:
+        """
+        First row from start on where the trade may exit, or the number of rows if none.
+        Conservative - the backtest loop decides whether the trade actually exits.
+        """
+        length = len(rows)
+        if trade.stop_loss is None:
+            return start
+        open_date = Timestamp(trade.open_date_utc).value
+        # Best case profit ratio at a rate, fees included
+        profit_factor = (1 - (trade.fee_close or 0.0)) / (1 + (trade.fee_open or 0.0))
+        profit_factor /= trade.open_rate
+        highest = -np.inf
+        size = SCAN_SIZE
+        while start < length:
+            end = min(length, start + size)
+            high = rows.prices[start:end, _HIGH]
+            low = rows.prices[start:end, _LOW]
+
+            # ROI reached at the high
+            may_exit = np.zeros(end - start, dtype=bool)
+            if len(self._roi_minutes):
+                minutes = (rows.dates[start:end] - open_date) // 60_000_000_000
+                roi_index = np.searchsorted(self._roi_minutes, minutes, side="right") - 1
+                roi = np.where(roi_index >= 0, self._roi_values[np.maximum(roi_index, 0)], np.inf)
+                may_exit |= high * profit_factor - 1 + PROFIT_TOLERANCE > roi
+
+            # Stoploss reached at the low
+            stop: float | np.ndarray = trade.stop_loss
+            if self._trailing_distance is not None:
+                highs = np.maximum(np.maximum.accumulate(high), highest)
+                highest = highs[-1]
+                trailing = highs * (1 - self._trailing_distance)
+                stop = np.maximum(stop, trailing + self._tick(trade, trailing))
+            may_exit |= low <= stop
+
+            if self._use_exit_signal:
+                may_exit |= rows.signals[start:end, _EXIT_LONG] == 1
+
+            hits = np.flatnonzero(may_exit)
+            if len(hits):
+                return start + int(hits[0])
+            start = end
+            size *= 2
+        return length
+
+    @staticmethod
+    def _tick(trade: LocalTrade, prices: np.ndarray) -> np.ndarray | float:
+        """
+        Upper bound of the rounding up of stoploss prices to the trade's price precision.
+        """
+        precision = trade.price_precision
+        mode = trade.precision_mode_price
+        tolerance = prices * 1e-12
+        if precision is None or mode is None:
+            return tolerance
+        if mode == TICK_SIZE:
+            return tolerance + precision
+        if mode == SIGNIFICANT_DIGITS:
+            return tolerance + prices * 10.0 ** (1 - int(precision))
+        return tolerance + 10.0 ** -int(precision)
@@ -6,8 +6,10 @@ This module contains the backtesting logic
 
 import logging
 from collections import defaultdict
+from collections.abc import Iterable, Mapping
 from copy import deepcopy
 from datetime import datetime, timedelta
+from pathlib import Path
 
 from numpy import isnan, nan
 from pandas import DataFrame, Series
@@ -49,19 +51,33 @@ from freqtrade.ft_types import (
 from freqtrade.leverage.liquidation_price import update_liquidation_prices
 from freqtrade.mixins import LoggingMixin
 from freqtrade.optimize.backtest_caching import get_strategy_run_id
+from freqtrade.optimize.backtest_pair_cache import backtest_pair_cached
+from freqtrade.optimize.backtest_parallel import (
+    backtest_sharded,
+    backtest_strategies_parallel,
+    shard_count,
+    strategy_jobs,
+)
+from freqtrade.optimize.backtest_profiler import BacktestProfiler
+from freqtrade.optimize.backtest_rows import DetailRows, PairRows, TagTable
+from freqtrade.optimize.backtest_schedule import SignalSchedule
+from freqtrade.optimize.backtest_vectorized import OpenTradeScanner, vectorized_blocker
 from freqtrade.optimize.bt_progress import BTProgress
 from freqtrade.optimize.optimize_reports import (
+    AnalysisChunkWriter,
     generate_backtest_stats,
     generate_rejected_signals,
     generate_trade_signal_candles,
     show_backtest_results,
     store_backtest_results,
 )
+from freqtrade.optimize.optimize_reports.bt_export_chunks import REJECTED_CHUNK_SIZE
 from freqtrade.persistence import (
     CustomDataWrapper,
     LocalTrade,
     Order,
     PairLocks,
+    PairOpenTrades,
     Trade,
     disable_database_use,
     enable_database_use,
@@ -120,6 +136,9 @@ class Backtesting:
     def __init__(self, config: Config, exchange: Exchange | None = None) -> None:
         LoggingMixin.show_output = False
         self.config = config
+        # Profiles the run from here on, if enabled
+        self.progress = BTProgress(BacktestProfiler() if config.get("profile", False) else None)
+        self.progress.init_step(BacktestState.STARTUP, 0)
         self.results: BacktestResultType = get_BacktestResultType_default()
         self.trade_id_counter: int = 0
         self.order_id_counter: int = 0
@@ -136,6 +155,8 @@ class Backtesting:
             "exited": {},
         }
         self.rejected_dict: dict[str, list] = {}
+        # Writes analysis_results to disk while backtesting, if set
+        self.analysis_writer: AnalysisChunkWriter | None = None
         self.starting_balance: float = 0.0
 
         self._exchange_name = self.config["exchange"]["name"]
@@ -179,6 +200,13 @@ class Backtesting:
 
         self.dataprovider.add_pairlisthandler(self.pairlists)
         self.dynamic_pairlist: bool = self.config.get("enable_dynamic_pairlist", False)
+        self.backtest_loop_mode: str = self.config.get(
+            "backtest_loop", constants.BACKTEST_LOOP_DEFAULT
+        )
+        self._schedule: SignalSchedule | None = None
+        self._scanner: OpenTradeScanner | None = None
+        # Last reason the vectorized loop could not be used - to log it once only
+        self._vectorized_blocker: str | None = None
         self.pairlists.refresh_pairlist(only_first=self.dynamic_pairlist)
 
         if len(self.pairlists.whitelist) == 0:
@@ -272,6 +300,7 @@ class Backtesting:
         else:
             self.timeframe_detail_td = timedelta(seconds=0)
         self.detail_data: dict[str, DataFrame] = {}
+        self._detail_rows: dict[str, DetailRows] = {}
         self.futures_data: dict[str, DataFrame] = {}
 
     def init_backtest(self):
@@ -280,7 +309,7 @@ class Backtesting:
         self.wallets = Wallets(self.config, self.exchange, is_backtest=True)
         self.starting_balance = self.wallets.get_starting_balance()
 
-        self.progress = BTProgress()
+        self.progress = BTProgress(self.progress.profiler)
         self.abort = False
 
     def _set_strategy(self, strategy: IStrategy):
@@ -464,9 +493,44 @@ class Backtesting:
             self.abort = False
             raise DependencyException("Stop requested")
 
-    def _get_ohlcv_as_lists(self, processed: dict[str, DataFrame]) -> dict[str, tuple]:
+    def analyze_pair_rows(self, pair: str, pair_data: DataFrame) -> tuple[DataFrame, DataFrame]:
+        """
+        Populate entry / exit signals for a pair, and trim the startup period.
+        :return: the analyzed dataframe, and a copy with the signals shifted to the candle
+            they're acted upon - the rows of the backtest loop.
+        """
+        if not pair_data.empty:
+            # Cleanup from prior runs
+            pair_data.drop(HEADERS[5:] + ["buy", "sell"], axis=1, errors="ignore")
+        df_analyzed = self.strategy.ft_advise_signals(pair_data, {"pair": pair})
+        # Update dataprovider cache
+        self.dataprovider._set_cached_df(
+            pair, self.timeframe, df_analyzed, self.config["candle_type_def"]
+        )
+
+        # Trim startup period from analyzed dataframe
+        trimmed = trim_dataframe(df_analyzed, self.timerange, startup_candles=self.required_startup)
+
+        # Create a copy of the dataframe before shifting, that way the entry signal/tag
+        # remains on the correct candle for callbacks.
+        df_analyzed = trimmed.copy()
+
+        # To avoid using data from future, we use entry/exit signals shifted
+        # from the previous candle
+        for col in HEADERS[5:]:
+            tag_col = col in ("enter_tag", "exit_tag")
+            if col in df_analyzed.columns:
+                df_analyzed[col] = (
+                    df_analyzed.loc[:, col].replace([nan], [0 if not tag_col else None]).shift(1)
+                )
+            elif not df_analyzed.empty:
+                df_analyzed[col] = 0 if not tag_col else None
+
+        return trimmed, df_analyzed.drop(df_analyzed.head(1).index)
+
+    def _get_ohlcv_as_lists(self, processed: dict[str, DataFrame]) -> dict[str, PairRows | list]:
         """
-        Helper function to convert a processed dataframes into lists for performance reasons.
+        Helper function to convert a processed dataframes into row stores for performance reasons.
 
         Used by backtest() - so keep this optimized for performance.
 
@@ -475,6 +539,8 @@ class Backtesting:
         """
 
         data: dict = {}
+        tags = TagTable()
+        self._detail_rows = {}
         self.progress.init_step(BacktestState.CONVERT, len(processed))
 
         # Create dict with data
@@ -483,42 +549,20 @@ class Backtesting:
             self.check_abort()
             self.progress.increment()
 
-            if not pair_data.empty:
-                # Cleanup from prior runs
-                pair_data.drop(HEADERS[5:] + ["buy", "sell"], axis=1, errors="ignore")
-            df_analyzed = self.strategy.ft_advise_signals(pair_data, {"pair": pair})
-            # Update dataprovider cache
-            self.dataprovider._set_cached_df(
-                pair, self.timeframe, df_analyzed, self.config["candle_type_def"]
-            )
-
-            # Trim startup period from analyzed dataframe
-            df_analyzed = processed[pair] = pair_data = trim_dataframe(
-                df_analyzed, self.timerange, startup_candles=self.required_startup
-            )
-
-            # Create a copy of the dataframe before shifting, that way the entry signal/tag
-            # remains on the correct candle for callbacks.
-            df_analyzed = df_analyzed.copy()
-
-            # To avoid using data from future, we use entry/exit signals shifted
-            # from the previous candle
-            for col in HEADERS[5:]:
-                tag_col = col in ("enter_tag", "exit_tag")
-                if col in df_analyzed.columns:
-                    df_analyzed[col] = (
-                        df_analyzed.loc[:, col]
-                        .replace([nan], [0 if not tag_col else None])
-                        .shift(1)
-                    )
-                elif not df_analyzed.empty:
-                    df_analyzed[col] = 0 if not tag_col else None
+            processed[pair], df_analyzed = self.analyze_pair_rows(pair, pair_data)
+            if self._schedule is not None:
+                self._schedule.add_pair(pair, df_analyzed, self._can_short)
 
-            df_analyzed = df_analyzed.drop(df_analyzed.head(1).index)
-
-            # Convert from Pandas to list for performance reasons
+            # Convert from Pandas to NumPy arrays for performance reasons
             # (Looping Pandas is slow.)
-            data[pair] = df_analyzed[HEADERS].values.tolist() if not df_analyzed.empty else []
+            if df_analyzed.empty:
+                data[pair] = []
+                continue
+            data[pair] = PairRows(df_analyzed, tags)
+            if pair in self.detail_data:
+                self._detail_rows[pair] = DetailRows(
+                    self.detail_data[pair], data[pair], self.timeframe_secs
+                )
         return data
 
     def _get_close_rate(
@@ -1225,7 +1269,7 @@ class Backtesting:
         return trade
 
     def handle_left_open(
-        self, open_trades: dict[str, list[LocalTrade]], data: dict[str, list[tuple]]
+        self, open_trades: Mapping[str, Iterable[LocalTrade]], data: dict[str, list[tuple]]
     ) -> None:
         """
         Handling of left open trades at the end of backtesting
@@ -1451,6 +1495,25 @@ class Backtesting:
             if pair not in self.rejected_dict:
                 self.rejected_dict[pair] = []
             self.rejected_dict[pair].append([row[DATE_IDX], row[ENTER_TAG_IDX]])
+            if (
+                self.analysis_writer is not None
+                and len(self.rejected_dict[pair]) >= REJECTED_CHUNK_SIZE
+            ):
+                self.analysis_writer.spool_rejected(
+                    self.strategy.get_strategy_name(), pair, self.rejected_dict[pair]
+                )
+                self.rejected_dict[pair] = []
+
+    def take_rejected(self, pair: str) -> list:
+        """
+        Rejected signals of a pair for the running strategy - including those spooled to disk.
+        """
+        rejected = self.rejected_dict.pop(pair, [])
+        if self.analysis_writer is None:
+            return rejected
+        return (
+            self.analysis_writer.take_rejected(self.strategy.get_strategy_name(), pair) + rejected
+        )
 
     def backtest_loop(
         self,
@@ -1468,7 +1531,7 @@ class Backtesting:
         exiting_dir: LongShort | None = None
         if not self._position_stacking and len(LocalTrade.bt_trades_open_pp[pair]) > 0:
             # position_stacking not supported for now.
-            exiting_dir = "short" if LocalTrade.bt_trades_open_pp[pair][0].is_short else "long"
+            exiting_dir = "short" if LocalTrade.bt_trades_open_pp[pair].first().is_short else "long"
 
         for t in list(LocalTrade.bt_trades_open_pp[pair]):
             # 1. Manage currently open orders of active trades
@@ -1514,26 +1577,16 @@ class Backtesting:
             return exiting_dir
         return None
 
-    def get_detail_data(self, pair: str, row: tuple) -> list[tuple] | None:
+    def get_detail_data(self, pair: str, row: tuple, row_index: int) -> list[tuple] | None:
         """
         Spread into detail data
+        :param row: main candle
+        :param row_index: index of the main candle in the pair's rows
         """
-        current_detail_time: datetime = row[DATE_IDX].to_pydatetime()
-        exit_candle_end = current_detail_time + self.timeframe_td
-        detail_data = self.detail_data[pair]
-        detail_data = detail_data.loc[
-            (detail_data["date"] >= current_detail_time) & (detail_data["date"] < exit_candle_end)
-        ].copy()
-
-        if len(detail_data) == 0:
+        detail = self._detail_rows.get(pair)
+        if detail is None:
             return None
-        detail_data.loc[:, "enter_long"] = row[LONG_IDX]
-        detail_data.loc[:, "exit_long"] = row[ELONG_IDX]
-        detail_data.loc[:, "enter_short"] = row[SHORT_IDX]
-        detail_data.loc[:, "exit_short"] = row[ESHORT_IDX]
-        detail_data.loc[:, "enter_tag"] = row[ENTER_TAG_IDX]
-        detail_data.loc[:, "exit_tag"] = row[EXIT_TAG_IDX]
-        return detail_data[HEADERS].values.tolist()
+        return detail.rows(row_index, row)
 
     def _time_generator(self, start_date: datetime, end_date: datetime):
         current_time = start_date + self.timeframe_td
@@ -1557,15 +1610,67 @@ class Backtesting:
             i += 1
             current_time += self.timeframe_detail_td
 
+    def _get_main_row(
+        self, data: dict, pair: str, candle: int, current_time: datetime, indexes: dict
+    ) -> tuple[tuple | None, int]:
+        """
+        Row of the pair for the main candle, and the number of rows consumed so far.
+        """
+        if self._schedule is not None:
+            row_index = self._schedule.row_index(pair, candle)
+            if row_index is None:
+                return None, 0
+            return data[pair][row_index], row_index + 1
+
+        row_index = indexes[pair]
+        row = self.validate_row(data, pair, row_index, current_time)
+        if not row:
+            return None, row_index
+        indexes[pair] = row_index + 1
+        return row, row_index + 1
+
+    def _open_trade_pairs(self, pairs: list[str]) -> list[str]:
+        """
+        Pairs with open trades to process in this candle.
+        The vectorized loop skips the ones which can't exit.
+        """
+        scanner = self._scanner
+        if scanner is None:
+            return LocalTrade.bt_trades_open.pairs()
+        return [t.pair for t in LocalTrade.bt_trades_open if scanner.visit(t, t.pair in pairs)]
+
     def _time_pair_generator_det(self, current_time: datetime, pairs: list[str]):
+        open_pairs = self._open_trade_pairs(pairs)
+        if not pairs and self._schedule is not None and not open_pairs:
+            # Sparse loop - nothing can happen on this candle.
+            self.dataprovider._set_dataframe_max_date(current_time)
+            return
+        open_trades = LocalTrade.bt_trades_open
+        version = open_trades.version
+        # Pairs that have open trades should be processed first
+        new_pairlist = list(dict.fromkeys(open_pairs + pairs))
         for current_time_det, is_first, has_detail, idx in self._time_generator_det(
             current_time, current_time + self.timeframe_td
         ):
-            # Pairs that have open trades should be processed first
-            new_pairlist = list(dict.fromkeys([t.pair for t in LocalTrade.bt_trades_open] + pairs))
+            if idx > 0 and open_trades.version != version:
+                # Trades opened or closed on the previous detail candle
+                version = open_trades.version
+                new_pairlist = list(dict.fromkeys(open_trades.pairs() + pairs))
             for pair in new_pairlist:
+                if self._schedule is not None:
+                    self._schedule.visit(pair, is_first)
                 yield current_time_det, is_first, has_detail, idx, pair
 
+    def _candle_pairs(self, candle: int, pairs: list[str]) -> list[str]:
+        """
+        Pairs to process in this candle (besides the ones with open trades).
+        The sparse loop only processes pairs with an entry signal.
+        """
+        if self._schedule is None:
+            return pairs
+        self._schedule.start_candle(candle, LocalTrade.bt_trades_open.pairs())
+        return self._schedule.signal_pairs(candle)
+
     def time_pair_generator(
         self,
         start_date: datetime,
@@ -1585,7 +1690,7 @@ class Backtesting:
         # Indexes per pair, so some pairs are allowed to have a missing start.
         indexes: dict = defaultdict(int)
 
-        for current_time in self._time_generator(start_date, end_date):
+        for candle, current_time in enumerate(self._time_generator(start_date, end_date)):
             # Loop for each main candle.
             self.check_abort()
 
@@ -1593,6 +1698,8 @@ class Backtesting:
                 self.pairlists.refresh_pairlist(pairs=self.available_pairs)
                 pairs = self.pairlists.whitelist
 
+            candle_pairs = self._candle_pairs(candle, pairs)
+
             # Reset open trade count for this candle
             # Critical to avoid exceeding max_open_trades in backtesting
             # when timeframe-detail is used and trades close within the opening candle.
@@ -1601,10 +1708,10 @@ class Backtesting:
             )
             pair_detail_cache: dict[str, list[tuple]] = {}
             pair_tradedir_cache: dict[str, LongShort | None] = {}
-            pairs_with_open_trades = [t.pair for t in LocalTrade.bt_trades_open]
+            pairs_with_open_trades = set(LocalTrade.bt_trades_open.pairs())
 
             for current_time_det, is_first, has_detail, idx, pair in self._time_pair_generator_det(
-                current_time, pairs
+                current_time, candle_pairs
             ):
                 # Loop for each detail candle (if necessary) and pair
                 # Yields only the main date if no detail timeframe is set.
@@ -1613,13 +1720,10 @@ class Backtesting:
                 trade_dir: LongShort | None = None
                 if is_first:
                     # Main candle
-                    row_index = indexes[pair]
-                    row = self.validate_row(data, pair, row_index, current_time)
+                    row, row_index = self._get_main_row(data, pair, candle, current_time, indexes)
                     if not row:
                         continue
 
-                    row_index += 1
-                    indexes[pair] = row_index
                     is_last_row = current_time == end_date
                     self.dataprovider._set_dataframe_max_index(
                         pair, self.required_startup + row_index
@@ -1656,7 +1760,7 @@ class Backtesting:
                     # auto-lock for pairs that have open trades
                     # Necessary for detail - to capture trades that open and close within
                     # the same main candle
-                    pairs_with_open_trades.append(pair)
+                    pairs_with_open_trades.add(pair)
 
                 if (
                     is_first
@@ -1669,7 +1773,7 @@ class Backtesting:
                     # Spread candle into detail timeframe and cache that -
                     # only once per main candle
                     # and only if we can expect activity.
-                    pair_detail = self.get_detail_data(pair, row)
+                    pair_detail = self.get_detail_data(pair, row, row_index - 1)
                     if pair_detail is not None:
                         pair_detail_cache[pair] = pair_detail
                         row = pair_detail_cache[pair][idx]
@@ -1679,6 +1783,48 @@ class Backtesting:
                 yield current_time_det, pair, row, is_last_row, trade_dir
             self.progress.increment()
 
+    def _sparse_slice_index(self, schedule: SignalSchedule, pair: str) -> int | None:
+        rows = schedule.rows_consumed(pair)
+        return None if rows is None else self.required_startup + rows
+
+    def _init_backtest_loop(self, start_date: datetime) -> str:
+        """
+        Backtest loop to use for this backtest - falls back to a denser loop where the configured
+        one is not supported.
+        """
+        mode = self.backtest_loop_mode
+        if mode != "dense" and self.dynamic_pairlist:
+            logger.warning(
+                f"{mode.capitalize()} backtest loop is not supported with dynamic pairlists. "
+                "Falling back to the dense loop."
+            )
+            return "dense"
+        if mode == "vectorized":
+            blocker = vectorized_blocker(self.strategy, self.config)
+            if blocker is not None:
+                if blocker != self._vectorized_blocker:
+                    # Once only, not for every hyperopt epoch
+                    logger.info(
+                        f"Vectorized backtest loop is not supported as {blocker}. "
+                        "Falling back to the sparse loop."
+                    )
+                self._vectorized_blocker = blocker
+                mode = "sparse"
+        if mode != "dense":
+            self._schedule = SignalSchedule(start_date, self.timeframe_secs)
+        return mode
+
+    def _start_schedule(self, schedule: SignalSchedule, data: dict, loop_mode: str) -> None:
+        # Callbacks see the dataframe as the dense loop would have sliced it.
+        self.dataprovider._set_dataframe_max_index_source(
+            lambda pair: self._sparse_slice_index(schedule, pair)
+        )
+        # handle_left_open() closes trades in the order the dense loop first saw their pairs
+        for pair in schedule.first_visit_order():
+            LocalTrade.bt_trades_open_pp.setdefault(pair, PairOpenTrades())
+        if loop_mode == "vectorized":
+            self._scanner = OpenTradeScanner(self.strategy, schedule, data)
+
     def backtest(
         self, processed: dict, start_date: datetime, end_date: datetime
     ) -> BacktestContentTypeIcomplete:
@@ -1698,9 +1844,16 @@ class Backtesting:
         self.reset_backtest(self.enable_protections)
         # Ensure wallets are up-to-date (important for --strategy-list)
         self.wallets.update()
+        self._schedule = None
+        loop_mode = self._init_backtest_loop(start_date)
         # Use dict of lists with data for performance
         # (looping lists is a lot faster than pandas DataFrames)
         data: dict = self._get_ohlcv_as_lists(processed)
+        if (profiler := self.progress.profiler) is not None:
+            profiler.candles += sum(len(rows) for rows in data.values())
+        schedule = self._schedule
+        if schedule is not None:
+            self._start_schedule(schedule, data, loop_mode)
 
         # Loop timerange and get candle for each pair at that point in time
         for (
@@ -1723,8 +1876,21 @@ class Backtesting:
                         # the trade didn't close or position change is in the same direction
                         break
 
+        if schedule is not None:
+            # All pairs have been visited in the last candle
+            schedule.is_first = False
+        if self._scanner is not None:
+            self._scanner.catch_up_open_trades()
+            self._scanner = None
         self.handle_left_open(LocalTrade.bt_trades_open_pp, data=data)
         self.wallets.update()
+        if schedule is not None:
+            # Leave the dataprovider as the dense loop would
+            for pair in data:
+                if (max_index := self._sparse_slice_index(schedule, pair)) is not None:
+                    self.dataprovider._set_dataframe_max_index(pair, max_index)
+            self.dataprovider._set_dataframe_max_index_source(None)
+            self._schedule = None
 
         results = trade_list_to_dataframe(LocalTrade.bt_trades)
         return {
@@ -1768,11 +1934,17 @@ class Backtesting:
             f"({(max_date - min_date).days} days)."
         )
         # Execute backtest and store results
-        results = self.backtest(
-            processed=preprocessed,
-            start_date=min_date,
-            end_date=max_date,
-        )
+        results = None
+        if self.config.get("backtest_pair_cache", False):
+            results = backtest_pair_cached(self, preprocessed, min_date, max_date)
+        elif (shards := shard_count(self.config, len(preprocessed))) > 1:
+            results = backtest_sharded(self, preprocessed, min_date, max_date, shards)
+        if results is None:
+            results = self.backtest(
+                processed=preprocessed,
+                start_date=min_date,
+                end_date=max_date,
+            )
         backtest_end_time = dt_now()
         results.update(
             {
@@ -1788,15 +1960,31 @@ class Backtesting:
             and self.dataprovider.runmode == RunMode.BACKTEST
         ):
             signals = generate_trade_signal_candles(preprocessed_tmp, results, "open_date")
-            rejected = generate_rejected_signals(preprocessed_tmp, self.rejected_dict)
+            rejected = generate_rejected_signals(
+                preprocessed_tmp,
+                {pair: self.take_rejected(pair) for pair in list(self.rejected_dict)},
+            )
             exited = generate_trade_signal_candles(preprocessed_tmp, results, "close_date")
-
-            self.analysis_results["signals"][strategy_name] = signals
-            self.analysis_results["rejected"][strategy_name] = rejected
-            self.analysis_results["exited"][strategy_name] = exited
+            self.add_analysis_results(
+                strategy_name, {"signals": signals, "rejected": rejected, "exited": exited}
+            )
+            # Rejected signals of the next strategy start over
+            self.rejected_dict = {}
 
         return min_date, max_date
 
+    def add_analysis_results(
+        self, strategy_name: str, analysis: dict[str, dict[str, DataFrame]]
+    ) -> None:
+        """
+        Keep the analysis candles of a strategy for the export - on disk if a writer is set.
+        """
+        for name, frames in analysis.items():
+            if self.analysis_writer is not None:
+                self.analysis_writer.add(name, strategy_name, frames)
+            else:
+                self.analysis_results[name][strategy_name] = frames
+
     def _get_min_cached_backtest_date(self):
         min_backtest_date = None
         backtest_cache_age = self.config.get("backtest_cache", constants.BACKTEST_CACHE_DEFAULT)
@@ -1828,20 +2016,33 @@ class Backtesting:
         """
         Run backtesting end-to-end
         """
-        data: dict[str, DataFrame] = {}
-
-        data, timerange = self.load_bt_data()
-        logger.info("Dataload complete. Calculating indicators")
-
-        self.load_prior_backtest()
+        if (profiler := self.progress.profiler) is None:
+            self._start()
+            return
+        directory = Path(
+            self.config.get(
+                "exportdirectory", Path(self.config["user_data_dir"], "backtest_results")
+            )
+        )
+        with profiler.session(directory, self.config.get("profile_stacks", False)):
+            self._start()
 
-        for strat in self.strategylist:
-            if self.results and strat.get_strategy_name() in self.results["strategy"]:
-                # When previous result hash matches - reuse that result and skip backtesting.
-                logger.info(f"Reusing result of previous backtest for {strat.get_strategy_name()}")
-                continue
-            min_date, max_date = self.backtest_one_strategy(strat, data, timerange)
+    def _backtest_and_store(
+        self, data: dict[str, DataFrame], timerange: TimeRange, strategies: list[IStrategy]
+    ) -> None:
+        """
+        Backtest the strategies, and store the results with those of earlier backtests
+        """
+        jobs = strategy_jobs(self.config, len(strategies))
+        if jobs > 1:
+            min_date, max_date = backtest_strategies_parallel(
+                self, strategies, data, timerange, jobs
+            )
+        else:
+            for strat in strategies:
+                min_date, max_date = self.backtest_one_strategy(strat, data, timerange)
 
+        self.progress.init_step(BacktestState.REPORT, 0)
         # Update old results with new ones.
         if len(self.all_bt_content) > 0:
             results = generate_backtest_stats(
@@ -1865,10 +2066,45 @@ class Backtesting:
                     self.results,
                     dt_appendix,
                     market_change_data=combined_res,
-                    analysis_results=self.analysis_results,
+                    analysis_results=self.analysis_writer or self.analysis_results,
                     strategy_files={s.get_strategy_name(): s.__file__ for s in self.strategylist},
                 )
 
+    def _start(self) -> None:
+        data: dict[str, DataFrame] = {}
+
+        data, timerange = self.load_bt_data()
+        logger.info("Dataload complete. Calculating indicators")
+
+        self.load_prior_backtest()
+
+        strategies: list[IStrategy] = []
+        for strat in self.strategylist:
+            if self.results and strat.get_strategy_name() in self.results["strategy"]:
+                # When previous result hash matches - reuse that result and skip backtesting.
+                logger.info(f"Reusing result of previous backtest for {strat.get_strategy_name()}")
+                continue
+            strategies.append(strat)
+
+        if (
+            self.config.get("export", "none") == "signals"
+            and self.dataprovider.runmode == RunMode.BACKTEST
+            and self.config.get("exportdirectory")
+        ):
+            # Analysis candles are written to disk as each strategy completes
+            export_dir = Path(self.config["exportdirectory"])
+            self.analysis_writer = AnalysisChunkWriter(
+                export_dir if export_dir.is_dir() else export_dir.parent
+            )
+
+        try:
+            self._backtest_and_store(data, timerange, strategies)
+        finally:
+            # Also on failure - no chunks remain in the export directory
+            if self.analysis_writer is not None:
+                self.analysis_writer.cleanup()
+                self.analysis_writer = None
+
         # Results may be mixed up now. Sort them so they follow --strategy-list order.
         if "strategy_list" in self.config and len(self.results) > 0:
             self.results["strategy_comparison"] = sorted(
@@ -1,4 +1,5 @@
 from freqtrade.enums import BacktestState
+from freqtrade.optimize.backtest_profiler import BacktestProfiler
 
 
 class BTProgress:
@@ -6,10 +7,13 @@ class BTProgress:
     _progress: float = 0
     _max_steps: float = 0
 
-    def __init__(self):
-        pass
+    def __init__(self, profiler: BacktestProfiler | None = None):
+        # Times the backtest phases, if profiling
+        self.profiler = profiler
 
     def init_step(self, action: BacktestState, max_steps: float):
+        if self.profiler is not None:
+            self.profiler.start_phase(str(action))
         self._action = action
         self._max_steps = max_steps
         self._progress = 0
@@ -17,7 +17,7 @@ from joblib import Parallel, cpu_count
 from optuna.trial import FrozenTrial, Trial, TrialState
 
 from freqtrade.constants import FTHYPT_FILEVERSION, LAST_BT_RESULT_FN, Config
-from freqtrade.enums import HyperoptState
+from freqtrade.enums import BacktestState, HyperoptState
 from freqtrade.misc import file_dump_json, plural
 from freqtrade.optimize.hyperopt.hyperopt_optimizer import INITIAL_POINTS, HyperOptimizer
 from freqtrade.optimize.hyperopt.hyperopt_output import HyperoptOutput
@@ -198,6 +198,10 @@ class Hyperopt:
         """
         val["current_epoch"] = current
         val["is_initial_point"] = current <= INITIAL_POINTS
+        profile = val.pop("profile", {})
+        if (profiler := self.hyperopter.backtesting.progress.profiler) is not None:
+            profiler.merge(profile)
+            profiler.epochs += 1
 
         logger.debug("Optimizer epoch evaluated: %s", val)
 
@@ -217,6 +221,14 @@ class Hyperopt:
         self._save_result(val)
 
     def start(self) -> None:
+        if (profiler := self.hyperopter.backtesting.progress.profiler) is None:
+            self._start()
+            return
+        directory = self.config["user_data_dir"] / "hyperopt_results"
+        with profiler.session(directory, self.config.get("profile_stacks", False)):
+            self._start()
+
+    def _start(self) -> None:
         self.random_state = self._set_random_state(self.config.get("hyperopt_random_state"))
         logger.info(f"Using optimizer random state: {self.random_state}")
         self.hyperopt_table_header = -1
@@ -228,6 +240,8 @@ class Hyperopt:
         logger.info(f"Number of parallel jobs set as: {config_jobs}")
 
         self.opt = self.hyperopter.get_optimizer(self.random_state)
+        if (profiler := self.hyperopter.backtesting.progress.profiler) is not None:
+            profiler.start_phase(str(HyperoptState.OPTIMIZE))
         try:
             with Parallel(n_jobs=config_jobs) as parallel:
                 jobs = parallel._effective_n_jobs()
@@ -290,6 +304,7 @@ class Hyperopt:
         except KeyboardInterrupt:
             print("User interrupted..")
 
+        self.hyperopter.backtesting.progress.init_step(BacktestState.REPORT, 0)
         if self.count_skipped_epochs > 0:
             logger.info(
                 f"{self.count_skipped_epochs} {plural(self.count_skipped_epochs, 'epoch')} "
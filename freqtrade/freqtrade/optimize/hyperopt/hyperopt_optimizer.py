@@ -22,10 +22,11 @@ from freqtrade.constants import DATETIME_PRINT_FORMAT, Config
 from freqtrade.data.converter import trim_dataframes
 from freqtrade.data.history import get_timerange
 from freqtrade.data.metrics import calculate_market_change
-from freqtrade.enums import HyperoptState
+from freqtrade.enums import BacktestState, HyperoptState
 from freqtrade.exceptions import OperationalException
 from freqtrade.ft_types import BacktestContentType
 from freqtrade.misc import deep_merge_dicts, round_dict
+from freqtrade.optimize.backtest_profiler import profile_worker
 from freqtrade.optimize.backtesting import Backtesting
 
 # Import IHyperOptLoss to allow unpickling classes from these modules
@@ -261,7 +262,12 @@ class HyperOptimizer:
     @wrap_non_picklable_objects
     def generate_optimizer_wrapped(self, params_dict: dict[str, Any]) -> dict[str, Any]:
         logging_mp_setup(log_queue, logging.INFO if self.config["verbosity"] < 1 else logging.DEBUG)
-        return self.generate_optimizer(params_dict)
+        with profile_worker(self.backtesting.progress) as profile:
+            result = self.generate_optimizer(params_dict)
+        if profile:
+            # Merged into the profile of the main process by Hyperopt.evaluate_result()
+            result["profile"] = profile
+        return result
 
     def generate_optimizer(self, params_dict: dict[str, Any]) -> dict[str, Any]:
         """
@@ -438,6 +444,7 @@ class HyperOptimizer:
         return optuna.create_study(sampler=sampler, direction="minimize")
 
     def advise_and_trim(self, data: dict[str, DataFrame]) -> dict[str, DataFrame]:
+        self.backtesting.progress.init_step(BacktestState.ANALYZE, 0)
         preprocessed = self.backtesting.strategy.advise_all_indicators(data)
 
         # Trim startup period from analyzed dataframe to get correct dates for output.
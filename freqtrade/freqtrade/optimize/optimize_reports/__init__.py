@@ -1,4 +1,5 @@
 # flake8: noqa: F401
+from freqtrade.optimize.optimize_reports.bt_export_chunks import AnalysisChunkWriter
 from freqtrade.optimize.optimize_reports.bt_output import (
     generate_wins_draws_losses,
     show_backtest_result,
@@ -0,0 +1,115 @@
+import logging
+from collections.abc import Iterator
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+
+from joblib import dump, load
+from pandas import DataFrame
+
+from freqtrade.misc import pair_to_filename
+
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_NAMES = ("signals", "rejected", "exited")
+# Rejected signals a pair collects in memory before they're spooled to disk
+REJECTED_CHUNK_SIZE = 10_000
+
+
+class AnalysisChunkWriter:
+    """
+    Writes the analysis data of a backtest (signal, rejected and exit candles) to disk as each
+    strategy completes, one columnar chunk per strategy and pair.
+    Rejected signals of the running strategy are spooled to disk in chunks of
+    REJECTED_CHUNK_SIZE per pair, and read back once it completes.
+    The chunks are moved into the result zip by store_backtest_results(), and are loaded
+    pair by pair by load_backtest_analysis_data().
+    """
+
+    def __init__(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        # Removed once stored - or on exit, if the backtest fails
+        self._tmp_dir: TemporaryDirectory | None = TemporaryDirectory(
+            prefix=".analysis-", dir=directory
+        )
+        self.directory = Path(self._tmp_dir.name)
+        # name -> strategy -> pair -> chunk file, relative to the directory
+        self.index: dict[str, dict[str, dict[str, str]]] = {name: {} for name in ANALYSIS_NAMES}
+
+    def add(self, name: str, strategy: str, frames: dict[str, DataFrame]) -> None:
+        """
+        Write the analysis frames of a strategy, per pair
+        """
+        entries = self.index[name].setdefault(strategy, {})
+        for pair, frame in frames.items():
+            chunk = Path(name, strategy, pair_to_filename(pair))
+            path = self.directory / chunk
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                frame.to_parquet(path.with_suffix(".parquet"))
+                chunk = chunk.with_suffix(".parquet")
+            except Exception as e:
+                # Columns of mixed types can't be stored in parquet.
+                logger.debug(f"Storing {name} candles of {pair} as pickle: {e}")
+                path.with_suffix(".parquet").unlink(missing_ok=True)
+                chunk = chunk.with_suffix(".pkl")
+                dump(frame, self.directory / chunk)
+            entries[pair] = chunk.as_posix()
+
+    def spool_rejected(self, strategy: str, pair: str, signals: list) -> None:
+        """
+        Write a chunk of rejected signals of the running strategy
+        """
+        directory = self.directory / ".rejected" / strategy / pair_to_filename(pair)
+        directory.mkdir(parents=True, exist_ok=True)
+        dump(signals, directory / f"{len(list(directory.iterdir()))}.pkl")
+
+    def take_rejected(self, strategy: str, pair: str) -> list:
+        """
+        Rejected signals spooled for a pair, in order. The chunks are removed.
+        """
+        directory = self.directory / ".rejected" / strategy / pair_to_filename(pair)
+        if not directory.is_dir():
+            return []
+        signals: list = []
+        for chunk in sorted(directory.iterdir(), key=lambda p: int(p.stem)):
+            signals.extend(load(chunk))
+            chunk.unlink()
+        directory.rmdir()
+        return signals
+
+    def strategy_index(self, strategy: str) -> dict[str, dict[str, str]]:
+        """
+        Chunks written for a strategy, by name and pair
+        """
+        return {
+            name: self.index[name][strategy] for name in self.index if strategy in self.index[name]
+        }
+
+    def add_index(self, strategy: str, entries: dict[str, dict[str, str]]) -> None:
+        """
+        Register the chunks of a strategy written by another process into the same directory
+        """
+        for name, pairs in entries.items():
+            self.index[name][strategy] = pairs
+
+    def chunk_files(self) -> Iterator[tuple[Path, str]]:
+        """
+        Chunk files, with their path relative to the directory
+        """
+        for strategies in self.index.values():
+            for pairs in strategies.values():
+                for chunk in pairs.values():
+                    yield self.directory / chunk, chunk
+
+    def cleanup(self) -> None:
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Copies in worker processes write to the directory, but don't own it
+        state = self.__dict__.copy()
+        state["_tmp_dir"] = None
+        return state
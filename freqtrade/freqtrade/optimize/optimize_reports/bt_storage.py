@@ -2,7 +2,7 @@ import logging
 from io import BytesIO, StringIO
 from pathlib import Path
 from typing import Any
-from zipfile import ZIP_DEFLATED, ZipFile
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
 from pandas import DataFrame
 
@@ -12,6 +12,7 @@ from freqtrade.enums.runmode import RunMode
 from freqtrade.ft_types import BacktestResultType
 from freqtrade.misc import dump_json_to_file, file_dump_json
 from freqtrade.optimize.backtest_caching import get_backtest_metadata_filename
+from freqtrade.optimize.optimize_reports.bt_export_chunks import AnalysisChunkWriter
 
 
 logger = logging.getLogger(__name__)
@@ -52,7 +53,7 @@ def store_backtest_results(
     dtappendix: str,
     *,
     market_change_data: DataFrame | None = None,
-    analysis_results: dict[str, dict[str, DataFrame]] | None = None,
+    analysis_results: dict[str, dict[str, DataFrame]] | AnalysisChunkWriter | None = None,
     strategy_files: dict[str, str] | None = None,
 ) -> Path:
     """
@@ -62,7 +63,8 @@ def store_backtest_results(
     :param stats: Dataframe containing the backtesting statistics
     :param dtappendix: Datetime to use for the filename
     :param market_change_data: Dataframe containing market change data
-    :param analysis_results: Dictionary containing analysis results
+    :param analysis_results: Dictionary containing analysis results, or the chunks written
+        while backtesting
     """
     recordfilename: Path = config["exportdirectory"]
     zip_filename = _generate_filename(recordfilename, dtappendix, ".zip")
@@ -129,12 +131,21 @@ def store_backtest_results(
             and analysis_results is not None
             and config.get("runmode", RunMode.OTHER) == RunMode.BACKTEST
         ):
-            for name in ["signals", "rejected", "exited"]:
-                if name in analysis_results:
-                    analysis_name = f"{base_filename.stem}_{name}.pkl"
-                    analysis_buf = BytesIO()
-                    file_dump_joblib(analysis_buf, analysis_results[name])
-                    analysis_buf.seek(0)
-                    zipf.writestr(analysis_name, analysis_buf.getvalue())
+            if isinstance(analysis_results, AnalysisChunkWriter):
+                # Copied from disk chunk by chunk, and indexed for loading by pair
+                for path, chunk in analysis_results.chunk_files():
+                    # Parquet chunks are compressed already
+                    zipf.write(path, f"{base_filename.stem}_analysis/{chunk}", ZIP_STORED)
+                index_buf = StringIO()
+                dump_json_to_file(index_buf, analysis_results.index)
+                zipf.writestr(f"{base_filename.stem}_analysis.json", index_buf.getvalue())
+            else:
+                for name in ["signals", "rejected", "exited"]:
+                    if name in analysis_results:
+                        analysis_name = f"{base_filename.stem}_{name}.pkl"
+                        analysis_buf = BytesIO()
+                        file_dump_joblib(analysis_buf, analysis_results[name])
+                        analysis_buf.seek(0)
+                        zipf.writestr(analysis_name, analysis_buf.getvalue())
 
     return zip_filename
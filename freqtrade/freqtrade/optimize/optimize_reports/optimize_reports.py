@@ -4,7 +4,7 @@ from datetime import UTC, datetime, timedelta
 from typing import Any, Literal
 
 import numpy as np
-from pandas import DataFrame, Series, concat, to_datetime
+from pandas import DataFrame, Index, Series, to_datetime
 
 from freqtrade.constants import BACKTEST_BREAKDOWNS, DATETIME_PRINT_FORMAT
 from freqtrade.data.metrics import (
@@ -33,42 +33,37 @@ def generate_trade_signal_candles(
     preprocessed_df: dict[str, DataFrame], bt_results: BacktestContentType, date_col: str
 ) -> dict[str, DataFrame]:
     signal_candles_only = {}
+    resdf = bt_results["results"]
     for pair in preprocessed_df.keys():
-        signal_candles_only_df = DataFrame()
-
         pairdf = preprocessed_df[pair]
-        resdf = bt_results["results"]
         pairresults = resdf.loc[(resdf["pair"] == pair)]
 
         if pairdf.shape[0] > 0:
-            for t, v in pairresults.iterrows():
-                allinds = pairdf.loc[(pairdf["date"] < v[date_col])]
-                signal_inds = allinds.iloc[[-1]]
-                signal_candles_only_df = concat(
-                    [signal_candles_only_df.infer_objects(), signal_inds.infer_objects()]
-                )
-
-            signal_candles_only[pair] = signal_candles_only_df
+            if pairresults.empty:
+                signal_candles_only[pair] = DataFrame()
+                continue
+            # Last candle before each trade's date
+            positions = pairdf["date"].searchsorted(pairresults[date_col], side="left") - 1
+            signal_candles_only[pair] = pairdf.iloc[positions[positions >= 0]]
     return signal_candles_only
 
 
 def generate_rejected_signals(
-    preprocessed_df: dict[str, DataFrame], rejected_dict: dict[str, DataFrame]
+    preprocessed_df: dict[str, DataFrame], rejected_dict: dict[str, list]
 ) -> dict[str, DataFrame]:
     rejected_candles_only = {}
     for pair, signals in rejected_dict.items():
-        rejected_signals_only_df = DataFrame()
+        if not signals:
+            rejected_candles_only[pair] = DataFrame()
+            continue
         pairdf = preprocessed_df[pair]
+        dates, tags = zip(*signals, strict=True)
+        positions = Index(pairdf["date"]).get_indexer(to_datetime(list(dates), utc=True))
+        found = positions >= 0
 
-        for t in signals:
-            data_df_row = pairdf.loc[(pairdf["date"] == t[0])].copy()
-            data_df_row["pair"] = pair
-            data_df_row["enter_tag"] = t[1]
-
-            rejected_signals_only_df = concat(
-                [rejected_signals_only_df.infer_objects(), data_df_row.infer_objects()]
-            )
-
+        rejected_signals_only_df = pairdf.iloc[positions[found]].copy()
+        rejected_signals_only_df["pair"] = pair
+        rejected_signals_only_df["enter_tag"] = np.array(tags, dtype=object)[found]
         rejected_candles_only[pair] = rejected_signals_only_df
     return rejected_candles_only
 
@@ -1,5 +1,6 @@
 # flake8: noqa: F401
 
+from freqtrade.persistence.bt_open_trades import OpenTradeRegistry, PairOpenTrades
 from freqtrade.persistence.custom_data import CustomDataWrapper
 from freqtrade.persistence.key_value_store import KeyStoreKeys, KeyValueStore
 from freqtrade.persistence.models import init_db
@@ -0,0 +1,138 @@
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from freqtrade.persistence.trade_model import LocalTrade
+
+
+class OpenTradeRegistry:
+    """
+    Open trades of a backtest, in the order they were opened.
+    Indexed by trade and by pair - adding and removing a trade takes constant time,
+    regardless of the number of open trades.
+    Iterates like the list of open trades.
+    """
+
+    __slots__ = ("_pairs", "_pairs_stale", "_trades", "long_count", "short_count", "version")
+
+    def __init__(self, trades: Iterable["LocalTrade"] = ()) -> None:
+        self._trades: dict[int, LocalTrade] = {}
+        # Open trades per pair, keyed like _trades.
+        # Pairs are ordered by their earliest open trade - unless _pairs_stale is set.
+        self._pairs: dict[str, dict[int, LocalTrade]] = {}
+        self._pairs_stale = False
+        # Open trades per side
+        self.long_count = 0
+        self.short_count = 0
+        # Incremented whenever a trade is added or removed
+        self.version = 0
+        for trade in trades:
+            self.append(trade)
+
+    def __iter__(self) -> Iterator["LocalTrade"]:
+        return iter(self._trades.values())
+
+    def __len__(self) -> int:
+        return len(self._trades)
+
+    def __contains__(self, trade: object) -> bool:
+        return id(trade) in self._trades
+
+    def append(self, trade: "LocalTrade") -> None:
+        key = id(trade)
+        if key in self._trades:
+            raise ValueError(f"{trade} is already an open trade.")
+        self._trades[key] = trade
+        if (pair_trades := self._pairs.get(trade.pair)) is None:
+            self._pairs[trade.pair] = {key: trade}
+        else:
+            pair_trades[key] = trade
+        if trade.is_short:
+            self.short_count += 1
+        else:
+            self.long_count += 1
+        self.version += 1
+
+    def remove(self, trade: "LocalTrade") -> None:
+        key = id(trade)
+        if self._trades.pop(key, None) is None:
+            raise ValueError(f"{trade} is not an open trade.")
+        pair_trades = self._pairs[trade.pair]
+        earliest = next(iter(pair_trades)) == key
+        del pair_trades[key]
+        if not pair_trades:
+            del self._pairs[trade.pair]
+        elif earliest:
+            # The pair moves to the position of its next open trade
+            self._pairs_stale = True
+        if trade.is_short:
+            self.short_count -= 1
+        else:
+            self.long_count -= 1
+        self.version += 1
+
+    def pop(self) -> "LocalTrade":
+        """
+        Remove and return the latest open trade
+        """
+        if not self._trades:
+            raise IndexError("pop from empty OpenTradeRegistry")
+        trade = self._trades[next(reversed(self._trades))]
+        self.remove(trade)
+        return trade
+
+    def pairs(self) -> list[str]:
+        """
+        Pairs with open trades, ordered by their earliest open trade
+        """
+        if self._pairs_stale:
+            self._pairs = {
+                pair: self._pairs[pair]
+                for pair in dict.fromkeys(t.pair for t in self._trades.values())
+            }
+            self._pairs_stale = False
+        return list(self._pairs)
+
+    def count(self, is_short: bool) -> int:
+        """
+        Number of open trades in one direction
+        """
+        return self.short_count if is_short else self.long_count
+
+
+class PairOpenTrades:
+    """
+    Open trades of a single pair, in the order they were opened.
+    Unlike a list, removing a trade takes constant time.
+    """
+
+    __slots__ = ("_trades",)
+
+    def __init__(self, trades: Iterable["LocalTrade"] = ()) -> None:
+        self._trades: dict[int, LocalTrade] = {id(trade): trade for trade in trades}
+
+    def __iter__(self) -> Iterator["LocalTrade"]:
+        return iter(self._trades.values())
+
+    def __len__(self) -> int:
+        return len(self._trades)
+
+    def __contains__(self, trade: object) -> bool:
+        return id(trade) in self._trades
+
+    def append(self, trade: "LocalTrade") -> None:
+        key = id(trade)
+        if key in self._trades:
+            raise ValueError(f"{trade} is already an open trade.")
+        self._trades[key] = trade
+
+    def remove(self, trade: "LocalTrade") -> None:
+        if self._trades.pop(id(trade), None) is None:
+            raise ValueError(f"{trade} is not an open trade.")
+
+    def first(self) -> "LocalTrade":
+        """
+        The earliest open trade
+        """
+        return next(iter(self._trades.values()))
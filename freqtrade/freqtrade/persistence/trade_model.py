@@ -47,6 +47,7 @@ from freqtrade.exchange.exchange_types import CcxtOrder
 from freqtrade.leverage import interest
 from freqtrade.misc import safe_value_fallback
 from freqtrade.persistence.base import ModelBase, SessionType
+from freqtrade.persistence.bt_open_trades import OpenTradeRegistry, PairOpenTrades
 from freqtrade.persistence.custom_data import CustomDataWrapper, _CustomData
 from freqtrade.util import FtPrecise, dt_from_ts, dt_now, dt_ts, dt_ts_none, round_value
 
@@ -387,9 +388,11 @@ class LocalTrade:
     use_db: bool = False
     # Trades container for backtesting
     bt_trades: list["LocalTrade"] = []
-    bt_trades_open: list["LocalTrade"] = []
+    # Copy of bt_trades - but indexed by pair
+    bt_trades_pp: dict[str, list["LocalTrade"]] = defaultdict(list)
+    bt_trades_open: OpenTradeRegistry = OpenTradeRegistry()
     # Copy of trades_open - but indexed by pair
-    bt_trades_open_pp: dict[str, list["LocalTrade"]] = defaultdict(list)
+    bt_trades_open_pp: dict[str, PairOpenTrades] = defaultdict(PairOpenTrades)
     bt_open_open_trade_count: int = 0
     bt_total_profit: float = 0
     realized_profit: float = 0
@@ -768,8 +771,9 @@ class LocalTrade:
         Resets all trades. Only active for backtesting mode.
         """
         LocalTrade.bt_trades = []
-        LocalTrade.bt_trades_open = []
-        LocalTrade.bt_trades_open_pp = defaultdict(list)
+        LocalTrade.bt_trades_pp = defaultdict(list)
+        LocalTrade.bt_trades_open = OpenTradeRegistry()
+        LocalTrade.bt_trades_open_pp = defaultdict(PairOpenTrades)
         LocalTrade.bt_open_open_trade_count = 0
         LocalTrade.bt_total_profit = 0
 
@@ -1487,18 +1491,26 @@ class LocalTrade:
         """
 
         # Offline mode - without database
+        sel_trades: list[LocalTrade]
         if is_open is not None:
+            # Trades of a single pair come from the copies indexed by pair
             if is_open:
-                sel_trades = LocalTrade.bt_trades_open
+                sel_trades = list(
+                    LocalTrade.bt_trades_open_pp.get(pair, PairOpenTrades())
+                    if pair
+                    else LocalTrade.bt_trades_open
+                )
             else:
-                sel_trades = LocalTrade.bt_trades
+                sel_trades = (
+                    list(LocalTrade.bt_trades_pp.get(pair, [])) if pair else LocalTrade.bt_trades
+                )
 
         else:
             # Not used during backtesting, but might be used by a strategy
-            sel_trades = list(LocalTrade.bt_trades + LocalTrade.bt_trades_open)
+            sel_trades = [*LocalTrade.bt_trades, *LocalTrade.bt_trades_open]
+            if pair:
+                sel_trades = [trade for trade in sel_trades if trade.pair == pair]
 
-        if pair:
-            sel_trades = [trade for trade in sel_trades if trade.pair == pair]
         if open_date:
             sel_trades = [trade for trade in sel_trades if trade.open_date > open_date]
         if close_date:
@@ -1514,6 +1526,7 @@ class LocalTrade:
         LocalTrade.bt_trades_open_pp[trade.pair].remove(trade)
         LocalTrade.bt_open_open_trade_count -= 1
         LocalTrade.bt_trades.append(trade)
+        LocalTrade.bt_trades_pp[trade.pair].append(trade)
         LocalTrade.bt_total_profit += trade.close_profit_abs
 
     @staticmethod
@@ -1524,6 +1537,7 @@ class LocalTrade:
             LocalTrade.bt_open_open_trade_count += 1
         else:
             LocalTrade.bt_trades.append(trade)
+            LocalTrade.bt_trades_pp[trade.pair].append(trade)
 
     @staticmethod
     def remove_bt_trade(trade):
@@ -41,6 +41,13 @@ class ProtectionManager:
         """
         return [p.name for p in self._protection_handlers]
 
+    @property
+    def has_global_stop(self) -> bool:
+        """
+        Whether any Protection Handler can lock all pairs
+        """
+        return any(p.has_global_stop for p in self._protection_handlers)
+
     def short_desc(self) -> list[dict]:
         """
         List of short_desc for each Pairlist Handler
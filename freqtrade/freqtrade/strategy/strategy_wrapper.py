@@ -2,6 +2,7 @@ import logging
 from collections.abc import Callable
 from copy import deepcopy
 from functools import wraps
+from time import perf_counter
 from typing import Any, TypeVar, cast
 
 from freqtrade.exceptions import StrategyError
@@ -12,6 +13,23 @@ logger = logging.getLogger(__name__)
 
 F = TypeVar("F", bound=Callable[..., Any])
 
+# Called with the name and duration (in seconds) of each wrapped call, while profiling
+_call_recorder: Callable[[str, float], None] | None = None
+
+
+def set_call_recorder(
+    recorder: Callable[[str, float], None] | None,
+) -> Callable[[str, float], None] | None:
+    """
+    Set the function timed calls of user-provided methods are reported to.
+    :param recorder: recorder to use, None to stop recording
+    :return: the previous recorder
+    """
+    global _call_recorder
+    previous = _call_recorder
+    _call_recorder = recorder
+    return previous
+
 
 def __format_traceback(error: Exception) -> str:
     """Format the traceback of an exception into a formatted string."""
@@ -37,6 +55,8 @@ def strategy_safe_wrapper(f: F, message: str = "", default_retval=None, supress_
 
     @wraps(f)
     def wrapper(*args, **kwargs):
+        recorder = _call_recorder
+        start = perf_counter() if recorder is not None else 0.0
         try:
             if not (getattr(f, "__qualname__", "")).startswith("IStrategy."):
                 # Don't deep-copy if the function is not implemented in the user strategy.``
@@ -59,5 +79,8 @@ def strategy_safe_wrapper(f: F, message: str = "", default_retval=None, supress_
             if default_retval is None and not supress_error:
                 raise StrategyError(str(error)) from error
             return default_retval
+        finally:
+            if recorder is not None:
+                recorder(getattr(f, "__name__", str(f)), perf_counter() - start)
 
     return cast(F, wrapper)
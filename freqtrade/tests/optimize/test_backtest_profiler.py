@@ -0,0 +1,129 @@
+import json
+import time
+
+from freqtrade.enums import BacktestState
+from freqtrade.optimize.backtest_profiler import BacktestProfiler, StackSampler, profile_worker
+from freqtrade.optimize.bt_progress import BTProgress
+from freqtrade.strategy.strategy_wrapper import strategy_safe_wrapper
+from tests.conftest import log_has_re
+
+
+def custom_exit():
+    return None
+
+
+def test_backtest_profiler_phases():
+    profiler = BacktestProfiler()
+    progress = BTProgress(profiler)
+    progress.init_step(BacktestState.DATALOAD, 1)
+    progress.init_step(BacktestState.BACKTEST, 10)
+    progress.init_step(BacktestState.DATALOAD, 1)
+    assert set(profiler.phases) == {"dataload", "backtest"}
+    profiler.stop_phase()
+    assert set(profiler.phases) == {"dataload", "backtest"}
+    assert all(seconds >= 0 for seconds in profiler.phases.values())
+    # Stopping twice doesn't add up
+    phases = dict(profiler.phases)
+    profiler.stop_phase()
+    assert profiler.phases == phases
+
+    profiler.candles = 1000
+    profiler.phases["backtest"] = 2.0
+    report = profiler.report()
+    assert report["candles_per_second"] == 500
+    assert report["phases"]["backtest"] == 2.0
+    assert "workers" not in report
+    assert "epochs" not in report
+
+
+def test_backtest_profiler_callbacks():
+    profiler = BacktestProfiler()
+    with profiler.recording():
+        for _ in range(3):
+            strategy_safe_wrapper(custom_exit)()
+    # Not recorded outside of the context
+    strategy_safe_wrapper(custom_exit)()
+
+    assert profiler.calls["custom_exit"][0] == 3
+    profiler.record_call("custom_stoploss", 0.5)
+    profiler.record_call("custom_stoploss", 1.5)
+    report = profiler.report()
+    assert list(report["callbacks"]) == ["custom_stoploss", "custom_exit"]
+    assert report["callbacks"]["custom_stoploss"] == {
+        "calls": 2,
+        "seconds": 2.0,
+        "mean_us": 1_000_000.0,
+    }
+
+
+def test_profile_worker():
+    progress = BTProgress()
+    with profile_worker(progress) as profile:
+        progress.init_step(BacktestState.BACKTEST, 1)
+    # Not profiling
+    assert profile == {}
+
+    profiler = BacktestProfiler()
+    progress = BTProgress(profiler)
+    with profile_worker(progress) as profile:
+        assert progress.profiler is not profiler
+        progress.init_step(BacktestState.CONVERT, 1)
+        progress.profiler.candles += 100
+        strategy_safe_wrapper(custom_exit)()
+    assert progress.profiler is profiler
+    assert profiler.phases == {}
+    assert set(profile["phases"]) == {"convert"}
+
+    profiler.merge(profile)
+    profiler.merge(profile)
+    profiler.merge({})
+    profiler.epochs = 2
+    profiler.phases["optimize"] = 30
+    report = profiler.report()
+    assert report["candles"] == 200
+    assert report["callbacks"]["custom_exit"]["calls"] == 2
+    assert report["workers"]["tasks"] == 2
+    assert set(report["workers"]["phases"]) == {"convert"}
+    assert "convert" not in report["phases"]
+    assert report["epochs"] == 2
+    assert report["epochs_per_minute"] == 4
+
+
+def busy_function(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_stack_sampler(tmp_path):
+    sampler = StackSampler(interval=0.001)
+    sampler.start()
+    busy_function(0.1)
+    sampler.stop()
+
+    assert sum(sampler.stacks.values()) > 0
+    assert any("busy_function" in stack for stack in sampler.stacks)
+    filename = tmp_path / "profile.collapsed"
+    sampler.write(filename)
+    lines = filename.read_text().splitlines()
+    assert len(lines) == len(sampler.stacks)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert ";" in stack
+    assert int(count) > 0
+
+
+def test_backtest_profiler_session(tmp_path, caplog):
+    profiler = BacktestProfiler()
+    with profiler.session(tmp_path, stacks=True):
+        profiler.start_phase("backtest")
+        strategy_safe_wrapper(custom_exit)()
+        busy_function(0.02)
+
+    reports = list(tmp_path.glob("profile-*.json"))
+    assert len(reports) == 1
+    assert reports[0].with_suffix(".collapsed").is_file()
+    report = json.loads(reports[0].read_text())
+    assert report["phases"]["backtest"] > 0
+    assert report["callbacks"]["custom_exit"]["calls"] == 1
+    assert report["duration"] >= report["phases"]["backtest"]
+    assert log_has_re(r"Profile: custom_exit called 1 times, took .*", caplog)
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from freqtrade.optimize.backtest_rows import DetailRows, PairRows, TagTable
+from freqtrade.optimize.backtesting import HEADERS
+from tests.conftest import generate_test_data
+
+
+def _analyzed(size: int) -> pd.DataFrame:
+    df = generate_test_data("5m", size, "2022-01-03 12:00:00+00:00")
+    df["enter_long"] = np.where(df.index % 7 == 0, 1.0, 0.0)
+    df["exit_long"] = np.where(df.index % 5 == 0, 1.0, 0.0)
+    df["enter_short"] = 0.0
+    df["exit_short"] = np.where(df.index % 3 == 0, 1.0, 0.0)
+    df["enter_tag"] = np.where(df.index % 7 == 0, "tag_a", None)
+    df.loc[df.index % 14 == 0, "enter_tag"] = "tag_b"
+    df["exit_tag"] = None
+    return df
+
+
+@pytest.mark.parametrize("size", [1, 20, 3000])
+def test_pair_rows(size):
+    df = _analyzed(size)
+    expected = [tuple(row) for row in df[HEADERS].values.tolist()]
+    tags = TagTable()
+    rows = PairRows(df, tags)
+
+    assert len(rows) == size
+    # In order - built in blocks
+    assert [rows[i] for i in range(size)] == expected
+    # Out of order, and repeated reads
+    for i in [size - 1, 0, size // 2, size // 2, min(size // 2 + 1, size - 1), -1]:
+        assert rows[i] == expected[i]
+    assert isinstance(rows[0][0], pd.Timestamp)
+    assert str(rows[0][0].tz) == "UTC"
+    with pytest.raises(IndexError):
+        rows[size]
+    assert tags.tags == [None, "tag_b", "tag_a"] if size > 7 else [None, "tag_b"]
+    assert rows.nbytes < df.memory_usage(deep=True).sum()
+
+
+def test_tag_table_shared_between_pairs():
+    tags = TagTable()
+    first = tags.codes(np.array([None, "a", "b", "a"], dtype=object))
+    second = tags.codes(np.array(["b", None, "c"], dtype=object))
+    assert first.tolist() == [0, 1, 2, 1]
+    assert second.tolist() == [2, 0, 3]
+    assert tags.tags == [None, "a", "b", "c"]
+
+
+def test_detail_rows():
+    df = _analyzed(30)
+    detail = generate_test_data("1m", 120, "2022-01-03 12:00:00+00:00")
+    # Gap in the detail data
+    detail = detail.drop(index=range(12, 17)).reset_index(drop=True)
+    rows = PairRows(df, TagTable())
+    detail_rows = DetailRows(detail, rows, 300)
+
+    for i in range(len(rows)):
+        row = rows[i]
+        start = row[0]
+        expected = detail.loc[
+            (detail["date"] >= start) & (detail["date"] < start + pd.Timedelta("5m"))
+        ]
+        result = detail_rows.rows(i, row)
+        if expected.empty:
+            assert result is None
+            continue
+        assert [r[0] for r in result] == expected["date"].tolist()
+        assert [r[1:5] for r in result] == [
+            tuple(r) for r in expected[["open", "high", "low", "close"]].values.tolist()
+        ]
+        # Signals and tags of the main candle
+        assert all(r[5:] == row[5:] for r in result)
+
+    # Candles 2 and 3 are partly missing, after 24 candles there is no detail data.
+    assert len(detail_rows.rows(2, rows[2])) == 2
+    assert len(detail_rows.rows(3, rows[3])) == 3
+    assert detail_rows.rows(25, rows[25]) is None
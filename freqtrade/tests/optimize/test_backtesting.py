@@ -1,10 +1,14 @@
 # pragma pylint: disable=missing-docstring, W0212, line-too-long, C0103, unused-argument
 
+import json
+import logging
 import random
+import time
 from collections import defaultdict
 from copy import deepcopy
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
+from queue import Queue
 from unittest.mock import ANY, MagicMock, PropertyMock
 
 import numpy as np
@@ -15,17 +19,30 @@ from freqtrade import constants
 from freqtrade.commands.optimize_commands import setup_optimize_configuration, start_backtesting
 from freqtrade.configuration import TimeRange
 from freqtrade.data import history
-from freqtrade.data.btanalysis import BT_DATA_COLUMNS, evaluate_result_multi
+from freqtrade.data.btanalysis import (
+    BT_DATA_COLUMNS,
+    evaluate_result_multi,
+    load_backtest_analysis_data,
+)
 from freqtrade.data.converter import clean_ohlcv_dataframe, ohlcv_fill_up_missing_data
 from freqtrade.data.dataprovider import DataProvider
 from freqtrade.data.history import get_timerange
-from freqtrade.enums import CandleType, ExitType, RunMode
+from freqtrade.enums import CandleType, ExitType, RunMode, TradingMode
 from freqtrade.exceptions import DependencyException, OperationalException
 from freqtrade.exchange import timeframe_to_next_date, timeframe_to_prev_date
 from freqtrade.exchange.exchange_utils import DECIMAL_PLACES, TICK_SIZE
 from freqtrade.optimize.backtest_caching import get_backtest_metadata_filename, get_strategy_run_id
+from freqtrade.optimize.backtest_pair_cache import _resumable, pair_cache_blocker
+from freqtrade.optimize.backtest_parallel import (
+    _forwarded_logs,
+    pair_shards,
+    shard_blocker,
+    shard_count,
+    strategy_jobs,
+)
 from freqtrade.optimize.backtesting import Backtesting
-from freqtrade.persistence import LocalTrade, Trade
+from freqtrade.optimize.optimize_reports import AnalysisChunkWriter
+from freqtrade.persistence import LocalTrade, OpenTradeRegistry, PairOpenTrades, Trade
 from freqtrade.resolvers import StrategyResolver
 from freqtrade.util import dt_now, dt_utc
 from tests.conftest import (
@@ -33,6 +50,7 @@ from tests.conftest import (
     EXMS,
     generate_test_data,
     get_args,
+    get_markets,
     log_has,
     log_has_re,
     patch_exchange,
@@ -551,7 +569,8 @@ def test_backtest__enter_trade(default_conf, fee, mocker) -> None:
     assert trade.stake_amount == 495
 
     # Fake 2 trades, so there's not enough amount for the next trade left.
-    LocalTrade.bt_trades_open.append(trade)
+    # The registry holds each trade once - so the second one is a copy.
+    LocalTrade.bt_trades_open.append(deepcopy(trade))
     backtesting.wallets.update()
     trade = backtesting._enter_trade(pair, row=row, direction="long")
     assert trade is None
@@ -1712,6 +1731,245 @@ def test_backtest_multi_pair_detail(
     assert len(evaluate_result_multi(results["results"], "5m", 1)) == 0
 
 
+@pytest.mark.parametrize("use_detail", [True, False])
+@pytest.mark.parametrize("can_short", [True, False])
+@pytest.mark.parametrize("stacking", [True, False])
+@pytest.mark.parametrize("tres", [0, 30])
+def test_backtest_sparse_loop(
+    default_conf_usdt, fee, mocker, use_detail, can_short, stacking, tres
+):
+    """
+    The sparse loop must produce the same results as the dense loop - including the dataframes
+    visible to callbacks.
+    """
+
+    def _rare_signals(dataframe=None, metadata=None):
+        multi = {"ETH/USDT": 23, "LTC/USDT": 31}.get(metadata["pair"], 37)
+        dataframe["enter_long"] = np.where(dataframe.index % multi == 0, 1, 0)
+        dataframe["exit_long"] = np.where((dataframe.index + multi - 7) % multi == 0, 1, 0)
+        dataframe["enter_short"] = np.where((dataframe.index + 11) % multi == 0, 1, 0)
+        dataframe["exit_short"] = np.where((dataframe.index + 3) % multi == 0, 1, 0)
+        return dataframe
+
+    default_conf_usdt.update(
+        {
+            "runmode": "backtest",
+            "stoploss": -0.01,
+            "minimal_roi": {"0": 0.02},
+            "timeframe": "5m",
+            "max_open_trades": 3,
+            "position_stacking": stacking,
+        }
+    )
+    if use_detail:
+        default_conf_usdt["timeframe_detail"] = "1m"
+
+    mocker.patch(f"{EXMS}.get_min_pair_stake_amount", return_value=0.00001)
+    mocker.patch(f"{EXMS}.get_max_pair_stake_amount", return_value=float("inf"))
+    mocker.patch(f"{EXMS}.get_fee", fee)
+    patch_exchange(mocker)
+
+    raw_candles_1m = generate_test_data("1m", 1500, "2022-01-03 12:00:00+00:00")
+    raw_candles = ohlcv_fill_up_missing_data(raw_candles_1m, "5m", "dummy")
+    pairs = ["ADA/USDT", "DASH/USDT", "ETH/USDT", "LTC/USDT", "NXT/USDT"]
+    data = trim_dictlist({pair: raw_candles for pair in pairs}, -280)
+    if tres > 0:
+        data["LTC/USDT"] = data["LTC/USDT"][tres:].reset_index()
+
+    def run(loop: str):
+        default_conf_usdt["backtest_loop"] = loop
+        backtesting = Backtesting(default_conf_usdt)
+        backtesting.detail_data = {pair: raw_candles_1m for pair in pairs}
+        backtesting._set_strategy(backtesting.strategylist[0])
+        backtesting._can_short = can_short
+        backtesting.strategy.can_short = can_short
+        backtesting.strategy.bot_loop_start = MagicMock()
+        backtesting.strategy.advise_entry = _rare_signals
+        backtesting.strategy.advise_exit = _rare_signals
+        seen = []
+
+        def confirm_trade_entry(pair, current_time, **kwargs):
+            # Dataframe length per pair, as visible to the strategy
+            dp = backtesting.strategy.dp
+            seen.append(
+                (pair, current_time)
+                + tuple(len(dp.get_analyzed_dataframe(p, "5m")[0]) for p in pairs)
+            )
+            return True
+
+        backtesting.strategy.confirm_trade_entry = confirm_trade_entry
+        processed = backtesting.strategy.advise_all_indicators(data)
+        min_date, max_date = get_timerange(processed)
+        results = backtesting.backtest(
+            processed=deepcopy(processed), start_date=min_date, end_date=max_date
+        )
+        return backtesting, results, seen
+
+    dense_bt, dense, dense_seen = run("dense")
+    sparse_bt, sparse, sparse_seen = run("sparse")
+
+    assert len(dense["results"]) > 10
+    pd.testing.assert_frame_equal(dense["results"], sparse["results"])
+    assert dense["rejected_signals"] == sparse["rejected_signals"]
+    assert dense["final_balance"] == sparse["final_balance"]
+    assert dense_seen == sparse_seen
+    assert (
+        dense_bt.strategy.bot_loop_start.call_count == sparse_bt.strategy.bot_loop_start.call_count
+    )
+    # Schedule is only used while backtesting
+    assert sparse_bt._schedule is None
+    assert (
+        len(sparse_bt.dataprovider.get_analyzed_dataframe("LTC/USDT", "5m")[0])
+        == len(data["LTC/USDT"]) - 1
+    )
+
+
+def test_backtest_sparse_loop_dynamic_pairlist(default_conf, mocker, caplog) -> None:
+    default_conf["backtest_loop"] = "sparse"
+    default_conf["enable_dynamic_pairlist"] = True
+    patch_exchange(mocker)
+    backtesting = Backtesting(default_conf)
+    backtesting._set_strategy(backtesting.strategylist[0])
+    spy = mocker.spy(backtesting.dataprovider, "_set_dataframe_max_index_source")
+    start = datetime(2022, 1, 1, tzinfo=UTC)
+    backtesting.backtest(processed={}, start_date=start, end_date=start + timedelta(hours=1))
+    assert log_has_re(r"Sparse backtest loop is not supported with dynamic pairlists.*", caplog)
+    assert spy.call_count == 0
+
+
+@pytest.mark.parametrize(
+    "exit_conf",
+    [
+        # Static ROI table and stoploss, exit signals
+        {"stoploss": -0.02, "minimal_roi": {"0": 0.03, "60": 0.01, "150": 0}},
+        # Plain trailing stoploss, no exit signals
+        {
+            "stoploss": -0.02,
+            "minimal_roi": {"0": 0.05},
+            "trailing_stop": True,
+            "use_exit_signal": False,
+        },
+        # Trailing stoploss with positive offset
+        {
+            "stoploss": -0.03,
+            "minimal_roi": {"0": 0.04},
+            "trailing_stop": True,
+            "trailing_stop_positive": 0.01,
+            "trailing_stop_positive_offset": 0.015,
+            "trailing_only_offset_is_reached": True,
+        },
+        # Positive trailing stoploss wider than the stoploss - processed on every candle
+        {
+            "stoploss": -0.01,
+            "minimal_roi": {},
+            "trailing_stop": True,
+            "trailing_stop_positive": 0.02,
+            "trailing_stop_positive_offset": 0.025,
+        },
+    ],
+)
+@pytest.mark.parametrize("tres", [0, 30])
+def test_backtest_vectorized_loop(default_conf_usdt, fee, mocker, exit_conf, tres):
+    """
+    The vectorized loop must produce the same results as the dense loop.
+    """
+
+    def _signals(dataframe=None, metadata=None):
+        multi = {"ETH/USDT": 23, "LTC/USDT": 31}.get(metadata["pair"], 37)
+        dataframe["enter_long"] = np.where(dataframe.index % multi == 0, 1, 0)
+        dataframe["exit_long"] = np.where((dataframe.index + 5) % 41 == 0, 1, 0)
+        dataframe["enter_short"] = 0
+        dataframe["exit_short"] = 0
+        return dataframe
+
+    default_conf_usdt.update(
+        {
+            "runmode": "backtest",
+            "timeframe": "5m",
+            "max_open_trades": 3,
+            **exit_conf,
+        }
+    )
+    mocker.patch(f"{EXMS}.get_min_pair_stake_amount", return_value=0.00001)
+    mocker.patch(f"{EXMS}.get_max_pair_stake_amount", return_value=float("inf"))
+    mocker.patch(f"{EXMS}.get_fee", fee)
+    patch_exchange(mocker)
+
+    # Random walk - trades need to last a while for candles to be skipped
+    raw_candles = generate_test_data("5m", 600, "2022-01-03 12:00:00+00:00")
+    rng = np.random.default_rng(42)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.004, len(raw_candles))))
+    raw_candles["open"] = np.r_[20, close[:-1]]
+    raw_candles["close"] = close
+    spread = np.abs(rng.normal(0, 0.003, (2, len(raw_candles))))
+    raw_candles["high"] = raw_candles[["open", "close"]].max(axis=1) * (1 + spread[0])
+    raw_candles["low"] = raw_candles[["open", "close"]].min(axis=1) * (1 - spread[1])
+    pairs = ["ADA/USDT", "DASH/USDT", "ETH/USDT", "LTC/USDT", "NXT/USDT"]
+    data = {pair: raw_candles for pair in pairs}
+    if tres > 0:
+        data["LTC/USDT"] = data["LTC/USDT"][tres:].reset_index()
+
+    def run(loop: str):
+        default_conf_usdt["backtest_loop"] = loop
+        backtesting = Backtesting(default_conf_usdt)
+        backtesting._set_strategy(backtesting.strategylist[0])
+        backtesting.strategy.bot_loop_start = MagicMock()
+        backtesting.strategy.advise_entry = _signals
+        backtesting.strategy.advise_exit = _signals
+        spy = mocker.spy(backtesting, "backtest_loop")
+        processed = backtesting.strategy.advise_all_indicators(data)
+        min_date, max_date = get_timerange(processed)
+        results = backtesting.backtest(
+            processed=deepcopy(processed), start_date=min_date, end_date=max_date
+        )
+        return backtesting, results, spy.call_count
+
+    dense_bt, dense, dense_calls = run("dense")
+    vector_bt, vector, vector_calls = run("vectorized")
+
+    assert len(dense["results"]) > 10
+    pd.testing.assert_frame_equal(dense["results"], vector["results"])
+    assert dense["rejected_signals"] == vector["rejected_signals"]
+    assert dense["final_balance"] == vector["final_balance"]
+    assert (
+        dense_bt.strategy.bot_loop_start.call_count == vector_bt.strategy.bot_loop_start.call_count
+    )
+    assert vector_calls < dense_calls
+    assert vector_bt._scanner is None
+    assert vector_bt._schedule is None
+
+
+def test_backtest_vectorized_loop_fallback(default_conf, mocker, caplog) -> None:
+    default_conf["backtest_loop"] = "vectorized"
+    patch_exchange(mocker)
+    backtesting = Backtesting(default_conf)
+    backtesting._set_strategy(backtesting.strategylist[0])
+    backtesting.strategy.custom_exit = lambda **kwargs: None
+    scanner = mocker.patch("freqtrade.optimize.backtesting.OpenTradeScanner")
+    start = datetime(2022, 1, 1, tzinfo=UTC)
+    backtesting.backtest(processed={}, start_date=start, end_date=start + timedelta(hours=1))
+    assert log_has(
+        "Vectorized backtest loop is not supported as custom_exit is implemented. "
+        "Falling back to the sparse loop.",
+        caplog,
+    )
+    assert scanner.call_count == 0
+
+    # Logged once only
+    caplog.clear()
+    backtesting.backtest(processed={}, start_date=start, end_date=start + timedelta(hours=1))
+    assert not log_has_re(r"Vectorized backtest loop is not supported.*", caplog)
+
+    backtesting.strategy.use_exit_signal = False
+    backtesting.backtest(processed={}, start_date=start, end_date=start + timedelta(hours=1))
+    assert scanner.call_count == 1
+
+    backtesting.dynamic_pairlist = True
+    backtesting.backtest(processed={}, start_date=start, end_date=start + timedelta(hours=1))
+    assert log_has_re(r"Vectorized backtest loop is not supported with dynamic pairlists.*", caplog)
+    assert scanner.call_count == 1
+
+
 @pytest.mark.parametrize("use_detail", [True, False])
 @pytest.mark.parametrize("pair", ["ADA/USDT", "LTC/USDT"])
 @pytest.mark.parametrize("tres", [0, 20, 30])
@@ -2086,6 +2344,455 @@ def test_backtest_start_multi_strat(default_conf, mocker, caplog, testdatadir):
         assert log_has(line, caplog)
 
 
+def test_backtest_start_multi_strat_parallel(default_conf, mocker, caplog, testdatadir, tmp_path):
+    patch_exchange(mocker)
+    mocker.patch(
+        "freqtrade.plugins.pairlistmanager.PairListManager.whitelist",
+        PropertyMock(return_value=["ETH/BTC", "LTC/BTC", "ADA/BTC", "DASH/BTC"]),
+    )
+    default_conf.update(
+        {
+            "datadir": testdatadir,
+            "timeframe": "5m",
+            "timerange": "20180120-20180130",
+            "export": "signals",
+            "runmode": RunMode.BACKTEST,
+            "fee": 0.0025,
+            "amend_last_stake_amount": False,
+            # HyperoptableStrategy inherits from a strategy in another file
+            "strategy_list": [CURRENT_TEST_STRATEGY, "StrategyTestV2", "HyperoptableStrategy"],
+        }
+    )
+
+    def run(jobs: int) -> Backtesting:
+        default_conf["backtest_jobs"] = jobs
+        # Workers write their analysis candles to the export directory
+        default_conf["exportdirectory"] = tmp_path / f"jobs_{jobs}"
+        default_conf["exportdirectory"].mkdir()
+        backtesting = Backtesting(default_conf)
+        # Worker processes don't see mocks on the exchange class
+        backtesting.exchange._markets = get_markets()
+        backtesting.exchange.get_min_pair_stake_amount = lambda *x, **xx: 0.00001
+        backtesting.exchange.get_max_pair_stake_amount = lambda *x, **xx: 100.0
+        backtesting.exchange.get_max_leverage = lambda *x, **xx: 1.0
+        backtesting.start()
+        return backtesting
+
+    sequential = run(1)
+    parallel = run(2)
+
+    assert log_has("Backtesting 3 strategies using 2 processes.", caplog)
+    # Logs from the workers
+    assert log_has_re(r"Running backtesting for Strategy StrategyTestV2", caplog)
+    assert log_has_re(r"Strategy StrategyTestV2 backtested in \d+\.\d+s\.", caplog)
+    assert list(parallel.all_bt_content) == list(sequential.all_bt_content)
+    for name, content in sequential.all_bt_content.items():
+        assert len(content["results"]) > 0
+        pd.testing.assert_frame_equal(content["results"], parallel.all_bt_content[name]["results"])
+        assert content["final_balance"] == parallel.all_bt_content[name]["final_balance"]
+    assert list(parallel.results["strategy"]) == default_conf["strategy_list"]
+    for key in ("signals", "exited"):
+        expected_frames = load_backtest_analysis_data(tmp_path / "jobs_1", key)
+        frames = load_backtest_analysis_data(tmp_path / "jobs_2", key)
+        assert sorted(frames) == sorted(default_conf["strategy_list"])
+        for name, pair_frames in expected_frames.items():
+            assert sorted(frames[name]) == sorted(pair_frames)
+            for pair, frame in pair_frames.items():
+                pd.testing.assert_frame_equal(frames[name][pair], frame)
+    # Temporary chunk directories are removed
+    assert [p.name for p in (tmp_path / "jobs_2").iterdir() if p.name.startswith(".")] == [
+        ".last_result.json"
+    ]
+    # The exchange is left intact
+    assert parallel.exchange._api is not None
+
+
+def test_backtest_rejected_spooled(default_conf, mocker, testdatadir, tmp_path):
+    patch_exchange(mocker)
+    mocker.patch(
+        "freqtrade.plugins.pairlistmanager.PairListManager.whitelist",
+        PropertyMock(return_value=["ETH/BTC", "LTC/BTC", "ADA/BTC", "DASH/BTC"]),
+    )
+    default_conf.update(
+        {
+            "datadir": testdatadir,
+            "timeframe": "5m",
+            "timerange": "20180120-20180130",
+            "export": "signals",
+            "runmode": RunMode.BACKTEST,
+            "fee": 0.0025,
+            # Entries of other pairs are rejected while a trade is open
+            "max_open_trades": 1,
+            "amend_last_stake_amount": False,
+            "strategy_list": [CURRENT_TEST_STRATEGY],
+        }
+    )
+
+    def run(name: str) -> Backtesting:
+        default_conf["exportdirectory"] = tmp_path / name
+        default_conf["exportdirectory"].mkdir()
+        backtesting = Backtesting(default_conf)
+        backtesting.exchange.get_min_pair_stake_amount = lambda *x, **xx: 0.00001
+        backtesting.exchange.get_max_pair_stake_amount = lambda *x, **xx: 100.0
+        backtesting.start()
+        return backtesting
+
+    run("memory")
+    spool = mocker.spy(AnalysisChunkWriter, "spool_rejected")
+    mocker.patch("freqtrade.optimize.backtesting.REJECTED_CHUNK_SIZE", 3)
+    spooled = run("spooled")
+
+    assert spool.call_count > 1
+    assert spooled.rejected_dict == {}
+    expected = load_backtest_analysis_data(tmp_path / "memory", "rejected")[CURRENT_TEST_STRATEGY]
+    frames = load_backtest_analysis_data(tmp_path / "spooled", "rejected")[CURRENT_TEST_STRATEGY]
+    assert sum(len(frame) for frame in expected.values()) > 3
+    assert sorted(frames) == sorted(expected)
+    for pair, frame in expected.items():
+        pd.testing.assert_frame_equal(frames[pair], frame)
+
+    # A failed backtest leaves no chunks behind
+    mocker.patch.object(Backtesting, "backtest_one_strategy", side_effect=ValueError("failed"))
+    default_conf["exportdirectory"] = tmp_path / "failed"
+    default_conf["exportdirectory"].mkdir()
+    backtesting = Backtesting(default_conf)
+    with pytest.raises(ValueError, match="failed"):
+        backtesting.start()
+    assert backtesting.analysis_writer is None
+    assert list((tmp_path / "failed").iterdir()) == []
+
+
+def test_forwarded_logs(caplog):
+    def record(msg: str) -> logging.LogRecord:
+        return logging.LogRecord("freqtrade.worker", logging.INFO, __file__, 0, msg, None, None)
+
+    log_queue: Queue = Queue()
+    with _forwarded_logs(log_queue):
+        log_queue.put(record("Worker started"))
+        # Logged while the workers are still running
+        deadline = time.monotonic() + 5
+        while not log_has("Worker started", caplog) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert log_has("Worker started", caplog)
+        log_queue.put(record("Worker done"))
+    assert log_has("Worker done", caplog)
+
+
+def test_strategy_jobs(default_conf, mocker, caplog):
+    mocker.patch("freqtrade.optimize.backtest_parallel.cpu_count", return_value=8)
+    assert strategy_jobs(default_conf, 5) == 1
+    default_conf["backtest_jobs"] = 4
+    assert strategy_jobs(default_conf, 5) == 4
+    assert strategy_jobs(default_conf, 3) == 3
+    assert strategy_jobs(default_conf, 1) == 1
+    default_conf["backtest_jobs"] = -1
+    assert strategy_jobs(default_conf, 20) == 8
+    default_conf["backtest_jobs"] = -2
+    assert strategy_jobs(default_conf, 20) == 7
+    default_conf["freqai"] = {"enabled": True}
+    assert strategy_jobs(default_conf, 20) == 1
+    assert log_has_re(r"Parallel backtesting is not supported with FreqAI.*", caplog)
+
+
+def test_backtest_sharded(default_conf, mocker, caplog, testdatadir, tmp_path):
+    patch_exchange(mocker)
+    mocker.patch(
+        "freqtrade.plugins.pairlistmanager.PairListManager.whitelist",
+        PropertyMock(return_value=["ETH/BTC", "LTC/BTC", "ADA/BTC", "DASH/BTC", "XLM/BTC"]),
+    )
+    default_conf.update(
+        {
+            "datadir": testdatadir,
+            "timeframe": "5m",
+            "timerange": "20180120-20180130",
+            "export": "signals",
+            "runmode": RunMode.BACKTEST,
+            "fee": 0.0025,
+            "max_open_trades": -1,
+            "stake_amount": 0.001,
+            "dry_run_wallet": 1,
+            "enable_protections": True,
+            "_strategy_protections": [{"method": "CooldownPeriod", "stop_duration": 60}],
+            "amend_last_stake_amount": False,
+            "strategy_list": [CURRENT_TEST_STRATEGY],
+        }
+    )
+
+    def run(shards: int) -> Backtesting:
+        default_conf["backtest_shards"] = shards
+        default_conf["exportdirectory"] = tmp_path / f"shards_{shards}"
+        default_conf["exportdirectory"].mkdir(exist_ok=True)
+        backtesting = Backtesting(default_conf)
+        # Worker processes don't see mocks on the exchange class
+        backtesting.exchange._markets = get_markets()
+        backtesting.exchange.get_min_pair_stake_amount = lambda *x, **xx: 0.00001
+        backtesting.exchange.get_max_pair_stake_amount = lambda *x, **xx: 100.0
+        backtesting.exchange.get_max_leverage = lambda *x, **xx: 1.0
+        backtesting.start()
+        return backtesting
+
+    single = run(1)
+    sharded = run(2)
+
+    assert log_has("Backtesting 5 pairs in 2 shards.", caplog)
+    assert log_has_re(r"Backtested 2 shards in \d+\.\d+s \(shard times: .*\)\.", caplog)
+    expected = single.all_bt_content[CURRENT_TEST_STRATEGY]
+    content = sharded.all_bt_content[CURRENT_TEST_STRATEGY]
+    assert len(expected["results"]["pair"].unique()) == 5
+    pd.testing.assert_frame_equal(
+        content["results"],
+        expected["results"].sort_values(
+            ["close_date", "open_date", "pair"], kind="stable", ignore_index=True
+        ),
+    )
+    assert content["final_balance"] == pytest.approx(expected["final_balance"])
+    assert len(content["locks"]) == len(expected["locks"]) > 0
+    for key in ("rejected_signals", "canceled_trade_entries", "timedout_entry_orders"):
+        assert content[key] == expected[key]
+    for key in ("signals", "rejected", "exited"):
+        result = load_backtest_analysis_data(tmp_path / "shards_2", key)[CURRENT_TEST_STRATEGY]
+        expected_frames = load_backtest_analysis_data(tmp_path / "shards_1", key)[
+            CURRENT_TEST_STRATEGY
+        ]
+        assert sorted(result) == sorted(expected_frames)
+        for pair, frame in expected_frames.items():
+            pd.testing.assert_frame_equal(result[pair], frame)
+
+    # A wallet too small for all trades couples the pairs
+    caplog.clear()
+    default_conf["dry_run_wallet"] = 0.003
+    limited = run(2)
+    assert log_has(
+        "Pair-sharded backtesting is not possible as the wallet limits entries. "
+        "Backtesting all pairs in one process.",
+        caplog,
+    )
+    assert len(limited.all_bt_content[CURRENT_TEST_STRATEGY]["results"]) < len(expected["results"])
+
+
+def test_backtest_sharded_callback(default_conf, mocker, caplog, testdatadir):
+    patch_exchange(mocker)
+    mocker.patch(
+        "freqtrade.plugins.pairlistmanager.PairListManager.whitelist",
+        PropertyMock(return_value=["ETH/BTC", "LTC/BTC", "ADA/BTC", "DASH/BTC"]),
+    )
+    default_conf.update(
+        {
+            "datadir": testdatadir,
+            "timeframe": "5m",
+            "timerange": "20180120-20180125",
+            "export": "none",
+            "runmode": RunMode.BACKTEST,
+            "fee": 0.0025,
+            "max_open_trades": -1,
+            "stake_amount": 0.001,
+            "dry_run_wallet": 1,
+            "amend_last_stake_amount": False,
+            "strategy_list": [CURRENT_TEST_STRATEGY],
+        }
+    )
+    seen = []
+
+    def confirm_trade_entry(self, pair, *args, current_time, **kwargs) -> bool:
+        # Only enter while the last ETH/BTC candle closed above its open
+        dataframe, _ = self.dp.get_analyzed_dataframe("ETH/BTC", self.timeframe)
+        seen.append(len(dataframe))
+        return not dataframe.empty and dataframe["close"].iat[-1] > dataframe["open"].iat[-1]
+
+    def run(shards: int) -> dict:
+        default_conf["backtest_shards"] = shards
+        backtesting = Backtesting(default_conf)
+        backtesting.exchange.get_min_pair_stake_amount = lambda *x, **xx: 0.00001
+        backtesting.exchange.get_max_pair_stake_amount = lambda *x, **xx: 100.0
+        strategy = backtesting.strategylist[0]
+        strategy.confirm_trade_entry = confirm_trade_entry.__get__(strategy)
+        backtesting.start()
+        return backtesting.all_bt_content[CURRENT_TEST_STRATEGY]
+
+    expected = run(1)
+    content = run(2)
+    assert log_has(
+        "Pair-sharded backtesting is not possible as confirm_trade_entry is implemented. "
+        "Backtesting all pairs in one process.",
+        caplog,
+    )
+    # Both runs looked at ETH/BTC from all pairs, and declined some entries
+    assert all(seen)
+    assert len(expected["results"]["pair"].unique()) > 1
+    assert len(seen) > 2 * (len(expected["results"]) + len(content["results"]))
+    pd.testing.assert_frame_equal(content["results"], expected["results"])
+
+
+def test_shard_blocker(default_conf, mocker):
+    patch_exchange(mocker)
+    default_conf.update({"max_open_trades": -1, "stake_amount": 0.001})
+    backtesting = Backtesting(default_conf)
+    backtesting._set_strategy(backtesting.strategylist[0])
+    assert shard_blocker(backtesting, 5) is None
+
+    backtesting.strategy.max_open_trades = 3
+    assert shard_blocker(backtesting, 5) == "max_open_trades can be reached"
+    # Never reached without position stacking
+    assert shard_blocker(backtesting, 3) is None
+    backtesting.config["position_stacking"] = True
+    assert shard_blocker(backtesting, 3) == "max_open_trades can be reached"
+    backtesting.config["position_stacking"] = False
+
+    backtesting.config["stake_amount"] = "unlimited"
+    assert shard_blocker(backtesting, 3) == "the stake amount is unlimited"
+    backtesting.config["stake_amount"] = 0.001
+
+    backtesting.enable_protections = True
+    backtesting.strategy.config["_strategy_protections"] = [
+        {"method": "CooldownPeriod", "stop_duration": 60}
+    ]
+    assert shard_blocker(backtesting, 3) is None
+    backtesting.strategy.config["_strategy_protections"] = [
+        {"method": "StoplossGuard", "lookback_period": 60, "stop_duration": 60}
+    ]
+    assert shard_blocker(backtesting, 3) == "protections can lock all pairs"
+    backtesting.enable_protections = False
+
+    backtesting.strategy.position_adjustment_enable = True
+    assert shard_blocker(backtesting, 3) == "position adjustment is enabled"
+    backtesting.strategy.position_adjustment_enable = False
+
+    backtesting.strategy.custom_exit = MagicMock()
+    assert shard_blocker(backtesting, 3) == "custom_exit is implemented"
+    del backtesting.strategy.custom_exit
+    # StrategyTestV3's leverage() is only called in futures
+    backtesting.trading_mode = TradingMode.FUTURES
+    assert shard_blocker(backtesting, 3) == "leverage is implemented"
+    backtesting.trading_mode = TradingMode.SPOT
+    assert shard_blocker(backtesting, 3) is None
+
+    backtesting.dynamic_pairlist = True
+    assert shard_blocker(backtesting, 3) == "dynamic pairlists are used"
+
+
+def test_shard_count_and_pairs(default_conf, mocker):
+    mocker.patch("freqtrade.optimize.backtest_parallel.cpu_count", return_value=8)
+    assert shard_count(default_conf, 10) == 1
+    default_conf["backtest_shards"] = 4
+    assert shard_count(default_conf, 10) == 4
+    assert shard_count(default_conf, 3) == 3
+    assert shard_count(default_conf, 1) == 1
+    default_conf["backtest_shards"] = -1
+    assert shard_count(default_conf, 20) == 8
+
+    data = {
+        "A/BTC": pd.DataFrame(index=range(100)),
+        "B/BTC": pd.DataFrame(index=range(50)),
+        "C/BTC": pd.DataFrame(index=range(40)),
+        "D/BTC": pd.DataFrame(index=range(30)),
+    }
+    assert pair_shards(data, 2) == [["A/BTC"], ["B/BTC", "C/BTC", "D/BTC"]]
+    assert pair_shards(data, 3) == [["A/BTC"], ["B/BTC"], ["C/BTC", "D/BTC"]]
+    assert pair_shards(data, 8) == [["A/BTC"], ["B/BTC"], ["C/BTC"], ["D/BTC"]]
+
+
+def test_backtest_pair_cache(default_conf, mocker, caplog, testdatadir, tmp_path):
+    patch_exchange(mocker)
+    whitelist = ["ETH/BTC", "LTC/BTC", "ADA/BTC", "DASH/BTC"]
+    mocker.patch(
+        "freqtrade.plugins.pairlistmanager.PairListManager.whitelist",
+        PropertyMock(side_effect=lambda: whitelist),
+    )
+    default_conf.update(
+        {
+            "datadir": testdatadir,
+            "user_data_dir": tmp_path,
+            "timeframe": "5m",
+            "export": "none",
+            "fee": 0.0025,
+            "max_open_trades": -1,
+            "stake_amount": 0.001,
+            "dry_run_wallet": 1,
+            "amend_last_stake_amount": False,
+            "strategy_list": [CURRENT_TEST_STRATEGY],
+        }
+    )
+
+    def run(timerange: str, pair_cache: bool) -> dict:
+        default_conf["timerange"] = timerange
+        default_conf["backtest_pair_cache"] = pair_cache
+        backtesting = Backtesting(default_conf)
+        backtesting.exchange.get_min_pair_stake_amount = lambda *x, **xx: 0.00001
+        backtesting.exchange.get_max_pair_stake_amount = lambda *x, **xx: 100.0
+        backtesting.start()
+        return backtesting.all_bt_content[CURRENT_TEST_STRATEGY]
+
+    def assert_same(content: dict, expected: dict) -> None:
+        assert len(expected["results"]) > 0
+        pd.testing.assert_frame_equal(
+            content["results"],
+            expected["results"].sort_values(
+                ["close_date", "open_date", "pair"], kind="stable", ignore_index=True
+            ),
+        )
+        assert content["final_balance"] == pytest.approx(expected["final_balance"])
+
+    assert_same(run("20180120-20180125", True), run("20180120-20180125", False))
+    assert log_has(
+        "Pair result cache: reused 0 pairs, resumed 0, backtested 4 from the start.", caplog
+    )
+    cache_files = list((tmp_path / "backtest_results" / ".pair_cache").glob("*/*.pkl"))
+    assert len(cache_files) == 4
+
+    caplog.clear()
+    assert_same(run("20180120-20180125", True), run("20180120-20180125", False))
+    assert log_has(
+        "Pair result cache: reused 4 pairs, resumed 0, backtested 0 from the start.", caplog
+    )
+
+    # Extended timerange - continues from the last candle without an open trade
+    caplog.clear()
+    assert_same(run("20180120-20180128", True), run("20180120-20180128", False))
+    assert log_has(
+        "Pair result cache: reused 0 pairs, resumed 4, backtested 0 from the start.", caplog
+    )
+
+    # Another pair
+    caplog.clear()
+    whitelist = ["ETH/BTC", "LTC/BTC", "ADA/BTC", "XLM/BTC"]
+    assert_same(run("20180120-20180128", True), run("20180120-20180128", False))
+    assert log_has(
+        "Pair result cache: reused 3 pairs, resumed 0, backtested 1 from the start.", caplog
+    )
+
+    caplog.clear()
+    default_conf["max_open_trades"] = 2
+    run("20180120-20180128", True)
+    assert log_has(
+        "Pair result cache is not used as max_open_trades can be reached. "
+        "Backtesting all pairs together.",
+        caplog,
+    )
+
+
+def test_pair_cache_blocker(default_conf, mocker):
+    patch_exchange(mocker)
+    default_conf.update({"max_open_trades": -1, "stake_amount": 0.001})
+    backtesting = Backtesting(default_conf)
+    backtesting._set_strategy(backtesting.strategylist[0])
+    entry = {"locks": [], "counters": {"rejected_signals": 0, "timedout_entry_orders": 0}}
+    assert pair_cache_blocker(backtesting, 3) is None
+    assert _resumable(backtesting, entry)
+
+    # Callbacks may look at other pairs, or keep state from skipped candles
+    backtesting.strategy.bot_loop_start = MagicMock()
+    assert pair_cache_blocker(backtesting, 3) == "bot_loop_start is implemented"
+    assert not _resumable(backtesting, entry)
+    del backtesting.strategy.bot_loop_start
+
+    backtesting.enable_protections = True
+    assert not _resumable(backtesting, entry)
+    backtesting.enable_protections = False
+    assert not _resumable(backtesting, {**entry, "locks": [MagicMock()]})
+    backtesting.trading_mode = TradingMode.FUTURES
+    assert pair_cache_blocker(backtesting, 3) == "leverage is implemented"
+
+
 def test_backtest_start_multi_strat_nomock(default_conf, mocker, caplog, testdatadir, capsys):
     default_conf.update(
         {
@@ -2765,12 +3472,12 @@ def test_time_pair_generator_open_trades_first(mocker, default_conf, dynamic_pai
         LocalTrade(pair="XRP/BTC", open_date=dt_now(), amount=1, open_rate=1),
         LocalTrade(pair="NEO/BTC", open_date=dt_now(), amount=1, open_rate=1),
     ]
-    LocalTrade.bt_trades_open = trades
+    LocalTrade.bt_trades_open = OpenTradeRegistry(trades)
     LocalTrade.bt_trades_open_pp = {
-        "XRP/BTC": [trades[0]],
-        "NEO/BTC": [trades[1]],
-        "LTC/BTC": [],
-        "ETH/BTC": [],
+        "XRP/BTC": PairOpenTrades([trades[0]]),
+        "NEO/BTC": PairOpenTrades([trades[1]]),
+        "LTC/BTC": PairOpenTrades(),
+        "ETH/BTC": PairOpenTrades(),
     }
 
     start_date = datetime(2025, 1, 1, 0, 0, tzinfo=UTC)
@@ -2793,3 +3500,53 @@ def test_time_pair_generator_open_trades_first(mocker, default_conf, dynamic_pai
         assert processed_pairs == ["XRP/BTC", "NEO/BTC", "ETH/BTC", "LTC/BTC"]
     else:
         assert processed_pairs == ["XRP/BTC", "NEO/BTC", "LTC/BTC", "ETH/BTC"]
+
+
+def test_backtest_start_profile(default_conf, mocker, caplog, testdatadir, tmp_path):
+    patch_exchange(mocker)
+    mocker.patch("freqtrade.optimize.backtesting.show_backtest_results")
+    mocker.patch("freqtrade.optimize.backtesting.store_backtest_results")
+    mocker.patch(
+        "freqtrade.plugins.pairlistmanager.PairListManager.whitelist",
+        PropertyMock(return_value=["UNITTEST/BTC"]),
+    )
+    patched_configuration_load_config_file(mocker, default_conf)
+
+    args = [
+        "backtesting",
+        "--config",
+        "config.json",
+        "--strategy",
+        CURRENT_TEST_STRATEGY,
+        "--datadir",
+        str(testdatadir),
+        "--backtest-directory",
+        str(tmp_path),
+        "--timeframe",
+        "1m",
+        "--timerange",
+        "1510694220-1510700340",
+        "--profile",
+        "--profile-stacks",
+    ]
+    args = get_args(args)
+    start_backtesting(args)
+    assert log_has("Parameter --profile detected ...", caplog)
+
+    reports = list(tmp_path.glob("profile-*.json"))
+    assert len(reports) == 1
+    assert reports[0].with_suffix(".collapsed").is_file()
+    report = json.loads(reports[0].read_text())
+    assert list(report["phases"]) == [
+        "startup",
+        "dataload",
+        "analyze",
+        "convert",
+        "backtest",
+        "report",
+    ]
+    assert report["candles"] > 0
+    assert report["candles_per_second"] > 0
+    assert report["callbacks"]["bot_loop_start"]["calls"] > 0
+    assert "workers" not in report
+    assert log_has_re(r"Profile: backtest took \d+\.\d+s\.", caplog)
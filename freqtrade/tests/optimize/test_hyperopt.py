@@ -1,4 +1,5 @@
 # pragma pylint: disable=missing-docstring,W0212,C0103
+import json
 from datetime import datetime, timedelta
 from functools import partial, wraps
 from pathlib import Path
@@ -1393,3 +1394,38 @@ def test_max_open_trades_consistency(mocker, hyperopt_conf, tmp_path, fee) -> No
 
     assert hyperopt.hyperopter.backtesting.strategy.max_open_trades == 4
     assert hyperopt.config["max_open_trades"] == 4
+
+
+def test_hyperopt_profile(mocker, hyperopt_conf, tmp_path, fee) -> None:
+    patch_exchange(mocker)
+    mocker.patch(f"{EXMS}.get_fee", fee)
+    (tmp_path / "hyperopt_results").mkdir(parents=True)
+    hyperopt_conf.update(
+        {
+            "strategy": "HyperoptableStrategy",
+            "user_data_dir": tmp_path,
+            "hyperopt_random_state": 42,
+            "spaces": ["buy"],
+            "epochs": 2,
+            "hyperopt_jobs": 1,
+            "profile": True,
+        }
+    )
+    hyperopt = Hyperopt(hyperopt_conf)
+    hyperopt.hyperopter.backtesting.exchange.get_max_leverage = MagicMock(return_value=1.0)
+    hyperopt.start()
+
+    reports = list((tmp_path / "hyperopt_results").glob("profile-*.json"))
+    assert len(reports) == 1
+    report = json.loads(reports[0].read_text())
+    assert list(report["phases"]) == ["startup", "dataload", "analyze", "optimize", "report"]
+    assert report["epochs"] == 2
+    assert report["epochs_per_minute"] > 0
+    # Epochs are profiled separately
+    assert report["workers"]["tasks"] == 2
+    assert set(report["workers"]["phases"]) == {"convert", "backtest"}
+    assert report["candles"] > 0
+    assert report["callbacks"]["bot_loop_start"]["calls"] > 0
+    # Not stored with the epochs
+    with hyperopt.results_file.open() as f:
+        assert all("profile" not in json.loads(line) for line in f)
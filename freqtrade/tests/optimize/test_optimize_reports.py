@@ -15,16 +15,21 @@ from freqtrade.constants import BACKTEST_BREAKDOWNS, DATETIME_PRINT_FORMAT, LAST
 from freqtrade.data import history
 from freqtrade.data.btanalysis import (
     get_latest_backtest_filename,
+    load_backtest_analysis_data,
     load_backtest_data,
     load_backtest_stats,
 )
+from freqtrade.data.btanalysis.bt_fileutils import AnalysisChunks
 from freqtrade.enums import ExitType
 from freqtrade.optimize.optimize_reports import (
+    AnalysisChunkWriter,
     generate_backtest_stats,
     generate_daily_stats,
     generate_pair_metrics,
     generate_periodic_breakdown_stats,
+    generate_rejected_signals,
     generate_strategy_comparison,
+    generate_trade_signal_candles,
     generate_trading_stats,
     show_sorted_pairlist,
     store_backtest_results,
@@ -394,6 +399,105 @@ def test_write_read_backtest_candles(tmp_path):
     _clean_test_file(stored_file)
 
 
+def test_write_read_backtest_candles_chunked(tmp_path):
+    candles = pd.DataFrame(
+        {
+            "date": pd.date_range("2022-01-01", periods=3, freq="5min", tz="UTC"),
+            "close": [1.0, 2.0, 3.0],
+            "enter_tag": [None, "tag", None],
+        },
+        index=[4, 8, 9],
+    )
+    # Columns of mixed types fall back to pickle
+    mixed = candles.assign(custom=[1, "a", None])
+    mock_conf = {
+        "exportdirectory": tmp_path,
+        "export": "signals",
+        "runmode": "backtest",
+        "original_config": {},
+    }
+    writer = AnalysisChunkWriter(tmp_path)
+    writer.add("signals", "DefStrat", {"UNITTEST/BTC": candles, "XRP/BTC": mixed})
+    writer.add("rejected", "DefStrat", {})
+    writer.add("exited", "DefStrat", {"UNITTEST/BTC": pd.DataFrame()})
+    assert writer.index["signals"]["DefStrat"] == {
+        "UNITTEST/BTC": "signals/DefStrat/UNITTEST_BTC.parquet",
+        "XRP/BTC": "signals/DefStrat/XRP_BTC.pkl",
+    }
+    assert writer.strategy_index("Other") == {}
+
+    # Rejected signals are read back in order, once
+    writer.spool_rejected("DefStrat", "XRP/BTC", [[candles["date"][4], None]])
+    writer.spool_rejected("DefStrat", "XRP/BTC", [[candles["date"][8], "tag"]])
+    assert writer.take_rejected("DefStrat", "XRP/BTC") == [
+        [candles["date"][4], None],
+        [candles["date"][8], "tag"],
+    ]
+    assert writer.take_rejected("DefStrat", "XRP/BTC") == []
+    assert writer.take_rejected("Other", "XRP/BTC") == []
+
+    sample_date = "2022_01_01_15_05_13"
+    stored_file = store_backtest_results(
+        mock_conf,
+        {"metadata": {}, "strategy": {}, "strategy_comparison": []},
+        sample_date,
+        analysis_results=writer,
+    )
+    writer.cleanup()
+    assert not writer.directory.exists()
+    with ZipFile(stored_file, "r") as zipf:
+        assert f"backtest-result-{sample_date}_analysis.json" in zipf.namelist()
+        assert f"backtest-result-{sample_date}_signals.pkl" not in zipf.namelist()
+
+    signals = load_backtest_analysis_data(tmp_path, "signals")
+    assert list(signals) == ["DefStrat"]
+    assert isinstance(signals["DefStrat"], AnalysisChunks)
+    assert sorted(signals["DefStrat"]) == ["UNITTEST/BTC", "XRP/BTC"]
+    pd.testing.assert_frame_equal(signals["DefStrat"]["UNITTEST/BTC"], candles)
+    pd.testing.assert_frame_equal(signals["DefStrat"]["XRP/BTC"], mixed)
+    assert load_backtest_analysis_data(tmp_path, "rejected") == {"DefStrat": {}}
+    assert load_backtest_analysis_data(tmp_path, "exited")["DefStrat"]["UNITTEST/BTC"].empty
+
+
+def test_generate_trade_signal_candles():
+    pairdf = pd.DataFrame(
+        {
+            "date": pd.date_range("2022-01-01", periods=6, freq="5min", tz="UTC"),
+            "close": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        }
+    )
+    results = pd.DataFrame(
+        {
+            "pair": ["UNITTEST/BTC", "UNITTEST/BTC", "XRP/BTC"],
+            "open_date": pairdf["date"].iloc[[2, 4, 1]].to_list(),
+        }
+    )
+    signals = generate_trade_signal_candles(
+        {"UNITTEST/BTC": pairdf, "ETH/BTC": pairdf, "XRP/BTC": pairdf.iloc[:0]},
+        {"results": results},
+        "open_date",
+    )
+    assert list(signals) == ["UNITTEST/BTC", "ETH/BTC"]
+    assert signals["UNITTEST/BTC"]["close"].to_list() == [2.0, 4.0]
+    assert signals["ETH/BTC"].empty
+
+    rejected = generate_rejected_signals(
+        {"UNITTEST/BTC": pairdf, "ETH/BTC": pairdf},
+        {
+            "UNITTEST/BTC": [
+                [pairdf["date"].iat[3], "tag1"],
+                [pairdf["date"].iat[3] + timedelta(days=1), "missing"],
+                [pairdf["date"].iat[0], None],
+            ],
+            "ETH/BTC": [],
+        },
+    )
+    assert rejected["UNITTEST/BTC"]["close"].to_list() == [4.0, 1.0]
+    assert rejected["UNITTEST/BTC"]["enter_tag"].to_list() == ["tag1", None]
+    assert (rejected["UNITTEST/BTC"]["pair"] == "UNITTEST/BTC").all()
+    assert rejected["ETH/BTC"].empty
+
+
 def test_generate_pair_metrics():
     results = pd.DataFrame(
         {
@@ -9,7 +9,14 @@ from freqtrade.constants import CUSTOM_TAG_MAX_LENGTH, DATETIME_PRINT_FORMAT
 from freqtrade.enums import TradingMode
 from freqtrade.exceptions import DependencyException
 from freqtrade.exchange.exchange_utils import TICK_SIZE
-from freqtrade.persistence import LocalTrade, Order, Trade, init_db
+from freqtrade.persistence import (
+    LocalTrade,
+    OpenTradeRegistry,
+    Order,
+    PairOpenTrades,
+    Trade,
+    init_db,
+)
 from freqtrade.util import dt_now
 from tests.conftest import (
     create_mock_trades,
@@ -1890,9 +1897,84 @@ def test_get_trades_proxy(fee, use_db, is_short):
 
     assert len(Trade.get_trades_proxy(open_date=opendate)) == 3
 
+    for is_open in (True, False):
+        trades = Trade.get_trades_proxy(is_open=is_open)
+        for pair in {t.pair for t in trades}:
+            assert Trade.get_trades_proxy(pair=pair, is_open=is_open) == [
+                t for t in trades if t.pair == pair
+            ]
+    assert Trade.get_trades_proxy(pair="XRP/USDT", is_open=False) == []
+
     Trade.use_db = True
 
 
+def test_open_trade_registry():
+    trades = [
+        LocalTrade(pair=pair, open_date=dt_now(), open_rate=1, amount=1, is_short=is_short)
+        for pair, is_short in (
+            ("ETH/BTC", False),
+            ("XRP/BTC", True),
+            ("ETH/BTC", True),
+            ("LTC/BTC", False),
+        )
+    ]
+    registry = OpenTradeRegistry(trades)
+    assert list(registry) == trades
+    assert len(registry) == 4
+    assert trades[1] in registry
+    assert registry.pairs() == ["ETH/BTC", "XRP/BTC", "LTC/BTC"]
+    assert registry.count(is_short=False) == 2
+    assert registry.count(is_short=True) == 2
+    with pytest.raises(ValueError, match=r"is already an open trade"):
+        registry.append(trades[1])
+    assert len(registry) == 4
+
+    version = registry.version
+    # ETH/BTC moves behind XRP/BTC with its remaining trade
+    registry.remove(trades[0])
+    assert registry.version > version
+    assert registry.pairs() == ["XRP/BTC", "ETH/BTC", "LTC/BTC"]
+    assert registry.count(is_short=False) == 1
+    with pytest.raises(ValueError, match=r"is not an open trade"):
+        registry.remove(trades[0])
+
+    assert registry.pop() is trades[3]
+    assert registry.pairs() == ["XRP/BTC", "ETH/BTC"]
+    registry.append(trades[0])
+    assert list(registry) == [trades[1], trades[2], trades[0]]
+    assert registry.pairs() == ["XRP/BTC", "ETH/BTC"]
+    registry.remove(trades[1])
+    assert registry.pairs() == ["ETH/BTC"]
+    registry.pop()
+    registry.pop()
+    assert not registry
+    assert registry.pairs() == []
+    with pytest.raises(IndexError):
+        registry.pop()
+
+
+def test_pair_open_trades():
+    trades = [
+        LocalTrade(pair="ETH/BTC", open_date=dt_now(), open_rate=1, amount=1) for _ in range(3)
+    ]
+    pair_trades = PairOpenTrades(trades[:2])
+    pair_trades.append(trades[2])
+    assert list(pair_trades) == trades
+    assert len(pair_trades) == 3
+    assert pair_trades.first() is trades[0]
+    with pytest.raises(ValueError, match=r"is already an open trade"):
+        pair_trades.append(trades[0])
+
+    pair_trades.remove(trades[0])
+    assert trades[0] not in pair_trades
+    assert pair_trades.first() is trades[1]
+    with pytest.raises(ValueError, match=r"is not an open trade"):
+        pair_trades.remove(trades[0])
+    pair_trades.remove(trades[1])
+    pair_trades.remove(trades[2])
+    assert not pair_trades
+
+
 @pytest.mark.usefixtures("init_persistence")
 @pytest.mark.parametrize("is_short", [True, False])
 def test_get_trades__query(fee, is_short):
@@ -2146,6 +2228,7 @@ def test_Trade_object_idem():
     )
     EXCLUDES2 = (
         "bt_trades",
+        "bt_trades_pp",
         "bt_trades_open",
         "bt_trades_open_pp",
         "bt_open_open_trade_count",
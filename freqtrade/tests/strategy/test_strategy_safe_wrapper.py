@@ -1,8 +1,10 @@
+from unittest.mock import MagicMock
+
 import pytest
 
 from freqtrade.exceptions import StrategyError
 from freqtrade.persistence import Trade
-from freqtrade.strategy.strategy_wrapper import strategy_safe_wrapper
+from freqtrade.strategy.strategy_wrapper import set_call_recorder, strategy_safe_wrapper
 from freqtrade.util.datetime_helpers import dt_now
 from tests.conftest import create_mock_trades, log_has_re
 
@@ -91,3 +93,28 @@ def test_strategy_safe_wrapper_trade_copy(fee, mocker):
     )
 
     assert deepcopy_mock.call_count == 0
+
+
+def test_strategy_safe_wrapper_call_recorder():
+    def working_method(argument):
+        return argument
+
+    def failing_method():
+        raise ValueError("This is an error.")
+
+    recorder = MagicMock()
+    assert set_call_recorder(recorder) is None
+    try:
+        assert strategy_safe_wrapper(working_method)(2) == 2
+        assert strategy_safe_wrapper(failing_method, default_retval=False)() is False
+    finally:
+        assert set_call_recorder(None) is recorder
+
+    assert recorder.call_count == 2
+    assert recorder.call_args_list[0][0][0] == "working_method"
+    assert recorder.call_args_list[1][0][0] == "failing_method"
+    assert recorder.call_args_list[0][0][1] >= 0
+
+    # Not recorded once the recorder is removed
+    strategy_safe_wrapper(working_method)(2)
+    assert recorder.call_count == 2
@@ -0,0 +1,58 @@
+from copy import deepcopy
+
+import pytest
+
+from benchmarks.backtest_benchmark import compare_results, run_case, synthetic_candles
+
+
+def test_synthetic_candles():
+    candles = synthetic_candles(1, 500)
+    assert len(candles) == 500
+    assert (candles["high"] >= candles[["open", "close"]].max(axis=1)).all()
+    assert (candles["low"] <= candles[["open", "close"]].min(axis=1)).all()
+    # Reproducible, but different per pair
+    assert candles.equals(synthetic_candles(1, 500))
+    assert not candles["close"].equals(synthetic_candles(2, 500)["close"])
+
+
+@pytest.mark.parametrize("case", ["spot_detail", "spot_stacking", "futures_short", "hyperopt"])
+def test_run_case(case):
+    result = run_case(case, pair_count=2, candle_count=400, epochs=2, repeat=1)
+    assert result["candles"] > 0
+    if case == "hyperopt":
+        assert result["epochs"] == 2
+        assert result["epochs_per_minute"] > 0
+    else:
+        assert result["candles_per_second"] > 0
+        assert result["seconds"]["backtest"] > 0
+
+
+def test_compare_results():
+    baseline = {
+        "parameters": {"pairs": 10, "candles": 10000, "epochs": 20, "repeat": 3},
+        "results": {
+            "spot": {"candles_per_second": 1000.0, "peak_memory_mb": 300.0},
+            "hyperopt": {"epochs_per_minute": 10.0, "peak_memory_mb": 300.0},
+        },
+    }
+    results = deepcopy(baseline)
+    assert compare_results(results, baseline) == []
+
+    results["results"]["spot"]["candles_per_second"] = 850.0
+    results["results"]["hyperopt"]["peak_memory_mb"] = 305.0
+    regressions = compare_results(results, baseline)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("spot candles_per_second")
+
+    results["results"]["hyperopt"]["peak_memory_mb"] = 400.0
+    assert len(compare_results(results, baseline)) == 2
+    assert len(compare_results(results, baseline, tolerance=0.5)) == 0
+
+    # Timings of other machines are not compared
+    results["machine"] = {"python": "3.12.1", "platform": "Linux", "processor": "arm64"}
+    assert compare_results(results, baseline) == []
+    del results["machine"]
+
+    # Other parameters are not compared
+    results["parameters"]["pairs"] = 5
+    assert compare_results(results, baseline) == []
@@ -0,0 +1,177 @@
+"""
+Measures the legacy Lightstreamer text protocol client (trading_ig.lightstreamer):
+the CPU cost per update line of Subscription.notifyupdate(), and of reading the
+lines from the (chunked HTTP) Stream Connection, against the previous
+implementation of each.
+
+The input is a file of stream lines as sent by the server ("<table>,<item>|
+<field>|..."), a StreamRecorder Parquet file (its updates are encoded as stream
+lines, with unchanged fields left empty), or synthetic lines. No connection to
+IG is needed:
+
+    $ python sample/benchmark_lightstreamer.py --lines 200000
+    $ python sample/benchmark_lightstreamer.py --input recording.parquet
+"""
+
+import argparse
+import io
+import random
+import time
+import warnings
+from http.client import HTTPResponse
+
+from trading_ig.lightstreamer import Subscription, _LineReader
+
+FIELDS = ["BID", "OFR", "LTP", "LTV", "TTV", "UTM"]
+
+
+class LegacySubscription(Subscription):
+    """The previous notifyupdate(), for comparison"""
+
+    def notifyupdate(self, item_line):
+        toks = item_line.rstrip("\r\n").split("|")
+        undecoded_item = dict(list(zip(self.field_names, toks[1:])))
+        item_pos = int(toks[0])
+        curr_item = self._items_map.get(item_pos, {})
+        self._items_map[item_pos] = dict(
+            [
+                (k, self._decode(v, curr_item.get(k)))
+                for k, v in list(undecoded_item.items())
+            ]
+        )
+        item_info = {
+            "pos": item_pos,
+            "name": self.item_names[item_pos - 1],
+            "values": self._items_map[item_pos],
+        }
+        for on_item_update in self._listeners:
+            on_item_update(item_info)
+
+
+def encode(value):
+    if value is None:
+        return "#"
+    if value == "":
+        return "$"
+    if value[0] in "#$":
+        return value[0] + value
+    return value
+
+
+def synthetic_lines(count, items):
+    now = int(time.time() * 1000)
+    lines = []
+    for i in range(count):
+        bid = 100 + random.random()
+        # prices change on every update, the rest only now and then
+        values = [f"{bid:.2f}", f"{bid + 0.1:.2f}", "", "", "", str(now + i)]
+        if i % 10 == 0:
+            values[2:5] = [f"{bid:.2f}", "1", "#"]
+        lines.append(f"1,{i % items + 1}|" + "|".join(values))
+    return lines
+
+
+def recorded_lines(path):
+    """Encodes the updates of a StreamRecorder file as stream lines, all
+    items sharing one field schema"""
+    from trading_ig.streamer.recorder import StreamReplay
+
+    updates = list(StreamReplay(path).updates())
+    positions = {}
+    fields = {}
+    for update in updates:
+        positions.setdefault(update.getItemName(), len(positions) + 1)
+        fields.update(dict.fromkeys(update.getChangedFields()))
+    lines = []
+    for update in updates:
+        changed = update.getChangedFields()
+        values = [encode(changed[f]) if f in changed else "" for f in fields]
+        lines.append(f"1,{positions[update.getItemName()]}|" + "|".join(values))
+    return lines, len(positions), list(fields)
+
+
+def run_notify(subscription_type, lines, items, fields):
+    subscription = subscription_type(
+        "MERGE", [f"ITEM{i}" for i in range(items)], fields
+    )
+    subscription.addlistener(lambda item: None)
+    updates = [line.split(",", 1)[1] for line in lines]
+    start = time.process_time()
+    for update in updates:
+        subscription.notifyupdate(update)
+    return time.process_time() - start
+
+
+class RecordedSocket:
+    """Hands a recorded HTTP response to http.client"""
+
+    def __init__(self, data):
+        self._data = data
+
+    def makefile(self, mode):
+        return io.BufferedReader(io.BytesIO(self._data))
+
+
+def http_response(lines, chunk_size=4096):
+    """A chunked HTTP response carrying the lines, as the Stream Connection is"""
+    body = "".join(line + "\r\n" for line in lines).encode("utf-8")
+    data = [b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"]
+    for i in range(0, len(body), chunk_size):
+        chunk = body[i : i + chunk_size]
+        data.append(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+    data.append(b"0\r\n\r\n")
+    response = HTTPResponse(RecordedSocket(b"".join(data)))
+    response.begin()
+    return response
+
+
+def run_read(lines, buffered):
+    stream = http_response(lines)
+    if buffered:
+        readline = _LineReader(stream).readline
+    else:
+
+        def readline():
+            return stream.readline().decode("utf-8").rstrip()
+
+    start = time.process_time()
+    for _ in lines:
+        readline()
+    return time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--input", help="stream lines (.txt) or recording (.parquet)")
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--items", type=int, default=50)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    fields = FIELDS
+    if args.input is None:
+        lines = synthetic_lines(args.lines, args.items)
+        items = args.items
+    elif args.input.endswith(".parquet"):
+        lines, items, fields = recorded_lines(args.input)
+    else:
+        with open(args.input, encoding="utf-8") as f:
+            lines = [line.rstrip() for line in f if line.strip()]
+        items = max(int(line.split(",", 1)[1].split("|", 1)[0]) for line in lines)
+        fields = [f"F{i}" for i in range(max(line.count("|") for line in lines))]
+
+    count = len(lines)
+    print(f"{count:,} lines, {items} items, {len(fields)} fields")
+    for label, subscription_type in [
+        ("notifyupdate (previous)", LegacySubscription),
+        ("notifyupdate", Subscription),
+    ]:
+        elapsed = run_notify(subscription_type, lines, items, fields)
+        print(f"{label:>24}: {elapsed / count * 1e6:6.2f} us/line")
+    for label, buffered in [("readline (previous)", False), ("readline", True)]:
+        elapsed = run_read(lines, buffered)
+        print(f"{label:>24}: {elapsed / count * 1e6:6.2f} us/line")
+
+
+if __name__ == "__main__":
+    main()
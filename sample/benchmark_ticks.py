@@ -0,0 +1,135 @@
+"""
+Measures the CPU cost per update of populating each stream object type, and
+per tick of the streamer consumer path (Ticker.populate, plus the TickStore
+append when enabled), using synthetic updates, then the
+throughput, conflation and lag of the StreamingManager queues when the updates
+arrive faster than they are handled. No connection to IG is needed:
+
+    $ python sample/benchmark_ticks.py --ticks 200000 --epics 50 --workers 2
+"""
+
+import argparse
+import random
+import time
+
+from trading_ig.streamer.account import Account
+from trading_ig.streamer.manager import Consumer, StreamingManager
+from trading_ig.streamer.market import Market
+from trading_ig.streamer.ticker import Ticker
+
+
+class SyntheticUpdate:
+    def __init__(self, name, fields):
+        self._name = name
+        self._fields = fields
+
+    def getItemName(self):
+        return self._name
+
+    def getChangedFields(self):
+        return self._fields
+
+    def getFields(self):
+        return self._fields
+
+
+class BenchmarkStreamService:
+    def subscribe(self, subscription):
+        pass
+
+
+def make_updates(ticks, epics):
+    now = int(time.time() * 1000)
+    updates = []
+    for i in range(ticks):
+        epic = f"CS.D.EPIC{i % epics}.TODAY.IP"
+        bid = 100 + random.random()
+        fields = {
+            "BID": f"{bid:.2f}",
+            "OFR": f"{bid + 0.1:.2f}",
+            "LTP": None,
+            "LTV": None,
+            "TTV": None,
+            "UTM": str(now + i),
+            "DAY_OPEN_MID": None,
+            "DAY_NET_CHG_MID": None,
+            "DAY_PERC_CHG_MID": None,
+            "DAY_HIGH": None,
+            "DAY_LOW": None,
+        }
+        updates.append(SyntheticUpdate(f"CHART:{epic}:TICK", fields))
+    return updates
+
+
+POPULATE_UPDATES = [
+    (Ticker, {"BID": "100.5", "OFR": "100.6", "UTM": "1700000000000"}),
+    (Ticker, {field: "15" for field in Ticker.FIELDS}),
+    (Market, {"BID": "100.5", "OFFER": "100.6", "UPDATE_TIME": "10:00:00"}),
+    (Account, {field: "1000.0" for field in Account.FIELDS}),
+]
+
+
+def run_populate(object_type, values, count):
+    obj = object_type("ID")
+    start = time.process_time()
+    for _ in range(count):
+        obj.populate(values)
+    return time.process_time() - start
+
+
+def run(updates, tick_capacity):
+    manager = StreamingManager(BenchmarkStreamService(), tick_capacity=tick_capacity)
+    consumer = Consumer(None, manager)
+    start = time.process_time()
+    for update in updates:
+        consumer._handle_ticker_update(update)
+    return time.process_time() - start
+
+
+def run_manager(updates, workers, maxsize):
+    manager = StreamingManager(
+        BenchmarkStreamService(), workers=workers, maxsize=maxsize
+    )
+    start = time.perf_counter()
+    for update in updates:
+        manager.on_update(update)
+    while True:
+        metrics = manager.metrics()
+        if metrics["processed"] == metrics["queued"] and not metrics["depth"]:
+            break
+        time.sleep(0.001)
+    return time.perf_counter() - start, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ticks", type=int, default=200000)
+    parser.add_argument("--epics", type=int, default=50)
+    parser.add_argument("--capacity", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--maxsize", type=int, default=10000)
+    args = parser.parse_args()
+
+    for object_type, values in POPULATE_UPDATES:
+        elapsed = run_populate(object_type, values, args.ticks)
+        label = f"{object_type.__name__} ({len(values)} fields)"
+        print(f"{label:>24}: {elapsed / args.ticks * 1e6:6.2f} us/update")
+
+    updates = make_updates(args.ticks, args.epics)
+    for label, capacity in [("ticker only", None), ("ticker + store", args.capacity)]:
+        elapsed = run(updates, capacity)
+        print(
+            f"{label:>24}: {elapsed / args.ticks * 1e6:6.2f} us/tick, "
+            f"{args.ticks / elapsed:10,.0f} ticks/s"
+        )
+
+    elapsed, metrics = run_manager(updates, args.workers, args.maxsize)
+    print(
+        f"{'manager':>24}: {args.ticks / elapsed:10,.0f} ticks/s with "
+        f"{args.workers} worker(s), {metrics['conflated']:,} conflated, "
+        f"high water {metrics['high_water']:,}, max lag {metrics['max_lag']:.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
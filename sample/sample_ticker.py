@@ -21,10 +21,9 @@ def main():
     ig.create_session(version="3")
     sm = StreamingManager(ig)
 
-    tickers = []
-    for epic in crypto_epics:  # fx_epics, index_epics, crypto_epics
-        sm.start_tick_subscription(epic)
-        tickers.append(sm.ticker(epic))
+    epics = crypto_epics  # fx_epics, index_epics, crypto_epics
+    sm.start_tick_subscription(epics)
+    tickers = sm.wait_for_tickers(epics, timeout=10).values()
 
     for idx in range(0, 10):
         for ticker in tickers:
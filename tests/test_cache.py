@@ -0,0 +1,200 @@
+from trading_ig.rest import IGService
+from trading_ig.cache import ResponseCache
+import responses
+import json
+import time
+
+"""
+unit tests for the response cache
+"""
+
+BASE_URL = "https://demo-api.ig.com/gateway/deal"
+EPIC = "CS.D.GBPUSD.TODAY.IP"
+# market details are only cached when asked for
+MARKETS_TTL = {"markets": 300}
+
+
+def add_market(epic=EPIC):
+    with open("tests/data/markets_epic.json", "r") as file:
+        response_body = json.loads(file.read())
+    responses.add(
+        responses.GET,
+        f"{BASE_URL}/markets/{epic}",
+        json=response_body,
+        status=200,
+    )
+
+
+def add_watchlists():
+    responses.add(
+        responses.GET,
+        f"{BASE_URL}/watchlists",
+        json={"watchlists": [{"id": "123", "name": "test"}]},
+        status=200,
+    )
+
+
+class TestResponseCache:
+    @responses.activate
+    def test_repeat_call_is_served_from_cache(self):
+        add_market()
+        ig_service = IGService(
+            "username", "password", "api_key", "DEMO", cache=ResponseCache(MARKETS_TTL)
+        )
+
+        first = ig_service.fetch_market_by_epic(EPIC)
+        second = ig_service.fetch_market_by_epic(EPIC)
+
+        assert len(responses.calls) == 1
+        assert first == second
+        assert first is not second
+        info = ig_service.cache.info()
+        assert info["size"] == 1
+        assert info["groups"]["markets"] == {"hits": 1, "misses": 1}
+
+    @responses.activate
+    def test_no_cache_by_default(self):
+        add_market()
+        ig_service = IGService("username", "password", "api_key", "DEMO")
+
+        ig_service.fetch_market_by_epic(EPIC)
+        ig_service.fetch_market_by_epic(EPIC)
+
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_entries_expire(self):
+        add_market()
+        cache = ResponseCache(ttl={"markets": 0.05})
+        ig_service = IGService("username", "password", "api_key", "DEMO", cache=cache)
+
+        ig_service.fetch_market_by_epic(EPIC)
+        time.sleep(0.1)
+        ig_service.fetch_market_by_epic(EPIC)
+
+        assert len(responses.calls) == 2
+        assert cache.misses["markets"] == 2
+
+    @responses.activate
+    def test_market_snapshots_not_cached_by_default(self):
+        add_market()
+        cache = ResponseCache()
+        ig_service = IGService("username", "password", "api_key", "DEMO", cache=cache)
+
+        ig_service.fetch_market_by_epic(EPIC)
+        ig_service.fetch_market_by_epic(EPIC)
+
+        assert len(responses.calls) == 2
+        assert len(cache) == 0
+
+    @responses.activate
+    def test_group_disabled(self):
+        add_market()
+        cache = ResponseCache(ttl={"markets": 0})
+        ig_service = IGService("username", "password", "api_key", "DEMO", cache=cache)
+
+        ig_service.fetch_market_by_epic(EPIC)
+        ig_service.fetch_market_by_epic(EPIC)
+
+        assert len(responses.calls) == 2
+        assert len(cache) == 0
+
+    @responses.activate
+    def test_size_bound(self):
+        epics = ["A.B.C", "D.E.F", "G.H.I"]
+        for epic in epics:
+            add_market(epic)
+        cache = ResponseCache(MARKETS_TTL, maxsize=2)
+        ig_service = IGService("username", "password", "api_key", "DEMO", cache=cache)
+
+        for epic in epics:
+            ig_service.fetch_market_by_epic(epic)
+        ig_service.fetch_market_by_epic(epics[0])
+
+        assert len(cache) == 2
+        assert len(responses.calls) == 4
+
+    @responses.activate
+    def test_watchlist_edit_invalidates(self):
+        add_watchlists()
+        responses.add(
+            responses.PUT,
+            f"{BASE_URL}/watchlists/123",
+            json={"status": "SUCCESS"},
+            status=200,
+        )
+        ig_service = IGService(
+            "username",
+            "password",
+            "api_key",
+            "DEMO",
+            return_dataframe=False,
+            cache=ResponseCache(),
+        )
+
+        ig_service.fetch_all_watchlists()
+        ig_service.fetch_all_watchlists()
+        ig_service.add_market_to_watchlist("123", EPIC)
+        ig_service.fetch_all_watchlists()
+
+        urls = [call.request.url for call in responses.calls]
+        assert urls.count(f"{BASE_URL}/watchlists") == 2
+
+    @responses.activate
+    def test_errors_are_not_cached(self):
+        responses.add(
+            responses.GET,
+            f"{BASE_URL}/markets/{EPIC}",
+            json={"errorCode": "error.service.marketdata.instrument.epic.unavailable"},
+            status=404,
+        )
+        cache = ResponseCache(MARKETS_TTL)
+        ig_service = IGService("username", "password", "api_key", "DEMO", cache=cache)
+
+        for i in range(2):
+            try:
+                ig_service.fetch_market_by_epic(EPIC)
+            except Exception:
+                pass
+
+        assert len(responses.calls) == 2
+        assert len(cache) == 0
+
+    @responses.activate
+    def test_persisted_across_restarts(self, tmp_path):
+        add_market()
+        filename = str(tmp_path / "ig_cache.sqlite")
+
+        cache = ResponseCache(MARKETS_TTL, filename=filename)
+        ig_service = IGService("username", "password", "api_key", "DEMO", cache=cache)
+        first = ig_service.fetch_market_by_epic(EPIC)
+        cache.close()
+
+        cache = ResponseCache(MARKETS_TTL, filename=filename)
+        ig_service = IGService("username", "password", "api_key", "DEMO", cache=cache)
+        second = ig_service.fetch_market_by_epic(EPIC)
+        cache.close()
+
+        assert len(responses.calls) == 1
+        assert first == second
+
+    @responses.activate
+    def test_account_data_not_shared_across_accounts(self, tmp_path):
+        add_watchlists()
+        filename = str(tmp_path / "ig_cache.sqlite")
+
+        for acc_number in ["ABC123", "ABC123", "XYZ789"]:
+            cache = ResponseCache(filename=filename)
+            ig_service = IGService(
+                "username",
+                "password",
+                "api_key",
+                "DEMO",
+                acc_number=acc_number,
+                return_dataframe=False,
+                cache=cache,
+            )
+            ig_service.fetch_all_watchlists()
+            cache.close()
+
+        assert len(responses.calls) == 2
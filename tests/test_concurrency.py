@@ -0,0 +1,118 @@
+from trading_ig.rest import IGService
+from concurrent.futures import ThreadPoolExecutor
+import responses
+import json
+
+"""
+unit tests for sharing one IGService between threads
+"""
+
+BASE_URL = "https://demo-api.ig.com/gateway/deal"
+
+
+class TestConcurrency:
+    @responses.activate
+    def test_request_headers_no_cross_talk(self):
+        """
+        many threads calling endpoints with different versions and methods must
+        each send exactly their own VERSION and _method headers
+        """
+        with open("tests/data/markets_epic.json", "r") as file:
+            markets_body = json.loads(file.read())
+        with open("tests/data/accounts.json", "r") as file:
+            accounts_body = json.loads(file.read())
+        with open("tests/data/positions_v2.json", "r") as file:
+            positions_body = json.loads(file.read())
+
+        mismatches = []
+
+        def expect(version, body, method=None):
+            def callback(request):
+                sent = (request.headers.get("VERSION"), request.headers.get("_method"))
+                if sent != (version, method):
+                    mismatches.append((request.method, request.url, sent))
+                return 200, {}, json.dumps(body)
+
+            return callback
+
+        responses.add_callback(
+            responses.GET,
+            f"{BASE_URL}/markets/CS.D.GBPUSD.TODAY.IP",
+            callback=expect("3", markets_body),
+        )
+        responses.add_callback(
+            responses.GET, f"{BASE_URL}/accounts", callback=expect("1", accounts_body)
+        )
+        responses.add_callback(
+            responses.GET, f"{BASE_URL}/positions", callback=expect("2", positions_body)
+        )
+        responses.add_callback(
+            responses.PUT,
+            f"{BASE_URL}/accounts/preferences",
+            callback=expect("1", {"status": "SUCCESS"}),
+        )
+        responses.add_callback(
+            responses.POST,
+            f"{BASE_URL}/watchlists",
+            callback=expect("1", {"watchlistId": "123", "status": "SUCCESS"}),
+        )
+        responses.add_callback(
+            responses.POST,
+            f"{BASE_URL}/watchlists/123",
+            callback=expect("1", {"status": "SUCCESS"}, method="DELETE"),
+        )
+
+        ig_service = IGService(
+            "username",
+            "password",
+            "api_key",
+            "DEMO",
+            return_dataframe=False,
+            return_munch=False,
+            pool_maxsize=8,
+        )
+
+        calls = [
+            lambda: ig_service.fetch_market_by_epic("CS.D.GBPUSD.TODAY.IP"),
+            lambda: ig_service.fetch_accounts(),
+            lambda: ig_service.fetch_open_positions(),
+            lambda: ig_service.update_account_preferences(True),
+            lambda: ig_service.create_watchlist("test", ["CS.D.GBPUSD.TODAY.IP"]),
+            lambda: ig_service.delete_watchlist("123"),
+        ]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(calls[i % len(calls)]) for i in range(600)]
+            for future in futures:
+                future.result()
+
+        assert mismatches == []
+        assert len(responses.calls) == 600
+        assert "VERSION" not in ig_service.session.headers
+        assert "_method" not in ig_service.session.headers
+
+    @responses.activate
+    def test_delete_does_not_leak_method_header(self):
+        """
+        a POST following a DELETE must not be sent with the _method override
+        """
+        responses.add(
+            responses.POST,
+            f"{BASE_URL}/watchlists/123",
+            json={"status": "SUCCESS"},
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            f"{BASE_URL}/watchlists",
+            json={"watchlistId": "123", "status": "SUCCESS"},
+            status=200,
+        )
+
+        ig_service = IGService("username", "password", "api_key", "DEMO")
+        ig_service.delete_watchlist("123")
+        ig_service.create_watchlist("test", ["CS.D.GBPUSD.TODAY.IP"])
+
+        assert responses.calls[0].request.headers["_method"] == "DELETE"
+        assert "_method" not in responses.calls[1].request.headers
+        assert responses.calls[1].request.headers["VERSION"] == "1"
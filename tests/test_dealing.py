@@ -2,11 +2,45 @@ from trading_ig.rest import IGService
 import responses
 import json
 import pandas as pd
+import pytest
 
 """
 unit tests for dealing methods
 """
 
+POSITION_ARGS = [
+    "GBP",
+    "BUY",
+    "CS.D.GBPUSD.TODAY.IP",
+    "DFB",
+    False,
+    False,
+    None,
+    None,
+    None,
+    "MARKET",
+    None,
+    1,
+    None,
+    None,
+    False,
+    None,
+]
+
+
+class FakeClock:
+    """time.monotonic and time.sleep, without actually sleeping"""
+
+    def __init__(self, monkeypatch):
+        self.now = 0.0
+        self.waits = []
+        monkeypatch.setattr("trading_ig.rest.time.monotonic", lambda: self.now)
+        monkeypatch.setattr("trading_ig.rest.time.sleep", self.sleep)
+
+    def sleep(self, seconds):
+        self.waits.append(seconds)
+        self.now += seconds
+
 
 class TestDealing:
     @responses.activate
@@ -68,3 +102,101 @@ class TestDealing:
         assert result.iloc[0]["orderLevel"] == 2000.0
         assert result.iloc[0]["epic"] == "CS.D.CFDGOLD.CFDGC.IP"
         assert result.iloc[0]["currencyCode"] == "USD"
+
+    @responses.activate
+    def test_deal_confirmation_backoff(self, monkeypatch):
+        """
+        test fetch_deal_by_deal_reference retries with a short, growing backoff
+        """
+        url = "https://demo-api.ig.com/gateway/deal/confirms/REF123"
+        for i in range(3):
+            responses.add(responses.GET, url, json={}, status=404)
+        responses.add(
+            responses.GET,
+            url,
+            json={"dealReference": "REF123", "dealStatus": "ACCEPTED"},
+            status=200,
+        )
+        clock = FakeClock(monkeypatch)
+
+        ig_service = IGService("username", "password", "api_key", "DEMO")
+        result = ig_service.fetch_deal_by_deal_reference("REF123")
+
+        assert result["dealStatus"] == "ACCEPTED"
+        assert len(responses.calls) == 4
+        assert clock.waits == [0.1, 0.2, 0.4]
+
+    @responses.activate
+    def test_deal_confirmation_slow(self, monkeypatch):
+        """
+        test a confirmation arriving after 4 seconds is still returned
+        """
+        clock = FakeClock(monkeypatch)
+
+        def confirm(request):
+            if clock.now < 4.0:
+                return 404, {}, json.dumps({})
+            body = {"dealReference": "REF123", "dealStatus": "ACCEPTED"}
+            return 200, {}, json.dumps(body)
+
+        responses.add_callback(
+            responses.GET,
+            "https://demo-api.ig.com/gateway/deal/confirms/REF123",
+            callback=confirm,
+        )
+
+        ig_service = IGService("username", "password", "api_key", "DEMO")
+        result = ig_service.fetch_deal_by_deal_reference("REF123")
+
+        assert result["dealStatus"] == "ACCEPTED"
+        assert clock.now >= 4.0
+
+    @responses.activate
+    def test_deal_confirmation_backoff_gives_up(self, monkeypatch):
+        """
+        test fetch_open_position_by_deal_id stops after RETRY_TIMEOUT, with the
+        wait capped at RETRY_MAX_WAIT
+        """
+        responses.add(
+            responses.GET,
+            "https://demo-api.ig.com/gateway/deal/positions/DEAL1",
+            json={"errorCode": "error.position.notfound"},
+            status=404,
+        )
+        clock = FakeClock(monkeypatch)
+
+        ig_service = IGService("username", "password", "api_key", "DEMO")
+        ig_service.RETRY_TIMEOUT = 8.0
+        with pytest.raises(Exception):
+            ig_service.fetch_open_position_by_deal_id("DEAL1")
+
+        assert len(responses.calls) == 9
+        assert clock.waits == pytest.approx([0.1, 0.2, 0.4, 0.8, 1.6, 2.0, 2.0, 0.9])
+        assert clock.now == pytest.approx(8.0)
+
+    @responses.activate
+    def test_create_position_confirmed_by_rest(self):
+        """
+        test create_open_position polls for the confirmation when not streaming
+        """
+        responses.add(
+            responses.POST,
+            "https://demo-api.ig.com/gateway/deal/positions/otc",
+            json={"dealReference": "REF123"},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://demo-api.ig.com/gateway/deal/confirms/REF123",
+            json={"dealReference": "REF123", "dealStatus": "ACCEPTED"},
+            status=200,
+        )
+
+        ig_service = IGService("username", "password", "api_key", "DEMO")
+        result = ig_service.create_open_position(*POSITION_ARGS)
+
+        assert result["dealStatus"] == "ACCEPTED"
+        assert len(responses.calls) == 2
+        source, latency = ig_service.confirmation_latencies[-1]
+        assert source == "rest"
+        assert latency >= 0
@@ -330,13 +330,13 @@ class TestIntegration:
         ig_service.read_session()
         assert "X-IG-API-KEY" in ig_service.session.headers
 
-        if ig_service.session.headers["VERSION"] == "2":
+        if ig_service._refresh_token is None:
             assert "CST" in ig_service.session.headers
             assert "X-SECURITY-TOKEN" in ig_service.session.headers
             assert "Authorization" not in ig_service.session.headers
             assert "IG-ACCOUNT-ID" not in ig_service.session.headers
 
-        if ig_service.session.headers["VERSION"] == "3":
+        if ig_service._refresh_token is not None:
             assert "CST" not in ig_service.session.headers
             assert "X-SECURITY-TOKEN" not in ig_service.session.headers
             assert "Authorization" in ig_service.session.headers
@@ -348,11 +348,11 @@ class TestIntegration:
         assert "CST" in ig_service.session.headers
         assert "X-SECURITY-TOKEN" in ig_service.session.headers
 
-        if ig_service.session.headers["VERSION"] == "2":
+        if ig_service._refresh_token is None:
             assert "Authorization" not in ig_service.session.headers
             assert "IG-ACCOUNT-ID" not in ig_service.session.headers
 
-        if ig_service.session.headers["VERSION"] == "3":
+        if ig_service._refresh_token is not None:
             assert "Authorization" in ig_service.session.headers
             assert "IG-ACCOUNT-ID" in ig_service.session.headers
 
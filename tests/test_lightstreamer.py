@@ -0,0 +1,103 @@
+from trading_ig.lightstreamer import LSClient, Subscription, _LineReader
+import io
+import pytest
+
+"""
+unit tests for the legacy Lightstreamer text protocol client
+"""
+
+pytestmark = pytest.mark.filterwarnings("ignore::DeprecationWarning")
+
+
+class ChunkedStream(io.BytesIO):
+    """Returns at most chunk_size bytes from each read1(), as a socket would"""
+
+    def __init__(self, data, chunk_size):
+        super().__init__(data)
+        self.chunk_size = chunk_size
+
+    def read1(self, size=-1):
+        return super().read1(min(size, self.chunk_size))
+
+
+class LineStream(io.BytesIO):
+    """Has no read1()"""
+
+    read1 = property(lambda self: None)
+
+
+def subscribe(updates):
+    sub = Subscription("MERGE", ["ITEM1", "ITEM2"], ["BID", "OFR", "UTM"])
+    sub.addlistener(updates.append)
+    return sub
+
+
+class TestSubscription:
+    def test_decode(self):
+        updates = []
+        sub = subscribe(updates)
+        sub.notifyupdate("1|1.5|1.6|1000\r\n")
+        sub.notifyupdate("2|#|$|2000")
+        # unchanged fields are empty, or left out at the end of the line
+        sub.notifyupdate("1||1.7")
+        sub.notifyupdate("1|$$1|##2|")
+
+        assert [u["name"] for u in updates] == ["ITEM1", "ITEM2", "ITEM1", "ITEM1"]
+        assert [u["pos"] for u in updates] == [1, 2, 1, 1]
+        assert updates[0]["values"] == {"BID": "1.5", "OFR": "1.6", "UTM": "1000"}
+        assert updates[1]["values"] == {"BID": None, "OFR": "", "UTM": "2000"}
+        assert updates[2]["values"] == {"BID": "1.5", "OFR": "1.7", "UTM": "1000"}
+        assert updates[3]["values"] == {"BID": "$1", "OFR": "#2", "UTM": "1000"}
+
+    def test_first_update_and_extra_tokens(self):
+        updates = []
+        sub = subscribe(updates)
+        sub.notifyupdate("1|1.5||1000|unexpected")
+        assert updates[0]["values"] == {"BID": "1.5", "OFR": None, "UTM": "1000"}
+
+
+class TestLineReader:
+    def test_lines_split_across_reads(self):
+        data = "PROBE\r\n1,1|£1.5|x\r\n\r\n1,2|€2\r\nEND".encode("utf-8")
+        # one byte at a time cuts every line, and the multi-byte characters
+        reader = _LineReader(ChunkedStream(data, 1))
+        lines = [reader.readline() for _ in range(6)]
+        assert lines == ["PROBE", "1,1|£1.5|x", "", "1,2|€2", "END", ""]
+
+    def test_readline_fallback_and_readlines(self):
+        reader = _LineReader(LineStream(b"OK\r\nSessionId:S1\r\n\r\n"))
+        assert reader.readline() == "OK"
+        assert reader.readline() == "SessionId:S1"
+
+        reader = _LineReader(ChunkedStream(b"ERROR\r\nbad\r\nrequest", 8))
+        assert reader.readline() == "ERROR"
+        assert reader.readlines() == ["bad\r\n", "request"]
+
+
+class FakeThread:
+    active_connection = True
+
+
+class TestLSClient:
+    def test_receive(self):
+        updates = []
+        client = LSClient("http://localhost")
+        client._subscriptions[1] = subscribe(updates)
+        lines = [
+            "Preamble: x",
+            "PROBE",
+            "1,1|1.5|1.6|1000",
+            "1,2|2.5||",
+            "2,1|3",
+            "END",
+        ]
+        stream = ChunkedStream("\r\n".join(lines).encode("utf-8"), 7)
+        client._open_stream(stream)
+        client._stream_connection_thread = FakeThread()
+
+        client._receive()
+
+        assert [u["values"]["BID"] for u in updates] == ["1.5", "2.5"]
+        assert stream.closed
+        assert client._stream_connection is None
+        assert client._subscriptions == {}
@@ -0,0 +1,111 @@
+from trading_ig.rest import IGService, ApiExceededException
+from urllib.parse import urlparse, parse_qs
+import responses
+import json
+import pandas as pd
+import pytest
+
+"""
+unit tests for market methods
+"""
+
+BASE_URL = "https://demo-api.ig.com/gateway/deal"
+BAD_EPIC = "XX.D.BAD.EPIC.IP"
+
+
+def markets_callback(request):
+    query = parse_qs(urlparse(request.url).query)
+    epics = query["epics"][0].split(",")
+    if BAD_EPIC in epics:
+        return (
+            404,
+            {},
+            '{"errorCode": "error.service.marketdata.instrument.epic.unavailable"}',
+        )
+    details = [
+        {
+            "instrument": {"epic": epic, "name": f"name {epic}"},
+            "snapshot": {"bid": 1.0, "offer": 1.1},
+        }
+        for epic in epics
+    ]
+    return 200, {}, json.dumps({"marketDetails": details})
+
+
+def add_markets():
+    responses.add_callback(
+        responses.GET,
+        f"{BASE_URL}/markets",
+        callback=markets_callback,
+    )
+
+
+def requested_epics():
+    return [
+        parse_qs(urlparse(call.request.url).query)["epics"][0].split(",")
+        for call in responses.calls
+    ]
+
+
+class TestMarkets:
+    @responses.activate
+    def test_batched_chunks(self):
+        add_markets()
+        epics = [f"CS.D.EPIC{i}.IP" for i in range(120)]
+
+        ig_service = IGService("username", "password", "api_key", "DEMO")
+        result = ig_service.fetch_markets_by_epics_batched(epics)
+
+        chunk_sizes = sorted(len(chunk) for chunk in requested_epics())
+        assert chunk_sizes == [20, 50, 50]
+        assert isinstance(result["marketDetails"], pd.DataFrame)
+        assert result["marketDetails"].shape[0] == 120
+        assert list(result["marketDetails"]["instrument.epic"]) == epics
+        assert result["errors"] == {}
+
+    @responses.activate
+    def test_batched_partial_failure(self):
+        add_markets()
+        epics = [f"CS.D.EPIC{i}.IP" for i in range(60)]
+        epics.insert(10, BAD_EPIC)
+
+        ig_service = IGService(
+            "username", "password", "api_key", "DEMO", return_dataframe=False
+        )
+        result = ig_service.fetch_markets_by_epics_batched(",".join(epics))
+
+        found = [detail["instrument"]["epic"] for detail in result["marketDetails"]]
+        assert found == [epic for epic in epics if epic != BAD_EPIC]
+        assert list(result["errors"]) == [BAD_EPIC]
+        assert "epic.unavailable" in result["errors"][BAD_EPIC]
+        # the bad epic is isolated by bisecting its chunk, not one call per epic
+        assert len(responses.calls) < 20
+
+    @responses.activate
+    def test_batched_duplicates_and_chunk_size(self):
+        add_markets()
+        epics = ["CS.D.A.IP", "CS.D.B.IP", "CS.D.A.IP", "CS.D.C.IP"]
+
+        ig_service = IGService(
+            "username", "password", "api_key", "DEMO", return_dataframe=False
+        )
+        result = ig_service.fetch_markets_by_epics_batched(epics, chunk_size=2)
+
+        assert sorted(requested_epics()) == [
+            ["CS.D.A.IP", "CS.D.B.IP"],
+            ["CS.D.C.IP"],
+        ]
+        assert len(result["marketDetails"]) == 3
+
+    @responses.activate
+    def test_batched_allowance_exceeded_not_swallowed(self):
+        responses.add(
+            responses.GET,
+            f"{BASE_URL}/markets",
+            json={"errorCode": "error.public-api.exceeded-api-key-allowance"},
+            status=403,
+        )
+
+        ig_service = IGService("username", "password", "api_key", "DEMO")
+        with pytest.raises(ApiExceededException):
+            ig_service.fetch_markets_by_epics_batched(["CS.D.A.IP", "CS.D.B.IP"])
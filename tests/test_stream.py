@@ -0,0 +1,249 @@
+from trading_ig.rest import IGService, IGException
+from trading_ig.stream import IGStreamService, StreamGap, StreamSupervisor
+from trading_ig.streamer.candles import CandleBuilder
+from trading_ig.streamer.manager import StreamingManager
+from threading import Thread
+from urllib.parse import parse_qsl
+import responses
+import asyncio
+import json
+import pytest
+import time
+
+"""
+unit tests for the stream service, against a local fake Lightstreamer server
+"""
+
+web = pytest.importorskip("aiohttp.web")
+
+BASE_URL = "https://demo-api.ig.com/gateway/deal"
+
+# short client timeouts, so that dropped connections are noticed quickly
+CONNECTION_OPTIONS = {
+    "ForcedTransport": "WS-STREAMING",
+    "StalledTimeout": 200,
+    "ReconnectTimeout": 200,
+    "RetryDelay": 100,
+    "FirstRetryMaxDelay": 50,
+    "SessionRecoveryTimeout": 0,
+}
+
+
+class FakeLightstreamerServer:
+    """
+    Speaks enough TLCP over a websocket for the Lightstreamer client: session
+    creation (checking the CST/XST password), subscriptions, and updates. It
+    can drop every connection, to simulate a network failure, and can leave
+    logins with a bad password unanswered (silent), to simulate a hung server
+    """
+
+    PROTOCOL = "TLCP-2.5.0.lightstreamer.com"
+
+    def __init__(self):
+        self.passwords = set()
+        self.silent = False
+        self.sessions = 0
+        self.subscriptions = []
+        self._sockets = []
+        self._loop = None
+        self._ready = []
+        self._runner = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        Thread(target=asyncio.run, args=(self._serve(),), daemon=True).start()
+        deadline = time.time() + 5
+        while not self._ready:
+            assert time.time() < deadline, "fake server did not start"
+            time.sleep(0.01)
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        app = web.Application()
+        app.router.add_get("/lightstreamer", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.append(True)
+        await asyncio.Event().wait()
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse(protocols=[self.PROTOCOL])
+        await ws.prepare(request)
+        self._sockets.append(ws)
+        async for msg in ws:
+            lines = [line for line in msg.data.split("\r\n") if line]
+            for verb, params in zip(lines[::2], lines[1::2]):
+                await self._request(ws, verb, dict(parse_qsl(params)))
+            if lines == ["wsok"]:
+                await ws.send_str("WSOK\r\n")
+        return ws
+
+    async def _request(self, ws, verb, params):
+        if verb == "wsok":
+            await ws.send_str("WSOK\r\n")
+        elif verb == "create_session":
+            if params.get("LS_password") not in self.passwords:
+                if self.silent:
+                    return
+                await ws.send_str("CONERR,1,User/password check failed\r\n")
+                await ws.close()
+                return
+            self.sessions += 1
+            await ws.send_str(f"CONOK,S{self.sessions},50000,100,*\r\n")
+        elif verb in ("bind_session", "recover_session"):
+            await ws.send_str("END,31,Session not found\r\n")
+        elif verb == "control" and params.get("LS_op") == "add":
+            sub_id = params["LS_subId"]
+            items = params["LS_group"].split(" ")
+            fields = params["LS_schema"].split(" ")
+            self.subscriptions.append(items)
+            await ws.send_str(
+                f"REQOK,{params['LS_reqId']}\r\n"
+                f"SUBOK,{sub_id},{len(items)},{len(fields)}\r\n"
+            )
+            for i, item in enumerate(items, 1):
+                values = "|".join(str(self.sessions) for _ in fields)
+                await ws.send_str(f"U,{sub_id},{i},{values}\r\n")
+        elif verb == "control":
+            await ws.send_str(f"REQOK,{params.get('LS_reqId')}\r\n")
+
+    def drop(self):
+        """Drops every connection, without a clean close"""
+
+        async def abort():
+            for ws in self._sockets:
+                if ws._req is not None and ws._req.transport is not None:
+                    ws._req.transport.abort()
+            self._sockets.clear()
+
+        asyncio.run_coroutine_threadsafe(abort(), self._loop).result()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+
+
+class FakeLogin:
+    """IG session endpoint handing out new tokens on every login"""
+
+    def __init__(self, server):
+        self.server = server
+        self.logins = 0
+
+    def callback(self, request):
+        self.logins += 1
+        cst, xst = f"cst{self.logins}", f"xst{self.logins}"
+        self.server.passwords.add(f"CST-{cst}|XST-{xst}")
+        body = {"accountId": "ABC123", "lightstreamerEndpoint": self.server.url}
+        headers = {"CST": cst, "X-SECURITY-TOKEN": xst}
+        return 200, headers, json.dumps(body)
+
+
+@pytest.fixture
+def server():
+    server = FakeLightstreamerServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def login(server):
+    login = FakeLogin(server)
+    with responses.RequestsMock() as mock:
+        mock.add_callback(responses.POST, f"{BASE_URL}/session", login.callback)
+        yield login
+
+
+def wait_until(condition, timeout=15):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            pytest.fail("timed out")
+        time.sleep(0.02)
+
+
+def connect(**supervisor_args):
+    ig_service = IGService("username", "password", "api_key", "DEMO")
+    stream = IGStreamService(ig_service, connection_options=CONNECTION_OPTIONS)
+    stream.acc_number = "ABC123"
+    stream.create_session()
+    supervisor = stream.supervise(**supervisor_args)
+    wait_until(lambda: supervisor.connected)
+    return stream, supervisor
+
+
+class TestStreamSupervisor:
+    def test_resubscribes_with_new_tokens(self, server, login):
+        stream, supervisor = connect(min_wait=0.05, max_wait=0.1, check_interval=0.05)
+        builder = CandleBuilder(["1m"])
+        manager = StreamingManager(stream, candle_builder=builder)
+        manager.start_market_subscription("CS.D.A.IP")
+        wait_until(lambda: "CS.D.A.IP" in manager.markets)
+        assert manager.markets["CS.D.A.IP"].bid == 1.0
+
+        # the tokens expire while the connection is down
+        server.passwords.clear()
+        server.drop()
+
+        wait_until(lambda: supervisor.reconnects == 1 and supervisor.connected)
+        wait_until(lambda: manager.markets["CS.D.A.IP"].bid == 2.0)
+        assert login.logins == 2
+        assert server.subscriptions == [["MARKET:CS.D.A.IP"], ["MARKET:CS.D.A.IP"]]
+
+        # the outage is reported to the candle builder
+        wait_until(lambda: len(supervisor.gaps) == 1)
+        gap = supervisor.gaps[0]
+        assert isinstance(gap, StreamGap)
+        assert 0 < gap.end - gap.start < 15000
+        assert list(builder.gaps) == [(gap.start, gap.end)]
+
+        stream.disconnect()
+        assert stream.supervisor is None
+
+    def test_replaces_client_after_max_outage(self, server, login):
+        stream, supervisor = connect(max_outage=0.3, check_interval=0.05)
+        first_client = stream.ls_client
+
+        # the client's own retries hang, without any error
+        server.passwords.clear()
+        server.silent = True
+        server.drop()
+        wait_until(lambda: stream.ls_client is not first_client)
+        wait_until(lambda: supervisor.connected)
+
+        assert supervisor.reconnects == 1
+        assert first_client.getStatus() == "DISCONNECTED"
+        assert len(supervisor.gaps) == 1
+        stream.disconnect()
+
+    def test_gaps_reported_by_supervisor_set_later(self):
+        stream = IGStreamService(None)
+        builder = CandleBuilder(["1m"])
+        StreamingManager(stream, candle_builder=builder)
+        stream.supervisor = StreamSupervisor(stream)
+        stream.supervisor._emit(StreamGap(1000, 2000))
+
+        assert list(builder.gaps) == [(1000, 2000)]
+
+    def test_backoff_jitter(self):
+        supervisor = StreamSupervisor(IGStreamService(None), min_wait=1, max_wait=8)
+        waits = [supervisor.backoff(attempt) for attempt in range(6)]
+        for wait, cap in zip(waits, [1, 2, 4, 8, 8, 8]):
+            assert cap / 2 <= wait <= cap
+
+    def test_create_session_failure_raises(self, server, login, monkeypatch):
+        ig_service = IGService("username", "password", "api_key", "DEMO")
+        stream = IGStreamService(ig_service)
+
+        def fail(client):
+            raise ConnectionError("no route")
+
+        monkeypatch.setattr("trading_ig.stream.LightstreamerClient.connect", fail)
+        with pytest.raises(IGException, match="Unable to connect"):
+            stream.create_session()
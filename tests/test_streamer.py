@@ -0,0 +1,842 @@
+from trading_ig.rest import IGService
+from trading_ig.streamer.candles import CandleBuilder, timeframe_to_msecs
+from trading_ig.streamer.manager import StreamingManager
+from trading_ig.streamer.positions import PositionCache
+from trading_ig.streamer.recorder import StreamRecorder, StreamReplay
+from trading_ig.streamer.shared import PricePublisher, PriceReader
+from trading_ig.streamer.store import TickBuffer
+from trading_ig.streamer.ticker import Ticker
+from trading_ig.streamer.trade import DealConfirmations, TradeSubscription
+from trading_ig.streamer.updates import ShardedQueue, UpdateQueue
+from threading import Thread, Timer
+import multiprocessing
+import responses
+import asyncio
+import json
+import numpy as np
+import pytest
+import time
+import uuid
+
+"""
+unit tests for streaming classes
+"""
+
+BASE_URL = "https://demo-api.ig.com/gateway/deal"
+
+
+class FakeUpdate:
+    def __init__(self, fields, name=None):
+        self._fields = fields
+        self._name = name
+
+    def getItemName(self):
+        return self._name
+
+    def getChangedFields(self):
+        return self._fields
+
+    def getFields(self):
+        return self._fields
+
+
+class FakeStreamService:
+    def __init__(self):
+        self.subscriptions = []
+        self.acc_number = "ABC123"
+        self.ig_service = None
+
+    def subscribe(self, subscription):
+        self.subscriptions.append(subscription)
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.remove(subscription)
+
+    def on_gap(self, callback):
+        pass
+
+
+def tick(epic, utm, **fields):
+    values = {"UTM": str(utm)}
+    values.update({k: str(v) for k, v in fields.items()})
+    return FakeUpdate(values, f"CHART:{epic}:TICK")
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            pytest.fail("timed out")
+        time.sleep(0.01)
+
+
+def confirm(deal_reference, status="ACCEPTED"):
+    return {"dealReference": deal_reference, "dealStatus": status}
+
+
+class TestDealConfirmations:
+    def test_trade_subscription(self):
+        sub = TradeSubscription("ABC123")
+        assert sub.getItems() == ["TRADE:ABC123"]
+        assert sub.getMode() == "DISTINCT"
+        assert sub.getFields() == ["CONFIRMS", "OPU", "WOU"]
+
+    def test_confirmation_streamed_before_wait(self):
+        confirmations = DealConfirmations()
+        update = FakeUpdate({"CONFIRMS": json.dumps(confirm("REF1")), "OPU": None})
+        confirmations.onItemUpdate(update)
+        confirmations.onItemUpdate(FakeUpdate({"CONFIRMS": None, "OPU": "{}"}))
+
+        assert confirmations.wait("REF1", timeout=0) == confirm("REF1")
+        assert confirmations.wait("REF2", timeout=0) is None
+
+    def test_confirmation_wakes_waiter(self):
+        confirmations = DealConfirmations()
+        Timer(0.05, confirmations.on_confirmation, [confirm("REF1")]).start()
+
+        assert confirmations.wait("REF1", timeout=5) == confirm("REF1")
+        reference, latency = confirmations.latencies[-1]
+        assert reference == "REF1"
+        assert 0 < latency < 5
+
+    def test_retained_confirmations_bounded(self):
+        confirmations = DealConfirmations(max_retained=2)
+        for i in range(3):
+            confirmations.on_confirmation(confirm(f"REF{i}"))
+
+        assert confirmations.wait("REF0", timeout=0) is None
+        assert confirmations.wait("REF2", timeout=0) == confirm("REF2")
+
+    def test_wait_async(self):
+        confirmations = DealConfirmations()
+
+        async def deal():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, confirmations.on_confirmation, confirm("REF1"))
+            timed_out = await confirmations.wait_async("REF0", timeout=0.01)
+            confirmed = await confirmations.wait_async("REF1", timeout=5)
+            return timed_out, confirmed
+
+        assert asyncio.run(deal()) == (None, confirm("REF1"))
+        assert confirmations._futures == {}
+
+    def test_timed_out_wait_is_forgotten(self):
+        confirmations = DealConfirmations()
+        assert confirmations.wait("REF1", timeout=0.01) is None
+        assert confirmations._futures == {}
+
+        # a waiter timing out leaves other waiters on the same deal waiting
+        results = []
+        waiter = Thread(target=lambda: results.append(confirmations.wait("REF2", 5)))
+        waiter.start()
+        while "REF2" not in confirmations._futures:
+            time.sleep(0.001)
+        assert confirmations.wait("REF2", timeout=0.01) is None
+        assert len(confirmations._futures["REF2"]) == 1
+        confirmations.on_confirmation(confirm("REF2"))
+        waiter.join()
+        assert results == [confirm("REF2")]
+        assert confirmations._futures == {}
+
+    @responses.activate
+    def test_dealing_uses_streamed_confirmation(self):
+        responses.add(
+            responses.POST,
+            f"{BASE_URL}/workingorders/otc/DEAL1",
+            json={"dealReference": "REF1"},
+            status=200,
+        )
+
+        ig_service = IGService("username", "password", "api_key", "DEMO")
+        ig_service.deal_confirmations = DealConfirmations()
+        ig_service.deal_confirmations.on_confirmation(confirm("REF1"))
+        result = ig_service.delete_working_order("DEAL1")
+
+        assert result == confirm("REF1")
+        assert len(responses.calls) == 1
+        source, latency = ig_service.confirmation_latencies[-1]
+        assert source == "stream"
+
+    @responses.activate
+    def test_dealing_falls_back_to_rest(self):
+        responses.add(
+            responses.POST,
+            f"{BASE_URL}/workingorders/otc/DEAL1",
+            json={"dealReference": "REF1"},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            f"{BASE_URL}/confirms/REF1",
+            json=confirm("REF1"),
+            status=200,
+        )
+
+        ig_service = IGService("username", "password", "api_key", "DEMO")
+        ig_service.deal_confirmations = DealConfirmations()
+        ig_service.CONFIRMATION_TIMEOUT = 0.01
+        result = ig_service.delete_working_order("DEAL1")
+
+        assert result == confirm("REF1")
+        assert len(responses.calls) == 2
+        assert ig_service.confirmation_latencies[-1][0] == "rest"
+
+
+class TestTickStore:
+    def test_multi_epic_subscription(self):
+        service = FakeStreamService()
+        manager = StreamingManager(service)
+        sub = manager.start_tick_subscription(["CS.D.A.IP", "CS.D.B.IP"])
+        single = manager.start_tick_subscription("CS.D.C.IP")
+
+        assert sub.getItems() == ["CHART:CS.D.A.IP:TICK", "CHART:CS.D.B.IP:TICK"]
+        assert sub.epics == ["CS.D.A.IP", "CS.D.B.IP"]
+        assert service.subscriptions == [sub, single]
+
+        manager.stop_tick_subscription("CS.D.A.IP")
+        assert service.subscriptions == [sub, single]
+        manager.stop_tick_subscription(["CS.D.B.IP", "CS.D.C.IP"])
+        assert service.subscriptions == []
+
+    def test_ring_buffer_wraps(self):
+        buffer = TickBuffer("CS.D.A.IP", capacity=4)
+        assert len(buffer) == 0
+        assert buffer.column("bid").size == 0
+
+        for i in range(6):
+            buffer.append(1000 + i, 1.0 + i, 1.5 + i, np.nan, i)
+
+        assert len(buffer) == 4
+        assert buffer.total == 6
+        assert list(buffer.column("timestamp")) == [1002, 1003, 1004, 1005]
+        assert list(buffer.column("bid", 2)) == [5.0, 6.0]
+        assert list(buffer.mid(3)) == [4.25, 5.25, 6.25]
+        last = buffer.last(10)
+        assert list(last["volume"]) == [2, 3, 4, 5]
+
+    def test_views_are_zero_copy_and_read_only(self):
+        buffer = TickBuffer("CS.D.A.IP", capacity=3)
+        for i in range(5):
+            buffer.append(i, float(i), float(i), float(i), i)
+
+        view = buffer.column("bid")
+        assert view.base is not None
+        with pytest.raises(ValueError):
+            view[0] = 0.0
+
+    def test_consumer_fills_store(self):
+        manager = StreamingManager(FakeStreamService(), tick_capacity=100)
+        manager.on_update(tick("CS.D.A.IP", 1000, BID=1.0, OFR=1.2))
+        manager.on_update(tick("CS.D.A.IP", 2000, BID=1.1))
+        manager.on_update(tick("CS.D.B.IP", 3000, BID=5.0, OFR=5.5, LTV=7))
+
+        store = manager.tick_store
+        wait_until(lambda: "CS.D.B.IP" in store)
+        assert sorted(store.epics) == ["CS.D.A.IP", "CS.D.B.IP"]
+        ticks = store["CS.D.A.IP"].last()
+        assert list(ticks["timestamp"]) == [1000, 2000]
+        assert list(ticks["bid"]) == [1.0, 1.1]
+        # fields missing from an update carry the previous value forward
+        assert list(ticks["offer"]) == [1.2, 1.2]
+        assert list(store["CS.D.B.IP"].column("volume")) == [7]
+
+
+MINUTE = 60 * 1000
+
+
+def candle(utm, bid, offer, ticks=1, end="0"):
+    fields = {"UTM": str(utm), "CONS_TICK_COUNT": str(ticks), "CONS_END": end}
+    for name, price in [("BID", bid), ("OFR", offer)]:
+        for i, part in enumerate(["OPEN", "HIGH", "LOW", "CLOSE"]):
+            fields[f"{name}_{part}"] = str(price[i])
+    return fields
+
+
+class TestCandleBuilder:
+    def test_timeframes(self):
+        assert timeframe_to_msecs("5m") == 5 * MINUTE
+        assert timeframe_to_msecs("1h") == 60 * MINUTE
+        with pytest.raises(ValueError):
+            timeframe_to_msecs("5x")
+
+    def test_ticks_to_candles(self):
+        builder = CandleBuilder(["1m", "5m"], price="bid")
+        emitted = []
+        builder.on_candle(lambda *args: emitted.append(args))
+
+        prices = [5, 7, 3, 4, 6, 8, 2]
+        for i, price in enumerate(prices):
+            builder.add_tick("CS.D.A.IP", i * 30 * 1000, price)
+
+        assert builder.rows("CS.D.A.IP", "1m") == [
+            [0, 5, 7, 5, 7, 2],
+            [MINUTE, 3, 4, 3, 4, 2],
+            [2 * MINUTE, 6, 8, 6, 8, 2],
+        ]
+        assert builder.rows("CS.D.A.IP", "5m") == []
+        assert builder.rows("CS.D.A.IP", "5m", include_open=True) == [
+            [0, 5, 8, 2, 2, 7]
+        ]
+        assert emitted[0] == ("CS.D.A.IP", "1m", [0, 5, 7, 5, 7, 2])
+        assert len(emitted) == 3
+
+        builder.close_expired(now=5 * MINUTE)
+        assert emitted[-1] == ("CS.D.A.IP", "5m", [0, 5, 8, 2, 2, 7])
+        assert len(builder.rows("CS.D.A.IP", "1m")) == 4
+
+    def test_late_tick_after_close_expired(self):
+        builder = CandleBuilder(["1m"])
+        emitted = []
+        builder.on_candle(lambda *args: emitted.append(args))
+
+        builder.add_tick("CS.D.A.IP", 10 * 1000, 5)
+        builder.close_expired(now=MINUTE)
+        # late tick for the candle already emitted
+        builder.add_tick("CS.D.A.IP", 50 * 1000, 9)
+        builder.add_tick("CS.D.A.IP", MINUTE + 10 * 1000, 6)
+        builder.close_expired(now=2 * MINUTE)
+
+        assert [args[2][0] for args in emitted] == [0, MINUTE]
+        assert builder.rows("CS.D.A.IP", "1m") == [
+            [0, 5, 5, 5, 5, 1],
+            [MINUTE, 6, 6, 6, 6, 1],
+        ]
+
+    def test_retained_window_bounded(self):
+        builder = CandleBuilder(["1m"], maxlen=3, volume="ltv")
+        for i in range(10):
+            builder.add_tick("CS.D.A.IP", i * MINUTE, 1.0, volume=i)
+
+        rows = builder.rows("CS.D.A.IP", "1m")
+        assert [row[0] for row in rows] == [6 * MINUTE, 7 * MINUTE, 8 * MINUTE]
+        assert [row[5] for row in rows] == [6, 7, 8]
+
+    def test_ltv_counted_once(self):
+        builder = CandleBuilder(["1m"], volume="ltv")
+        ticker = Ticker("CS.D.A.IP")
+        ticker.populate({"UTM": "1000", "BID": "1.0", "OFR": "1.2", "LTV": "5"})
+        builder.add_ticker(ticker)
+        # price only updates keep the last traded volume
+        for utm in ("2000", "3000"):
+            ticker.populate({"UTM": utm, "BID": "1.1"})
+            builder.add_ticker(ticker)
+        ticker.populate({"UTM": "4000", "LTV": "3"})
+        builder.add_ticker(ticker)
+
+        assert builder.rows("CS.D.A.IP", "1m", include_open=True)[0][5] == 8
+
+    def test_candle_updates_folded(self):
+        builder = CandleBuilder(["5m"])
+        epic = "CS.D.A.IP"
+        # the open 1 minute candle is updated, then completed
+        builder.add_candle_update(
+            epic, "1MINUTE", candle(0, [1, 2, 1, 1], [3, 4, 3, 3])
+        )
+        builder.add_candle_update(
+            epic, "1MINUTE", candle(0, [1, 3, 1, 2], [3, 5, 3, 4], ticks=4, end="1")
+        )
+        # the next one is only folded in once replaced by a later candle
+        builder.add_candle_update(
+            epic, "1MINUTE", candle(MINUTE, [2, 2, 0, 0], [4, 4, 2, 2], ticks=2)
+        )
+        builder.add_candle_update(
+            epic, "1MINUTE", candle(MINUTE, [2, 2, 0, 1], [4, 4, 2, 3])
+        )
+        assert builder.rows(epic, "5m", include_open=True) == [[0, 2, 4, 2, 3, 4]]
+        builder.add_candle_update(epic, "1MINUTE", candle(2 * MINUTE, [1] * 4, [3] * 4))
+        assert builder.rows(epic, "5m", include_open=True) == [[0, 2, 4, 1, 2, 5]]
+
+        builder.add_candle_update(epic, "1MINUTE", {"UTM": None})
+
+    def test_gap_backfill(self):
+        builder = CandleBuilder(["1m", "5m"])
+        gaps = []
+        builder.on_gap(lambda *gap: gaps.append(gap))
+        builder.add_tick("CS.D.A.IP", 0, 1.0)
+        builder.add_tick("CS.D.A.IP", 3 * MINUTE, 3.0)
+        builder.mark_gap(MINUTE - 500, 2 * MINUTE + 500)
+
+        assert gaps == [(MINUTE - 500, 2 * MINUTE + 500)]
+        assert builder.gap_window(*gaps[0], "1m") == (0, 3 * MINUTE)
+        assert builder.gap_window(*gaps[0], "5m") == (0, 5 * MINUTE)
+
+        fetched = [[MINUTE, 1, 2, 1, 2, 5], [2 * MINUTE, 2, 3, 2, 3, 5]]
+        builder.backfill("CS.D.A.IP", "1m", fetched + [[3 * MINUTE, 9, 9, 9, 9, 9]])
+        assert builder.rows("CS.D.A.IP", "1m", include_open=True) == [
+            [0, 1.0, 1.0, 1.0, 1.0, 1],
+            [MINUTE, 1, 2, 1, 2, 5],
+            [2 * MINUTE, 2, 3, 2, 3, 5],
+            [3 * MINUTE, 3.0, 3.0, 3.0, 3.0, 1],
+        ]
+
+    def test_backfill_without_open_candle(self):
+        builder = CandleBuilder(["1m"])
+        builder.backfill(
+            "CS.D.A.IP", "1m", [[0, 1, 2, 1, 2, 5], [MINUTE, 2, 3, 2, 3, 5]]
+        )
+        # a tick for the last backfilled candle doesn't open it again
+        builder.add_tick("CS.D.A.IP", MINUTE + 500, 9.0)
+        builder.add_tick("CS.D.A.IP", 2 * MINUTE, 4.0)
+
+        assert builder.rows("CS.D.A.IP", "1m", include_open=True) == [
+            [0, 1, 2, 1, 2, 5],
+            [MINUTE, 2, 3, 2, 3, 5],
+            [2 * MINUTE, 4.0, 4.0, 4.0, 4.0, 1],
+        ]
+
+    def test_dataframe_layout(self):
+        builder = CandleBuilder(["1m"])
+        builder.add_tick("CS.D.A.IP", 1700000000000, 1.5)
+        frame = builder.dataframe("CS.D.A.IP", "1m", include_open=True)
+
+        assert list(frame.columns) == ["date", "open", "high", "low", "close", "volume"]
+        assert str(frame["date"].dtype) == "datetime64[ns, UTC]"
+        assert frame["date"][0].minute == 13
+        assert builder.dataframe("CS.D.B.IP", "1m").empty
+
+    def test_manager_feeds_builder(self):
+        builder = CandleBuilder(["1m"])
+        manager = StreamingManager(FakeStreamService(), candle_builder=builder)
+        manager.on_update(tick("CS.D.A.IP", 1000, BID=1.0, OFR=1.2))
+        manager.on_update(tick("CS.D.A.IP", MINUTE, BID=2.0, OFR=2.2))
+
+        wait_until(lambda: builder.rows("CS.D.A.IP", "1m"))
+        assert builder.rows("CS.D.A.IP", "1m") == [[0, 1.1, 1.1, 1.1, 1.1, 1]]
+
+
+class TestUpdateQueue:
+    def test_batches_in_order(self):
+        queue = UpdateQueue()
+        for i in range(5):
+            queue.put(tick("CS.D.A.IP", i))
+
+        first = queue.get_batch(3)
+        assert [update.getChangedFields()["UTM"] for _, update, _ in first] == [
+            "0",
+            "1",
+            "2",
+        ]
+        assert len(queue.get_batch(3)) == 2
+        assert queue.get_batch(3, timeout=0.01) == []
+        queue.close()
+        assert queue.get_batch() is None
+
+    def test_conflates_when_full(self):
+        queue = UpdateQueue(maxsize=2)
+        queue.put(tick("CS.D.A.IP", 1, BID=1.0, OFR=1.2))
+        queue.put(tick("CS.D.B.IP", 1, BID=5.0))
+        queue.put(tick("CS.D.A.IP", 2, BID=1.1))
+        queue.put(tick("CS.D.A.IP", 3, LTP=1.15))
+        queue.put(tick("CS.D.C.IP", 1, BID=9.0))
+
+        assert queue.conflated == 2
+        assert queue.high_water == 3
+        batch = queue.get_batch()
+        assert [name for name, _, _ in batch] == [
+            "CHART:CS.D.A.IP:TICK",
+            "CHART:CS.D.B.IP:TICK",
+            "CHART:CS.D.C.IP:TICK",
+        ]
+        assert batch[0][1].getChangedFields() == {
+            "UTM": "3",
+            "BID": "1.1",
+            "OFR": "1.2",
+            "LTP": "1.15",
+        }
+
+        # once drained, updates for the item are queued again
+        queue.put(tick("CS.D.A.IP", 4))
+        assert len(queue) == 1
+
+    @responses.activate
+    def test_events_never_conflated(self):
+        mock_positions_and_orders()
+        queue = UpdateQueue(maxsize=1)
+        deals = [f"DEAL{i}" for i in range(5)]
+        for deal_id in deals:
+            opu = {"dealId": deal_id, "epic": "CS.D.A.IP", "direction": "BUY"}
+            opu.update({"size": 1, "status": "OPEN"})
+            queue.put(FakeUpdate(trade_update(OPU=opu), "TRADE:ABC123"))
+        # a completed chart candle is kept, the open one after it conflated
+        for utm, cons_end in [(0, "0"), (0, "1"), (60000, "0"), (60000, "0")]:
+            queue.put(FakeUpdate({"UTM": utm, "CONS_END": cons_end}, "CHART:A:1MINUTE"))
+
+        assert queue.conflated == 2
+        batch = queue.get_batch()
+        cache = PositionCache("ABC123")
+        cache.bootstrap(IGService("username", "password", "api_key", "DEMO"))
+        for name, update, _ in batch:
+            if name.startswith("TRADE:"):
+                cache.on_trade_update(update.getChangedFields())
+        assert all(cache.position(deal_id) is not None for deal_id in deals)
+        assert cache.net_size("CS.D.A.IP") == len(deals)
+        candles = [u.getChangedFields() for n, u, _ in batch if n.startswith("CHART")]
+        assert candles == [
+            {"UTM": 0, "CONS_END": "1"},
+            {"UTM": 60000, "CONS_END": "0"},
+        ]
+
+    def test_sharded_by_item(self):
+        queue = ShardedQueue(shards=4)
+        epics = [f"CS.D.EPIC{i}.IP" for i in range(40)]
+        for epic in epics:
+            for i in range(3):
+                queue.put(tick(epic, i))
+
+        assert queue.qsize() == 120
+        seen = {}
+        for index, shard in enumerate(queue.shards):
+            assert 0 < len(shard) < 120
+            for name, _, _ in shard.get_batch(1000):
+                assert seen.setdefault(name, index) == index
+
+    def test_manager_workers_and_metrics(self):
+        manager = StreamingManager(FakeStreamService(), workers=3, batch_size=10)
+        for i in range(50):
+            manager.on_update(tick(f"CS.D.EPIC{i % 10}.IP", i, BID=i))
+        manager.on_update(FakeUpdate({}, "UNKNOWN:ITEM"))
+
+        wait_until(lambda: manager.metrics()["processed"] == 51)
+        metrics = manager.metrics()
+        assert metrics["queued"] == 51
+        assert metrics["depth"] == 0
+        assert metrics["max_lag"] >= metrics["lag"] >= 0
+        assert len(metrics["shards"]) == 3
+        assert len(manager.tickers) == 10
+        assert manager.tickers["CS.D.EPIC9.IP"].bid == 49.0
+
+
+class TestTickerReadiness:
+    def test_wait_for_tickers(self):
+        manager = StreamingManager(FakeStreamService())
+        epics = [f"CS.D.EPIC{i}.IP" for i in range(100)]
+        manager.on_update(tick(epics[0], 1000, BID=1.0))
+
+        def send():
+            for epic in epics[1:]:
+                manager.on_update(tick(epic, 2000, BID=2.0))
+
+        Timer(0.05, send).start()
+        started = time.perf_counter()
+        tickers = manager.wait_for_tickers(epics, timeout=5)
+
+        assert time.perf_counter() - started < 2
+        assert list(tickers) == epics
+        assert tickers[epics[0]].bid == 1.0
+        assert tickers[epics[-1]].bid == 2.0
+        assert manager.ticker(epics[5]) is tickers[epics[5]]
+
+    def test_wait_for_tickers_timeout(self):
+        manager = StreamingManager(FakeStreamService())
+        manager.on_update(tick("CS.D.A.IP", 1000, BID=1.0))
+
+        with pytest.raises(Exception, match="CS.D.B.IP"):
+            manager.wait_for_tickers(["CS.D.A.IP", "CS.D.B.IP"], timeout=0.1)
+        with pytest.raises(Exception, match="No ticker found for CS.D.C.IP"):
+            manager.ticker("CS.D.C.IP", timeout_length=0.01)
+
+    def test_wait_for_tickers_async(self):
+        manager = StreamingManager(FakeStreamService())
+
+        async def ready():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, manager.on_update, tick("CS.D.A.IP", 1, BID=3.0))
+            tickers = await manager.wait_for_tickers_async(["CS.D.A.IP"], timeout=5)
+            with pytest.raises(Exception):
+                await manager.wait_for_tickers_async(["CS.D.B.IP"], timeout=0.01)
+            return tickers
+
+        assert asyncio.run(ready())["CS.D.A.IP"].bid == 3.0
+
+
+class TestStreamObjects:
+    def test_ticker_populate(self):
+        ticker = Ticker("CS.D.A.IP")
+        assert ticker.timestamp is None
+        assert np.isnan(ticker.bid)
+
+        ticker.populate({"UTM": "1700000000000", "BID": "1.5", "LTV": "3"})
+        ticker.populate({"BID": None, "OFR": "", "LTP": "bad", "XYZ": "1"})
+
+        assert ticker.timestamp_ms == 1700000000000
+        assert ticker.timestamp.timestamp() == 1700000000
+        assert ticker.bid == 1.5
+        assert np.isnan(ticker.offer)
+        assert np.isnan(ticker.last_traded_price)
+        assert ticker.last_traded_volume == 3
+        with pytest.raises(AttributeError):
+            ticker.not_a_field = 1
+
+    def test_manager_market_account_trade(self):
+        service = FakeStreamService()
+        manager = StreamingManager(service)
+        manager.start_market_subscription("CS.D.A.IP")
+        manager.start_account_subscription()
+        assert [sub.getItems() for sub in service.subscriptions] == [
+            ["MARKET:CS.D.A.IP"],
+            ["ACCOUNT:ABC123"],
+        ]
+
+        manager.on_update(
+            FakeUpdate(
+                {"BID": "1.5", "MARKET_STATE": "TRADEABLE", "MARKET_DELAY": "0"},
+                "MARKET:CS.D.A.IP",
+            )
+        )
+        manager.on_update(
+            FakeUpdate({"FUNDS": "1000", "PNL": "-2.5"}, "ACCOUNT:ABC123")
+        )
+        manager.on_update(
+            FakeUpdate(
+                {"OPU": json.dumps({"dealId": "D1"}), "WOU": None}, "TRADE:ABC123"
+            )
+        )
+
+        wait_until(lambda: "ABC123" in manager.trades)
+        market = manager.markets["CS.D.A.IP"]
+        assert (market.bid, market.market_state) == (1.5, "TRADEABLE")
+        account = manager.accounts["ABC123"]
+        assert (account.funds, account.pnl) == (1000.0, -2.5)
+        assert manager.trades["ABC123"].opu == {"dealId": "D1"}
+        assert manager.trades["ABC123"].wou is None
+
+
+class TestStreamRecorder:
+    def record(self, path, updates, batch_size=2):
+        pytest.importorskip("pyarrow")
+        with StreamRecorder(path, batch_size=batch_size) as recorder:
+            for received, update in updates:
+                recorder.record(update, received=received)
+        return recorder
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "stream.parquet")
+        updates = [
+            (1_000_000_000, tick("CS.D.A.IP", 1000, BID=1.0, OFR=1.2)),
+            (1_100_000_000, tick("CS.D.B.IP", 1100, BID=5.0)),
+            (1_200_000_000, tick("CS.D.A.IP", 1200, BID=1.1)),
+        ]
+        recorder = self.record(path, updates)
+        assert recorder.count == 3
+
+        replayed = list(StreamReplay(path).updates())
+        assert [u.received for u in replayed] == [r for r, _ in updates]
+        assert [u.getItemName() for u in replayed] == [
+            u.getItemName() for _, u in updates
+        ]
+        assert replayed[2].getChangedFields() == {"UTM": "1200", "BID": "1.1"}
+        # fields accumulate per item
+        assert replayed[2].getFields() == {"UTM": "1200", "BID": "1.1", "OFR": "1.2"}
+        assert replayed[2].getValue("OFR") == "1.2"
+        assert not replayed[0].isSnapshot()
+
+        only_b = list(StreamReplay(path).updates(items=["CHART:CS.D.B.IP:TICK"]))
+        assert [u.received for u in only_b] == [1_100_000_000]
+
+    def test_replay_speed(self, tmp_path):
+        path = str(tmp_path / "stream.parquet")
+        updates = [(i * 100_000_000, tick("CS.D.A.IP", i)) for i in range(4)]
+        self.record(path, updates)
+        replay = StreamReplay(path)
+
+        received = []
+        stats = replay.replay(received.append)
+        assert stats["count"] == 4
+        assert stats["elapsed"] < 0.2
+
+        # 300ms recorded, at 3x speed
+        stats = replay.replay(received.append, speed=3)
+        assert 0.09 <= stats["elapsed"] < 0.5
+        assert len(received) == 8
+
+    def test_record_and_replay_through_manager(self, tmp_path):
+        path = str(tmp_path / "stream.parquet")
+        pytest.importorskip("pyarrow")
+        service = FakeStreamService()
+        manager = StreamingManager(service, recorder=StreamRecorder(path))
+        sub = manager.start_tick_subscription(["CS.D.A.IP", "CS.D.B.IP"])
+        assert manager.recorder in sub.getListeners()
+        for listener in sub.getListeners():
+            listener.onItemUpdate(tick("CS.D.A.IP", 1000, BID=1.0, OFR=1.2))
+            listener.onItemUpdate(tick("CS.D.B.IP", 2000, BID=5.0))
+        wait_until(lambda: "CS.D.B.IP" in manager.tickers)
+        manager.recorder.close()
+
+        # the same stream, replayed offline
+        replayed = StreamingManager(None, tick_capacity=10)
+        assert StreamReplay(path).replay(replayed)["count"] == 2
+        tickers = replayed.wait_for_tickers(["CS.D.A.IP", "CS.D.B.IP"])
+        for epic, ticker in tickers.items():
+            live = manager.tickers[epic]
+            assert (ticker.timestamp_ms, ticker.bid) == (live.timestamp_ms, live.bid)
+        assert np.isnan(tickers["CS.D.B.IP"].offer)
+
+
+@pytest.fixture
+def publisher():
+    with PricePublisher(f"test_{uuid.uuid4().hex[:12]}", max_epics=2, history=4) as pub:
+        yield pub
+
+
+def read_shared_prices(name, epic, ticks, results):
+    """Reader process: checks that every tick read is whole"""
+    reader = PriceReader(name)
+    results.put("ready")
+    torn = reads = 0
+    while reader.total(epic) < ticks:
+        rows = reader.last(epic, 4)
+        latest = reader.latest(epic)
+        for timestamp, bid, offer in zip(rows["timestamp"], rows["bid"], rows["offer"]):
+            torn += not (bid == timestamp and offer == timestamp + 1)
+        if latest is not None:
+            torn += latest["offer"] != latest["timestamp"] + 1
+        reads += 1
+    reader.close()
+    results.put((reads, torn))
+
+
+class TestSharedPrices:
+    def test_publish_and_read(self, publisher):
+        reader = PriceReader(publisher.name)
+        assert reader.latest("CS.D.A.IP") is None
+        assert len(reader.last("CS.D.A.IP")["bid"]) == 0
+
+        for i in range(6):
+            publisher.publish("CS.D.A.IP", 1000 + i, i, i + 0.5, np.nan, i)
+        publisher.publish("CS.D.B.IP", 2000, 5.0, 5.5, 5.2, 1)
+        # all the slots are taken
+        publisher.publish("CS.D.C.IP", 3000, 1.0, 1.1, 1.0, 1)
+
+        assert reader.epics == ["CS.D.A.IP", "CS.D.B.IP"]
+        assert reader.latest("CS.D.A.IP")["timestamp"] == 1005
+        assert reader.latest("CS.D.B.IP")["ltp"] == 5.2
+        assert reader.latest("CS.D.C.IP") is None
+        # the ring buffer holds the last 4 ticks
+        ticks = reader.last("CS.D.A.IP")
+        assert list(ticks["timestamp"]) == [1002, 1003, 1004, 1005]
+        assert list(ticks["bid"]) == [2.0, 3.0, 4.0, 5.0]
+        assert list(reader.last("CS.D.A.IP", 2)["offer"]) == [4.5, 5.5]
+        assert reader.total("CS.D.A.IP") == 6
+        reader.close()
+
+    def test_reader_process(self, publisher):
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        ticks = 20000
+        process = context.Process(
+            target=read_shared_prices,
+            args=(publisher.name, "CS.D.A.IP", ticks, results),
+        )
+        process.start()
+        assert results.get(timeout=30) == "ready"
+        for i in range(1, ticks + 1):
+            publisher.publish("CS.D.A.IP", i, i, i + 1, i, i)
+            if i % 1000 == 0:
+                time.sleep(0.01)
+        reads, torn = results.get(timeout=30)
+        process.join(timeout=5)
+
+        assert reads > 0
+        assert torn == 0
+
+    def test_manager_publishes_ticks(self, publisher):
+        manager = StreamingManager(FakeStreamService(), publisher=publisher)
+        manager.on_update(tick("CS.D.A.IP", 1000, BID=1.0, OFR=1.2))
+        manager.on_update(tick("CS.D.A.IP", 2000, BID=1.1))
+
+        reader = PriceReader(publisher.name)
+        wait_until(lambda: reader.total("CS.D.A.IP") == 2)
+        latest = reader.latest("CS.D.A.IP")
+        assert (latest["timestamp"], latest["bid"], latest["offer"]) == (2000, 1.1, 1.2)
+        reader.close()
+
+
+def mock_positions_and_orders():
+    for endpoint, path in [
+        ("positions", "tests/data/positions_v2.json"),
+        ("workingorders", "tests/data/workingorders_v2.json"),
+    ]:
+        with open(path) as file:
+            responses.add(responses.GET, f"{BASE_URL}/{endpoint}", json=json.load(file))
+
+
+def trade_update(**fields):
+    values = {"CONFIRMS": None, "OPU": None, "WOU": None}
+    values.update({key: json.dumps(value) for key, value in fields.items()})
+    return values
+
+
+class TestPositionCache:
+    @pytest.mark.parametrize("return_dataframe", [True, False])
+    @responses.activate
+    def test_bootstrap_then_stream(self, return_dataframe):
+        mock_positions_and_orders()
+        ig_service = IGService(
+            "username", "password", "api_key", "DEMO", return_dataframe=return_dataframe
+        )
+        cache = PositionCache("ABC123")
+
+        # streamed before the REST snapshot is taken, applied after it
+        opu = {"dealId": "NEW1", "epic": "CS.D.A.IP", "direction": "SELL", "size": 2}
+        cache.on_trade_update(trade_update(OPU={**opu, "status": "OPEN"}))
+        cache.bootstrap(ig_service)
+
+        assert cache.ready
+        assert len(responses.calls) == 2
+        first = cache.position("ABCDE12345")
+        assert (first["epic"], first["size"], first["level"]) == (
+            "MT.D.ABC.Month1.IP",
+            10.0,
+            17000.0,
+        )
+        assert cache.order("ABCD1234")["orderLevel"] == 2000.0
+        assert cache.net_size("CS.D.A.IP") == -2
+
+        update = {"dealId": "ABCDE12345", "status": "UPDATED", "stopLevel": 16000.0}
+        cache.on_trade_update(trade_update(OPU=update))
+        cache.on_trade_update(
+            trade_update(OPU={"dealId": "ABCDE54321", "status": "DELETED"})
+        )
+        wou = {"dealId": "ABCD1234", "status": "UPDATED", "level": 1990.0, "size": 1}
+        cache.on_trade_update(trade_update(WOU=wou))
+        closed = {
+            "dealReference": "REF1",
+            "dealStatus": "ACCEPTED",
+            "affectedDeals": [{"dealId": "NEW1", "status": "FULLY_CLOSED"}],
+        }
+        cache.on_trade_update(trade_update(CONFIRMS=closed))
+        cache.on_account_update({"FUNDS": "1000", "PNL": "-2.5"})
+
+        # positions handed out are not changed by later updates
+        assert first["stopLevel"] is None or np.isnan(first["stopLevel"])
+        updated = cache.position("ABCDE12345")
+        assert (updated["stopLevel"], updated["level"]) == (16000.0, 17000.0)
+        assert cache.position("ABCDE54321") is None
+        assert cache.positions_for("CS.D.A.IP") == []
+        assert [p["dealId"] for p in cache.positions] == ["ABCDE12345"]
+        order = cache.orders_for("CS.D.CFDGOLD.CFDGC.IP")[0]
+        assert (order["orderLevel"], order["orderSize"]) == (1990.0, 1)
+        assert cache.account.funds == 1000.0
+        assert list(cache.positions_frame()["dealId"]) == ["ABCDE12345"]
+        assert cache.orders_frame()["orderLevel"][0] == 1990.0
+
+    @responses.activate
+    def test_manager_position_cache(self):
+        mock_positions_and_orders()
+        service = FakeStreamService()
+        service.ig_service = IGService("username", "password", "api_key", "DEMO")
+        manager = StreamingManager(service)
+        cache = manager.start_position_cache()
+
+        assert manager.position_cache is cache
+        assert [sub.getItems() for sub in service.subscriptions] == [
+            ["TRADE:ABC123"],
+            ["ACCOUNT:ABC123"],
+        ]
+        opu = {"dealId": "NEW1", "epic": "CS.D.A.IP", "direction": "BUY", "size": 1}
+        manager.on_update(FakeUpdate(trade_update(OPU=opu), "TRADE:ABC123"))
+        manager.on_update(FakeUpdate({"AVAILABLE_TO_DEAL": "50"}, "ACCOUNT:ABC123"))
+
+        wait_until(lambda: cache.account.available_to_deal == 50.0)
+        assert cache.net_size("CS.D.A.IP") == 1
+        assert len(cache.positions) == 3
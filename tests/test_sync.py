@@ -0,0 +1,180 @@
+from trading_ig.rest import IGService
+from trading_ig.sync import AccountSync, ActivityRecord, TransactionRecord
+from urllib.parse import urlparse, parse_qs
+import responses
+import json
+import pandas as pd
+import pytest
+
+"""
+unit tests for incremental account history sync
+"""
+
+pytest.importorskip("pyarrow")
+
+BASE_URL = "https://demo-api.ig.com/gateway/deal"
+
+
+def activity(date, deal_id, status="ACCEPTED"):
+    return {
+        "date": date,
+        "epic": "CS.D.GBPUSD.TODAY.IP",
+        "period": "DFB",
+        "dealId": deal_id,
+        "channel": "PUBLIC_WEB_API",
+        "type": "POSITION",
+        "status": status,
+        "description": f"Position opened: {deal_id}",
+        "details": None,
+    }
+
+
+def transaction(date, reference):
+    return {
+        "date": date[:10],
+        "dateUtc": date,
+        "openDateUtc": date,
+        "instrumentName": "GBP/USD",
+        "period": "DFB",
+        "profitAndLoss": "£1.00",
+        "transactionType": "DEAL",
+        "reference": reference,
+        "openLevel": "1.3",
+        "closeLevel": "1.4",
+        "size": "+1",
+        "currency": "£",
+        "cashTransaction": False,
+    }
+
+
+class FakeHistory:
+    """serves activities and transactions newer than the 'from' param"""
+
+    def __init__(self):
+        self.activities = []
+        self.transactions = []
+        self.page_size = 2
+
+    def activity_callback(self, request):
+        query = parse_qs(urlparse(request.url).query)
+        from_date = query["from"][0]
+        acts = [a for a in self.activities if a["date"] >= from_date]
+        body = {"activities": acts, "metadata": {"paging": {"next": None}}}
+        return 200, {}, json.dumps(body)
+
+    def transaction_callback(self, request):
+        query = parse_qs(urlparse(request.url).query)
+        from_date = query["from"][0]
+        page = int(query["pageNumber"][0])
+        trans = [t for t in self.transactions if t["dateUtc"] >= from_date]
+        pages = max(1, -(-len(trans) // self.page_size))
+        start = (page - 1) * self.page_size
+        body = {
+            "transactions": trans[start : start + self.page_size],
+            "metadata": {
+                "pageData": {"pageNumber": page, "pageSize": 2, "totalPages": pages}
+            },
+        }
+        return 200, {}, json.dumps(body)
+
+    def register(self):
+        responses.add_callback(
+            responses.GET,
+            f"{BASE_URL}/history/activity/",
+            callback=self.activity_callback,
+        )
+        responses.add_callback(
+            responses.GET,
+            f"{BASE_URL}/history/transactions",
+            callback=self.transaction_callback,
+        )
+
+
+@pytest.fixture
+def history():
+    return FakeHistory()
+
+
+@pytest.fixture
+def ig_service():
+    return IGService("username", "password", "api_key", "DEMO", acc_number="ABC123")
+
+
+class TestAccountSync:
+    @responses.activate
+    def test_activities_incremental(self, history, ig_service, tmp_path):
+        history.register()
+        history.activities = [
+            activity("2030-01-01T10:00:00", "A1"),
+            activity("2030-01-01T11:00:00", "A2"),
+            activity("2030-01-01T11:00:00", "A3"),
+        ]
+
+        sync = AccountSync(ig_service, str(tmp_path))
+        first = [r for chunk in sync.sync_activities() for r in chunk]
+        assert [r.deal_id for r in first] == ["A1", "A2", "A3"]
+        assert isinstance(first[0], ActivityRecord)
+
+        history.activities.append(activity("2030-01-01T12:00:00", "A4"))
+        second = [r for chunk in sync.sync_activities() for r in chunk]
+        assert [r.deal_id for r in second] == ["A4"]
+
+        # the repeat sync only asks for records from the last seen date
+        query = parse_qs(urlparse(responses.calls[-1].request.url).query)
+        assert query["from"] == ["2030-01-01T11:00:00"]
+
+        ledger = sync.read_activities()
+        assert list(ledger["dealId"]) == ["A1", "A2", "A3", "A4"]
+
+        third = list(sync.sync_activities())
+        assert third == []
+
+    @responses.activate
+    def test_transactions_paged_as_dataframe(self, history, ig_service, tmp_path):
+        history.register()
+        history.transactions = [
+            transaction(f"2030-01-0{i}T10:00:00", f"REF{i}") for i in range(1, 6)
+        ]
+
+        sync = AccountSync(ig_service, str(tmp_path), chunk_size=3)
+        chunks = list(sync.sync_transactions(as_dataframe=True))
+
+        assert [len(c) for c in chunks] == [3, 2]
+        assert isinstance(chunks[0], pd.DataFrame)
+        assert len(responses.calls) == 3
+        ledger = sync.read_transactions()
+        assert list(ledger["reference"]) == [f"REF{i}" for i in range(1, 6)]
+
+        history.transactions.append(transaction("2030-01-06T10:00:00", "REF6"))
+        new = [r for chunk in sync.sync_transactions() for r in chunk]
+        assert new == [TransactionRecord.from_json(history.transactions[-1])]
+
+    @responses.activate
+    def test_interrupted_sync_resumes(self, history, ig_service, tmp_path):
+        history.register()
+        history.activities = [
+            activity(f"2030-01-01T1{i}:00:00", f"A{i}") for i in range(4)
+        ]
+
+        sync = AccountSync(ig_service, str(tmp_path), chunk_size=1)
+        generator = sync.sync_activities()
+        first = next(generator)
+        generator.close()
+        assert [r.deal_id for r in first] == ["A0"]
+
+        rest = [r for chunk in sync.sync_activities() for r in chunk]
+        assert [r.deal_id for r in rest] == ["A1", "A2", "A3"]
+        assert list(sync.read_activities()["dealId"]) == ["A0", "A1", "A2", "A3"]
+
+    @responses.activate
+    def test_sync_counts_per_account(self, history, ig_service, tmp_path):
+        history.register()
+        history.activities = [activity("2030-01-01T10:00:00", "A1")]
+        history.transactions = [transaction("2030-01-01T10:00:00", "REF1")]
+
+        counts = AccountSync(ig_service, str(tmp_path)).sync()
+        assert counts == {"activity": 1, "transactions": 1}
+        assert (tmp_path / "ABC123" / "activity" / "cursor.json").exists()
+
+        other = AccountSync(ig_service, str(tmp_path), account_id="XYZ987")
+        assert other.read_activities().empty
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Response cache for slow-changing IG reference data (market navigation, market
+details, searches, watchlists)
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from collections import Counter, OrderedDict
+from threading import RLock
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache(object):
+    """
+    Bounded, time-to-live cache of raw IG API response bodies.
+
+    Entries are grouped by endpoint type, and each group has its own TTL in
+    seconds. A group with a TTL of 0 or None is not cached. Bodies are stored
+    as the raw response text, so every hit is parsed into fresh objects and
+    callers can never modify cached data.
+
+    Market details include the live snapshot (bid, offer, market status), so
+    the "markets" group is not cached unless a TTL is given for it. Entries of
+    account scoped groups are keyed by account, so one account is never served
+    another account's data.
+
+    When a filename is given, entries are also written to a SQLite database,
+    and unexpired entries are loaded again on start up.
+    """
+
+    DEFAULT_TTL = {
+        "navigation": 3600,
+        "markets": 0,
+        "search": 3600,
+        "watchlists": 600,
+    }
+    # groups holding data of the current account
+    ACCOUNT_GROUPS = frozenset(["watchlists"])
+
+    def __init__(self, ttl=None, maxsize=1024, filename=None):
+        """
+        :param ttl: TTL in seconds per group, overriding DEFAULT_TTL. Optional
+        :type ttl: dict
+        :param maxsize: max number of entries held, least recently used entries
+            are evicted first. Optional, default 1024
+        :type maxsize: int
+        :param filename: SQLite file to persist entries across restarts. Optional
+        :type filename: str
+        """
+        self.ttl = dict(self.DEFAULT_TTL)
+        if ttl is not None:
+            self.ttl.update(ttl)
+        self.maxsize = maxsize
+        self.hits = Counter()
+        self.misses = Counter()
+        self._entries = OrderedDict()
+        self._lock = RLock()
+        self._db = None
+        if filename is not None:
+            self._open(filename)
+
+    def _open(self, filename):
+        self._db = sqlite3.connect(filename, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(grp TEXT, key TEXT, expires REAL, body TEXT, PRIMARY KEY (grp, key))"
+        )
+        now = time.time()
+        self._db.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+        self._db.commit()
+        rows = self._db.execute(
+            "SELECT grp, key, expires, body FROM responses ORDER BY expires"
+        )
+        for group, key, expires, body in rows:
+            self._entries[(group, key)] = (expires, body)
+        self._evict()
+        logger.info(f"Loaded {len(self._entries)} cached responses from {filename}")
+
+    @staticmethod
+    def make_key(endpoint, params, version, account=None):
+        """Returns a cache key for a request, scoped to account if given"""
+        key = f"v{version}:{endpoint}?{json.dumps(params, sort_keys=True)}"
+        if account is not None:
+            key = f"{account}:{key}"
+        return key
+
+    def enabled(self, group):
+        """Returns True if responses in the group are cached"""
+        return bool(self.ttl.get(group))
+
+    def get(self, group, key):
+        """Returns the cached body, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get((group, key))
+            if entry is not None:
+                expires, body = entry
+                if expires > time.time():
+                    self._entries.move_to_end((group, key))
+                    self.hits[group] += 1
+                    return body
+                self._delete(group, key)
+            self.misses[group] += 1
+            return None
+
+    def set(self, group, key, body):
+        """Stores a response body, if the group is cached"""
+        if not self.enabled(group):
+            return
+        expires = time.time() + self.ttl[group]
+        with self._lock:
+            self._entries[(group, key)] = (expires, body)
+            self._entries.move_to_end((group, key))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                    (group, key, expires, body),
+                )
+                self._db.commit()
+            self._evict()
+
+    def invalidate(self, group=None):
+        """Removes all entries in a group, or all entries if group is None"""
+        with self._lock:
+            keys = [k for k in self._entries if group is None or k[0] == group]
+            for k in keys:
+                del self._entries[k]
+            if self._db is not None:
+                if group is None:
+                    self._db.execute("DELETE FROM responses")
+                else:
+                    self._db.execute("DELETE FROM responses WHERE grp = ?", (group,))
+                self._db.commit()
+        logger.debug(f"Invalidated {len(keys)} cached responses")
+
+    def info(self):
+        """Returns hit and miss counts per group, and the current size"""
+        with self._lock:
+            groups = set(self.hits) | set(self.misses)
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "groups": {
+                    g: {"hits": self.hits[g], "misses": self.misses[g]}
+                    for g in sorted(groups)
+                },
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def close(self):
+        """Closes the persistent store, if any"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _delete(self, group, key):
+        del self._entries[(group, key)]
+        if self._db is not None:
+            self._db.execute(
+                "DELETE FROM responses WHERE grp = ? AND key = ?", (group, key)
+            )
+            self._db.commit()
+
+    def _evict(self):
+        while len(self._entries) > self.maxsize:
+            group, key = next(iter(self._entries))
+            self._delete(group, key)
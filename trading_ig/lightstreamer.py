@@ -16,9 +16,12 @@
 
 import logging
 import threading
+import time
 import traceback
 import sys
 import warnings
+from collections import deque
+from itertools import islice
 
 from six.moves.urllib.request import urlopen as _urlopen
 from six.moves.urllib.parse import urlparse as parse_url, urljoin, urlencode
@@ -53,6 +56,12 @@ LOOP_CMD = "LOOP"
 ERROR_CMD = "ERROR"
 SYNC_ERROR_CMD = "SYNC ERROR"
 OK_CMD = "OK"
+# Decoded values of the special field tokens
+_SPECIAL_VALUES = {"$": "", "#": None}
+# Max bytes taken from the Stream Connection at once
+READ_CHUNK_SIZE = 65536
+# Min seconds between systemd watchdog notifications
+WATCHDOG_INTERVAL = 1.0
 
 log = logging.getLogger(__name__)
 
@@ -69,6 +78,7 @@ class Subscription(object):
         )
         self.item_names = items
         self._items_map = {}
+        self._items_values = {}
         self.field_names = fields
         self.adapter = adapter
         self.mode = mode
@@ -99,25 +109,28 @@ class Subscription(object):
         """
         # Tokenize the item line as sent by Lightstreamer
         toks = item_line.rstrip("\r\n").split("|")
-        undecoded_item = dict(list(zip(self.field_names, toks[1:])))
-
-        # Retrieve the previous item stored into the map, if present.
-        # Otherwise create a new empty dict.
         item_pos = int(toks[0])
-        curr_item = self._items_map.get(item_pos, {})
-        # Update the map with new values, merging with the
-        # previous ones if any.
-        self._items_map[item_pos] = dict(
-            [
-                (k, self._decode(v, curr_item.get(k)))
-                for k, v in list(undecoded_item.items())
-            ]
-        )
+
+        # The latest values of each item are kept in a list, in field order,
+        # updated in place. Unchanged fields (empty tokens, or missing at the
+        # end of the line) are skipped without decoding
+        values = self._items_values.get(item_pos)
+        if values is None:
+            values = [None] * len(self.field_names)
+            self._items_values[item_pos] = values
+        for index, value in enumerate(islice(toks, 1, len(values) + 1)):
+            if value:
+                if value[0] in "#$":
+                    value = _SPECIAL_VALUES.get(value, value[1:])
+                values[index] = value
+
+        # Listeners get a new dict, so the ones they keep do not change
+        self._items_map[item_pos] = item_values = dict(zip(self.field_names, values))
         # Make an item info as a new event to be passed to listeners
         item_info = {
             "pos": item_pos,
             "name": self.item_names[item_pos - 1],
-            "values": self._items_map[item_pos],
+            "values": item_values,
         }
 
         # Update each registered listener with new event
@@ -125,6 +138,52 @@ class Subscription(object):
             on_item_update(item_info)
 
 
+class _LineReader(object):
+    """Reads the Stream Connection in chunks, as they arrive, and splits them
+    into lines, instead of a read and decode call per line"""
+
+    def __init__(self, stream, chunk_size=READ_CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._read = getattr(stream, "read1", None)
+        self._lines = deque()
+        self._partial = b""
+
+    def _fill(self):
+        if self._read is None:
+            # no way to read only what is available, so read a line at a time
+            line = self._stream.readline()
+            if line:
+                self._lines.append(line.decode("utf-8").rstrip())
+            return bool(line)
+        chunk = self._read(self._chunk_size)
+        if not chunk:
+            return False
+        lines = (self._partial + chunk).split(b"\n")
+        # the last piece is an incomplete line, or empty. Lines are split on
+        # b"\n" before decoding, so multi-byte characters are never cut
+        self._partial = lines.pop()
+        self._lines.extend(line.decode("utf-8").rstrip() for line in lines)
+        return True
+
+    def readline(self):
+        """Returns the next line, without its line end, or "" at end of stream"""
+        while not self._lines:
+            if not self._fill():
+                partial, self._partial = self._partial, b""
+                return partial.decode("utf-8").rstrip()
+        return self._lines.popleft()
+
+    def readlines(self):
+        """Returns the rest of the stream, as lines with line ends"""
+        lines = [line + "\r\n" for line in self._lines]
+        self._lines.clear()
+        rest = self._partial + self._stream.read()
+        self._partial = b""
+        lines.extend(rest.decode("utf-8").splitlines(True))
+        return lines
+
+
 class LSClient(object):
     """Manages the communication with Lightstreamer Server"""
 
@@ -143,6 +202,7 @@ class LSClient(object):
         self._subscriptions = {}
         self._current_subscription_key = 0
         self._stream_connection = None
+        self._stream_reader = None
         self._stream_connection_thread = None
         self._bind_counter = 0
         self.content_length = 1000000000
@@ -179,10 +239,13 @@ class LSClient(object):
         response = self._call(self._control_url, CONTROL_URL_PATH, params)
         return response.readline().decode("utf-8").rstrip()
 
+    def _open_stream(self, stream_connection):
+        self._stream_connection = stream_connection
+        self._stream_reader = _LineReader(stream_connection)
+
     def _read_from_stream(self):
         """Read a single line of content of the Stream Connection."""
-        line = self._stream_connection.readline().decode("utf-8").rstrip()
-        return line
+        return self._stream_reader.readline()
 
     def connect(self):
         """Establish a connection to Lightstreamer Server to create
@@ -195,17 +258,19 @@ class LSClient(object):
                 "no watchdog notifications will be sent."
             )
 
-        self._stream_connection = self._call(
-            self._base_url,
-            CONNECTION_URL_PATH,
-            {
-                "LS_op2": "create",
-                "LS_cid": "mgQkwtwdysogQz2BJ4Ji kOj2Bg",
-                "LS_adapter_set": self._adapter_set,
-                "LS_user": self._user,
-                "LS_password": self._password,
-                "LS_content_length": self.content_length,
-            },
+        self._open_stream(
+            self._call(
+                self._base_url,
+                CONNECTION_URL_PATH,
+                {
+                    "LS_op2": "create",
+                    "LS_cid": "mgQkwtwdysogQz2BJ4Ji kOj2Bg",
+                    "LS_adapter_set": self._adapter_set,
+                    "LS_user": self._user,
+                    "LS_password": self._password,
+                    "LS_content_length": self.content_length,
+                },
+            )
         )
         stream_line = self._read_from_stream()
         self._handle_stream(stream_line)
@@ -214,13 +279,15 @@ class LSClient(object):
         """Replace a completely consumed connection in listening for an active
         Session.
         """
-        self._stream_connection = self._call(
-            self._control_url,
-            BIND_URL_PATH,
-            {
-                "LS_session": self._session["SessionId"],
-                "LS_content_length": self.content_length,
-            },
+        self._open_stream(
+            self._call(
+                self._control_url,
+                BIND_URL_PATH,
+                {
+                    "LS_session": self._session["SessionId"],
+                    "LS_content_length": self.content_length,
+                },
+            )
         )
 
         self._bind_counter += 1
@@ -252,7 +319,7 @@ class LSClient(object):
             setattr(self._stream_connection_thread, "active_connection", True)
             self._stream_connection_thread.start()
         else:
-            lines = self._stream_connection.readlines()
+            lines = self._stream_reader.readlines()
             lines.insert(0, stream_line)
             log.error("Server response error: \n{0}".format("".join(lines)))
             raise IOError()
@@ -333,7 +400,6 @@ class LSClient(object):
         """Forwards the real time update to the relative
         Subscription instance for further dispatching to its listeners.
         """
-        log.debug("Received update message ---> <{0}>".format(update_message))
         tok = update_message.split(",", 1)
         table, item = int(tok[0]), tok[1]
         if table in self._subscriptions:
@@ -344,18 +410,23 @@ class LSClient(object):
     def _receive(self):
         rebind = False
         receive = True
+        debug = log.isEnabledFor(logging.DEBUG)
+        last_notify = 0.0
         while receive and self._stream_connection_thread.active_connection:
-            log.debug("Waiting for a new message")
             try:
                 message = self._read_from_stream()
-                log.debug("Received message ---> <{0}>".format(message))
+                if debug:
+                    log.debug("Received message ---> <{0}>".format(message))
             except Exception:
                 log.error("Communication error")
                 print(traceback.format_exc())
                 message = None
 
             if notify:
-                notify("WATCHDOG=1")
+                now = time.monotonic()
+                if now - last_notify >= WATCHDOG_INTERVAL:
+                    notify("WATCHDOG=1")
+                    last_notify = now
 
             if message is None:
                 receive = False
@@ -399,12 +470,14 @@ class LSClient(object):
             # and subscriptions management.
             self._stream_connection.close()
             self._stream_connection = None
+            self._stream_reader = None
             self._session.clear()
             self._subscriptions.clear()
             self._current_subscription_key = 0
         else:
             log.debug("Binding to this active session")
             self._stream_connection = None
+            self._stream_reader = None
             self.bind()
 
 
@@ -16,6 +16,7 @@ from base64 import b64encode, b64decode
 from Crypto.Cipher import PKCS1_v1_5
 from Crypto.PublicKey import RSA
 from requests import Session
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse, parse_qs
 
 from datetime import timedelta, datetime
@@ -36,8 +37,10 @@ if _HAS_PANDAS:
     from .utils import pd
     from pandas import json_normalize
 
-from threading import Thread
+from threading import Thread, RLock
 from queue import Queue, Empty
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -100,12 +103,31 @@ class IGSessionCRUD(object):
         """Returns url from endpoint and base url"""
         return self.BASE_URL + endpoint
 
+    @staticmethod
+    def _headers(version, method=None):
+        """Returns the headers specific to a single request. These are passed
+        per request, and merged by requests with the session headers, so the
+        shared session is never mutated - which makes it safe for several
+        threads to use the same session (and connection pool) at once
+
+        :param version: IG API method version
+        :type version: str
+        :param method: HTTP method override, for IG's POST-as-DELETE. Optional
+        :type method: str
+        :return: request headers
+        :rtype: dict
+        """
+        headers = {"VERSION": version}
+        if method is not None:
+            headers["_method"] = method
+        return headers
+
     def create(self, endpoint, params, session, version):
         """Create = POST"""
         url = self._url(endpoint)
         session = self._get_session(session)
-        session.headers.update({"VERSION": version})
-        response = session.post(url, data=json.dumps(params))
+        headers = self._headers(version)
+        response = session.post(url, data=json.dumps(params), headers=headers)
         logger.info(f"POST '{endpoint}', resp {response.status_code}")
         if response.status_code in [401, 403]:
             if api_limit_hit(response.text):
@@ -124,8 +146,8 @@ class IGSessionCRUD(object):
         """Read = GET"""
         url = self._url(endpoint)
         session = self._get_session(session)
-        session.headers.update({"VERSION": version})
-        response = session.get(url, params=params)
+        headers = self._headers(version)
+        response = session.get(url, params=params, headers=headers)
         # handle 'read_session' with 'fetchSessionTokens=true'
         handle_session_tokens(response, self.session)
         logger.info(f"GET '{endpoint}', resp {response.status_code}")
@@ -135,8 +157,8 @@ class IGSessionCRUD(object):
         """Update = PUT"""
         url = self._url(endpoint)
         session = self._get_session(session)
-        session.headers.update({"VERSION": version})
-        response = session.put(url, data=json.dumps(params))
+        headers = self._headers(version)
+        response = session.put(url, data=json.dumps(params), headers=headers)
         logger.info(f"PUT '{endpoint}', resp {response.status_code}")
         return response
 
@@ -144,12 +166,9 @@ class IGSessionCRUD(object):
         """Delete = POST"""
         url = self._url(endpoint)
         session = self._get_session(session)
-        session.headers.update({"VERSION": version})
-        session.headers.update({"_method": "DELETE"})
-        response = session.post(url, data=json.dumps(params))
+        headers = self._headers(version, method="DELETE")
+        response = session.post(url, data=json.dumps(params), headers=headers)
         logger.info(f"DELETE (POST) '{endpoint}', resp {response.status_code}")
-        if "_method" in session.headers:
-            del session.headers["_method"]
         return response
 
     def req(self, action, endpoint, params, session, version):
@@ -169,6 +188,20 @@ class IGService:
         "demo": "https://demo-api.ig.com/gateway/deal",
     }
 
+    # the most epics IG accepts in one /markets request
+    MAX_EPICS_PER_REQUEST = 50
+
+    # backoff for requests retried until they succeed, eg deal confirmations:
+    # waits 0.1, 0.2, 0.4... seconds, capped at RETRY_MAX_WAIT, until
+    # RETRY_TIMEOUT seconds have passed. The timeout is at least the window of
+    # the five one second polls this replaced, so slow confirms still succeed
+    RETRY_TIMEOUT = 5.0
+    RETRY_INITIAL_WAIT = 0.1
+    RETRY_MAX_WAIT = 2.0
+
+    # how long to wait for a streamed deal confirmation before polling REST
+    CONFIRMATION_TIMEOUT = 5.0
+
     API_KEY = None
     IG_USERNAME = None
     IG_PASSWORD = None
@@ -187,13 +220,25 @@ class IGService:
         return_munch=_HAS_MUNCH,
         retryer=None,
         use_rate_limiter=False,
+        pool_maxsize=None,
+        cache=None,
     ):
         """Constructor, calls the method required to connect to
-        the API (accepts acc_type = LIVE or DEMO)"""
+        the API (accepts acc_type = LIVE or DEMO)
+
+        Request headers are never written to the shared session, so one
+        IGService may be used from several threads. Set pool_maxsize to the
+        number of worker threads to give each its own pooled connection.
+
+        Pass a trading_ig.cache.ResponseCache as cache to serve reference data
+        (market navigation, market details, searches, watchlists) from a local
+        TTL cache instead of the API"""
         self.API_KEY = api_key
         self.IG_USERNAME = username
         self.IG_PASSWORD = password
         self.ACC_NUMBER = acc_number
+        # account of the current session, scopes account data in the cache
+        self._account_id = acc_number
         self._retryer = retryer
         self._use_rate_limiter = use_rate_limiter
         self._bucket_threads_run = False
@@ -206,12 +251,26 @@ class IGService:
 
         self.return_dataframe = return_dataframe
         self.return_munch = return_munch
+        self.cache = cache
+
+        # set to a streamer DealConfirmations to get confirmations from the
+        # TRADE stream instead of polling, see StreamingManager
+        self.deal_confirmations = None
+        # (source, seconds) of recent deal confirmations, newest last
+        self.confirmation_latencies = deque(maxlen=1000)
 
         if session is None:
             self.session = Session()  # Requests Session (global)
         else:
             self.session = session
 
+        if pool_maxsize is not None:
+            adapter = HTTPAdapter(pool_maxsize=pool_maxsize)
+            self.session.mount("https://", adapter)
+
+        # serialises session token refreshes between threads
+        self._session_lock = RLock()
+
         self.crud_session = IGSessionCRUD(self.BASE_URL, self.API_KEY, self.session)
 
     def setup_rate_limiter(
@@ -404,6 +463,58 @@ class IGService:
             raise TokenInvalidException()
         return response
 
+    def _req_until_ok(self, endpoint, params, session, version, description):
+        """
+        Sends a read request, retrying with a short, growing backoff until the
+        response is OK or RETRY_TIMEOUT seconds have passed. Each attempt passes
+        through the non-trading rate limiter, so retries can never exceed the
+        allowance
+        :return: the last response
+        :rtype: requests.Response
+        """
+        deadline = time.monotonic() + self.RETRY_TIMEOUT
+        wait = self.RETRY_INITIAL_WAIT
+        while True:
+            self.non_trading_rate_limit_pause_or_pass()
+            response = self._req("read", endpoint, params, session, version)
+            remaining = deadline - time.monotonic()
+            if response.status_code == 200 or remaining <= 0:
+                break
+            wait = min(wait, remaining)
+            logger.info(f"{description}, retrying in {wait:.2f}s")
+            time.sleep(wait)
+            wait = min(wait * 2, self.RETRY_MAX_WAIT)
+        return response
+
+    def _cached_read(self, group, endpoint, params, session, version):
+        """
+        Reads an endpoint through the response cache, if one is configured.
+        Only cache misses count against the non-trading rate limit
+        :param group: cache group, see ResponseCache.DEFAULT_TTL
+        :type group: str
+        :return: response body
+        :rtype: str
+        """
+        if self.cache is None or not self.cache.enabled(group):
+            self.non_trading_rate_limit_pause_or_pass()
+            return self._req("read", endpoint, params, session, version).text
+
+        account = self._account_id if group in self.cache.ACCOUNT_GROUPS else None
+        key = self.cache.make_key(endpoint, params, version, account)
+        text = self.cache.get(group, key)
+        if text is None:
+            self.non_trading_rate_limit_pause_or_pass()
+            response = self._req("read", endpoint, params, session, version)
+            text = response.text
+            if response.status_code == 200:
+                self.cache.set(group, key, text)
+        return text
+
+    def _invalidate_cache(self, group=None):
+        """Drops cached responses after a write that makes them stale"""
+        if self.cache is not None:
+            self.cache.invalidate(group)
+
     # ---------- PARSE_RESPONSE ----------- #
 
     @staticmethod
@@ -719,7 +830,40 @@ class IGService:
         :return: results set
         :rtype: Pandas DataFrame if configured, otherwise a dict
         """
-        self.non_trading_rate_limit_pause_or_pass()
+        data = {}
+        activities = []
+        for page in self.iter_account_activity(
+            from_date, to_date, detailed, deal_id, fiql_filter, page_size, session
+        ):
+            data = page
+            activities.extend(page["activities"])
+
+        data["activities"] = activities
+        if _HAS_PANDAS and self.return_dataframe:
+            if detailed:
+                data = self.format_activities(data)
+            else:
+                data = pd.DataFrame(data["activities"])
+
+        return data
+
+    def iter_account_activity(
+        self,
+        from_date: datetime = None,
+        to_date: datetime = None,
+        detailed=False,
+        deal_id: str = None,
+        fiql_filter: str = None,
+        page_size: int = 50,
+        session=None,
+    ):
+        """
+        Generator over the pages of the account activity history (v3). Each page
+        is yielded as the parsed response, as soon as it has been received. See
+        fetch_account_activity() for the parameters
+        :return: generator of parsed response pages
+        :rtype: generator of dict
+        """
         version = "3"
         params = {}
         if from_date:
@@ -736,38 +880,28 @@ class IGService:
         params["pageSize"] = page_size
         endpoint = "/history/activity/"
         action = "read"
-        data = {}
-        activities = []
         more_results = True
 
         while more_results:
+            self.non_trading_rate_limit_pause_or_pass()
             response = self._req(action, endpoint, params, session, version)
             data = self.parse_response(response.text)
-            activities.extend(data["activities"])
+            yield data
             paging = data["metadata"]["paging"]
             if paging["next"] is None:
                 more_results = False
             else:
                 parse_result = urlparse(paging["next"])
                 query = parse_qs(parse_result.query)
-                logger.debug(f"fetch_account_activity() next query: '{query}'")
+                logger.debug(f"iter_account_activity() next query: '{query}'")
                 if "from" in query:
                     params["from"] = query["from"][0]
                 else:
-                    del params["from"]
+                    params.pop("from", None)
                 if "to" in query:
                     params["to"] = query["to"][0]
                 else:
-                    del params["to"]
-
-        data["activities"] = activities
-        if _HAS_PANDAS and self.return_dataframe:
-            if detailed:
-                data = self.format_activities(data)
-            else:
-                data = pd.DataFrame(data["activities"])
-
-        return data
+                    params.pop("to", None)
 
     @staticmethod
     def format_activities(raw_json):
@@ -873,6 +1007,49 @@ class IGService:
     ):
         """Returns the transaction history for the specified transaction
         type and period"""
+        data = self._fetch_transaction_page(
+            trans_type,
+            from_date,
+            to_date,
+            max_span_seconds,
+            page_size,
+            page_number,
+            session,
+        )
+        if self.return_dataframe:
+            data = pd.DataFrame(data["transactions"])
+
+            if len(data) == 0:
+                columns = [
+                    "cashTransaction",
+                    "closeLevel",
+                    "currency",
+                    "date",
+                    "dateUtc",
+                    "instrumentName",
+                    "openLevel",
+                    "period",
+                    "profitAndLoss",
+                    "reference",
+                    "size",
+                    "transactionType",
+                ]
+                data = pd.DataFrame(columns=columns)
+                return data
+
+        return data
+
+    def _fetch_transaction_page(
+        self,
+        trans_type,
+        from_date,
+        to_date,
+        max_span_seconds,
+        page_size,
+        page_number,
+        session,
+    ):
+        """Returns one page of the transaction history (v2), parsed into dict"""
         self.non_trading_rate_limit_pause_or_pass()
         version = "2"
         params = {}
@@ -897,29 +1074,46 @@ class IGService:
         action = "read"
 
         response = self._req(action, endpoint, params, session, version)
-        data = self.parse_response(response.text)
-        if self.return_dataframe:
-            data = pd.DataFrame(data["transactions"])
-
-            if len(data) == 0:
-                columns = [
-                    "cashTransaction",
-                    "closeLevel",
-                    "currency",
-                    "date",
-                    "dateUtc",
-                    "instrumentName",
-                    "openLevel",
-                    "period",
-                    "profitAndLoss",
-                    "reference",
-                    "size",
-                    "transactionType",
-                ]
-                data = pd.DataFrame(columns=columns)
-                return data
+        return self.parse_response(response.text)
 
-        return data
+    def iter_transaction_history(
+        self,
+        trans_type=None,
+        from_date=None,
+        to_date=None,
+        max_span_seconds=None,
+        page_size=None,
+        session=None,
+    ):
+        """
+        Generator over all the pages of the transaction history (v2). Each page
+        is yielded as the parsed response, as soon as it has been received. See
+        fetch_transaction_history() for the parameters
+        :return: generator of parsed response pages
+        :rtype: generator of dict
+        """
+        page_number = 1
+        more_results = True
+        while more_results:
+            data = self._fetch_transaction_page(
+                trans_type,
+                from_date,
+                to_date,
+                max_span_seconds,
+                page_size,
+                page_number,
+                session,
+            )
+            yield data
+            page_data = data.get("metadata", {}).get("pageData")
+            if (
+                page_data is None
+                or page_data["totalPages"] == 0
+                or page_data["pageNumber"] >= page_data["totalPages"]
+            ):
+                more_results = False
+            else:
+                page_number += 1
 
     # -------- END -------- #
 
@@ -927,37 +1121,72 @@ class IGService:
 
     def fetch_deal_by_deal_reference(self, deal_reference, session=None):
         """Returns a deal confirmation for the given deal reference"""
-        self.non_trading_rate_limit_pause_or_pass()
         version = "1"
         params = {}
         url_params = {"deal_reference": deal_reference}
         endpoint = "/confirms/{deal_reference}".format(**url_params)
-        action = "read"
-        for i in range(5):
-            response = self._req(action, endpoint, params, session, version)
-            if not response.status_code == 200:
-                logger.info("Deal reference %s not found, retrying." % deal_reference)
-                time.sleep(1)
-            else:
-                break
+        response = self._req_until_ok(
+            endpoint,
+            params,
+            session,
+            version,
+            f"Deal reference {deal_reference} not found",
+        )
         data = self.parse_response(response.text)
         return data
 
+    def wait_for_deal_confirmation(
+        self, deal_reference, started=None, timeout=None, session=None
+    ):
+        """
+        Returns the deal confirmation for the given deal reference. If
+        deal_confirmations is set, the confirmation is taken from the streaming
+        TRADE channel, falling back to REST if it does not arrive within the
+        timeout. The time taken is recorded in confirmation_latencies
+        :param deal_reference: deal reference
+        :type deal_reference: str
+        :param started: time.perf_counter() value when the deal was sent.
+            Optional, defaults to now
+        :type started: float
+        :param timeout: seconds to wait for a streamed confirmation. Optional,
+            default CONFIRMATION_TIMEOUT
+        :type timeout: float
+        :param session: session object. Optional
+        :type session: requests.Session
+        :return: deal confirmation
+        :rtype: dict
+        """
+        if started is None:
+            started = time.perf_counter()
+        data = None
+        source = "rest"
+        if self.deal_confirmations is not None:
+            if timeout is None:
+                timeout = self.CONFIRMATION_TIMEOUT
+            data = self.deal_confirmations.wait(deal_reference, timeout)
+            if data is None:
+                logger.warning(
+                    f"No streamed confirmation for {deal_reference} within "
+                    f"{timeout}s, polling"
+                )
+            else:
+                source = "stream"
+        if data is None:
+            data = self.fetch_deal_by_deal_reference(deal_reference, session)
+        latency = time.perf_counter() - started
+        self.confirmation_latencies.append((source, latency))
+        logger.info(f"Deal {deal_reference} confirmed via {source} in {latency:.3f}s")
+        return data
+
     def fetch_open_position_by_deal_id(self, deal_id, session=None):
         """Return the open position by deal id for the active account"""
-        self.non_trading_rate_limit_pause_or_pass()
         version = "2"
         params = {}
         url_params = {"deal_id": deal_id}
         endpoint = "/positions/{deal_id}".format(**url_params)
-        action = "read"
-        for i in range(5):
-            response = self._req(action, endpoint, params, session, version)
-            if not response.status_code == 200:
-                logger.info("Deal id %s not found, retrying." % deal_id)
-                time.sleep(1)
-            else:
-                break
+        response = self._req_until_ok(
+            endpoint, params, session, version, f"Deal id {deal_id} not found"
+        )
         data = self.parse_response(response.text)
         return data
 
@@ -971,17 +1200,11 @@ class IGService:
         :return: table of position data, one per row
         :rtype: pd.Dataframe
         """
-        self.non_trading_rate_limit_pause_or_pass()
         params = {}
         endpoint = "/positions"
-        action = "read"
-        for i in range(5):
-            response = self._req(action, endpoint, params, session, version)
-            if not response.status_code == 200:
-                logger.info("Error fetching open positions, retrying.")
-                time.sleep(1)
-            else:
-                break
+        response = self._req_until_ok(
+            endpoint, params, session, version, "Error fetching open positions"
+        )
         data = self.parse_response(response.text)
 
         if self.return_dataframe:
@@ -1074,11 +1297,12 @@ class IGService:
             params["timeInForce"] = time_in_force
         endpoint = "/positions/otc"
         action = "delete"
+        started = time.perf_counter()
         response = self._req(action, endpoint, params, session, version)
 
         if response.status_code == 200:
             deal_reference = json.loads(response.text)["dealReference"]
-            return self.fetch_deal_by_deal_reference(deal_reference)
+            return self.wait_for_deal_confirmation(deal_reference, started)
         else:
             raise IGException(response.text)
 
@@ -1130,11 +1354,12 @@ class IGService:
         endpoint = "/positions/otc"
         action = "create"
 
+        started = time.perf_counter()
         response = self._req(action, endpoint, params, session, version)
 
         if response.status_code == 200:
             deal_reference = json.loads(response.text)["dealReference"]
-            return self.fetch_deal_by_deal_reference(deal_reference)
+            return self.wait_for_deal_confirmation(deal_reference, started)
         else:
             raise IGException(response.text)
 
@@ -1169,11 +1394,12 @@ class IGService:
         url_params = {"deal_id": deal_id}
         endpoint = "/positions/otc/{deal_id}".format(**url_params)
         action = "update"
+        started = time.perf_counter()
         response = self._req(action, endpoint, params, session, version)
 
         if response.status_code == 200:
             deal_reference = json.loads(response.text)["dealReference"]
-            return self.fetch_deal_by_deal_reference(deal_reference)
+            return self.wait_for_deal_confirmation(deal_reference, started)
         else:
             raise IGException(response.text)
 
@@ -1323,11 +1549,12 @@ class IGService:
         endpoint = "/workingorders/otc"
         action = "create"
 
+        started = time.perf_counter()
         response = self._req(action, endpoint, params, session, version)
 
         if response.status_code == 200:
             deal_reference = json.loads(response.text)["dealReference"]
-            return self.fetch_deal_by_deal_reference(deal_reference)
+            return self.wait_for_deal_confirmation(deal_reference, started)
         else:
             raise IGException(response.text)
 
@@ -1339,11 +1566,12 @@ class IGService:
         url_params = {"deal_id": deal_id}
         endpoint = "/workingorders/otc/{deal_id}".format(**url_params)
         action = "delete"
+        started = time.perf_counter()
         response = self._req(action, endpoint, params, session, version)
 
         if response.status_code == 200:
             deal_reference = json.loads(response.text)["dealReference"]
-            return self.fetch_deal_by_deal_reference(deal_reference)
+            return self.wait_for_deal_confirmation(deal_reference, started)
         else:
             raise IGException(response.text)
 
@@ -1380,11 +1608,12 @@ class IGService:
         url_params = {"deal_id": deal_id}
         endpoint = "/workingorders/otc/{deal_id}".format(**url_params)
         action = "update"
+        started = time.perf_counter()
         response = self._req(action, endpoint, params, session, version)
 
         if response.status_code == 200:
             deal_reference = json.loads(response.text)["dealReference"]
-            return self.fetch_deal_by_deal_reference(deal_reference)
+            return self.wait_for_deal_confirmation(deal_reference, started)
         else:
             raise IGException(response.text)
 
@@ -1398,20 +1627,14 @@ class IGService:
         :return: repeat dealing windows for recently traded epics
         :rtype: dict
         """
-        self.non_trading_rate_limit_pause_or_pass()
         version = "1"
         params = {}
         if epic is not None:
             params["epic"] = epic
         endpoint = "/repeat-dealing-window"
-        action = "read"
-        for i in range(5):
-            response = self._req(action, endpoint, params, session, version)
-            if not response.status_code == 200:
-                logger.info("Error fetching repeat dealing window, retrying.")
-                time.sleep(1)
-            else:
-                break
+        response = self._req_until_ok(
+            endpoint, params, session, version, "Error fetching repeat dealing window"
+        )
         data = self.parse_response(response.text)
         return data
 
@@ -1456,13 +1679,11 @@ class IGService:
     def fetch_top_level_navigation_nodes(self, session=None):
         """Returns all top-level nodes (market categories) in the market
         navigation hierarchy."""
-        self.non_trading_rate_limit_pause_or_pass()
         version = "1"
         params = {}
         endpoint = "/marketnavigation"
-        action = "read"
-        response = self._req(action, endpoint, params, session, version)
-        data = self.parse_response(response.text)
+        text = self._cached_read("navigation", endpoint, params, session, version)
+        data = self.parse_response(text)
         if self.return_dataframe:
             data["markets"] = pd.DataFrame(data["markets"])
             if len(data["markets"]) == 0:
@@ -1500,14 +1721,12 @@ class IGService:
     def fetch_sub_nodes_by_node(self, node, session=None):
         """Returns all sub-nodes of the given node in the market
         navigation hierarchy"""
-        self.non_trading_rate_limit_pause_or_pass()
         version = "1"
         params = {}
         url_params = {"node": node}
         endpoint = "/marketnavigation/{node}".format(**url_params)
-        action = "read"
-        response = self._req(action, endpoint, params, session, version)
-        data = self.parse_response(response.text)
+        text = self._cached_read("navigation", endpoint, params, session, version)
+        data = self.parse_response(text)
         if self.return_dataframe:
             data["markets"] = pd.DataFrame(data["markets"])
             data["nodes"] = pd.DataFrame(data["nodes"])
@@ -1515,14 +1734,12 @@ class IGService:
 
     def fetch_market_by_epic(self, epic, session=None):
         """Returns the details of the given market"""
-        self.non_trading_rate_limit_pause_or_pass()
         version = "3"
         params = {}
         url_params = {"epic": epic}
         endpoint = "/markets/{epic}".format(**url_params)
-        action = "read"
-        response = self._req(action, endpoint, params, session, version)
-        data = self.parse_response(response.text)
+        text = self._cached_read("markets", endpoint, params, session, version)
+        data = self.parse_response(text)
         if self.return_munch:
             data = munchify(data)
         return data
@@ -1542,6 +1759,13 @@ class IGService:
         :return: list of market details
         :rtype: Munch instance if configured, else dict
         """
+        data = self._fetch_market_details(epics, detailed, session, version)
+        if self.return_munch:
+            data = munchify(data)
+        return data
+
+    def _fetch_market_details(self, epics, detailed, session, version):
+        """Returns the raw market details for a comma separated list of epics"""
         self.non_trading_rate_limit_pause_or_pass()
         params = {"epics": epics}
         if version == "2":
@@ -1550,21 +1774,103 @@ class IGService:
         action = "read"
         response = self._req(action, endpoint, params, session, version)
         data = self.parse_response(response.text)
-        if self.return_munch:
-            data = munchify(data["marketDetails"])
-        else:
-            data = data["marketDetails"]
-        return data
+        return data["marketDetails"]
+
+    def fetch_markets_by_epics_batched(
+        self,
+        epics,
+        detailed=True,
+        chunk_size=None,
+        max_workers=4,
+        session=None,
+        version="2",
+    ):
+        """
+        Returns the details of any number of markets. The epics are split into
+        chunks of at most MAX_EPICS_PER_REQUEST, which are fetched concurrently.
+        Concurrency is still bounded by the non-trading rate limiter, if enabled.
+
+        A failed chunk does not fail the whole batch: it is split in half and
+        retried, until the epics causing the failure are isolated
+        :param epics: list of epics, or comma separated list of epics
+        :type epics: list or str
+        :param detailed: Whether to return detailed info or snapshot data only.
+            Only supported for version 2. Optional, default True
+        :type detailed: bool
+        :param chunk_size: max epics per request. Optional, default
+            MAX_EPICS_PER_REQUEST
+        :type chunk_size: int
+        :param max_workers: max number of concurrent requests. Optional, default 4
+        :type max_workers: int
+        :param session: session object. Optional, default None
+        :type session: requests.Session
+        :param version: IG API method version. Optional, default '2'
+        :type version: str
+        :return: dict with 'marketDetails', the details of each market found, and
+            'errors', a dict of error message by epic for the epics not found
+        :rtype: dict, with 'marketDetails' as pandas.DataFrame if configured
+        """
+        if isinstance(epics, str):
+            epics = epics.split(",")
+        epics = list(dict.fromkeys(e.strip() for e in epics if e.strip()))
+        if chunk_size is None:
+            chunk_size = self.MAX_EPICS_PER_REQUEST
+        chunk_size = min(chunk_size, self.MAX_EPICS_PER_REQUEST)
+        chunks = [epics[i : i + chunk_size] for i in range(0, len(epics), chunk_size)]
+
+        def fetch(chunk):
+            return self._fetch_market_details_chunk(chunk, detailed, session, version)
+
+        details = []
+        errors = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for chunk_details, chunk_errors in executor.map(fetch, chunks):
+                details.extend(chunk_details)
+                errors.update(chunk_errors)
+
+        found = {detail["instrument"]["epic"] for detail in details}
+        for epic in epics:
+            if epic not in found and epic not in errors:
+                errors[epic] = "market details not returned"
+        if errors:
+            logger.warning(f"Market details not found for {len(errors)} epic(s)")
+
+        if self.return_dataframe:
+            details = json_normalize(details)
+        elif self.return_munch:
+            details = munchify(details)
+        return {"marketDetails": details, "errors": errors}
+
+    def _fetch_market_details_chunk(self, epics, detailed, session, version):
+        """Fetches a chunk of epics, bisecting it on failure. Returns a tuple
+        of the market details found, and a dict of error messages by epic"""
+        try:
+            details = self._fetch_market_details(
+                ",".join(epics), detailed, session, version
+            )
+            return details, {}
+        except (ApiExceededException, TokenInvalidException):
+            raise
+        except Exception as e:
+            if len(epics) == 1:
+                return [], {epics[0]: str(e)}
+            logger.info(f"Fetch of {len(epics)} epics failed, splitting: {e}")
+            middle = len(epics) // 2
+            left = self._fetch_market_details_chunk(
+                epics[:middle], detailed, session, version
+            )
+            right = self._fetch_market_details_chunk(
+                epics[middle:], detailed, session, version
+            )
+            return left[0] + right[0], {**left[1], **right[1]}
 
     def search_markets(self, search_term, session=None):
         """Returns all markets matching the search term"""
-        self.non_trading_rate_limit_pause_or_pass()
         version = "1"
         endpoint = "/markets"
         params = {"searchTerm": search_term}
-        action = "read"
-        response = self._req(action, endpoint, params, session, version)
-        data = self.parse_response(response.text)
+        text = self._cached_read("search", endpoint, params, session, version)
+        data = self.parse_response(text)
         if self.return_dataframe:
             data = pd.DataFrame(data["markets"])
         return data
@@ -1912,7 +2218,6 @@ class IGService:
             )
         action = "read"
         response = self._req(action, endpoint, params, session, version)
-        del self.session.headers["VERSION"]
         data = self.parse_response(response.text)
         if format is None:
             format = self.format_prices
@@ -1935,13 +2240,11 @@ class IGService:
 
     def fetch_all_watchlists(self, session=None):
         """Returns all watchlists belonging to the active account"""
-        self.non_trading_rate_limit_pause_or_pass()
         version = "1"
         params = {}
         endpoint = "/watchlists"
-        action = "read"
-        response = self._req(action, endpoint, params, session, version)
-        data = self.parse_response(response.text)
+        text = self._cached_read("watchlists", endpoint, params, session, version)
+        data = self.parse_response(text)
         if self.return_dataframe:
             data = pd.DataFrame(data["watchlists"])
         return data
@@ -1954,6 +2257,7 @@ class IGService:
         endpoint = "/watchlists"
         action = "create"
         response = self._req(action, endpoint, params, session, version)
+        self._invalidate_cache("watchlists")
         data = self.parse_response(response.text)
         return data
 
@@ -1966,19 +2270,18 @@ class IGService:
         endpoint = "/watchlists/{watchlist_id}".format(**url_params)
         action = "delete"
         response = self._req(action, endpoint, params, session, version)
+        self._invalidate_cache("watchlists")
         data = self.parse_response(response.text)
         return data
 
     def fetch_watchlist_markets(self, watchlist_id, session=None):
         """Returns the given watchlist's markets"""
-        self.non_trading_rate_limit_pause_or_pass()
         version = "1"
         params = {}
         url_params = {"watchlist_id": watchlist_id}
         endpoint = "/watchlists/{watchlist_id}".format(**url_params)
-        action = "read"
-        response = self._req(action, endpoint, params, session, version)
-        data = self.parse_response(response.text)
+        text = self._cached_read("watchlists", endpoint, params, session, version)
+        data = self.parse_response(text)
         if self.return_dataframe:
             data = pd.DataFrame(data["markets"])
         return data
@@ -1992,6 +2295,7 @@ class IGService:
         endpoint = "/watchlists/{watchlist_id}".format(**url_params)
         action = "update"
         response = self._req(action, endpoint, params, session, version)
+        self._invalidate_cache("watchlists")
         data = self.parse_response(response.text)
         return data
 
@@ -2004,6 +2308,7 @@ class IGService:
         endpoint = "/watchlists/{watchlist_id}/{epic}".format(**url_params)
         action = "delete"
         response = self._req(action, endpoint, params, session, version)
+        self._invalidate_cache("watchlists")
         data = self.parse_response(response.text)
         return data
 
@@ -2071,6 +2376,9 @@ class IGService:
         response = self._req(action, endpoint, params, session, version, check=False)
         self._manage_headers(response)
         data = self.parse_response(response.text)
+        self._account_id = (
+            data.get("currentAccountId") or data.get("accountId") or self.ACC_NUMBER
+        )
 
         if self._use_rate_limiter:
             self.setup_rate_limiter()
@@ -2133,7 +2441,12 @@ class IGService:
             - if not, a new session will be created
         """
         logger.debug("Checking session status...")
-        if self._valid_until is not None and datetime.now() > self._valid_until:
+        if self._valid_until is None or datetime.now() <= self._valid_until:
+            return
+        with self._session_lock:
+            # another thread may have refreshed while we were waiting
+            if self._valid_until is None or datetime.now() <= self._valid_until:
+                return
             if self._refresh_token:
                 # we are in a v3 session, need to refresh
                 try:
@@ -2154,6 +2467,8 @@ class IGService:
         action = "update"
         response = self._req(action, endpoint, params, session, version)
         self._manage_headers(response)
+        self._account_id = account_id
+        self._invalidate_cache("watchlists")
         data = self.parse_response(response.text)
         return data
 
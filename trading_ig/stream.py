@@ -3,23 +3,65 @@
 
 from __future__ import absolute_import, division, print_function
 
-import sys
+import random
+import time
 import traceback
 import logging
+from collections import deque, namedtuple
+from threading import Event, Lock, RLock, Thread
 
 from lightstreamer.client import LightstreamerClient, Subscription, ClientListener
 
+from .rest import IGException
+
 logger = logging.getLogger(__name__)
 
 
+# a period without streamed data, in ms since epoch
+StreamGap = namedtuple("StreamGap", ["start", "end"])
+
+
 class IGStreamService(object):
-    def __init__(self, ig_service):
+    def __init__(self, ig_service, connection_options=None):
+        """
+        :param ig_service: IGService instance
+        :type ig_service: IGService
+        :param connection_options: Lightstreamer ConnectionOptions to set on
+            each client, e.g. {"StalledTimeout": 2000, "ForcedTransport":
+            "WS-STREAMING"}. Optional
+        :type connection_options: dict
+        """
         self.ig_service = ig_service
         self.lightstreamerEndpoint = None
         self.acc_number = None
         self.ls_client = None
+        self.connection_options = connection_options or {}
+        self._supervisor = None
+        self._gap_callbacks = []
+        self._ls_password = None
+        self._session_args = None
+        self._client_listeners = []
+        self._client_lock = RLock()
 
     def create_session(self, encryption=False, version="2"):
+        self._session_args = (encryption, version)
+        self._login()
+
+        # Establishing a new connection to Lightstreamer Server
+        logger.info("Starting connection with %s" % self.lightstreamerEndpoint)
+        with self._client_lock:
+            self.ls_client = self._new_client()
+            try:
+                self.ls_client.connect()
+                return
+            except Exception as exc:
+                logger.error("Unable to connect to Lightstreamer Server")
+                logger.error(traceback.format_exc())
+                raise IGException("Unable to connect to Lightstreamer Server") from exc
+
+    def _login(self):
+        """Creates an IG session, and the Lightstreamer password from its tokens"""
+        encryption, version = self._session_args
         ig_session = self.ig_service.create_session(
             encryption=encryption, version=version
         )
@@ -29,39 +71,297 @@ class IGStreamService(object):
         self.lightstreamerEndpoint = ig_session["lightstreamerEndpoint"]
         cst = self.ig_service.session.headers["CST"]
         xsecuritytoken = self.ig_service.session.headers["X-SECURITY-TOKEN"]
-        ls_password = "CST-%s|XST-%s" % (cst, xsecuritytoken)
+        self._ls_password = "CST-%s|XST-%s" % (cst, xsecuritytoken)
 
-        # Establishing a new connection to Lightstreamer Server
-        logger.info("Starting connection with %s" % self.lightstreamerEndpoint)
-        self.ls_client = LightstreamerClient(self.lightstreamerEndpoint, None)
-        self.ls_client.connectionDetails.setUser(self.acc_number)
-        self.ls_client.connectionDetails.setPassword(ls_password)
-        try:
+    def _new_client(self):
+        client = LightstreamerClient(self.lightstreamerEndpoint, None)
+        client.connectionDetails.setUser(self.acc_number)
+        client.connectionDetails.setPassword(self._ls_password)
+        for name, value in self.connection_options.items():
+            getattr(client.connectionOptions, f"set{name}")(value)
+        for listener in self._client_listeners:
+            client.addListener(listener)
+        return client
+
+    def reconnect(self, refresh_tokens=True):
+        """
+        Replaces the Lightstreamer client with a new one, logging in again to IG
+        for fresh session tokens first, and moves the client listeners and all
+        the subscriptions over to it
+        :param refresh_tokens: create a new IG session. Optional, default True
+        :type refresh_tokens: bool
+        """
+        if refresh_tokens:
+            self._login()
+        with self._client_lock:
+            old_client = self.ls_client
+            subscriptions = list(old_client.getSubscriptions())
+            for listener in self._client_listeners:
+                old_client.removeListener(listener)
+            for sub in subscriptions:
+                old_client.unsubscribe(sub)
+            old_client.disconnect()
+
+            logger.info(
+                f"Reconnecting to {self.lightstreamerEndpoint}, "
+                f"replaying {len(subscriptions)} subscription(s)"
+            )
+            self.ls_client = self._new_client()
+            for sub in subscriptions:
+                self.ls_client.subscribe(sub)
             self.ls_client.connect()
-            return
-        except Exception:
-            logger.error("Unable to connect to Lightstreamer Server")
-            logger.error(traceback.format_exc())
-            sys.exit(1)
+
+    @property
+    def supervisor(self):
+        return self._supervisor
+
+    @supervisor.setter
+    def supervisor(self, supervisor):
+        """Sets the StreamSupervisor, passing it the on_gap callbacks"""
+        self._supervisor = supervisor
+        if supervisor is not None:
+            for callback in self._gap_callbacks:
+                supervisor.on_gap(callback)
+
+    def supervise(self, **kwargs):
+        """
+        Starts a StreamSupervisor, keeping the connection up. Keyword arguments
+        are passed to StreamSupervisor
+        :rtype: StreamSupervisor
+        """
+        if self.supervisor is None:
+            self.supervisor = StreamSupervisor(self, **kwargs)
+            self.supervisor.start()
+        return self.supervisor
+
+    def on_gap(self, callback):
+        """
+        Registers a callback, called with a StreamGap after each outage. It is
+        passed on to the current supervisor, and to any supervisor set later
+        """
+        self._gap_callbacks.append(callback)
+        if self.supervisor is not None:
+            self.supervisor.on_gap(callback)
 
     def subscribe(self, subscription: Subscription):
-        self.ls_client.subscribe(subscription)
+        with self._client_lock:
+            self.ls_client.subscribe(subscription)
 
     def unsubscribe(self, subscription: Subscription):
-        self.ls_client.unsubscribe(subscription)
+        with self._client_lock:
+            self.ls_client.unsubscribe(subscription)
 
     def unsubscribe_all(self):
-        # To avoid a RuntimeError: dictionary changed size during iteration
-        subscriptions = self.ls_client.getSubscriptions().copy()
-        for sub in subscriptions:
-            self.ls_client.unsubscribe(sub)
+        with self._client_lock:
+            # To avoid a RuntimeError: dictionary changed size during iteration
+            subscriptions = self.ls_client.getSubscriptions().copy()
+            for sub in subscriptions:
+                self.ls_client.unsubscribe(sub)
 
     def add_client_listener(self, listener: ClientListener):
-        self.ls_client.addListener(listener)
+        with self._client_lock:
+            self._client_listeners.append(listener)
+            self.ls_client.addListener(listener)
 
     def remove_client_listener(self, listener: ClientListener):
-        self.ls_client.removeListener(listener)
+        with self._client_lock:
+            self._client_listeners.remove(listener)
+            self.ls_client.removeListener(listener)
 
     def disconnect(self):
+        if self.supervisor is not None:
+            self.supervisor.stop()
+            self.supervisor = None
         self.unsubscribe_all()
         self.ls_client.disconnect()
+
+
+class StreamSupervisor(ClientListener):
+    """
+    Keeps an IGStreamService connected.
+
+    The Lightstreamer client retries by itself after most network problems,
+    and resubscribes when it gets back. The supervisor watches the client
+    status, and steps in when the client gives up (status DISCONNECTED, e.g.
+    after a server error for expired CST/XST tokens), or has been down for
+    longer than max_outage: it logs in to IG again for fresh tokens, and
+    replaces the client with IGStreamService.reconnect(), replaying all the
+    subscriptions. Failed attempts are retried with jittered exponential
+    backoff.
+
+    Each outage is reported, once the connection is back, as a StreamGap (start
+    and end in ms since epoch) to the on_gap callbacks, so that candle builders
+    can backfill only the missed window
+    """
+
+    def __init__(
+        self,
+        stream_service,
+        min_wait=1.0,
+        max_wait=60.0,
+        max_outage=30.0,
+        check_interval=1.0,
+        max_gaps=100,
+    ):
+        """
+        :param stream_service: connected stream service
+        :type stream_service: IGStreamService
+        :param min_wait: seconds before the first reconnect retry. Optional,
+            default 1
+        :type min_wait: float
+        :param max_wait: max seconds between reconnect retries. Optional,
+            default 60
+        :type max_wait: float
+        :param max_outage: seconds to let the client recover by itself before
+            replacing it. Optional, default 30
+        :type max_outage: float
+        :param check_interval: seconds between status checks. Optional, default 1
+        :type check_interval: float
+        :param max_gaps: number of gaps kept in gaps. Optional, default 100
+        :type max_gaps: int
+        """
+        self.stream_service = stream_service
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self.max_outage = max_outage
+        self.check_interval = check_interval
+        self.gaps = deque(maxlen=max_gaps)
+        self.reconnects = 0
+        self.status = None
+        self._lock = Lock()
+        self._wake = Event()
+        self._stopped = Event()
+        self._callbacks = []
+        self._thread = None
+        self._was_up = False
+        self._down_since = None
+        self._last_attempt = None
+        self._next_attempt = 0.0
+        self._attempt = 0
+        self._reconnect_needed = False
+
+    def start(self):
+        self.stream_service.add_client_listener(self)
+        self._thread = Thread(target=self._run, name="StreamSupervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        try:
+            self.stream_service.remove_client_listener(self)
+        except ValueError:
+            pass
+
+    def on_gap(self, callback):
+        """Registers a callback, called with a StreamGap after each outage"""
+        self._callbacks.append(callback)
+
+    @property
+    def connected(self):
+        return self._is_up(self.status)
+
+    @staticmethod
+    def _is_up(status):
+        return (
+            status is not None
+            and status.startswith("CONNECTED:")
+            and status != "CONNECTED:STREAM-SENSING"
+        )
+
+    def backoff(self, attempt):
+        """Seconds to wait before the given retry: exponential, capped at
+        max_wait, with jitter so that many clients do not retry in step"""
+        wait = min(self.max_wait, self.min_wait * 2**attempt)
+        return random.uniform(wait / 2, wait)
+
+    # -------- CLIENT LISTENER -------- #
+
+    def onStatusChange(self, status):
+        gap = None
+        with self._lock:
+            if status == "DISCONNECTED":
+                # ignore a late event from a client that has been replaced
+                client = self.stream_service.ls_client
+                if client is not None and client.getStatus() != "DISCONNECTED":
+                    return
+            self.status = status
+            if self._is_up(status):
+                if self._down_since is not None:
+                    gap = StreamGap(self._down_since[1], int(time.time() * 1000))
+                    self._down_since = None
+                self._was_up = True
+                self._attempt = 0
+                self._reconnect_needed = False
+            else:
+                if self._was_up and self._down_since is None:
+                    self._down_since = (time.monotonic(), int(time.time() * 1000))
+                if status == "DISCONNECTED" and not self._stopped.is_set():
+                    self._reconnect_needed = True
+        logger.info(f"Stream status: {status}")
+        self._wake.set()
+        if gap is not None:
+            self._emit(gap)
+
+    def onServerError(self, code, message):
+        logger.warning(f"Stream server error: '{code}' {message}")
+        with self._lock:
+            self._reconnect_needed = True
+        self._wake.set()
+
+    # -------- SUPERVISION -------- #
+
+    def _emit(self, gap):
+        logger.warning(
+            f"Stream was down for {(gap.end - gap.start) / 1000:.1f}s "
+            f"({gap.start} - {gap.end})"
+        )
+        self.gaps.append(gap)
+        for callback in self._callbacks:
+            try:
+                callback(gap)
+            except Exception:
+                logger.exception("Error in stream gap callback")
+
+    def _due(self, now):
+        """Whether the client should be replaced now"""
+        if self._is_up(self.status) or now < self._next_attempt:
+            return False
+        if self._reconnect_needed:
+            return True
+        # give the client (or the last replacement) max_outage to recover
+        if self._down_since is not None:
+            since = self._down_since[0]
+            if self._last_attempt is not None:
+                since = max(since, self._last_attempt)
+            return now - since > self.max_outage
+        return False
+
+    def _run(self):
+        logger.info("StreamSupervisor: Running")
+        while not self._stopped.is_set():
+            self._wake.wait(self.check_interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            now = time.monotonic()
+            with self._lock:
+                if not self._due(now):
+                    continue
+                self._reconnect_needed = False
+                self._last_attempt = now
+                self._next_attempt = now + self.backoff(self._attempt)
+                self._attempt += 1
+                attempt = self._attempt
+            logger.warning(f"StreamSupervisor: reconnect attempt {attempt}")
+            try:
+                self.stream_service.reconnect(refresh_tokens=True)
+                self.reconnects += 1
+            except Exception:
+                logger.exception("StreamSupervisor: reconnect failed")
+                with self._lock:
+                    self._reconnect_needed = True
+        logger.info("StreamSupervisor: Stopped")
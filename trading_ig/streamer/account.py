@@ -0,0 +1,80 @@
+from lightstreamer.client import Subscription
+from .objects import nan, StreamObject
+
+
+class AccountSubscription(Subscription):
+    """Represents a subscription for account balance updates"""
+
+    ACCOUNT_FIELDS = [
+        "PNL",
+        "DEPOSIT",
+        "AVAILABLE_CASH",
+        "PNL_LR",
+        "PNL_NLR",
+        "FUNDS",
+        "MARGIN",
+        "MARGIN_LR",
+        "MARGIN_NLR",
+        "AVAILABLE_TO_DEAL",
+        "EQUITY",
+        "EQUITY_USED",
+    ]
+
+    def __init__(self, account_id: str):
+        super().__init__(
+            mode="MERGE",
+            items=[f"ACCOUNT:{account_id}"],
+            fields=self.ACCOUNT_FIELDS,
+        )
+
+    def __repr__(self) -> str:
+        return f"AccountSubscription for {self.getItems()}"
+
+
+class Account(StreamObject):
+    __slots__ = [
+        "account_id",
+        "pnl",
+        "deposit",
+        "available_cash",
+        "pnl_lr",
+        "pnl_nlr",
+        "funds",
+        "margin",
+        "margin_lr",
+        "margin_nlr",
+        "available_to_deal",
+        "equity",
+        "equity_used",
+    ]
+
+    FIELDS = {
+        "PNL": ("pnl", float),
+        "DEPOSIT": ("deposit", float),
+        "AVAILABLE_CASH": ("available_cash", float),
+        "PNL_LR": ("pnl_lr", float),
+        "PNL_NLR": ("pnl_nlr", float),
+        "FUNDS": ("funds", float),
+        "MARGIN": ("margin", float),
+        "MARGIN_LR": ("margin_lr", float),
+        "MARGIN_NLR": ("margin_nlr", float),
+        "AVAILABLE_TO_DEAL": ("available_to_deal", float),
+        "EQUITY": ("equity", float),
+        "EQUITY_USED": ("equity_used", float),
+    }
+
+    def __init__(self, account_id):
+        self.account_id = account_id
+        for attr, _ in self.FIELDS.values():
+            setattr(self, attr, nan)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.account_id}: funds {self.funds} equity {self.equity} "
+            f"pnl {self.pnl} margin {self.margin} "
+            f"available to deal {self.available_to_deal}"
+        )
+
+    @classmethod
+    def identifier(cls, name):
+        return name.split(":")[1]
@@ -0,0 +1,407 @@
+import logging
+import math
+import time
+from collections import deque
+from threading import Lock
+from typing import Callable, List
+
+from lightstreamer.client import Subscription
+
+from ..rest import IGException
+from ..utils import _HAS_PANDAS, OPT_URL
+
+if _HAS_PANDAS:
+    from ..utils import pd
+
+logger = logging.getLogger(__name__)
+
+# column layout of freqtrade OHLCV dataframes
+OHLCV_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+
+TIMEFRAME_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+# IG chart candle scales, as freqtrade timeframes
+CANDLE_SCALES = {"SECOND": "1s", "1MINUTE": "1m", "5MINUTE": "5m", "HOUR": "1h"}
+
+
+def timeframe_to_msecs(timeframe: str) -> int:
+    """Converts a freqtrade style timeframe (e.g. '5m', '1h') to milliseconds"""
+    try:
+        return int(timeframe[:-1]) * TIMEFRAME_UNITS[timeframe[-1]] * 1000
+    except (KeyError, ValueError):
+        raise ValueError(f"Unsupported timeframe '{timeframe}'")
+
+
+class CandleSubscription(Subscription):
+    """Represents a subscription for IG chart candles of one scale (SECOND,
+    1MINUTE, 5MINUTE or HOUR)"""
+
+    CANDLE_FIELDS = [
+        "UTM",
+        "BID_OPEN",
+        "BID_HIGH",
+        "BID_LOW",
+        "BID_CLOSE",
+        "OFR_OPEN",
+        "OFR_HIGH",
+        "OFR_LOW",
+        "OFR_CLOSE",
+        "LTP_OPEN",
+        "LTP_HIGH",
+        "LTP_LOW",
+        "LTP_CLOSE",
+        "LTV",
+        "CONS_TICK_COUNT",
+        "CONS_END",
+    ]
+
+    def __init__(self, epic: str, scale: str = "1MINUTE"):
+        if scale not in CANDLE_SCALES:
+            raise ValueError(f"Unsupported candle scale '{scale}'")
+        self.epic = epic
+        self.scale = scale
+        super().__init__(
+            mode="MERGE",
+            items=[f"CHART:{epic}:{scale}"],
+            fields=self.CANDLE_FIELDS,
+        )
+
+    def __repr__(self) -> str:
+        return f"CandleSubscription for {self.epic} {self.scale}"
+
+
+class Candle:
+    """One OHLCV candle, start is in ms since epoch"""
+
+    __slots__ = ["start", "open", "high", "low", "close", "volume"]
+
+    def __init__(self, start, open, high, low, close, volume):
+        self.start = start
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def merge(self, open, high, low, close, volume):
+        if high > self.high:
+            self.high = high
+        if low < self.low:
+            self.low = low
+        self.close = close
+        self.volume += volume
+
+    def copy(self):
+        return Candle(
+            self.start, self.open, self.high, self.low, self.close, self.volume
+        )
+
+    def row(self):
+        """Returns the candle as a freqtrade OHLCV row (date as ms since epoch)"""
+        return [self.start, self.open, self.high, self.low, self.close, self.volume]
+
+    def __repr__(self) -> str:
+        return f"Candle({', '.join(str(v) for v in self.row())})"
+
+
+class _Series:
+    """Completed candles and the open candle for one epic and timeframe"""
+
+    __slots__ = ["msecs", "current", "completed", "closed"]
+
+    def __init__(self, msecs, maxlen):
+        self.msecs = msecs
+        self.current = None
+        self.completed = deque(maxlen=maxlen)
+        # start of the last completed candle, later updates for it are dropped
+        self.closed = None
+
+    def complete(self):
+        """Completes the open candle, and returns it"""
+        candle = self.current
+        self.completed.append(candle)
+        self.closed = candle.start
+        self.current = None
+        return candle
+
+
+class CandleBuilder:
+    """
+    Builds OHLCV candles for several timeframes at once, incrementally, from
+    ticks or from IG chart candles of a smaller scale.
+
+    Each tick, or each completed source candle, is folded into the open candle
+    of every timeframe, so the work per update is O(number of timeframes). A
+    candle is completed when the first update for a later period arrives, or
+    when close_expired() is called after its period has ended. Completed
+    candles are passed to the on_candle callbacks and kept, up to maxlen per
+    epic and timeframe. Late updates, for a candle already completed, are
+    dropped, so each candle is emitted once.
+
+    Candles are returned in freqtrade's OHLCV layout: date (UTC), open, high,
+    low, close, volume
+    """
+
+    PRICES = ("mid", "bid", "offer", "ltp")
+
+    def __init__(self, timeframes=("1m",), price="mid", volume="ticks", maxlen=1000):
+        """
+        :param timeframes: freqtrade style timeframes, e.g. ["1m", "5m", "1h"]
+        :type timeframes: list of str
+        :param price: price used for ticks: mid, bid, offer or ltp.
+            Optional, default mid
+        :type price: str
+        :param volume: ticks (tick count) or ltv (last traded volume).
+            Optional, default ticks
+        :type volume: str
+        :param maxlen: completed candles kept per epic and timeframe.
+            Optional, default 1000
+        :type maxlen: int
+        """
+        if price not in self.PRICES:
+            raise ValueError(f"price must be one of {self.PRICES}")
+        if volume not in ("ticks", "ltv"):
+            raise ValueError("volume must be 'ticks' or 'ltv'")
+        self.timeframes = list(timeframes)
+        self._msecs = [timeframe_to_msecs(tf) for tf in self.timeframes]
+        self.price = price
+        self.volume = volume
+        self.maxlen = maxlen
+        self._series = {}
+        self._pending = {}
+        # last traded volume last folded in, per epic
+        self._ltv = {}
+        self._callbacks = []
+        self._gap_callbacks = []
+        self.gaps = deque(maxlen=100)
+        self._lock = Lock()
+
+    def on_candle(self, callback: Callable[[str, str, List], None]):
+        """
+        Registers a callback for completed candles, called as
+        callback(epic, timeframe, row) with row in OHLCV layout
+        """
+        self._callbacks.append(callback)
+
+    def _epic_series(self, epic):
+        series = self._series.get(epic)
+        if series is None:
+            series = [_Series(msecs, self.maxlen) for msecs in self._msecs]
+            self._series[epic] = series
+        return series
+
+    def _fold(self, epic, start, open, high, low, close, volume):
+        completed = []
+        with self._lock:
+            for i, series in enumerate(self._epic_series(epic)):
+                bucket = start - start % series.msecs
+                current = series.current
+                if current is not None and bucket == current.start:
+                    current.merge(open, high, low, close, volume)
+                elif (current is not None and bucket < current.start) or (
+                    series.closed is not None and bucket <= series.closed
+                ):
+                    logger.debug(f"Dropping late update for {epic} at {start}")
+                else:
+                    if current is not None:
+                        completed.append((self.timeframes[i], series.complete()))
+                    series.current = Candle(bucket, open, high, low, close, volume)
+        self._emit(epic, completed)
+
+    def _emit(self, epic, completed):
+        for timeframe, candle in completed:
+            row = candle.row()
+            for callback in self._callbacks:
+                try:
+                    callback(epic, timeframe, row)
+                except Exception:
+                    logger.exception(f"Error in candle callback for {epic}")
+
+    # -------- SOURCES -------- #
+
+    def add_tick(self, epic, timestamp, price, volume=0):
+        """
+        Folds one tick into the open candles of the epic
+        :param timestamp: tick time, ms since epoch
+        :type timestamp: int
+        :param volume: last traded volume, used when volume is 'ltv'
+        :type volume: int
+        """
+        if price is None or math.isnan(price):
+            return
+        volume = 1 if self.volume == "ticks" else volume
+        self._fold(epic, timestamp, price, price, price, price, volume)
+
+    def add_ticker(self, ticker):
+        """
+        Folds the current values of a Ticker into the open candles. A Ticker
+        keeps its last traded volume across price only updates, so with
+        volume 'ltv' it is only counted when it has changed
+        """
+        if ticker.timestamp_ms is None:
+            return
+        if self.price == "mid":
+            price = (ticker.bid + ticker.offer) / 2
+        elif self.price == "bid":
+            price = ticker.bid
+        elif self.price == "offer":
+            price = ticker.offer
+        else:
+            price = ticker.last_traded_price
+        volume = ticker.last_traded_volume
+        if self._ltv.get(ticker.epic) == volume:
+            volume = 0
+        else:
+            self._ltv[ticker.epic] = volume
+        self.add_tick(ticker.epic, ticker.timestamp_ms, price, volume)
+
+    def add_candle_update(self, epic, scale, values):
+        """
+        Folds an IG chart candle update (all fields of a CandleSubscription
+        item) into the open candles. A source candle is only folded in once it
+        is complete, either flagged by CONS_END or replaced by a later candle,
+        so the timeframes must be multiples of the scale
+        """
+        source = self._parse_candle(values)
+        if source is None:
+            return
+        key = (epic, scale)
+        complete = values.get("CONS_END") == "1"
+        with self._lock:
+            pending = self._pending.get(key)
+            if complete:
+                self._pending.pop(key, None)
+            else:
+                self._pending[key] = source
+        if pending is not None and pending.start < source.start:
+            self._fold(epic, *pending.row())
+        if complete:
+            self._fold(epic, *source.row())
+
+    def _parse_candle(self, values):
+        prefix = {"mid": None, "bid": "BID", "offer": "OFR", "ltp": "LTP"}[self.price]
+        try:
+            start = int(values["UTM"])
+            if prefix is None:
+                ohlc = [
+                    (float(values[f"BID_{f}"]) + float(values[f"OFR_{f}"])) / 2
+                    for f in ("OPEN", "HIGH", "LOW", "CLOSE")
+                ]
+            else:
+                ohlc = [
+                    float(values[f"{prefix}_{f}"])
+                    for f in ("OPEN", "HIGH", "LOW", "CLOSE")
+                ]
+            field = "CONS_TICK_COUNT" if self.volume == "ticks" else "LTV"
+            volume = int(values.get(field) or 0)
+        except (KeyError, TypeError, ValueError):
+            # ignore, there will be plenty of dud values
+            return None
+        return Candle(start, *ohlc, volume)
+
+    def close_expired(self, now=None):
+        """
+        Completes the open candles whose period has ended, for markets that
+        have gone quiet
+        :param now: ms since epoch. Optional, defaults to the current time
+        :type now: int
+        """
+        if now is None:
+            now = int(time.time() * 1000)
+        for epic in list(self._series):
+            completed = []
+            with self._lock:
+                for i, series in enumerate(self._series[epic]):
+                    current = series.current
+                    if current is not None and current.start + series.msecs <= now:
+                        completed.append((self.timeframes[i], series.complete()))
+            self._emit(epic, completed)
+
+    # -------- GAPS -------- #
+
+    def on_gap(self, callback: Callable[[int, int], None]):
+        """
+        Registers a callback for stream outages, called as callback(start, end)
+        in ms since epoch
+        """
+        self._gap_callbacks.append(callback)
+
+    def mark_gap(self, start, end):
+        """
+        Records a period without streamed data (see StreamSupervisor), so the
+        candles it touched can be backfilled, e.g. from REST historical prices
+        """
+        self.gaps.append((start, end))
+        for callback in self._gap_callbacks:
+            try:
+                callback(start, end)
+            except Exception:
+                logger.exception("Error in candle gap callback")
+
+    def gap_window(self, start, end, timeframe):
+        """
+        Returns the period covered by the candles of the timeframe touched by a
+        gap, from the start of the first candle to the end of the last one
+        :rtype: tuple of int, ms since epoch
+        """
+        msecs = timeframe_to_msecs(timeframe)
+        return start - start % msecs, end - end % msecs + msecs
+
+    def backfill(self, epic, timeframe, rows):
+        """
+        Merges candles fetched from elsewhere (e.g. for the window of a gap)
+        into the completed candles, replacing those with the same date. Rows
+        are in OHLCV layout with dates in ms since epoch; rows for the open
+        candle or later are ignored
+        """
+        index = self.timeframes.index(timeframe)
+        with self._lock:
+            series = self._epic_series(epic)[index]
+            current = series.current
+            candles = {candle.start: candle for candle in series.completed}
+            for row in rows:
+                if current is not None and row[0] >= current.start:
+                    continue
+                candles[row[0]] = Candle(*row)
+            series.completed.clear()
+            series.completed.extend(sorted(candles.values(), key=lambda c: c.start))
+            if series.completed:
+                # a later tick must not open a backfilled candle again
+                last = series.completed[-1].start
+                if series.closed is None or last > series.closed:
+                    series.closed = last
+
+    # -------- OUTPUT -------- #
+
+    def rows(self, epic, timeframe, include_open=False):
+        """
+        Returns the retained candles for the epic and timeframe, oldest first
+        :param include_open: include the open (incomplete) candle.
+            Optional, default False
+        :type include_open: bool
+        :return: OHLCV rows, dates as ms since epoch
+        :rtype: list of list
+        """
+        index = self.timeframes.index(timeframe)
+        with self._lock:
+            series = self._series.get(epic)
+            if series is None:
+                return []
+            series = series[index]
+            candles = list(series.completed)
+            if include_open and series.current is not None:
+                candles.append(series.current.copy())
+        return [candle.row() for candle in candles]
+
+    def dataframe(self, epic, timeframe, include_open=False):
+        """
+        Returns the retained candles as a freqtrade OHLCV DataFrame
+        :rtype: pandas.DataFrame
+        """
+        if not _HAS_PANDAS:
+            raise IGException(f"dataframe() requires pandas. See {OPT_URL}")
+        frame = pd.DataFrame(
+            self.rows(epic, timeframe, include_open), columns=OHLCV_COLUMNS
+        )
+        frame["date"] = pd.to_datetime(frame["date"], unit="ms", utc=True)
+        return frame
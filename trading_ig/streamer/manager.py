@@ -1,29 +1,102 @@
+import asyncio
 import logging
-from queue import Queue
-from threading import Thread
+from concurrent.futures import Future, wait
+from threading import Lock, Thread
 import time
+from typing import Dict, List, Union
 
 from lightstreamer.client import SubscriptionListener, ItemUpdate
 
 from trading_ig import IGStreamService
 from .ticker import Ticker
 from .ticker import TickerSubscription
+from .store import TickStore
+from .candles import CandleBuilder
+from .candles import CandleSubscription
+from .market import Market
+from .market import MarketSubscription
+from .account import Account
+from .account import AccountSubscription
+from .positions import PositionCache
+from .trade import DealConfirmations
+from .trade import Trade
+from .trade import TradeSubscription
+from .updates import ShardedQueue
+from .updates import UpdateQueue
+from .recorder import StreamRecorder
+from .shared import PricePublisher
 
 logger = logging.getLogger(__name__)
 
 
 class StreamingManager:
-    def __init__(self, service: IGStreamService):
+    def __init__(
+        self,
+        service: IGStreamService,
+        tick_capacity=None,
+        candle_builder: CandleBuilder = None,
+        workers=1,
+        maxsize=10000,
+        batch_size=500,
+        recorder: StreamRecorder = None,
+        publisher: PricePublisher = None,
+    ):
+        """
+        :param service: stream service
+        :type service: IGStreamService
+        :param tick_capacity: if set, the latest tick_capacity ticks for each
+            epic are kept in tick_store. Optional, default None (no history).
+            Requires numpy
+        :type tick_capacity: int
+        :param candle_builder: if set, ticks and chart candles are folded into
+            its candles. Optional, default None
+        :type candle_builder: CandleBuilder
+        :param workers: number of consumer threads. Updates are sharded by item,
+            so each epic is always handled by the same thread. Optional, default 1
+        :type workers: int
+        :param maxsize: updates queued per consumer before updates for the same
+            item are conflated. Optional, default 10000
+        :type maxsize: int
+        :param batch_size: max updates taken from the queue at once.
+            Optional, default 500
+        :type batch_size: int
+        :param recorder: if set, every update received by the subscriptions
+            started here is recorded, for replay with StreamReplay. It is closed
+            by stop_subscriptions(). Optional, default None
+        :type recorder: StreamRecorder
+        :param publisher: if set, every tick is also written to its shared
+            memory segment, for PriceReaders in other processes. Optional,
+            default None
+        :type publisher: PricePublisher
+        """
         self._service = service
+        self._recorder = recorder
+        self._publisher = publisher
+        self._position_cache = None
         self._subs = {}
 
         # setup data objects
         self._tickers = {}
+        self._markets = {}
+        self._accounts = {}
+        self._trades = {}
+        self._ticker_futures = {}
+        self._ticker_lock = Lock()
+        self._tick_store = TickStore(tick_capacity) if tick_capacity else None
+        self._candle_builder = candle_builder
 
-        # set up consumer queue
-        self._queue = Queue()
-        self._consumer_thread = Consumer(self._queue, self)
-        self._consumer_thread.start()
+        # report stream outages, once the connection is supervised
+        if service is not None:
+            service.on_gap(self.on_gap)
+
+        # set up consumer queues, one per consumer thread
+        self._queue = ShardedQueue(workers, maxsize)
+        self._consumers = []
+        for i, shard in enumerate(self._queue.shards):
+            name = "ConsumerThread" if workers == 1 else f"ConsumerThread-{i}"
+            consumer = Consumer(shard, self, name=name, batch_size=batch_size)
+            consumer.start()
+            self._consumers.append(consumer)
 
     @property
     def service(self):
@@ -33,49 +106,248 @@ class StreamingManager:
     def tickers(self):
         return self._tickers
 
-    def start_tick_subscription(self, epic) -> TickerSubscription:
+    @property
+    def markets(self):
+        return self._markets
+
+    @property
+    def accounts(self):
+        return self._accounts
+
+    @property
+    def trades(self):
+        return self._trades
+
+    @property
+    def tick_store(self) -> TickStore:
+        return self._tick_store
+
+    @property
+    def candle_builder(self) -> CandleBuilder:
+        return self._candle_builder
+
+    @property
+    def recorder(self) -> StreamRecorder:
+        return self._recorder
+
+    @property
+    def publisher(self) -> PricePublisher:
+        return self._publisher
+
+    @property
+    def position_cache(self) -> PositionCache:
+        return self._position_cache
+
+    def _add_listeners(self, subscription):
+        subscription.addListener(TickerListener(self._queue))
+        if self._recorder is not None:
+            subscription.addListener(self._recorder)
+
+    def start_tick_subscription(
+        self, epic: Union[str, List[str]]
+    ) -> TickerSubscription:
+        """Subscribes to ticks for one epic, or for a list of epics with a single
+        multi-item subscription"""
         tick_sub = TickerSubscription(epic)
-        tick_sub.addListener(TickerListener(self._queue))
+        self._add_listeners(tick_sub)
         self.service.subscribe(tick_sub)
-        self._subs[epic] = tick_sub
+        for epic in tick_sub.epics:
+            self._subs[epic] = tick_sub
         return tick_sub
 
-    def stop_tick_subscription(self, epic):
-        subscription = self._subs.pop(epic)
+    def stop_tick_subscription(self, epic: Union[str, List[str]]):
+        """Stops ticks for one epic, or a list of epics. A multi-item
+        subscription is unsubscribed once none of its epics are wanted"""
+        epics = [epic] if isinstance(epic, str) else epic
+        subscriptions = [self._subs.pop(epic) for epic in epics]
+        for subscription in {id(s): s for s in subscriptions}.values():
+            if not any(s is subscription for s in self._subs.values()):
+                self.service.unsubscribe(subscription)
+
+    def start_candle_subscription(self, epic, scale="1MINUTE") -> CandleSubscription:
+        """Subscribes to IG chart candles for the epic, to be folded into the
+        candle builder's timeframes"""
+        if self._candle_builder is None:
+            raise Exception("A candle_builder is needed for candle subscriptions")
+        candle_sub = CandleSubscription(epic, scale)
+        self._add_listeners(candle_sub)
+        self.service.subscribe(candle_sub)
+        self._subs[f"CHART:{epic}:{scale}"] = candle_sub
+        return candle_sub
+
+    def stop_candle_subscription(self, epic, scale="1MINUTE"):
+        subscription = self._subs.pop(f"CHART:{epic}:{scale}")
+        self.service.unsubscribe(subscription)
+
+    def start_market_subscription(self, epic) -> MarketSubscription:
+        market_sub = MarketSubscription(epic)
+        self._add_listeners(market_sub)
+        self.service.subscribe(market_sub)
+        self._subs[f"MARKET:{epic}"] = market_sub
+        return market_sub
+
+    def stop_market_subscription(self, epic):
+        subscription = self._subs.pop(f"MARKET:{epic}")
         self.service.unsubscribe(subscription)
 
+    def start_account_subscription(self, account_id=None) -> AccountSubscription:
+        if account_id is None:
+            account_id = self._account_id()
+        account_sub = AccountSubscription(account_id)
+        self._add_listeners(account_sub)
+        self.service.subscribe(account_sub)
+        self._subs[f"ACCOUNT:{account_id}"] = account_sub
+        return account_sub
+
+    def stop_account_subscription(self, account_id=None):
+        if account_id is None:
+            account_id = self._account_id()
+        subscription = self._subs.pop(f"ACCOUNT:{account_id}")
+        self.service.unsubscribe(subscription)
+
+    def start_trade_subscription(self, account_id=None) -> TradeSubscription:
+        """Subscribes to the TRADE channel for the account, and has the REST
+        service take deal confirmations from the stream instead of polling"""
+        if account_id is None:
+            account_id = self._account_id()
+        confirmations = DealConfirmations()
+        trade_sub = TradeSubscription(account_id)
+        trade_sub.addListener(confirmations)
+        self._add_listeners(trade_sub)
+        self.service.subscribe(trade_sub)
+        self._subs[f"TRADE:{account_id}"] = trade_sub
+        self.service.ig_service.deal_confirmations = confirmations
+        return trade_sub
+
+    def stop_trade_subscription(self, account_id=None):
+        if account_id is None:
+            account_id = self._account_id()
+        subscription = self._subs.pop(f"TRADE:{account_id}")
+        self.service.unsubscribe(subscription)
+        self.service.ig_service.deal_confirmations = None
+
+    def start_position_cache(self, account_id=None) -> PositionCache:
+        """Starts the TRADE and ACCOUNT subscriptions for the account, if not
+        already started, and keeps a PositionCache up to date from them,
+        loading the open positions and working orders once from the REST API"""
+        if account_id is None:
+            account_id = self._account_id()
+        cache = PositionCache(account_id)
+        self._position_cache = cache
+        if f"TRADE:{account_id}" not in self._subs:
+            self.start_trade_subscription(account_id)
+        if f"ACCOUNT:{account_id}" not in self._subs:
+            self.start_account_subscription(account_id)
+        cache.bootstrap(self.service.ig_service)
+        return cache
+
+    def _account_id(self):
+        return self.service.acc_number or self.service.ig_service.ACC_NUMBER
+
     def ticker(self, epic, timeout_length=3):
         # we won't have a ticker until at least one update is received from server,
         # let's give it a few seconds
-        timeout = time.time() + timeout_length
-        while True:
-            logger.info(f"Waiting for ticker for '{epic}'...")
-            if epic in self._tickers or time.time() > timeout:
-                break
-            time.sleep(0.25)
-        try:
-            ticker = self._tickers[epic]
-        except KeyError:
+        return self.wait_for_tickers([epic], timeout_length)[epic]
+
+    def _ticker_future(self, epic) -> Future:
+        with self._ticker_lock:
+            future = self._ticker_futures.get(epic)
+            if future is None:
+                future = Future()
+                ticker = self._tickers.get(epic)
+                if ticker is not None:
+                    future.set_result(ticker)
+                self._ticker_futures[epic] = future
+            return future
+
+    def _ticker_ready(self, epic, ticker):
+        """Called by the consumer once the first update for an epic is handled"""
+        with self._ticker_lock:
+            future = self._ticker_futures.get(epic)
+        if future is not None and not future.done():
+            future.set_result(ticker)
+
+    def wait_for_tickers(self, epics: List[str], timeout=3) -> Dict[str, Ticker]:
+        """
+        Waits until the first update for each epic has been received. Returns
+        as soon as the last one arrives, rather than polling
+        :param epics: epics to wait for
+        :type epics: list of str
+        :param timeout: max seconds to wait. Optional, default 3
+        :type timeout: float
+        :return: epic to Ticker
+        :rtype: dict
+        """
+        futures = {epic: self._ticker_future(epic) for epic in epics}
+        logger.info(f"Waiting for tickers for {len(futures)} epic(s)...")
+        wait(futures.values(), timeout)
+        return self._ticker_results(futures, timeout)
+
+    async def wait_for_tickers_async(
+        self, epics: List[str], timeout=3
+    ) -> Dict[str, Ticker]:
+        """
+        Async version of wait_for_tickers()
+        :return: epic to Ticker
+        :rtype: dict
+        """
+        futures = {epic: self._ticker_future(epic) for epic in epics}
+        logger.info(f"Waiting for tickers for {len(futures)} epic(s)...")
+        pending = [asyncio.wrap_future(f) for f in futures.values() if not f.done()]
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
+        return self._ticker_results(futures, timeout)
+
+    @staticmethod
+    def _ticker_results(futures, timeout):
+        missing = [epic for epic, future in futures.items() if not future.done()]
+        if missing:
             raise Exception(
-                f"No ticker found for {epic} after "
-                f"waiting {timeout_length} seconds - giving up"
+                f"No ticker found for {', '.join(missing)} after "
+                f"waiting {timeout} seconds - giving up"
             )
-        return ticker
+        return {epic: future.result() for epic, future in futures.items()}
 
     def on_update(self, update):
         self._queue.put(update)
 
+    def on_gap(self, gap):
+        """Passes a stream outage (StreamGap) on to the candle builder"""
+        if self._candle_builder is not None:
+            self._candle_builder.mark_gap(gap.start, gap.end)
+
+    def metrics(self):
+        """
+        Returns consumer metrics: updates queued, conflated and processed,
+        current queue depth and its high water mark, and lag (seconds from an
+        update being queued to it being handled) for the latest batch and the
+        worst so far, in total and per consumer
+        :rtype: dict
+        """
+        shards = [consumer.metrics() for consumer in self._consumers]
+        totals = {
+            key: sum(shard[key] for shard in shards)
+            for key in ("depth", "queued", "conflated", "processed", "batches")
+        }
+        for key in ("high_water", "lag", "max_lag"):
+            totals[key] = max(shard[key] for shard in shards)
+        totals["shards"] = shards
+        return totals
+
     def stop_subscriptions(self):
         logger.info("Unsubscribing from all")
         self.service.unsubscribe_all()
         self.service.disconnect()
-        if self._consumer_thread:
-            self._consumer_thread.join(timeout=5)
-            self._consumer_thread = None
+        self._queue.close()
+        for consumer in self._consumers:
+            consumer.join(timeout=5)
+        self._consumers = []
+        if self._recorder is not None:
+            self._recorder.close()
 
 
 class TickerListener(SubscriptionListener):
-    def __init__(self, queue: Queue) -> None:
+    def __init__(self, queue: ShardedQueue) -> None:
         self._queue = queue
 
     def onItemUpdate(self, update: ItemUpdate):
@@ -92,33 +364,134 @@ class TickerListener(SubscriptionListener):
 
 
 class Consumer(Thread):
-    def __init__(self, queue: Queue, manager: StreamingManager):
-        super().__init__(name="ConsumerThread", daemon=True)
+    # handler method for each item name prefix
+    DISPATCH = {
+        "CHART": "_handle_chart_update",
+        "MARKET": "_handle_market_update",
+        "ACCOUNT": "_handle_account_update",
+        "TRADE": "_handle_trade_update",
+    }
+
+    def __init__(
+        self,
+        queue: UpdateQueue,
+        manager: StreamingManager,
+        name="ConsumerThread",
+        batch_size=500,
+    ):
+        super().__init__(name=name, daemon=True)
         self._queue = queue
         self._manager = manager
+        self._batch_size = batch_size
+        self._dispatch = {
+            prefix: getattr(self, method) for prefix, method in self.DISPATCH.items()
+        }
+        self.processed = 0
+        self.batches = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
 
     @property
     def manager(self):
         return self._manager
 
+    def metrics(self):
+        return {
+            "depth": len(self._queue),
+            "high_water": self._queue.high_water,
+            "queued": self._queue.queued,
+            "conflated": self._queue.conflated,
+            "processed": self.processed,
+            "batches": self.batches,
+            "lag": self.lag,
+            "max_lag": self.max_lag,
+        }
+
     def run(self):
-        logger.info("Consumer: Running")
+        logger.info(f"{self.name}: Running")
+        dispatch = self._dispatch
         while True:
-            item = self._queue.get()
+            batch = self._queue.get_batch(self._batch_size)
+            if batch is None:
+                break
+            if not batch:
+                continue
+
+            # lag of the oldest update in the batch
+            self.lag = time.monotonic() - batch[0][2]
+            if self.lag > self.max_lag:
+                self.max_lag = self.lag
 
             # deal with each different type of update
-            name = item.getItemName()
-            if name.startswith("CHART:"):
-                self._handle_ticker_update(item)
+            for name, item, _ in batch:
+                handler = dispatch.get(name.partition(":")[0])
+                if handler is None:
+                    continue
+                try:
+                    handler(item)
+                except Exception:
+                    logger.exception(f"{self.name}: error handling update for {name}")
+
+            self.processed += len(batch)
+            self.batches += 1
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"{self.name}: handled {len(batch)} updates, "
+                    f"queue length: {len(self._queue)}, lag: {self.lag:.4f}s"
+                )
+        logger.info(f"{self.name}: Stopped")
 
-            logger.debug(f"Consumer thread alive. queue length: {self._queue.qsize()}")
+    def _handle_chart_update(self, item: ItemUpdate):
+        if item.getItemName().endswith(":TICK"):
+            self._handle_ticker_update(item)
+        else:
+            self._handle_candle_update(item)
 
     def _handle_ticker_update(self, item: ItemUpdate):
         epic = Ticker.identifier(item.getItemName())
 
-        if epic not in self.manager.tickers:
+        ticker = self.manager.tickers.get(epic)
+        if ticker is None:
             ticker = Ticker(epic)
+            ticker.populate(item.getChangedFields())
             self.manager.tickers[epic] = ticker
+            self.manager._ticker_ready(epic, ticker)
+        else:
+            ticker.populate(item.getChangedFields())
+        if self.manager.tick_store is not None:
+            self.manager.tick_store.append(ticker)
+        if self.manager.publisher is not None:
+            self.manager.publisher.append(ticker)
+        if self.manager.candle_builder is not None:
+            self.manager.candle_builder.add_ticker(ticker)
+
+    def _handle_candle_update(self, item: ItemUpdate):
+        if self.manager.candle_builder is None:
+            return
+        _, epic, scale = item.getItemName().split(":")
+        self.manager.candle_builder.add_candle_update(epic, scale, item.getFields())
+
+    def _handle_market_update(self, item: ItemUpdate):
+        self._populate(Market, self.manager.markets, item)
+
+    def _handle_account_update(self, item: ItemUpdate):
+        account = self._populate(Account, self.manager.accounts, item)
+        cache = self.manager.position_cache
+        if cache is not None and cache.account_id == account.account_id:
+            cache.on_account_update(item.getChangedFields())
+
+    def _handle_trade_update(self, item: ItemUpdate):
+        trade = self._populate(Trade, self.manager.trades, item)
+        cache = self.manager.position_cache
+        if cache is not None and cache.account_id == trade.account_id:
+            cache.on_trade_update(item.getChangedFields())
 
-        ticker = self.manager.tickers[epic]
-        ticker.populate(item.getChangedFields())
+    @staticmethod
+    def _populate(object_type, objects, item: ItemUpdate):
+        key = object_type.identifier(item.getItemName())
+        obj = objects.get(key)
+        if obj is None:
+            obj = object_type(key)
+            objects[key] = obj
+        obj.populate(item.getChangedFields())
+        return obj
@@ -0,0 +1,82 @@
+from lightstreamer.client import Subscription
+from .objects import nan, StreamObject
+
+
+class MarketSubscription(Subscription):
+    """Represents a subscription for market (L1 prices and status) updates"""
+
+    MARKET_FIELDS = [
+        "BID",
+        "OFFER",
+        "HIGH",
+        "LOW",
+        "MID_OPEN",
+        "CHANGE",
+        "CHANGE_PCT",
+        "MARKET_DELAY",
+        "MARKET_STATE",
+        "UPDATE_TIME",
+    ]
+
+    def __init__(self, epic: str):
+        super().__init__(
+            mode="MERGE",
+            items=[f"MARKET:{epic}"],
+            fields=self.MARKET_FIELDS,
+        )
+
+    def __repr__(self) -> str:
+        return f"MarketSubscription for {self.getItems()}"
+
+
+class Market(StreamObject):
+    __slots__ = [
+        "epic",
+        "bid",
+        "offer",
+        "high",
+        "low",
+        "mid_open",
+        "change",
+        "change_percent",
+        "market_delay",
+        "market_state",
+        "update_time",
+    ]
+
+    FIELDS = {
+        "BID": ("bid", float),
+        "OFFER": ("offer", float),
+        "HIGH": ("high", float),
+        "LOW": ("low", float),
+        "MID_OPEN": ("mid_open", float),
+        "CHANGE": ("change", float),
+        "CHANGE_PCT": ("change_percent", float),
+        "MARKET_DELAY": ("market_delay", int),
+        "MARKET_STATE": ("market_state", str),
+        "UPDATE_TIME": ("update_time", str),
+    }
+
+    def __init__(self, epic):
+        self.epic = epic
+        self.bid = nan
+        self.offer = nan
+        self.high = nan
+        self.low = nan
+        self.mid_open = nan
+        self.change = nan
+        self.change_percent = nan
+        self.market_delay = 0
+        self.market_state = None
+        self.update_time = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.epic}: {self.update_time} {self.market_state} {self.bid} "
+            f"{self.offer} {self.high} {self.low} {self.change} "
+            f"{self.change_percent}%"
+        )
+
+    @classmethod
+    def identifier(cls, name):
+        return name.split(":")[1]
@@ -5,6 +5,46 @@ nan = float("nan")
 
 
 class StreamObject:
+    """
+    Base class for objects holding the latest values of a streamed item.
+
+    Subclasses declare their attributes in __slots__, and map stream field
+    names to (attribute, converter) in FIELDS. The table is compiled once per
+    class into the attributes' setters, so populate() only looks at the fields
+    present in an update, and does no attribute lookup by name
+    """
+
+    __slots__ = ()
+
+    # stream field name -> (attribute name, converter)
+    FIELDS = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._decoders = {
+            field: (getattr(cls, attr).__set__, converter)
+            for field, (attr, converter) in cls.FIELDS.items()
+        }
+
+    def populate(self, values):
+        """
+        Updates the attributes from the changed fields of an update. Empty and
+        invalid values are ignored, keeping the previous value
+        """
+        decoders = self._decoders
+        for key, value in values.items():
+            if value is None or value == "":
+                continue
+            decoder = decoders.get(key)
+            if decoder is None:
+                continue
+            setter, converter = decoder
+            try:
+                setter(self, converter(value))
+            except (TypeError, ValueError):
+                # ignore, there will be plenty of dud values
+                pass
+
     def set_by_name(self, attr_name, values, key, type):
         try:
             if key in values:
@@ -22,3 +62,22 @@ class StreamObject:
         except TypeError:
             # ignore, there will be plenty of dud values
             pass
+
+
+class TimestampMixin:
+    """
+    Keeps an update time as ms since epoch (timestamp_ms), and only converts it
+    to a datetime when timestamp is read
+    """
+
+    __slots__ = ()
+
+    @property
+    def timestamp(self):
+        if self.timestamp_ms is None:
+            return None
+        return datetime.fromtimestamp(self.timestamp_ms / 1000)
+
+    @timestamp.setter
+    def timestamp(self, value):
+        self.timestamp_ms = None if value is None else int(value.timestamp() * 1000)
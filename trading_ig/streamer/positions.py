@@ -0,0 +1,233 @@
+import json
+import logging
+from threading import Lock
+
+from ..rest import IGException
+from ..utils import _HAS_PANDAS, OPT_URL
+from .account import Account
+
+if _HAS_PANDAS:
+    from ..utils import pd
+
+logger = logging.getLogger(__name__)
+
+# WOU fields with a different name in the REST working order data
+WOU_FIELDS = {"level": "orderLevel", "size": "orderSize", "currency": "currencyCode"}
+
+# affected deal statuses (in a deal confirmation) that end a position or order
+CLOSED_STATUSES = ("FULLY_CLOSED", "DELETED")
+
+
+def _records(data, key, inner, market):
+    """Flat dicts from a REST positions or working orders response, whether it
+    was returned as a DataFrame or as parsed JSON"""
+    if _HAS_PANDAS and isinstance(data, pd.DataFrame):
+        return data.to_dict("records")
+    return [{**row.get(market, {}), **row[inner]} for row in data[key]]
+
+
+class _Deals:
+    """Deals by dealId, with an index by epic"""
+
+    def __init__(self):
+        self.by_id = {}
+        self.by_epic = {}
+
+    def put(self, deal):
+        deal_id = deal["dealId"]
+        old = self.by_id.get(deal_id)
+        if old is not None and old.get("epic") != deal.get("epic"):
+            self.remove(deal_id)
+        self.by_id[deal_id] = deal
+        self.by_epic.setdefault(deal.get("epic"), {})[deal_id] = deal
+
+    def update(self, deal_id, fields):
+        """Merges fields into the deal (as a new dict, so the ones handed out
+        do not change), or adds it"""
+        old = self.by_id.get(deal_id)
+        deal = {**old, **fields} if old is not None else dict(fields)
+        self.put(deal)
+
+    def remove(self, deal_id):
+        deal = self.by_id.pop(deal_id, None)
+        if deal is None:
+            return False
+        deals = self.by_epic.get(deal.get("epic"))
+        if deals is not None:
+            deals.pop(deal_id, None)
+            if not deals:
+                del self.by_epic[deal.get("epic")]
+        return True
+
+    def clear(self):
+        self.by_id.clear()
+        self.by_epic.clear()
+
+
+class PositionCache:
+    """
+    Open positions, working orders and account balances for one account, kept
+    up to date from the streaming API instead of polling fetch_open_positions()
+    and fetch_working_orders().
+
+    It is filled once from the REST API by bootstrap(), then updated from the
+    OPU (open position), WOU (working order) and CONFIRMS fields of the TRADE
+    subscription, and from the ACCOUNT subscription. Updates that arrive
+    before bootstrap() has finished are held, and applied in order on top of
+    the REST snapshot. Positions and orders are flat dicts, with the REST field
+    names (dealId, epic, direction, size, level...; orderSize, orderLevel...
+    for orders), and are replaced rather than changed, so the ones returned
+    stay as they were. StreamingManager.start_position_cache() sets it all up
+    """
+
+    def __init__(self, account_id=None):
+        """
+        :param account_id: account. Optional
+        :type account_id: str
+        """
+        self.account_id = account_id
+        self.account = Account(account_id)
+        self.ready = False
+        self._positions = _Deals()
+        self._orders = _Deals()
+        self._pending = []
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"PositionCache for {self.account_id}: "
+            f"{len(self._positions.by_id)} positions, "
+            f"{len(self._orders.by_id)} working orders"
+        )
+
+    def bootstrap(self, ig_service):
+        """
+        Loads the open positions and working orders from the REST API, then
+        applies the updates streamed meanwhile
+        :param ig_service: logged in REST service
+        :type ig_service: IGService
+        """
+        positions = ig_service.fetch_open_positions()
+        orders = ig_service.fetch_working_orders()
+        with self._lock:
+            self._positions.clear()
+            self._orders.clear()
+            for position in _records(positions, "positions", "position", "market"):
+                self._positions.put(position)
+            for order in _records(
+                orders, "workingOrders", "workingOrderData", "marketData"
+            ):
+                self._orders.put(order)
+            pending, self._pending = self._pending, []
+            for fields in pending:
+                self._apply_trade(fields)
+            self.ready = True
+        logger.info(f"{self}, {len(pending)} streamed update(s) applied")
+
+    # -------- STREAMED UPDATES -------- #
+
+    def on_trade_update(self, fields):
+        """Applies the changed fields (JSON) of a TRADE update"""
+        with self._lock:
+            if self.ready:
+                self._apply_trade(fields)
+            else:
+                self._pending.append(fields)
+
+    def on_account_update(self, fields):
+        """Applies the changed fields of an ACCOUNT update"""
+        with self._lock:
+            self.account.populate(fields)
+
+    def _apply_trade(self, fields):
+        for key, handler in (
+            ("OPU", self._on_opu),
+            ("WOU", self._on_wou),
+            ("CONFIRMS", self._on_confirm),
+        ):
+            value = fields.get(key)
+            if value:
+                try:
+                    handler(json.loads(value) if isinstance(value, str) else value)
+                except Exception:
+                    logger.exception(f"Error applying {key} update: {value}")
+
+    def _on_opu(self, opu):
+        deal_id = opu["dealId"]
+        if opu.get("status") == "DELETED":
+            self._positions.remove(deal_id)
+        else:
+            self._positions.update(deal_id, opu)
+
+    def _on_wou(self, wou):
+        deal_id = wou["dealId"]
+        if wou.get("status") == "DELETED":
+            self._orders.remove(deal_id)
+        else:
+            fields = {WOU_FIELDS.get(key, key): value for key, value in wou.items()}
+            self._orders.update(deal_id, fields)
+
+    def _on_confirm(self, confirm):
+        # details of new and amended deals come with their OPU / WOU, but a
+        # confirmation may be the first to report a deal gone
+        if confirm.get("dealStatus") != "ACCEPTED":
+            return
+        for deal in confirm.get("affectedDeals") or []:
+            if deal.get("status") in CLOSED_STATUSES:
+                self._positions.remove(deal["dealId"])
+                self._orders.remove(deal["dealId"])
+
+    # -------- LOOKUPS -------- #
+
+    @property
+    def positions(self):
+        """All open positions"""
+        with self._lock:
+            return list(self._positions.by_id.values())
+
+    @property
+    def orders(self):
+        """All working orders"""
+        with self._lock:
+            return list(self._orders.by_id.values())
+
+    def position(self, deal_id):
+        """Returns the open position with the deal id, or None"""
+        return self._positions.by_id.get(deal_id)
+
+    def order(self, deal_id):
+        """Returns the working order with the deal id, or None"""
+        return self._orders.by_id.get(deal_id)
+
+    def positions_for(self, epic):
+        """Returns the open positions for the epic"""
+        with self._lock:
+            return list(self._positions.by_epic.get(epic, {}).values())
+
+    def orders_for(self, epic):
+        """Returns the working orders for the epic"""
+        with self._lock:
+            return list(self._orders.by_epic.get(epic, {}).values())
+
+    def net_size(self, epic):
+        """Returns the size of the open positions for the epic, sells negative"""
+        return sum(
+            position["size"] * (-1 if position["direction"] == "SELL" else 1)
+            for position in self.positions_for(epic)
+        )
+
+    def positions_frame(self):
+        """Returns the open positions as a DataFrame, one per row. Requires
+        pandas"""
+        return self._frame(self.positions)
+
+    def orders_frame(self):
+        """Returns the working orders as a DataFrame, one per row. Requires
+        pandas"""
+        return self._frame(self.orders)
+
+    @staticmethod
+    def _frame(rows):
+        if not _HAS_PANDAS:
+            raise IGException(f"DataFrame snapshots require pandas. See {OPT_URL}")
+        return pd.DataFrame(rows)
@@ -0,0 +1,237 @@
+import json
+import logging
+import time
+from threading import Lock
+
+from lightstreamer.client import SubscriptionListener, ItemUpdate
+
+from ..rest import IGException
+from ..utils import OPT_URL
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    _HAS_PYARROW = False
+else:
+    _HAS_PYARROW = True
+
+logger = logging.getLogger(__name__)
+
+
+class StreamRecorder(SubscriptionListener):
+    """
+    Records streamed updates to a Parquet file, as they are received: receive
+    time (ns since epoch), item name, snapshot flag and the changed fields (as
+    JSON). Add it as a listener to any subscription, or pass it to
+    StreamingManager to record every subscription it makes. Requires pyarrow.
+
+    Rows are buffered, and written as a row group every batch_size updates;
+    call close() to write the rest
+    """
+
+    SCHEMA_FIELDS = [
+        ("received", "int64"),
+        ("item", "string"),
+        ("snapshot", "bool_"),
+        ("changed", "string"),
+    ]
+
+    def __init__(self, path, batch_size=10000, compression="zstd"):
+        """
+        :param path: Parquet file to write
+        :type path: str
+        :param batch_size: updates per row group. Optional, default 10000
+        :type batch_size: int
+        :param compression: Parquet compression codec. Optional, default zstd
+        :type compression: str
+        """
+        if not _HAS_PYARROW:
+            raise IGException(f"StreamRecorder requires pyarrow. See {OPT_URL}")
+        self.path = path
+        self.batch_size = batch_size
+        self.count = 0
+        self._schema = pa.schema(
+            [(name, getattr(pa, kind)()) for name, kind in self.SCHEMA_FIELDS]
+        )
+        self._writer = pq.ParquetWriter(path, self._schema, compression=compression)
+        self._lock = Lock()
+        self._clear()
+
+    def _clear(self):
+        self._received = []
+        self._items = []
+        self._snapshots = []
+        self._changed = []
+
+    def onItemUpdate(self, update: ItemUpdate):
+        self.record(update)
+
+    def record(self, update, received=None):
+        """
+        Records one update
+        :param received: receive time, ns since epoch. Optional, default now
+        :type received: int
+        """
+        if received is None:
+            received = time.time_ns()
+        is_snapshot = getattr(update, "isSnapshot", None)
+        changed = json.dumps(update.getChangedFields(), separators=(",", ":"))
+        with self._lock:
+            if self._writer is None:
+                return
+            self._received.append(received)
+            self._items.append(update.getItemName())
+            self._snapshots.append(bool(is_snapshot()) if is_snapshot else False)
+            self._changed.append(changed)
+            self.count += 1
+            if len(self._received) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+        if not self._received:
+            return
+        columns = [self._received, self._items, self._snapshots, self._changed]
+        self._writer.write_table(pa.table(columns, schema=self._schema))
+        self._clear()
+
+    def flush(self):
+        with self._lock:
+            if self._writer is not None:
+                self._flush()
+
+    def close(self):
+        with self._lock:
+            if self._writer is None:
+                return
+            self._flush()
+            self._writer.close()
+            self._writer = None
+        logger.info(f"Recorded {self.count} updates to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def onSubscriptionError(self, code, message):
+        logger.info(f"StreamRecorder onSubscriptionError(): '{code}' {message}")
+
+
+class RecordedUpdate:
+    """
+    A replayed update, with the same methods as a Lightstreamer ItemUpdate
+    used by this library. getFields() holds the latest value of every field
+    of the item seen so far in the recording
+    """
+
+    __slots__ = ["received", "_name", "_changed", "_fields", "_snapshot"]
+
+    def __init__(self, received, name, changed, fields, snapshot=False):
+        self.received = received
+        self._name = name
+        self._changed = changed
+        self._fields = fields
+        self._snapshot = snapshot
+
+    def getItemName(self):
+        return self._name
+
+    def getChangedFields(self):
+        return self._changed
+
+    def getFields(self):
+        return self._fields
+
+    def getValue(self, field):
+        return self._fields.get(field)
+
+    def isSnapshot(self):
+        return self._snapshot
+
+    def __repr__(self) -> str:
+        return f"RecordedUpdate({self.received}, {self._name}, {self._changed})"
+
+
+class StreamReplay:
+    """
+    Replays a StreamRecorder file, in order, into a StreamingManager, a
+    subscription listener or any callable taking an update: at the recorded
+    pace, faster or slower by a speed factor, or as fast as possible.
+    Requires pyarrow
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Parquet file written by StreamRecorder
+        :type path: str
+        """
+        if not _HAS_PYARROW:
+            raise IGException(f"StreamReplay requires pyarrow. See {OPT_URL}")
+        self.path = path
+
+    def updates(self, items=None):
+        """
+        Generator over the recorded updates
+        :param items: only replay these item names. Optional, default all
+        :type items: list of str
+        :rtype: generator of RecordedUpdate
+        """
+        wanted = set(items) if items is not None else None
+        fields = {}
+        parquet = pq.ParquetFile(self.path)
+        for i in range(parquet.num_row_groups):
+            group = parquet.read_row_group(i).to_pydict()
+            rows = zip(
+                group["received"], group["item"], group["snapshot"], group["changed"]
+            )
+            for received, item, snapshot, changed in rows:
+                if wanted is not None and item not in wanted:
+                    continue
+                changed = json.loads(changed)
+                state = fields.get(item)
+                state = dict(changed) if state is None else {**state, **changed}
+                fields[item] = state
+                yield RecordedUpdate(received, item, changed, state, snapshot)
+
+    @staticmethod
+    def _target(target):
+        for method in ("on_update", "onItemUpdate"):
+            if hasattr(target, method):
+                return getattr(target, method)
+        return target
+
+    def replay(self, target, speed=None, items=None):
+        """
+        Feeds the recorded updates to the target
+        :param target: StreamingManager, SubscriptionListener or callable
+        :param speed: 1 for the recorded pace, 10 for ten times faster...
+            Optional, default None (as fast as possible)
+        :type speed: float
+        :param items: only replay these item names. Optional, default all
+        :type items: list of str
+        :return: number of updates, elapsed seconds, and the max delay (seconds)
+            of an update behind its scheduled time
+        :rtype: dict
+        """
+        deliver = self._target(target)
+        count = 0
+        max_delay = 0.0
+        start = time.perf_counter()
+        first = None
+        for update in self.updates(items):
+            if speed:
+                if first is None:
+                    first = update.received
+                due = start + (update.received - first) / 1e9 / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif -delay > max_delay:
+                    max_delay = -delay
+            deliver(update)
+            count += 1
+        elapsed = time.perf_counter() - start
+        logger.info(f"Replayed {count} updates from {self.path} in {elapsed:.3f}s")
+        return {"count": count, "elapsed": elapsed, "max_delay": max_delay}
@@ -0,0 +1,300 @@
+import logging
+import sys
+import time
+from multiprocessing import shared_memory
+from threading import Lock
+
+from ..rest import IGException
+from ..utils import _HAS_PANDAS, OPT_URL
+
+if _HAS_PANDAS:
+    from ..utils import np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"IGPRICE1"
+EPIC_BYTES = 64
+COLUMNS = ["timestamp", "bid", "offer", "ltp", "volume"]
+
+# header: magic, max epics, history length, epics published (uint64 each)
+_HEADER = 4
+_attach_lock = Lock()
+
+
+def _layout(max_epics, history):
+    """Byte offsets of the sections of the segment, and its size"""
+    names = _HEADER * 8
+    state = names + max_epics * EPIC_BYTES
+    ticks = state + max_epics * 2 * 8
+    size = ticks + max_epics * history * len(COLUMNS) * 8
+    return names, state, ticks, size
+
+
+class _SharedPrices:
+    """
+    Latest ticks per epic in a named shared memory segment, laid out as:
+
+    - a header: magic, max epics, history length, number of epics published
+    - the epic of each slot, in the order they were published
+    - per slot, a sequence number and the number of ticks written
+    - per slot, a ring buffer of the latest ticks: timestamp (ms since epoch),
+      bid, offer, last traded price and volume, all as float64
+
+    Slots are written by a single thread each. The sequence number is odd
+    while a tick is being written (a seqlock): readers copy what they need, and
+    retry if the sequence number was odd or has changed meanwhile, so they
+    never take a lock nor see a half written tick
+    """
+
+    def __init__(self, shm, max_epics, history):
+        self._shm = shm
+        self.name = shm.name
+        self.max_epics = max_epics
+        self.history = history
+        names, state, ticks, _ = _layout(max_epics, history)
+        buf = shm.buf
+        self._header = np.ndarray((_HEADER,), np.uint64, buf)
+        self._names = np.ndarray((max_epics,), f"S{EPIC_BYTES}", buf, names)
+        self._state = np.ndarray((max_epics, 2), np.uint64, buf, state)
+        self._ticks = np.ndarray(
+            (max_epics, history, len(COLUMNS)), np.float64, buf, ticks
+        )
+        self._slots = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return int(self._header[3])
+
+    @property
+    def epics(self):
+        return [name.decode() for name in self._names[: len(self)]]
+
+    def _release(self):
+        # numpy views must go before the segment can be closed
+        self._header = self._names = self._state = self._ticks = None
+        self._shm.close()
+
+
+class PricePublisher(_SharedPrices):
+    """
+    Creates the shared memory segment, and writes the latest ticks of each
+    epic to it. Pass it to StreamingManager to publish every streamed tick, so
+    that one streaming connection can serve any number of PriceReader
+    processes on the host. Requires numpy
+    """
+
+    def __init__(self, name="trading_ig_prices", max_epics=256, history=1024):
+        """
+        :param name: shared memory segment name. Optional
+        :type name: str
+        :param max_epics: number of epics that can be published. Optional,
+            default 256
+        :type max_epics: int
+        :param history: ticks kept per epic. Optional, default 1024
+        :type history: int
+        """
+        if not _HAS_PANDAS:
+            raise IGException(f"PricePublisher requires numpy. See {OPT_URL}")
+        size = _layout(max_epics, history)[3]
+        shm = shared_memory.SharedMemory(name, create=True, size=size)
+        super().__init__(shm, max_epics, history)
+        self._names[:] = b""
+        self._state[:] = 0
+        self._ticks[:] = np.nan
+        self._header[1:] = (max_epics, history, 0)
+        self._header[0] = int.from_bytes(MAGIC, "little")
+        self._lock = Lock()
+        self._rejected = set()
+
+    def __repr__(self) -> str:
+        return f"PricePublisher '{self.name}': {len(self)}/{self.max_epics} epics"
+
+    def slot(self, epic):
+        """Returns the slot of the epic, publishing it if needed, or None if
+        all the slots are taken"""
+        slot = self._slots.get(epic)
+        if slot is None:
+            with self._lock:
+                slot = self._slots.get(epic)
+                if slot is None:
+                    slot = self._add(epic)
+        return slot
+
+    def _add(self, epic):
+        count = len(self)
+        if count == self.max_epics:
+            if epic not in self._rejected:
+                self._rejected.add(epic)
+                logger.warning(f"No shared price slot left for {epic}")
+            return None
+        self._names[count] = epic.encode()
+        # readers only look at slots below the count
+        self._header[3] = count + 1
+        self._slots[epic] = count
+        return count
+
+    def publish(self, epic, timestamp, bid, offer, ltp, volume):
+        """
+        Writes one tick for the epic
+        :param timestamp: tick time, ms since epoch
+        :type timestamp: int
+        """
+        slot = self.slot(epic)
+        if slot is None:
+            return
+        state = self._state[slot]
+        seq = int(state[0])
+        state[0] = seq + 1
+        total = int(state[1])
+        self._ticks[slot, total % self.history] = (timestamp, bid, offer, ltp, volume)
+        state[1] = total + 1
+        state[0] = seq + 2
+
+    def append(self, ticker):
+        """Publishes the current values of a Ticker"""
+        self.publish(
+            ticker.epic,
+            ticker.timestamp_ms or 0,
+            ticker.bid,
+            ticker.offer,
+            ticker.last_traded_price,
+            ticker.last_traded_volume,
+        )
+
+    def close(self):
+        """Closes and removes the segment. Readers attached keep their mapping"""
+        if self._shm is None:
+            return
+        shm = self._shm
+        self._release()
+        shm.unlink()
+        self._shm = None
+
+
+class PriceReader(_SharedPrices):
+    """
+    Reads the ticks published by a PricePublisher in another process (or the
+    same one), without locks. Requires numpy
+    """
+
+    def __init__(self, name="trading_ig_prices", retries=1000):
+        """
+        :param name: shared memory segment name. Optional
+        :type name: str
+        :param retries: attempts at a consistent read of a slot, while it is
+            being written, before giving up. Optional, default 1000
+        :type retries: int
+        """
+        if not _HAS_PANDAS:
+            raise IGException(f"PriceReader requires numpy. See {OPT_URL}")
+        shm = _attach(name)
+        header = np.ndarray((_HEADER,), np.uint64, shm.buf)
+        if header[0] != int.from_bytes(MAGIC, "little"):
+            del header
+            shm.close()
+            raise IGException(f"'{name}' is not a shared price segment")
+        max_epics, history = int(header[1]), int(header[2])
+        del header
+        super().__init__(shm, max_epics, history)
+        self.retries = retries
+
+    def __repr__(self) -> str:
+        return f"PriceReader '{self.name}': {len(self)} epics"
+
+    def slot(self, epic):
+        """Returns the slot of the epic, or None if it is not published yet"""
+        slot = self._slots.get(epic)
+        if slot is None:
+            for i, name in enumerate(self._names[: len(self)]):
+                self._slots.setdefault(name.decode(), i)
+            slot = self._slots.get(epic)
+        return slot
+
+    def _read(self, slot, n):
+        state = self._state[slot]
+        ticks = self._ticks[slot]
+        for _ in range(self.retries):
+            seq = int(state[0])
+            if seq & 1:
+                time.sleep(0)
+                continue
+            total = int(state[1])
+            count = min(n, total, self.history)
+            end = total % self.history
+            if count <= end:
+                rows = ticks[end - count : end].copy()
+            else:
+                rows = np.concatenate((ticks[end - count :], ticks[:end]))
+            if state[0] == seq:
+                return rows, total
+        raise IGException(f"No consistent read of shared price slot {slot}")
+
+    def latest(self, epic):
+        """
+        Returns the latest tick for the epic
+        :return: timestamp, bid, offer, ltp, volume; or None if no tick yet
+        :rtype: dict
+        """
+        slot = self.slot(epic)
+        if slot is None:
+            return None
+        rows, total = self._read(slot, 1)
+        if not total:
+            return None
+        row = rows[0]
+        values = dict(zip(COLUMNS, row.tolist()))
+        values["timestamp"] = int(values["timestamp"])
+        return values
+
+    def last(self, epic, n=None):
+        """
+        Returns (copies of) the latest n ticks for the epic, oldest first
+        :param n: number of ticks. Optional, default all held
+        :type n: int
+        :return: column name to values, empty if no tick yet
+        :rtype: dict of numpy.ndarray
+        """
+        slot = self.slot(epic)
+        if slot is None:
+            return {name: np.empty(0) for name in COLUMNS}
+        rows, _ = self._read(slot, self.history if n is None else n)
+        columns = {name: rows[:, i] for i, name in enumerate(COLUMNS)}
+        columns["timestamp"] = columns["timestamp"].astype(np.int64)
+        return columns
+
+    def total(self, epic):
+        """Number of ticks published for the epic so far"""
+        slot = self.slot(epic)
+        return 0 if slot is None else int(self._state[slot, 1])
+
+    def close(self):
+        if self._shm is not None:
+            self._release()
+            self._shm = None
+
+
+def _attach(name):
+    """Attaches to an existing segment. Before Python 3.13, attaching registers
+    the segment with the resource tracker, which then removes it when this
+    process exits (or breaks the publisher's own registration, if the tracker
+    is shared with it), so the registration is skipped"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    from multiprocessing import resource_tracker
+
+    with _attach_lock:
+        register = resource_tracker.register
+        resource_tracker.register = _skip_register
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+def _skip_register(name, rtype):
+    pass
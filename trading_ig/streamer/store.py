@@ -0,0 +1,164 @@
+import logging
+from threading import Lock
+
+from ..rest import IGException
+from ..utils import _HAS_PANDAS, OPT_URL
+
+if _HAS_PANDAS:
+    from ..utils import np
+
+logger = logging.getLogger(__name__)
+
+
+class TickBuffer:
+    """
+    Fixed capacity ring buffer of ticks for one epic, stored as preallocated
+    NumPy columns: timestamp (ms since epoch), bid, offer, last traded price and
+    last traded volume.
+
+    Each column is allocated at twice the capacity, and every tick is written
+    both at its slot and at slot + capacity. The latest n ticks are then always
+    contiguous, so last() and column() return views instead of copies. Views are
+    read only, and are overwritten as new ticks arrive: copy them if a stable
+    snapshot is needed
+    """
+
+    COLUMNS = ["timestamp", "bid", "offer", "ltp", "volume"]
+
+    def __init__(self, epic, capacity):
+        if not _HAS_PANDAS:
+            raise IGException(f"TickBuffer requires numpy. See {OPT_URL}")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.epic = epic
+        self.capacity = capacity
+        size = 2 * capacity
+        self._timestamp = np.zeros(size, dtype=np.int64)
+        self._bid = np.full(size, np.nan)
+        self._offer = np.full(size, np.nan)
+        self._ltp = np.full(size, np.nan)
+        self._volume = np.zeros(size, dtype=np.int64)
+        self._columns = {
+            "timestamp": self._timestamp,
+            "bid": self._bid,
+            "offer": self._offer,
+            "ltp": self._ltp,
+            "volume": self._volume,
+        }
+        self._next = 0
+        self._count = 0
+        self.total = 0
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self) -> str:
+        return f"TickBuffer for {self.epic}: {self._count}/{self.capacity} ticks"
+
+    def append(self, timestamp, bid, offer, ltp, volume):
+        """
+        Adds one tick, overwriting the oldest one if the buffer is full
+        :param timestamp: tick time, ms since epoch
+        :type timestamp: int
+        """
+        i = self._next
+        j = i + self.capacity
+        self._timestamp[i] = self._timestamp[j] = timestamp
+        self._bid[i] = self._bid[j] = bid
+        self._offer[i] = self._offer[j] = offer
+        self._ltp[i] = self._ltp[j] = ltp
+        self._volume[i] = self._volume[j] = volume
+        i += 1
+        self._next = 0 if i == self.capacity else i
+        if self._count < self.capacity:
+            self._count += 1
+        self.total += 1
+
+    def _window(self, n):
+        if n is None or n > self._count:
+            n = self._count
+        end = self._next + self.capacity
+        return end - n, end
+
+    def column(self, name, n=None):
+        """
+        Returns a read only view of the latest n values of one column, oldest
+        first
+        :param name: one of timestamp, bid, offer, ltp, volume
+        :type name: str
+        :param n: number of ticks. Optional, default all held
+        :type n: int
+        :rtype: numpy.ndarray
+        """
+        start, end = self._window(n)
+        view = self._columns[name][start:end]
+        view.flags.writeable = False
+        return view
+
+    def last(self, n=None):
+        """
+        Returns read only views of the latest n ticks, oldest first
+        :param n: number of ticks. Optional, default all held
+        :type n: int
+        :return: column name to values
+        :rtype: dict of numpy.ndarray
+        """
+        return {name: self.column(name, n) for name in self.COLUMNS}
+
+    def mid(self, n=None):
+        """Returns the mid prices of the latest n ticks (a new array)"""
+        return (self.column("bid", n) + self.column("offer", n)) / 2
+
+
+class TickStore:
+    """
+    Per epic TickBuffers, created on the first tick for each epic. Filled by
+    the StreamingManager consumer thread from each Ticker after it is updated,
+    so every row holds the latest known value of every column
+    """
+
+    def __init__(self, capacity=10000):
+        """
+        :param capacity: ticks held per epic. Optional, default 10000
+        :type capacity: int
+        """
+        if not _HAS_PANDAS:
+            raise IGException(f"TickStore requires numpy. See {OPT_URL}")
+        self.capacity = capacity
+        self._buffers = {}
+        self._lock = Lock()
+
+    def __contains__(self, epic):
+        return epic in self._buffers
+
+    def __getitem__(self, epic) -> TickBuffer:
+        return self._buffers[epic]
+
+    def __len__(self):
+        return len(self._buffers)
+
+    @property
+    def epics(self):
+        return list(self._buffers)
+
+    def buffer(self, epic) -> TickBuffer:
+        """Returns the buffer for the epic, creating it if needed"""
+        buffer = self._buffers.get(epic)
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.get(epic)
+                if buffer is None:
+                    logger.debug(f"Creating tick buffer for {epic}")
+                    buffer = TickBuffer(epic, self.capacity)
+                    self._buffers[epic] = buffer
+        return buffer
+
+    def append(self, ticker):
+        """Adds the current values of a Ticker to its epic's buffer"""
+        self.buffer(ticker.epic).append(
+            ticker.timestamp_ms or 0,
+            ticker.bid,
+            ticker.offer,
+            ticker.last_traded_price,
+            ticker.last_traded_volume,
+        )
@@ -1,11 +1,10 @@
-from dataclasses import dataclass
-from datetime import datetime
+from typing import List, Union
 from lightstreamer.client import Subscription
-from .objects import nan, StreamObject
+from .objects import nan, StreamObject, TimestampMixin
 
 
 class TickerSubscription(Subscription):
-    """Represents a subscription for tick prices"""
+    """Represents a subscription for tick prices, for one or more epics"""
 
     TICKER_FIELDS = [
         "BID",
@@ -21,34 +20,65 @@ class TickerSubscription(Subscription):
         "DAY_LOW",
     ]
 
-    def __init__(self, epic: str):
+    def __init__(self, epic: Union[str, List[str]]):
+        epics = [epic] if isinstance(epic, str) else list(epic)
         super().__init__(
             mode="DISTINCT",
-            items=[f"CHART:{epic}:TICK"],
+            items=[f"CHART:{epic}:TICK" for epic in epics],
             fields=self.TICKER_FIELDS,
         )
 
+    @property
+    def epics(self) -> List[str]:
+        return [Ticker.identifier(item) for item in self.getItems()]
+
     def __repr__(self) -> str:
-        return f"TickSubscription with {len(self.item_names)} epics"
+        return f"TickSubscription with {len(self.getItems())} epics"
+
 
+class Ticker(TimestampMixin, StreamObject):
+    __slots__ = [
+        "epic",
+        "timestamp_ms",
+        "bid",
+        "offer",
+        "last_traded_price",
+        "last_traded_volume",
+        "incr_volume",
+        "day_open_mid",
+        "day_net_change_mid",
+        "day_percent_change_mid",
+        "day_high",
+        "day_low",
+    ]
 
-@dataclass
-class Ticker(StreamObject):
-    epic: str
-    timestamp: datetime = None
-    bid: float = nan
-    offer: float = nan
-    last_traded_price: float = nan
-    last_traded_volume: int = 0
-    incr_volume: int = 0
-    day_open_mid: float = nan
-    day_net_change_mid: float = nan
-    day_percent_change_mid: float = nan
-    day_high: float = nan
-    day_low: float = nan
+    FIELDS = {
+        "UTM": ("timestamp_ms", int),
+        "BID": ("bid", float),
+        "OFR": ("offer", float),
+        "LTP": ("last_traded_price", float),
+        "LTV": ("last_traded_volume", int),
+        "TTV": ("incr_volume", int),
+        "DAY_OPEN_MID": ("day_open_mid", float),
+        "DAY_NET_CHG_MID": ("day_net_change_mid", float),
+        "DAY_PERC_CHG_MID": ("day_percent_change_mid", float),
+        "DAY_HIGH": ("day_high", float),
+        "DAY_LOW": ("day_low", float),
+    }
 
     def __init__(self, epic):
         self.epic = epic
+        self.timestamp_ms = None
+        self.bid = nan
+        self.offer = nan
+        self.last_traded_price = nan
+        self.last_traded_volume = 0
+        self.incr_volume = 0
+        self.day_open_mid = nan
+        self.day_net_change_mid = nan
+        self.day_percent_change_mid = nan
+        self.day_high = nan
+        self.day_low = nan
 
     def __repr__(self) -> str:
         return (
@@ -59,20 +89,6 @@ class Ticker(StreamObject):
             f"{self.day_low}"
         )
 
-    def populate(self, values):
-        # print(f"ticker populating: {values}")
-        self.set_timestamp_by_name("timestamp", values, "UTM")
-        self.set_by_name("bid", values, "BID", float)
-        self.set_by_name("offer", values, "OFR", float)
-        self.set_by_name("last_traded_price", values, "LTP", float)
-        self.set_by_name("last_traded_volume", values, "LTV", int)
-        self.set_by_name("incr_volume", values, "TTV", int)
-        self.set_by_name("day_open_mid", values, "DAY_OPEN_MID", float)
-        self.set_by_name("day_net_change_mid", values, "DAY_NET_CHG_MID", float)
-        self.set_by_name("day_percent_change_mid", values, "DAY_PERC_CHG_MID", float)
-        self.set_by_name("day_high", values, "DAY_HIGH", float)
-        self.set_by_name("day_low", values, "DAY_LOW", float)
-
     @classmethod
     def identifier(cls, name):
         epic = name.split(":")[1]
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError
+from threading import Lock
+
+from lightstreamer.client import Subscription, SubscriptionListener, ItemUpdate
+from .objects import StreamObject
+
+logger = logging.getLogger(__name__)
+
+
+class TradeSubscription(Subscription):
+    """Represents a subscription for trade updates (deal confirmations, open
+    position updates and working order updates) for one account"""
+
+    TRADE_FIELDS = ["CONFIRMS", "OPU", "WOU"]
+
+    def __init__(self, account_id: str):
+        super().__init__(
+            mode="DISTINCT",
+            items=[f"TRADE:{account_id}"],
+            fields=self.TRADE_FIELDS,
+        )
+
+    def __repr__(self) -> str:
+        return f"TradeSubscription for {self.getItems()}"
+
+
+class Trade(StreamObject):
+    """Latest deal confirmation, open position update and working order update
+    streamed for an account, decoded from JSON"""
+
+    __slots__ = ["account_id", "confirms", "opu", "wou"]
+
+    FIELDS = {
+        "CONFIRMS": ("confirms", json.loads),
+        "OPU": ("opu", json.loads),
+        "WOU": ("wou", json.loads),
+    }
+
+    def __init__(self, account_id):
+        self.account_id = account_id
+        self.confirms = None
+        self.opu = None
+        self.wou = None
+
+    def __repr__(self) -> str:
+        return f"{self.account_id}: {self.confirms} {self.opu} {self.wou}"
+
+    @classmethod
+    def identifier(cls, name):
+        return name.split(":")[1]
+
+
+class DealConfirmations(SubscriptionListener):
+    """
+    Listener for the CONFIRMS field of a TradeSubscription. Callers wait on a
+    deal reference, and are woken as soon as its confirmation is streamed.
+    Confirmations that arrive before anyone waits for them are kept, up to
+    max_retained, so a confirmation racing the dealing response is not lost
+    """
+
+    def __init__(self, max_retained=1000):
+        self._lock = Lock()
+        self._futures = {}
+        self._received = OrderedDict()
+        self._max_retained = max_retained
+        # (deal reference, seconds from wait() to confirmation), newest last
+        self.latencies = deque(maxlen=1000)
+
+    def onItemUpdate(self, update: ItemUpdate):
+        value = update.getChangedFields().get("CONFIRMS")
+        if value:
+            self.on_confirmation(json.loads(value))
+
+    def on_confirmation(self, confirm):
+        deal_reference = confirm.get("dealReference")
+        if deal_reference is None:
+            return
+        logger.debug(f"Streamed confirmation for {deal_reference}")
+        with self._lock:
+            self._received[deal_reference] = confirm
+            while len(self._received) > self._max_retained:
+                self._received.popitem(last=False)
+            futures = self._futures.pop(deal_reference, ())
+        for future in futures:
+            future.set_result(confirm)
+
+    def _future(self, deal_reference):
+        """Returns a future of the confirmation, one per waiter"""
+        future = Future()
+        with self._lock:
+            confirm = self._received.get(deal_reference)
+            if confirm is not None:
+                future.set_result(confirm)
+            else:
+                self._futures.setdefault(deal_reference, []).append(future)
+        return future
+
+    def _discard(self, deal_reference, future):
+        """Stops tracking the future of a waiter that timed out"""
+        with self._lock:
+            futures = self._futures.get(deal_reference)
+            if futures is not None and future in futures:
+                futures.remove(future)
+                if not futures:
+                    del self._futures[deal_reference]
+
+    def wait(self, deal_reference, timeout=None):
+        """
+        Blocks until the confirmation for the deal reference is streamed
+        :param deal_reference: deal reference
+        :type deal_reference: str
+        :param timeout: max seconds to wait. Optional, default forever
+        :type timeout: float
+        :return: confirmation, or None if the timeout expired
+        :rtype: dict
+        """
+        started = time.perf_counter()
+        future = self._future(deal_reference)
+        try:
+            confirm = future.result(timeout)
+        except TimeoutError:
+            self._discard(deal_reference, future)
+            return None
+        self.latencies.append((deal_reference, time.perf_counter() - started))
+        return confirm
+
+    async def wait_async(self, deal_reference, timeout=None):
+        """
+        Async version of wait()
+        :return: confirmation, or None if the timeout expired
+        :rtype: dict
+        """
+        started = time.perf_counter()
+        future = self._future(deal_reference)
+        try:
+            confirm = await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)), timeout
+            )
+        except asyncio.TimeoutError:
+            self._discard(deal_reference, future)
+            return None
+        self.latencies.append((deal_reference, time.perf_counter() - started))
+        return confirm
+
+    def onSubscription(self):
+        logger.info("DealConfirmations onSubscription()")
+
+    def onSubscriptionError(self, code, message):
+        logger.info(f"DealConfirmations onSubscriptionError(): '{code}' {message}")
+
+    def onUnsubscription(self):
+        logger.info("DealConfirmations onUnsubscription()")
@@ -0,0 +1,157 @@
+import time
+import zlib
+from collections import deque
+from threading import Condition
+
+
+# items in DISTINCT mode, where every update is an event of its own (a deal
+# confirmation, a position or order change) that must not be merged away
+DISTINCT_PREFIXES = ("TRADE:",)
+
+
+def conflatable(name, update):
+    """Whether later updates for the item may be merged into the update"""
+    if name.startswith(DISTINCT_PREFIXES):
+        return False
+    # the update completing an IG chart candle holds its final values
+    return update.getChangedFields().get("CONS_END") != "1"
+
+
+class ConflatedUpdate:
+    """
+    Stands in for a Lightstreamer ItemUpdate when several queued updates for an
+    item have been merged: changed fields are combined, the newest value of
+    each field winning, and all fields are taken from the newest update
+    """
+
+    __slots__ = ["_name", "_changed", "_fields"]
+
+    def __init__(self, name, changed, fields):
+        self._name = name
+        self._changed = changed
+        self._fields = fields
+
+    @classmethod
+    def merge(cls, older, newer):
+        changed = dict(older.getChangedFields())
+        changed.update(newer.getChangedFields())
+        return cls(newer.getItemName(), changed, newer.getFields())
+
+    def getItemName(self):
+        return self._name
+
+    def getChangedFields(self):
+        return self._changed
+
+    def getFields(self):
+        return self._fields
+
+
+class _Entry:
+    __slots__ = ["name", "update", "queued"]
+
+    def __init__(self, name, update, queued):
+        self.name = name
+        self.update = update
+        self.queued = queued
+
+
+class UpdateQueue:
+    """
+    Bounded queue of ItemUpdates, drained in batches.
+
+    While the queue holds fewer than maxsize updates, every update is kept. Once
+    it is full, a new update for an item that already has one waiting is merged
+    into it (conflation) instead of being queued, so only the latest state of
+    each item is kept. An update for an item with nothing waiting is always
+    queued, so the queue never holds more than maxsize updates plus one per
+    subscribed item, not counting events.
+
+    Events are never merged away: updates of DISTINCT items (TRADE) are always
+    queued, and nothing is merged into the update completing a chart candle
+    (CONS_END)
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._entries = deque()
+        self._waiting = {}
+        self._not_empty = Condition()
+        self._closed = False
+        self.queued = 0
+        self.conflated = 0
+        self.high_water = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, update):
+        name = update.getItemName()
+        with self._not_empty:
+            if len(self._entries) >= self.maxsize:
+                entry = self._waiting.get(name)
+                if entry is not None and conflatable(name, entry.update):
+                    entry.update = ConflatedUpdate.merge(entry.update, update)
+                    self.conflated += 1
+                    return
+            entry = _Entry(name, update, time.monotonic())
+            self._entries.append(entry)
+            self._waiting[name] = entry
+            self.queued += 1
+            if len(self._entries) > self.high_water:
+                self.high_water = len(self._entries)
+            self._not_empty.notify()
+
+    def get_batch(self, max_items=500, timeout=None):
+        """
+        Waits for updates, and returns up to max_items of them, oldest first
+        :return: list of (item name, update, monotonic time queued), or None
+            once the queue is closed and empty
+        :rtype: list
+        """
+        with self._not_empty:
+            while not self._entries:
+                if self._closed:
+                    return None
+                if not self._not_empty.wait(timeout):
+                    return []
+            batch = []
+            entries = self._entries
+            waiting = self._waiting
+            for _ in range(min(max_items, len(entries))):
+                entry = entries.popleft()
+                if waiting.get(entry.name) is entry:
+                    del waiting[entry.name]
+                batch.append((entry.name, entry.update, entry.queued))
+            return batch
+
+    def close(self):
+        """Wakes up and stops the consumer once the queue is drained"""
+        with self._not_empty:
+            self._closed = True
+            self._not_empty.notify_all()
+
+
+class ShardedQueue:
+    """
+    One UpdateQueue per consumer thread. Updates are routed by item name, so
+    all the updates for one epic are handled in order by the same thread
+    """
+
+    def __init__(self, shards=1, maxsize=10000):
+        self.shards = [UpdateQueue(maxsize) for _ in range(shards)]
+
+    def shard(self, name):
+        if len(self.shards) == 1:
+            return self.shards[0]
+        return self.shards[zlib.crc32(name.encode()) % len(self.shards)]
+
+    def put(self, update):
+        self.shard(update.getItemName()).put(update)
+
+    def qsize(self):
+        return sum(len(shard) for shard in self.shards)
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
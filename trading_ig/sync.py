@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Incremental sync of account activity and transaction history into a local
+ledger, so that only records newer than the last sync are downloaded
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from .rest import IGException
+from .utils import _HAS_PANDAS, OPT_URL
+
+if _HAS_PANDAS:
+    from .utils import pd
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ActivityRecord:
+    """One entry of the account activity history (v3)"""
+
+    date: str
+    epic: str
+    deal_id: str
+    type: str
+    status: str
+    description: str
+    channel: str = None
+    period: str = None
+    details: dict = field(default=None, compare=False)
+
+    @classmethod
+    def from_json(cls, d):
+        return cls(
+            date=d["date"],
+            epic=d.get("epic"),
+            deal_id=d.get("dealId"),
+            type=d.get("type"),
+            status=d.get("status"),
+            description=d.get("description"),
+            channel=d.get("channel"),
+            period=d.get("period"),
+            details=d.get("details"),
+        )
+
+
+@dataclass(frozen=True)
+class TransactionRecord:
+    """One entry of the transaction history (v2)"""
+
+    date_utc: str
+    reference: str
+    transaction_type: str
+    instrument_name: str = None
+    period: str = None
+    profit_and_loss: str = None
+    open_level: str = None
+    close_level: str = None
+    size: str = None
+    currency: str = None
+    cash_transaction: bool = None
+    open_date_utc: str = None
+
+    @classmethod
+    def from_json(cls, d):
+        return cls(
+            date_utc=d["dateUtc"],
+            reference=d.get("reference"),
+            transaction_type=d.get("transactionType"),
+            instrument_name=d.get("instrumentName"),
+            period=d.get("period"),
+            profit_and_loss=d.get("profitAndLoss"),
+            open_level=d.get("openLevel"),
+            close_level=d.get("closeLevel"),
+            size=d.get("size"),
+            currency=d.get("currency"),
+            cash_transaction=d.get("cashTransaction"),
+            open_date_utc=d.get("openDateUtc"),
+        )
+
+
+def _activity_key(d):
+    return "|".join(
+        str(d.get(k)) for k in ("date", "dealId", "type", "status", "description")
+    )
+
+
+def _transaction_key(d):
+    return "|".join(str(d.get(k)) for k in ("dateUtc", "reference", "transactionType"))
+
+
+class AccountSync(object):
+    """
+    Incremental sync of the account activity and transaction history.
+
+    For each account and record type, the date of the newest record seen is kept
+    in a cursor file, together with the keys of the records at that date (dates
+    only have a resolution of one second, and IG treats 'from' as inclusive).
+    Each sync only asks IG for records from the cursor date onwards, and drops
+    the ones seen already.
+
+    New records are yielded oldest first, in chunks, and each chunk is appended
+    to the ledger as a Parquet file before the cursor is moved past it. A sync
+    that is stopped part way through therefore resumes where it left off,
+    without gaps or duplicates. Writing the ledger requires pandas and pyarrow.
+
+    Directory layout::
+
+        path/<account id>/activity/cursor.json
+        path/<account id>/activity/part-000001.parquet
+        path/<account id>/transactions/...
+    """
+
+    ACTIVITY = "activity"
+    TRANSACTIONS = "transactions"
+
+    def __init__(
+        self,
+        ig_service,
+        path,
+        account_id=None,
+        lookback=timedelta(days=30),
+        chunk_size=500,
+    ):
+        """
+        :param ig_service: logged in IGService instance
+        :type ig_service: IGService
+        :param path: ledger directory
+        :type path: str
+        :param account_id: account the records belong to. Optional, defaults to
+            the IGService account number
+        :type account_id: str
+        :param lookback: how far back the first sync for an account goes.
+            Optional, default 30 days
+        :type lookback: timedelta
+        :param chunk_size: max number of records per yielded chunk and ledger
+            file. Optional, default 500
+        :type chunk_size: int
+        """
+        if not _HAS_PANDAS:
+            raise IGException(f"AccountSync requires pandas. See {OPT_URL}")
+        account_id = account_id or ig_service.ACC_NUMBER
+        if account_id is None:
+            raise IGException("An account id is needed to sync account history")
+        self.ig_service = ig_service
+        self.account_id = account_id
+        self.path = os.path.join(path, account_id)
+        self.lookback = lookback
+        self.chunk_size = chunk_size
+
+    # -------- SYNC -------- #
+
+    def sync_activities(self, detailed=False, as_dataframe=False, page_size=500):
+        """
+        Generator over the account activities added since the last sync
+        :param detailed: whether to fetch activity details. Optional, default False
+        :type detailed: bool
+        :param as_dataframe: yield pandas DataFrames instead of lists of
+            ActivityRecord. Optional, default False
+        :type as_dataframe: bool
+        :param page_size: IG page size (max 500). Optional, default 500
+        :type page_size: int
+        :return: chunks of new records, oldest first
+        :rtype: generator of list of ActivityRecord, or of pandas.DataFrame
+        """
+        cursor = self._read_cursor(self.ACTIVITY)
+        from_date = self._from_date(cursor)
+        records = []
+        for page in self.ig_service.iter_account_activity(
+            from_date=from_date, detailed=detailed, page_size=page_size
+        ):
+            records.extend(page["activities"])
+        yield from self._commit(
+            self.ACTIVITY,
+            cursor,
+            records,
+            "date",
+            _activity_key,
+            ActivityRecord,
+            as_dataframe,
+        )
+
+    def sync_transactions(self, trans_type="ALL", as_dataframe=False, page_size=500):
+        """
+        Generator over the transactions added since the last sync
+        :param trans_type: transaction type: ALL, ALL_DEAL, DEPOSIT or WITHDRAWAL.
+            Optional, default ALL
+        :type trans_type: str
+        :param as_dataframe: yield pandas DataFrames instead of lists of
+            TransactionRecord. Optional, default False
+        :type as_dataframe: bool
+        :param page_size: IG page size. Optional, default 500
+        :type page_size: int
+        :return: chunks of new records, oldest first
+        :rtype: generator of list of TransactionRecord, or of pandas.DataFrame
+        """
+        cursor = self._read_cursor(self.TRANSACTIONS)
+        from_date = self._from_date(cursor)
+        records = []
+        for page in self.ig_service.iter_transaction_history(
+            trans_type=trans_type,
+            from_date=from_date.strftime("%Y-%m-%dT%H:%M:%S"),
+            page_size=page_size,
+        ):
+            records.extend(page["transactions"])
+        yield from self._commit(
+            self.TRANSACTIONS,
+            cursor,
+            records,
+            "dateUtc",
+            _transaction_key,
+            TransactionRecord,
+            as_dataframe,
+        )
+
+    def sync(self):
+        """
+        Syncs both the activity and the transaction history
+        :return: number of new records of each type
+        :rtype: dict
+        """
+        counts = {self.ACTIVITY: 0, self.TRANSACTIONS: 0}
+        for chunk in self.sync_activities():
+            counts[self.ACTIVITY] += len(chunk)
+        for chunk in self.sync_transactions():
+            counts[self.TRANSACTIONS] += len(chunk)
+        logger.info(f"Synced account {self.account_id}: {counts}")
+        return counts
+
+    # -------- LEDGER -------- #
+
+    def read_activities(self):
+        """Returns all synced activities as a DataFrame, oldest first"""
+        return self._read_ledger(self.ACTIVITY)
+
+    def read_transactions(self):
+        """Returns all synced transactions as a DataFrame, oldest first"""
+        return self._read_ledger(self.TRANSACTIONS)
+
+    def _read_ledger(self, kind):
+        directory = os.path.join(self.path, kind)
+        parts = sorted(self._parts(directory))
+        if not parts:
+            return pd.DataFrame()
+        frames = [pd.read_parquet(os.path.join(directory, p)) for p in parts]
+        return pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def _parts(directory):
+        if not os.path.isdir(directory):
+            return []
+        return [
+            f
+            for f in os.listdir(directory)
+            if f.startswith("part-") and f.endswith(".parquet")
+        ]
+
+    def _commit(self, kind, cursor, records, date_col, key, record_type, as_frame):
+        """Drops records already seen, then writes and yields the rest in
+        chunks, oldest first, moving the cursor after each chunk"""
+        last_date = cursor["date"]
+        seen = set(cursor["keys"])
+        new = {}
+        for r in records:
+            k = key(r)
+            if last_date is not None:
+                if r[date_col] < last_date or (r[date_col] == last_date and k in seen):
+                    continue
+            new[k] = r
+        records = sorted(new.values(), key=lambda r: r[date_col])
+        logger.info(f"{len(records)} new {kind} record(s) for {self.account_id}")
+
+        directory = os.path.join(self.path, kind)
+        os.makedirs(directory, exist_ok=True)
+        for i in range(0, len(records), self.chunk_size):
+            chunk = records[i : i + self.chunk_size]
+            frame = self._to_frame(chunk)
+            self._write_part(directory, frame)
+
+            chunk_last = chunk[-1][date_col]
+            keys = [key(r) for r in chunk if r[date_col] == chunk_last]
+            if chunk_last == cursor["date"]:
+                keys = cursor["keys"] + keys
+            cursor = {"date": chunk_last, "keys": keys}
+            self._write_cursor(kind, cursor)
+
+            if as_frame:
+                yield frame
+            else:
+                yield [record_type.from_json(r) for r in chunk]
+
+    @staticmethod
+    def _to_frame(records):
+        frame = pd.json_normalize(records)
+        # nested values (e.g. activity details.actions) are stored as JSON text,
+        # keeping the schema flat and stable between ledger files
+        for col in frame.columns:
+            if frame[col].map(lambda v: isinstance(v, (list, dict))).any():
+                frame[col] = frame[col].map(
+                    lambda v: json.dumps(v) if isinstance(v, (list, dict)) else v
+                )
+        return frame
+
+    def _write_part(self, directory, frame):
+        numbers = [int(p[5:-8]) for p in self._parts(directory)]
+        name = "part-%06d.parquet" % (max(numbers, default=0) + 1)
+        tmp = os.path.join(directory, name + ".tmp")
+        frame.to_parquet(tmp, index=False)
+        os.replace(tmp, os.path.join(directory, name))
+
+    # -------- CURSOR -------- #
+
+    def _cursor_file(self, kind):
+        return os.path.join(self.path, kind, "cursor.json")
+
+    def _read_cursor(self, kind):
+        try:
+            with open(self._cursor_file(kind), "r") as file:
+                return json.loads(file.read())
+        except FileNotFoundError:
+            return {"date": None, "keys": []}
+
+    def _write_cursor(self, kind, cursor):
+        filename = self._cursor_file(kind)
+        with open(filename + ".tmp", "w") as file:
+            file.write(json.dumps(cursor))
+        os.replace(filename + ".tmp", filename)
+
+    def _from_date(self, cursor):
+        if cursor["date"] is None:
+            return datetime.now() - self.lookback
+        return datetime.fromisoformat(cursor["date"])